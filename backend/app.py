@@ -3,6 +3,7 @@
 import aws_cdk as cdk
 
 from backend.backend_stack import BackendStack
+from backend.utils.import_report import write_import_report
 
 
 app = cdk.App()
@@ -10,6 +11,10 @@ app = cdk.App()
 account = app.node.try_get_context("myapp:account")
 region = app.node.try_get_context("myapp:region")
 
-BackendStack(app, "BackendStack", env=cdk.Environment(account=account, region=region))
+stack = BackendStack(app, "BackendStack", env=cdk.Environment(account=account, region=region))
 
-app.synth()
+assembly = app.synth()
+
+# cdk synth -c import-report=true
+if app.node.try_get_context("import-report"):
+    write_import_report(stack, assembly.directory)
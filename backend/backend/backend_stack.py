@@ -15,6 +15,7 @@ from aws_cdk import (
     aws_apigateway as apigateway,
     aws_iam as iam,
     Duration,
+    Size,
     aws_stepfunctions as sfn,
     aws_stepfunctions_tasks as tasks,
 )
@@ -22,6 +23,12 @@ from aws_cdk import (
 from backend.utils.create_lambda import create_lambda_function
 from backend.utils.cognito_setup import setup_cognito
 from backend.utils.transcription_sf_setup import setup_transcription_sf
+from backend.utils.ingest_sf_setup import setup_ingest_sf
+from backend.utils.song_view_setup import setup_song_view
+from backend.utils.catalog_snapshot_setup import setup_catalog_snapshots
+from backend.utils.cover_setup import setup_cover_derivatives
+from backend.utils.content_setup import setup_content_release
+from backend.utils.common_layer import get_common_layer
 
 from backend.constructs.songs_construct import SongsConstruct
 from backend.constructs.albums_construct import AlbumConstruct
@@ -29,6 +36,7 @@ from backend.constructs.artists_construct import ArtistsConstruct
 from backend.constructs.subscriptions_construct import SubscriptionsConstruct
 from backend.constructs.feed_construct import FeedConstruct
 from backend.constructs.listening_history_construct import ListeningHistoryConstruct
+from backend.constructs.uploads_construct import UploadsConstruct
 
 class BackendStack(Stack):
 
@@ -47,7 +55,16 @@ class BackendStack(Stack):
             ),
             public_read_access=True,
             website_index_document="index.html",
-            website_error_document="error.html"
+            website_error_document="error.html",
+            # Browser salje delove audio fajla direktno na presigned URL-ove i cita ETag svakog dela
+            cors=[
+                s3.CorsRule(
+                    allowed_methods=[s3.HttpMethods.GET, s3.HttpMethods.PUT, s3.HttpMethods.POST],
+                    allowed_origins=["*"],
+                    allowed_headers=["*"],
+                    exposed_headers=["ETag"]
+                )
+            ]
         )
 
         CfnOutput(
@@ -62,7 +79,8 @@ class BackendStack(Stack):
             self, "Artists",
             partition_key=dynamodb.Attribute(name="Genre", type=dynamodb.AttributeType.STRING),
             sort_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
-            removal_policy=RemovalPolicy.DESTROY
+            removal_policy=RemovalPolicy.DESTROY,
+            stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES
         )
 
         artists_table.add_global_secondary_index(
@@ -71,6 +89,14 @@ class BackendStack(Stack):
             projection_type=dynamodb.ProjectionType.ALL
         )
 
+        # Sparse, write-sharded index of live items (ActiveShard = "active#0".."active#7")
+        artists_table.add_global_secondary_index(
+            index_name="active-index",
+            partition_key=dynamodb.Attribute(name="ActiveShard", type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
+            projection_type=dynamodb.ProjectionType.ALL
+        )
+
         artists_table.add_global_secondary_index(
             index_name="Id-index",
             partition_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
@@ -82,7 +108,8 @@ class BackendStack(Stack):
             self, "Songs",
             partition_key=dynamodb.Attribute(name="Album", type=dynamodb.AttributeType.STRING),
             sort_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
-            removal_policy=RemovalPolicy.DESTROY
+            removal_policy=RemovalPolicy.DESTROY,
+            stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES
         )
 
         songs_table.add_global_secondary_index(
@@ -91,6 +118,14 @@ class BackendStack(Stack):
             projection_type=dynamodb.ProjectionType.ALL
         )
 
+        # Sparse, write-sharded index of live items (ActiveShard = "active#0".."active#7")
+        songs_table.add_global_secondary_index(
+            index_name="active-index",
+            partition_key=dynamodb.Attribute(name="ActiveShard", type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
+            projection_type=dynamodb.ProjectionType.ALL
+        )
+
         songs_table.add_global_secondary_index(
             index_name="Album-index",
             partition_key=dynamodb.Attribute(name="Album", type=dynamodb.AttributeType.STRING),
@@ -108,7 +143,8 @@ class BackendStack(Stack):
             self, "Albums",
             partition_key=dynamodb.Attribute(name="Genre", type=dynamodb.AttributeType.STRING),
             sort_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
-            removal_policy=RemovalPolicy.DESTROY
+            removal_policy=RemovalPolicy.DESTROY,
+            stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES
         )
 
         albums_table.add_global_secondary_index(
@@ -117,6 +153,14 @@ class BackendStack(Stack):
             projection_type=dynamodb.ProjectionType.ALL
         )
 
+        # Sparse, write-sharded index of live items (ActiveShard = "active#0".."active#7")
+        albums_table.add_global_secondary_index(
+            index_name="active-index",
+            partition_key=dynamodb.Attribute(name="ActiveShard", type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
+            projection_type=dynamodb.ProjectionType.ALL
+        )
+
         albums_table.add_global_secondary_index(
             index_name="Id-index",
             partition_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
@@ -243,6 +287,12 @@ class BackendStack(Stack):
             projection_type=dynamodb.ProjectionType.ALL
         )
 
+        # SONG VIEW (read model, odrzava ga syncSongView iz stream-ova Songs/Albums/Artists)
+        song_view_table = setup_song_view(self, songs_table, albums_table, artists_table, artist_song_table)
+        setup_catalog_snapshots(self, music_bucket, song_view_table, albums_table, artists_table)
+        setup_cover_derivatives(self, music_bucket, songs_table, albums_table)
+        setup_content_release(self, music_bucket, songs_table, albums_table)
+
         user_pool, user_pool_client = setup_cognito(self)
 
         # SNS :(
@@ -273,8 +323,9 @@ class BackendStack(Stack):
 
         subscriptions_table.grant_read_data(send_email_lambda)
 
+        # SES sandbox salje najvise jedan mejl u sekundi; ogranicenje je na redu, ne rezervacija naloga
         send_email_lambda.add_event_source(
-            lambda_event_sources.SqsEventSource(new_content_queue)
+            lambda_event_sources.SqsEventSource(new_content_queue, max_concurrency=2)
         )
 
         send_email_lambda.add_to_role_policy(
@@ -312,6 +363,7 @@ class BackendStack(Stack):
         )
 
         state_machine = setup_transcription_sf(self, transcription_bucket, music_bucket, songs_table)
+        ingest_state_machine = setup_ingest_sf(self, music_bucket, songs_table)
 
         new_transcription_topic = sns.Topic(
             self, "NewTranscriptionTopic",
@@ -347,6 +399,8 @@ class BackendStack(Stack):
         api = apigateway.RestApi(
             self, "MusicStreamingApi",
             rest_api_name="MusicStreamingApi",
+            # Velike liste idu gzip-ovane klijentima koji salju Accept-Encoding (snapshot-i su vec gzip objekti u S3)
+            min_compression_size=Size.kibibytes(1),
             deploy_options=apigateway.StageOptions(stage_name="dev", throttling_rate_limit=100, throttling_burst_limit=200),
             default_cors_preflight_options=apigateway.CorsOptions(
                 allow_origins=apigateway.Cors.ALL_ORIGINS,
@@ -360,12 +414,13 @@ class BackendStack(Stack):
         )
 
         # API constructs (sve Artists rute idu preko ArtistsConstruct!)
-        ArtistsConstruct(self, "ArtistsConstruct", api, artists_table, songs_table, albums_table, artist_album_table, artist_song_table, authorizer)
-        SongsConstruct(self, "SongsConstruct", api, songs_table, albums_table, artist_song_table, music_bucket, new_content_topic, new_transcription_topic, authorizer, artists_table, rating_table)
-        AlbumConstruct(self, "AlbumConstruct", api, songs_table, albums_table, artist_album_table, artist_song_table, artists_table, music_bucket, new_content_topic, authorizer)
-        SubscriptionsConstruct(self, "SubscriptionsConstruct", api, subscriptions_table, authorizer)
+        ArtistsConstruct(self, "ArtistsConstruct", api, artists_table, songs_table, albums_table, artist_album_table, artist_song_table, authorizer, music_bucket)
+        songs_construct = SongsConstruct(self, "SongsConstruct", api, songs_table, albums_table, artist_song_table, music_bucket, new_content_topic, new_transcription_topic, authorizer, artists_table, rating_table, score_table, song_view_table, ingest_state_machine)
+        AlbumConstruct(self, "AlbumConstruct", api, songs_table, albums_table, artist_album_table, artist_song_table, artists_table, music_bucket, new_content_topic, authorizer, songs_construct.finalize_upload_lambda)
+        SubscriptionsConstruct(self, "SubscriptionsConstruct", api, subscriptions_table, authorizer, score_table)
         ListeningHistoryConstruct(self, "ListeningHistoryConstruct", api, listening_history_table, songs_table, authorizer)
         FeedConstruct(self, "FeedConstruct", api=api,score_table=score_table, songs_table=songs_table, albums_table=albums_table, artist_song_table=artist_song_table, artist_album_table=artist_album_table, authorizer=authorizer)
+        UploadsConstruct(self, "UploadsConstruct", api, music_bucket, authorizer)
 
         # FILTERS
         filter_api_resource = api.root.add_resource("discover").add_resource("filter")
@@ -394,16 +449,19 @@ class BackendStack(Stack):
             "GenerateDownloadUrlLambda",
             "handler.lambda_handler",
             "lambda/downloadSong",
-            [],
+            [get_common_layer(self)],
             environment={
                 "SONG_BUCKET_NAME": music_bucket.bucket_name,
                 "SONGS_TABLE": songs_table.table_name,
+                "SONG_VIEW_TABLE": song_view_table.table_name,
                 "CORS_ORIGIN": "*",
+                "PRIME_ON_INIT": "true",
             }
         )
 
         music_bucket.grant_read(generate_download_lambda)
         songs_table.grant_read_data(generate_download_lambda)
+        song_view_table.grant_read_data(generate_download_lambda)
 
         download_resource = api.root.add_resource("download")
         download_id_resource = download_resource.add_resource("{songId}")
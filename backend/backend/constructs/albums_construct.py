@@ -9,6 +9,11 @@ from aws_cdk import (
 )
 
 from backend.utils.create_lambda import create_lambda_function
+from backend.utils.common_layer import get_common_layer
+from backend.utils.catalog_version import get_catalog_version_table
+from backend.utils.content_setup import get_content_objects_table
+from backend.utils.pagination_secret import get_pagination_secret
+from backend.utils.upload_setup import UPLOAD_PREFIX, get_upload_sessions_table
 
 class AlbumConstruct(Construct):
     def __init__(
@@ -23,11 +28,16 @@ class AlbumConstruct(Construct):
         artists_table: dynamodb.Table, 
         bucket: s3.Bucket,
         topic: sns.Topic,
-        authorizer
+        authorizer,
+        finalize_upload_lambda: _lambda.IFunction
     ):
         super().__init__(scope, id)
 
         albums_api_resource = api.root.add_resource("albums")
+        common_layer = get_common_layer(self)
+        catalog_version_table = get_catalog_version_table(self)
+        content_objects_table = get_content_objects_table(self)
+        upload_sessions_table = get_upload_sessions_table(self)
 
         # Create Album
         create_album_lambda = create_lambda_function(
@@ -35,18 +45,22 @@ class AlbumConstruct(Construct):
             "CreateAlbumLambda",
             "handler.lambda_handler",
             "lambda/createAlbum",
-            [],
+            [common_layer],
             environment={
                 "BUCKET_NAME": bucket.bucket_name,
                 "ALBUMS_TABLE": albums_table.table_name,
                 "ARTIST_ALBUM_TABLE": artist_album_table.table_name,
+                "ARTISTS_TABLE": artists_table.table_name,
                 "SNS_TOPIC_ARN": topic.topic_arn,
+                "CONTENT_OBJECTS_TABLE": content_objects_table.table_name,
             }
         )
         bucket.grant_read_write(create_album_lambda)
+        content_objects_table.grant_read_write_data(create_album_lambda)
         # Changed from grant_write_data to grant_read_write_data
         albums_table.grant_read_write_data(create_album_lambda)
         artist_album_table.grant_read_write_data(create_album_lambda)
+        artists_table.grant_read_data(create_album_lambda)
         topic.grant_publish(create_album_lambda)
 
         albums_api_resource.add_method(
@@ -56,16 +70,54 @@ class AlbumConstruct(Construct):
             authorization_type=apigateway.AuthorizationType.COGNITO
         )
 
+        # Bulk ingest: album iz manifesta, sesije upload-a svih pesama odjednom (common.uploads)
+        ingest_album_lambda = create_lambda_function(
+            self,
+            "IngestAlbumLambda",
+            "handler.lambda_handler",
+            "lambda/ingestAlbum",
+            [common_layer],
+            environment={
+                "BUCKET_NAME": bucket.bucket_name,
+                "ALBUMS_TABLE": albums_table.table_name,
+                "ARTIST_ALBUM_TABLE": artist_album_table.table_name,
+                "ARTISTS_TABLE": artists_table.table_name,
+                "UPLOAD_SESSIONS_TABLE": upload_sessions_table.table_name,
+                "CONTENT_OBJECTS_TABLE": content_objects_table.table_name,
+                "FINALIZE_UPLOAD_FUNCTION": finalize_upload_lambda.function_name,
+            }
+        )
+        # Presigned URL-ovi vaze sa pravima ove uloge
+        bucket.grant_put(ingest_album_lambda, UPLOAD_PREFIX + "*")
+        bucket.grant_read_write(ingest_album_lambda, "covers/*")
+        albums_table.grant_write_data(ingest_album_lambda)
+        artist_album_table.grant_write_data(ingest_album_lambda)
+        artists_table.grant_read_data(ingest_album_lambda)
+        upload_sessions_table.grant_write_data(ingest_album_lambda)
+        content_objects_table.grant_read_write_data(ingest_album_lambda)
+        finalize_upload_lambda.grant_invoke(ingest_album_lambda)
+
+        albums_api_resource.add_resource("ingest").add_method(
+            "POST",
+            apigateway.LambdaIntegration(ingest_album_lambda, proxy=True),
+            authorizer=authorizer,
+            authorization_type=apigateway.AuthorizationType.COGNITO
+        )
+
         # Get Albums
         get_albums_lambda = create_lambda_function(
             self,
             "GetAlbumsLambda",
             "handler.lambda_handler",
             "lambda/getAlbums",
-            [],
+            [common_layer],
             {"ALBUMS_TABLE": albums_table.table_name,
-             "ARTISTS_TABLE": artists_table.table_name,}
+             "ARTISTS_TABLE": artists_table.table_name,
+             "BUCKET_NAME": bucket.bucket_name,
+             "PAGINATION_SECRET_ARN": get_pagination_secret(self).secret_arn,}
         )
+        get_pagination_secret(self).grant_read(get_albums_lambda)
+        bucket.grant_read(get_albums_lambda, "catalog/*")
         albums_table.grant_read_data(get_albums_lambda)
         artists_table.grant_read_data(get_albums_lambda)
 
@@ -82,13 +134,17 @@ class AlbumConstruct(Construct):
             "UpdateAlbumLambda",
             "handler.lambda_handler",
             "lambda/updateAlbum",
-            [],
+            [common_layer],
             {
                 "ALBUMS_TABLE": albums_table.table_name,
                 "ARTIST_ALBUM_TABLE": artist_album_table.table_name,
-                "BUCKET_NAME": bucket.bucket_name
+                "BUCKET_NAME": bucket.bucket_name,
+                "CATALOG_VERSION_TABLE": catalog_version_table.table_name,
+                "CONTENT_OBJECTS_TABLE": content_objects_table.table_name
             }
         )
+        catalog_version_table.grant_write_data(update_album_lambda)
+        content_objects_table.grant_read_write_data(update_album_lambda)
 
         albums_table.grant_read_write_data(update_album_lambda)
         artist_album_table.grant_read_write_data(update_album_lambda)
@@ -109,12 +165,14 @@ class AlbumConstruct(Construct):
             "DeleteAlbumLambda",
             "handler.lambda_handler",
             "lambda/deleteAlbum",
-            [],
+            [common_layer],
             {
                 "SONGS_TABLE": songs_table.table_name,
-                "ALBUMS_TABLE": albums_table.table_name
+                "ALBUMS_TABLE": albums_table.table_name,
+                "CATALOG_VERSION_TABLE": catalog_version_table.table_name
             }
         )
+        catalog_version_table.grant_write_data(delete_album_lambda)
         # Changed from grant_write_data to grant_read_write_data
         songs_table.grant_read_write_data(delete_album_lambda)
         albums_table.grant_read_write_data(delete_album_lambda)
@@ -133,30 +191,17 @@ class AlbumConstruct(Construct):
             "GetAlbumByIdLambda",
             "handler.lambda_handler",
             "lambda/getAlbumById",
-            [],
+            [common_layer],
             environment={
                 "ALBUMS_TABLE": albums_table.table_name,
                 "SONGS_TABLE": songs_table.table_name,
-                "ARTIST_ALBUM_TABLE": artist_album_table.table_name,
-                "ARTIST_SONG_TABLE": artist_song_table.table_name,  
-                "ARTISTS_TABLE": artists_table.table_name           
+                "ARTISTS_TABLE": artists_table.table_name,
+                "CATALOG_VERSION_TABLE": catalog_version_table.table_name
             }
         )
-
-        # Policy za AlbumId-index
-        get_album_lambda.add_to_role_policy(
-            iam.PolicyStatement(
-                actions=["dynamodb:Query", "dynamodb:GetItem"],
-                resources=[
-                    artist_album_table.table_arn,
-                    f"{artist_album_table.table_arn}/index/AlbumId-index"
-                ]
-            )
-        )
+        catalog_version_table.grant_read_data(get_album_lambda)
 
         albums_table.grant_read_data(get_album_lambda)
-        artist_album_table.grant_read_data(get_album_lambda)
-        artist_song_table.grant_read_data(get_album_lambda)
         songs_table.grant_read_data(get_album_lambda)
         artists_table.grant_read_data(get_album_lambda)
 
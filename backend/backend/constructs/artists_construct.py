@@ -1,6 +1,10 @@
 from constructs import Construct
-from aws_cdk import aws_apigateway as apigateway, aws_lambda as _lambda, aws_dynamodb as dynamodb
+from aws_cdk import aws_apigateway as apigateway, aws_lambda as _lambda, aws_dynamodb as dynamodb, aws_s3 as s3
 from backend.utils.create_lambda import create_lambda_function
+from backend.utils.common_layer import get_common_layer
+from backend.utils.catalog_version import get_catalog_version_table
+from backend.utils.pagination_secret import get_pagination_secret
+from backend.utils.artist_deletion_setup import setup_artist_deletion
 
 class ArtistsConstruct(Construct):
     def __init__(
@@ -13,11 +17,14 @@ class ArtistsConstruct(Construct):
         albums_table: dynamodb.Table,
         artist_album_table: dynamodb.Table,
         artist_song_table: dynamodb.Table,
-        authorizer
+        authorizer,
+        bucket: s3.Bucket
     ):
         super().__init__(scope, id)
 
         artists_api_resource = api.root.add_resource("artists")
+        common_layer = get_common_layer(self)
+        catalog_version_table = get_catalog_version_table(self)
 
         # Create Artist
         create_artist_lambda = create_lambda_function(
@@ -25,7 +32,7 @@ class ArtistsConstruct(Construct):
             "CreateArtistLambda",
             "handler.lambda_handler",
             "lambda/createArtist",
-            [],
+            [common_layer],
             {"TABLE_NAME": table.table_name}
         )
         table.grant_write_data(create_artist_lambda)
@@ -43,9 +50,13 @@ class ArtistsConstruct(Construct):
             "GetArtistsLambda",
             "handler.lambda_handler",
             "lambda/getArtists",
-            [],
-            {"TABLE_NAME": table.table_name}
+            [common_layer],
+            {"TABLE_NAME": table.table_name,
+             "BUCKET_NAME": bucket.bucket_name,
+             "PAGINATION_SECRET_ARN": get_pagination_secret(self).secret_arn}
         )
+        get_pagination_secret(self).grant_read(get_artists_lambda)
+        bucket.grant_read(get_artists_lambda, "catalog/*")
         table.grant_read_data(get_artists_lambda)
 
         artists_api_resource.add_method(
@@ -53,25 +64,24 @@ class ArtistsConstruct(Construct):
             apigateway.LambdaIntegration(get_artists_lambda, proxy=True),
         )
 
-        # Delete artist
+        # Delete artist: oznaci umetnika, albume i pesme odvaja CascadeArtistDeletion iz SQS reda
+        artist_deletion_queue = setup_artist_deletion(
+            self, songs_table, albums_table, table, artist_song_table, artist_album_table
+        )
         delete_artist_lambda = create_lambda_function(
             self,
             "DeleteArtistLambda",
             "handler.lambda_handler",
             "lambda/deleteArtist",
-            [],
+            [common_layer],
             {
              "ARTISTS_TABLE":table.table_name,
-             "SONGS_TABLE": songs_table.table_name,
-             "ALBUMS_TABLE": albums_table.table_name,
-             "ARTIST_ALBUM_TABLE": artist_album_table.table_name,
-             "ARTIST_SONG_TABLE": artist_song_table.table_name}
+             "CATALOG_VERSION_TABLE": catalog_version_table.table_name,
+             "ARTIST_DELETION_QUEUE_URL": artist_deletion_queue.queue_url}
         )
+        catalog_version_table.grant_write_data(delete_artist_lambda)
         table.grant_read_write_data(delete_artist_lambda)
-        songs_table.grant_read_write_data(delete_artist_lambda)
-        albums_table.grant_read_write_data(delete_artist_lambda)
-        artist_song_table.grant_read_write_data(delete_artist_lambda)
-        artist_album_table.grant_read_write_data(delete_artist_lambda)
+        artist_deletion_queue.grant_send_messages(delete_artist_lambda)
 
         artist_id_resource = artists_api_resource.add_resource("{id}")
         artist_id_resource.add_method(
@@ -87,11 +97,13 @@ class ArtistsConstruct(Construct):
             "UpdateArtistLambda",
             "handler.lambda_handler",
             "lambda/updateArtist",
-            [],
+            [common_layer],
             {
-                "ARTISTS_TABLE": table.table_name}
+                "ARTISTS_TABLE": table.table_name,
+                "CATALOG_VERSION_TABLE": catalog_version_table.table_name}
         )
         table.grant_read_write_data(update_artist_lambda)
+        catalog_version_table.grant_write_data(update_artist_lambda)
 
         artist_id_resource.add_method(
             "PUT",
@@ -106,16 +118,18 @@ class ArtistsConstruct(Construct):
             "GetArtistByIdLambda",
             "handler.lambda_handler",
             "lambda/getArtistById",
-            [],
+            [common_layer],
             environment={
                 "ALBUMS_TABLE": albums_table.table_name,
                 "ARTIST_ALBUM_TABLE": artist_album_table.table_name,
                 "ARTISTS_TABLE": table.table_name,
                 "SONGS_TABLE": songs_table.table_name,
-                "ARTIST_SONG_TABLE": artist_song_table.table_name
+                "ARTIST_SONG_TABLE": artist_song_table.table_name,
+                "CATALOG_VERSION_TABLE": catalog_version_table.table_name
             }
         )
 
+        catalog_version_table.grant_read_data(get_artist_lambda)
         albums_table.grant_read_data(get_artist_lambda)
         artist_album_table.grant_read_data(get_artist_lambda)
         artist_song_table.grant_read_data(get_artist_lambda)
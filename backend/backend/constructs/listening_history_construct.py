@@ -28,7 +28,8 @@ class ListeningHistoryConstruct(Construct):
             [],
             { # 2. DODATA ENVIROMENT VARIJABLA
                 "LISTENING_HISTORY_TABLE": table.table_name,
-                "SONGS_TABLE": songs_table.table_name 
+                "SONGS_TABLE": songs_table.table_name,
+                "PRIME_ON_INIT": "true"
             }
         )
         table.grant_write_data(record_listen_lambda)
@@ -48,9 +49,11 @@ class ListeningHistoryConstruct(Construct):
             "handler.handler",
             "lambda/getListeningHistory", # Pretpostavka za lokaciju
             [],
-            {"LISTENING_HISTORY_TABLE": table.table_name}
+            {"LISTENING_HISTORY_TABLE": table.table_name,
+             "SONGS_TABLE": songs_table.table_name}
         )
         table.grant_read_data(get_history_lambda)
+        songs_table.grant_read_data(get_history_lambda)
 
         listening_history_api_resource.add_method(
             "GET",
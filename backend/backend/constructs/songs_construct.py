@@ -4,9 +4,15 @@ from aws_cdk import (
     aws_lambda as _lambda,
     aws_sns as sns,
     aws_s3 as s3,
-    aws_dynamodb as dynamodb
+    aws_dynamodb as dynamodb,
+    aws_stepfunctions as sfn
 )
 from backend.utils.create_lambda import create_lambda_function
+from backend.utils.common_layer import get_common_layer
+from backend.utils.catalog_version import get_catalog_version_table
+from backend.utils.pagination_secret import get_pagination_secret
+from backend.utils.content_setup import get_content_objects_table
+from backend.utils.upload_setup import UPLOAD_PREFIX, get_upload_sessions_table, setup_upload_finalizer
 
 class SongsConstruct(Construct):
     def __init__(
@@ -24,31 +30,44 @@ class SongsConstruct(Construct):
         artists_table: dynamodb.Table,
         rating_table: dynamodb.Table,
         score_table: dynamodb.Table,
+        song_view_table: dynamodb.Table,
+        ingest_state_machine: sfn.StateMachine,
     ):
         super().__init__(scope, id)
 
         songs_api_resource = api.root.add_resource("songs")
+        common_layer = get_common_layer(self)
+        catalog_version_table = get_catalog_version_table(self)
+        upload_sessions_table = get_upload_sessions_table(self)
+        content_objects_table = get_content_objects_table(self)
+
+        finalize_upload_lambda = setup_upload_finalizer(
+            self, bucket, table, albums_table, artists_table, artist_song_table,
+            new_content_topic, new_transcription_topic, ingest_state_machine
+        )
+        # AlbumConstruct ga poziva za vec sacuvane pesme iz POST /albums/ingest
+        self.finalize_upload_lambda = finalize_upload_lambda
 
-        # Create Song
+        # Create Song: otvara multipart upload, pesmu upisuje FinalizeUploadLambda kad se upload zavrsi
         create_song_lambda = create_lambda_function(
             self,
             "UploadFileLambda",
             "handler.lambda_handler",
             "lambda/uploadMusicFile",
-            [],
+            [common_layer],
             environment={
                 "BUCKET_NAME": bucket.bucket_name,
-                "SONGS_TABLE": table.table_name,
-                "ARTIST_SONG_TABLE": artist_song_table.table_name,
-                "SNS_NEW_CONTENT_ARN": new_content_topic.topic_arn,
-                "SNS_NEW_TRANSCRIPTION_ARN": new_transcription_topic.topic_arn,
+                "UPLOAD_SESSIONS_TABLE": upload_sessions_table.table_name,
+                "CONTENT_OBJECTS_TABLE": content_objects_table.table_name,
+                "FINALIZE_UPLOAD_FUNCTION": finalize_upload_lambda.function_name,
             }
         )
-        bucket.grant_read_write(create_song_lambda)
-        table.grant_write_data(create_song_lambda)
-        artist_song_table.grant_write_data(create_song_lambda)
-        new_content_topic.grant_publish(create_song_lambda)
-        new_transcription_topic.grant_publish(create_song_lambda)
+        # Presigned URL-ovi vaze sa pravima ove uloge
+        bucket.grant_put(create_song_lambda, UPLOAD_PREFIX + "*")
+        upload_sessions_table.grant_write_data(create_song_lambda)
+        # Fajl sa vec sacuvanim SHA-256 se ne salje, pesma se odmah vezuje za postojeci objekat
+        content_objects_table.grant_read_data(create_song_lambda)
+        finalize_upload_lambda.grant_invoke(create_song_lambda)
 
         songs_api_resource.add_method(
             "POST",
@@ -63,15 +82,15 @@ class SongsConstruct(Construct):
             "GetSongsLambda",
             "handler.lambda_handler",
             "lambda/getSongs",
-            [],
-            {"SONGS_TABLE": table.table_name,
-             "ALBUMS_TABLE": albums_table.table_name,
-             "ARTISTS_TABLE": artists_table.table_name,
+            [common_layer],
+            {"SONG_VIEW_TABLE": song_view_table.table_name,
+             "BUCKET_NAME": bucket.bucket_name,
+             "PAGINATION_SECRET_ARN": get_pagination_secret(self).secret_arn,
              }
         )
-        table.grant_read_data(get_songs_lambda)
-        albums_table.grant_read_data(get_songs_lambda)
-        artists_table.grant_read_data(get_songs_lambda)
+        get_pagination_secret(self).grant_read(get_songs_lambda)
+        bucket.grant_read(get_songs_lambda, "catalog/*")
+        song_view_table.grant_read_data(get_songs_lambda)
 
         songs_api_resource.add_method(
             "GET",
@@ -92,14 +111,18 @@ class SongsConstruct(Construct):
                 "ALBUMS_TABLE": albums_table.table_name,
                 "ARTIST_SONG_TABLE": artist_song_table.table_name,
                 "BUCKET_NAME": bucket.bucket_name,
-                "SNS_NEW_TRANSCRIPTION_ARN": new_transcription_topic.topic_arn,
+                "UPLOAD_SESSIONS_TABLE": upload_sessions_table.table_name,
+                "CONTENT_OBJECTS_TABLE": content_objects_table.table_name,
+                "FINALIZE_UPLOAD_FUNCTION": finalize_upload_lambda.function_name,
             }
         )
         table.grant_read_write_data(update_song_lambda)
+        content_objects_table.grant_read_write_data(update_song_lambda)
+        finalize_upload_lambda.grant_invoke(update_song_lambda)
         albums_table.grant_read_write_data(update_song_lambda)
         artist_song_table.grant_read_write_data(update_song_lambda)
         bucket.grant_read_write(update_song_lambda)
-        new_transcription_topic.grant_publish(update_song_lambda)
+        upload_sessions_table.grant_write_data(update_song_lambda)
 
         song_id_resource = songs_api_resource.add_resource("{id}")
         song_id_resource.add_method(
@@ -118,11 +141,13 @@ class SongsConstruct(Construct):
             [],
             {
                 "SONGS_TABLE": table.table_name,
-                "ALBUMS_TABLE": albums_table.table_name
+                "ALBUMS_TABLE": albums_table.table_name,
+                "CATALOG_VERSION_TABLE": catalog_version_table.table_name
             }
         )
         table.grant_read_write_data(delete_song_lambda)
         albums_table.grant_read_write_data(delete_song_lambda)
+        catalog_version_table.grant_write_data(delete_song_lambda)
 
         # /songs/{id} → DELETE
         song_id_resource.add_method(
@@ -138,14 +163,20 @@ class SongsConstruct(Construct):
             "GetSongLambda",
             "handler.lambda_handler",
             "lambda/getSong",
-            [],  # lambda environment variables if any additional
+            [common_layer],
             {
                 "SONGS_TABLE": table.table_name,
                 "ALBUMS_TABLE": albums_table.table_name,
-                "ARTISTS_TABLE": artists_table.table_name
+                "ARTISTS_TABLE": artists_table.table_name,
+                "SONG_VIEW_TABLE": song_view_table.table_name,
+                "CATALOG_VERSION_TABLE": catalog_version_table.table_name,
+                # Konekcija ka DynamoDB i CatalogVersion se otvaraju u init fazi
+                "PRIME_ON_INIT": "true"
             }
         )
 
+        song_view_table.grant_read_data(get_song_lambda)
+        catalog_version_table.grant_read_data(get_song_lambda)
         table.grant_read_data(get_song_lambda)
         albums_table.grant_read_data(get_song_lambda)
         artists_table.grant_read_data(get_song_lambda)
@@ -0,0 +1,111 @@
+from constructs import Construct
+from aws_cdk import (
+    aws_apigateway as apigateway,
+    aws_s3 as s3
+)
+from backend.utils.common_layer import get_common_layer
+from backend.utils.create_lambda import create_lambda_function
+from backend.utils.upload_setup import UPLOAD_PREFIX, get_upload_sessions_table
+
+
+class UploadsConstruct(Construct):
+    """Resumable audio upload sessions opened by POST /songs and PUT /songs/{id}."""
+
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        api: apigateway.RestApi,
+        bucket: s3.Bucket,
+        authorizer
+    ):
+        super().__init__(scope, id)
+
+        common_layer = get_common_layer(self)
+        sessions_table = get_upload_sessions_table(self)
+        environment = {
+            "BUCKET_NAME": bucket.bucket_name,
+            "UPLOAD_SESSIONS_TABLE": sessions_table.table_name,
+        }
+
+        upload_id_resource = api.root.add_resource("uploads").add_resource("{id}")
+        part_resource = upload_id_resource.add_resource("parts").add_resource("{partNumber}")
+        complete_resource = upload_id_resource.add_resource("complete")
+
+        # Get Upload: gotovi delovi + novi URL-ovi za ostale
+        get_upload_lambda = create_lambda_function(
+            self,
+            "GetUploadLambda",
+            "handler.lambda_handler",
+            "lambda/getUpload",
+            [common_layer],
+            environment
+        )
+        sessions_table.grant_read_write_data(get_upload_lambda)
+        # ListParts (s3:ListMultipartUploadParts) i potpisivanje UploadPart URL-ova
+        bucket.grant_read(get_upload_lambda, UPLOAD_PREFIX + "*")
+        bucket.grant_put(get_upload_lambda, UPLOAD_PREFIX + "*")
+
+        upload_id_resource.add_method(
+            "GET",
+            apigateway.LambdaIntegration(get_upload_lambda, proxy=True),
+            authorizer=authorizer,
+            authorization_type=apigateway.AuthorizationType.COGNITO
+        )
+
+        # Record Part: ETag poslatog dela
+        record_part_lambda = create_lambda_function(
+            self,
+            "RecordUploadPartLambda",
+            "handler.lambda_handler",
+            "lambda/recordUploadPart",
+            [common_layer],
+            {"UPLOAD_SESSIONS_TABLE": sessions_table.table_name}
+        )
+        sessions_table.grant_read_write_data(record_part_lambda)
+
+        part_resource.add_method(
+            "PUT",
+            apigateway.LambdaIntegration(record_part_lambda, proxy=True),
+            authorizer=authorizer,
+            authorization_type=apigateway.AuthorizationType.COGNITO
+        )
+
+        # Complete Upload
+        complete_upload_lambda = create_lambda_function(
+            self,
+            "CompleteUploadLambda",
+            "handler.lambda_handler",
+            "lambda/completeUpload",
+            [common_layer],
+            environment
+        )
+        sessions_table.grant_read_write_data(complete_upload_lambda)
+        bucket.grant_read(complete_upload_lambda, UPLOAD_PREFIX + "*")
+        bucket.grant_put(complete_upload_lambda, UPLOAD_PREFIX + "*")
+
+        complete_resource.add_method(
+            "POST",
+            apigateway.LambdaIntegration(complete_upload_lambda, proxy=True),
+            authorizer=authorizer,
+            authorization_type=apigateway.AuthorizationType.COGNITO
+        )
+
+        # Abort Upload (grant_put ukljucuje s3:AbortMultipartUpload)
+        abort_upload_lambda = create_lambda_function(
+            self,
+            "AbortUploadLambda",
+            "handler.lambda_handler",
+            "lambda/abortUpload",
+            [common_layer],
+            environment
+        )
+        sessions_table.grant_read_write_data(abort_upload_lambda)
+        bucket.grant_put(abort_upload_lambda, UPLOAD_PREFIX + "*")
+
+        upload_id_resource.add_method(
+            "DELETE",
+            apigateway.LambdaIntegration(abort_upload_lambda, proxy=True),
+            authorizer=authorizer,
+            authorization_type=apigateway.AuthorizationType.COGNITO
+        )
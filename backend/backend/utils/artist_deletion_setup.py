@@ -0,0 +1,54 @@
+import aws_cdk.aws_lambda_event_sources as lambda_event_sources
+import aws_cdk.aws_sqs as sqs
+from aws_cdk import Duration
+
+from backend.utils.catalog_version import get_catalog_version_table
+from backend.utils.common_layer import get_common_layer
+from backend.utils.create_lambda import create_lambda_function
+from backend.utils.function_profiles import profile_for
+
+# Kaskade vise obrisanih umetnika u isto vreme dele kapacitet tabela
+MAX_CONCURRENT_CASCADES = 2
+
+
+def setup_artist_deletion(scope, songs_table, albums_table, artists_table, artist_song_table, artist_album_table):
+    """Queue and worker that detach a deleted artist from its albums and songs (lambda/cascadeArtistDeletion)."""
+    catalog_version_table = get_catalog_version_table(scope)
+
+    dead_letter_queue = sqs.Queue(scope, "ArtistDeletionDLQ", retention_period=Duration.days(14))
+    queue = sqs.Queue(
+        scope, "ArtistDeletionQueue",
+        # AWS preporucuje bar 6x timeout funkcije
+        visibility_timeout=Duration.seconds(6 * profile_for("CascadeArtistDeletion")["timeout"]),
+        dead_letter_queue=sqs.DeadLetterQueue(max_receive_count=3, queue=dead_letter_queue)
+    )
+
+    cascade_lambda = create_lambda_function(
+        scope,
+        "CascadeArtistDeletion",
+        "handler.lambda_handler",
+        "lambda/cascadeArtistDeletion",
+        [get_common_layer(scope)],
+        {
+            "SONGS_TABLE": songs_table.table_name,
+            "ALBUMS_TABLE": albums_table.table_name,
+            "ARTISTS_TABLE": artists_table.table_name,
+            "ARTIST_SONG_TABLE": artist_song_table.table_name,
+            "ARTIST_ALBUM_TABLE": artist_album_table.table_name,
+            "CATALOG_VERSION_TABLE": catalog_version_table.table_name,
+            "ARTIST_DELETION_QUEUE_URL": queue.queue_url
+        }
+    )
+    songs_table.grant_read_write_data(cascade_lambda)
+    albums_table.grant_read_write_data(cascade_lambda)
+    artists_table.grant_write_data(cascade_lambda)
+    artist_song_table.grant_read_write_data(cascade_lambda)
+    artist_album_table.grant_read_write_data(cascade_lambda)
+    catalog_version_table.grant_write_data(cascade_lambda)
+    # Sledeca stranica ide kao nova poruka u isti red
+    queue.grant_send_messages(cascade_lambda)
+
+    cascade_lambda.add_event_source(
+        lambda_event_sources.SqsEventSource(queue, batch_size=1, max_concurrency=MAX_CONCURRENT_CASCADES)
+    )
+    return queue
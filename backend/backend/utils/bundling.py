@@ -0,0 +1,18 @@
+import aws_cdk.aws_lambda as _lambda
+from aws_cdk import BundlingOptions
+
+# Lambda ne moze da upise __pycache__ (read-only), pa se bytecode pravi pri bundling-u.
+# unchecked-hash: .pyc vazi bez obzira na mtime fajlova posle zipovanja asset-a
+COMPILE_ARGS = ["-m", "compileall", "-q", "--invalidation-mode", "unchecked-hash"]
+
+
+def python_bundling(install_requirements=True):
+    steps = []
+    if install_requirements:
+        steps.append("pip install --no-cache -r requirements.txt -t /asset-output")
+    steps.append("cp -r . /asset-output")
+    steps.append("python " + " ".join(COMPILE_ARGS) + " /asset-output")
+    return BundlingOptions(
+        image=_lambda.Runtime.PYTHON_3_9.bundling_image,
+        command=["bash", "-c", " && ".join(steps)],
+    )
@@ -0,0 +1,44 @@
+import aws_cdk.aws_lambda as _lambda
+import aws_cdk.aws_lambda_event_sources as lambda_event_sources
+from aws_cdk import Duration
+
+from backend.utils.common_layer import get_common_layer
+from backend.utils.create_lambda import create_lambda_function
+
+
+def setup_catalog_snapshots(stack, music_bucket, song_view_table, albums_table, artists_table):
+    build_snapshot_lambda = create_lambda_function(
+        stack,
+        "BuildCatalogSnapshot",
+        "handler.lambda_handler",
+        "lambda/buildCatalogSnapshot",
+        [get_common_layer(stack)],
+        {
+            "BUCKET_NAME": music_bucket.bucket_name,
+            "SONG_VIEW_TABLE": song_view_table.table_name,
+            "ALBUMS_TABLE": albums_table.table_name,
+            "ARTISTS_TABLE": artists_table.table_name
+        }
+    )
+
+    song_view_table.grant_read_data(build_snapshot_lambda)
+    albums_table.grant_read_data(build_snapshot_lambda)
+    artists_table.grant_read_data(build_snapshot_lambda)
+    music_bucket.grant_read_write(build_snapshot_lambda, "catalog/*")
+
+    # Batching prozor je debounce: izmene iz 30s se skupe u jedan rebuild.
+    # parallelization_factor=1: jedan batch po shard-u u isto vreme, bez rezervisane konkurentnosti
+    # (ona obara deploy na nalozima sa malim limitom, vidi function_profiles)
+    for table in (song_view_table, albums_table, artists_table):
+        build_snapshot_lambda.add_event_source(
+            lambda_event_sources.DynamoEventSource(
+                table,
+                starting_position=_lambda.StartingPosition.LATEST,
+                batch_size=1000,
+                max_batching_window=Duration.seconds(30),
+                parallelization_factor=1,
+                retry_attempts=3
+            )
+        )
+
+    return build_snapshot_lambda
@@ -0,0 +1,15 @@
+import aws_cdk.aws_dynamodb as dynamodb
+from aws_cdk import RemovalPolicy, Stack
+
+
+def get_catalog_version_table(scope):
+    # Jedan CatalogVersion item, podize se pri svakoj izmeni albuma/umetnika i ponistava kes u toplim kontejnerima
+    stack = Stack.of(scope)
+    table = stack.node.try_find_child("CatalogVersion")
+    if table is None:
+        table = dynamodb.Table(
+            stack, "CatalogVersion",
+            partition_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
+            removal_policy=RemovalPolicy.DESTROY
+        )
+    return table
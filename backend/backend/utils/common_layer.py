@@ -0,0 +1,22 @@
+import aws_cdk.aws_lambda as _lambda
+from aws_cdk import Stack
+
+from backend.utils.bundling import python_bundling
+
+COMMON_LAYER_DIR = "lambda/layers/common/python"
+
+
+def get_common_layer(scope):
+    # Jedan layer po stack-u, deli ga svaka funkcija koja koristi lambda/layers/common
+    stack = Stack.of(scope)
+    layer = stack.node.try_find_child("CommonLayer")
+    if layer is None:
+        layer = _lambda.LayerVersion(
+            stack, "CommonLayer",
+            code=_lambda.Code.from_asset("lambda/layers/common", bundling=python_bundling(install_requirements=False)),
+            compatible_runtimes=[_lambda.Runtime.PYTHON_3_9],
+            # Samo cist Python, isti layer ide i na x86_64 i na arm64 funkcije
+            compatible_architectures=[_lambda.Architecture.X86_64, _lambda.Architecture.ARM_64],
+            description="Shared helpers for the music app handlers"
+        )
+    return layer
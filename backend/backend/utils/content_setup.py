@@ -0,0 +1,59 @@
+import aws_cdk.aws_dynamodb as dynamodb
+import aws_cdk.aws_lambda as _lambda
+import aws_cdk.aws_lambda_event_sources as lambda_event_sources
+from aws_cdk import RemovalPolicy, Stack
+
+from backend.utils.common_layer import get_common_layer
+from backend.utils.create_lambda import create_lambda_function
+
+# Isto kao common.content: sadrzaj po SHA-256 i sve sto se iz njega izvodi
+CONTENT_PREFIXES = ("audio/", "covers/", "hls/")
+
+
+def get_content_objects_table(scope):
+    # Jedan red po sacuvanom audio fajlu/cover-u, sa setom referenci (common.content)
+    stack = Stack.of(scope)
+    table = stack.node.try_find_child("ContentObjects")
+    if table is None:
+        table = dynamodb.Table(
+            stack, "ContentObjects",
+            partition_key=dynamodb.Attribute(name="ObjectKey", type=dynamodb.AttributeType.STRING),
+            removal_policy=RemovalPolicy.DESTROY
+        )
+    return table
+
+
+def setup_content_release(stack, music_bucket, songs_table, albums_table):
+    objects_table = get_content_objects_table(stack)
+
+    release_content_lambda = create_lambda_function(
+        stack,
+        "ReleaseContent",
+        "handler.lambda_handler",
+        "lambda/releaseContent",
+        [get_common_layer(stack)],
+        {
+            "BUCKET_NAME": music_bucket.bucket_name,
+            "SONGS_TABLE": songs_table.table_name,
+            "CONTENT_OBJECTS_TABLE": objects_table.table_name
+        }
+    )
+
+    objects_table.grant_read_write_data(release_content_lambda)
+    for prefix in CONTENT_PREFIXES:
+        music_bucket.grant_read(release_content_lambda, prefix + "*")
+        music_bucket.grant_delete(release_content_lambda, prefix + "*")
+
+    # Brisanje pesme/albuma ili promena fajla/cover-a otpusta referencu na stari sadrzaj
+    for table in (songs_table, albums_table):
+        release_content_lambda.add_event_source(
+            lambda_event_sources.DynamoEventSource(
+                table,
+                starting_position=_lambda.StartingPosition.TRIM_HORIZON,
+                batch_size=100,
+                bisect_batch_on_error=True,
+                retry_attempts=10
+            )
+        )
+
+    return release_content_lambda
@@ -0,0 +1,40 @@
+import aws_cdk.aws_s3 as s3
+import aws_cdk.aws_s3_notifications as s3n
+
+from backend.utils.catalog_version import get_catalog_version_table
+from backend.utils.common_layer import get_common_layer
+from backend.utils.create_lambda import create_lambda_function
+
+# Isto kao common.covers
+COVER_PREFIX = "covers/"
+ORIGINAL_PREFIX = COVER_PREFIX + "original/"
+
+
+def setup_cover_derivatives(stack, music_bucket, songs_table, albums_table):
+    catalog_version_table = get_catalog_version_table(stack)
+    process_cover_lambda = create_lambda_function(
+        stack,
+        "ProcessCover",
+        "handler.lambda_handler",
+        "lambda/processCover",
+        [get_common_layer(stack)],
+        {
+            "BUCKET_NAME": music_bucket.bucket_name,
+            "SONGS_TABLE": songs_table.table_name,
+            "ALBUMS_TABLE": albums_table.table_name,
+            "CATALOG_VERSION_TABLE": catalog_version_table.table_name
+        }
+    )
+
+    music_bucket.grant_read_write(process_cover_lambda, COVER_PREFIX + "*")
+    songs_table.grant_write_data(process_cover_lambda)
+    albums_table.grant_read_write_data(process_cover_lambda)
+    catalog_version_table.grant_write_data(process_cover_lambda)
+
+    # Derivati se pisu van original/, pa ne okidaju ponovo isti lambda
+    music_bucket.add_event_notification(
+        s3.EventType.OBJECT_CREATED_PUT,
+        s3n.LambdaDestination(process_cover_lambda),
+        s3.NotificationKeyFilter(prefix=ORIGINAL_PREFIX)
+    )
+    return process_cover_lambda
@@ -1,7 +1,14 @@
 import aws_cdk.aws_lambda as _lambda
-from aws_cdk import BundlingOptions, Duration
+from aws_cdk import Duration
 import aws_cdk.aws_iam as iam
 
+from backend.utils.bundling import python_bundling
+from backend.utils.common_layer import get_common_layer
+from backend.utils.function_profiles import profile_for, reserved_concurrency_for
+from backend.utils.import_report import register_function
+
+ARCHITECTURES = {"x86_64": _lambda.Architecture.X86_64, "arm64": _lambda.Architecture.ARM_64}
+
 def create_lambda_function(stack, id, handler, include_dir, layers, environment):
     role = iam.Role(
             stack, id+"Role",
@@ -11,24 +18,30 @@ def create_lambda_function(stack, id, handler, include_dir, layers, environment)
         iam.ManagedPolicy.from_aws_managed_policy_name("service-role/AWSLambdaBasicExecutionRole")
     )
 
+    # Common layer (responses, auth, clients...) ide uz svaku funkciju
+    common_layer = get_common_layer(stack)
+    layers = [common_layer] + [layer for layer in layers if layer is not common_layer]
+
+    profile = profile_for(id)
+
     function = _lambda.Function(
         stack, id,
         runtime=_lambda.Runtime.PYTHON_3_9,
         layers=layers,
         handler=handler,
-        code=_lambda.Code.from_asset(include_dir,
-            bundling=BundlingOptions(
-                image=_lambda.Runtime.PYTHON_3_9.bundling_image,
-                command=[
-                    "bash", "-c",
-                    "pip install --no-cache -r requirements.txt -t /asset-output && cp -r . /asset-output"
-                ],
-            ),),
-        memory_size=128,
-        timeout=Duration.seconds(10),
+        code=_lambda.Code.from_asset(include_dir, bundling=python_bundling()),
+        memory_size=profile["memory"],
+        timeout=Duration.seconds(profile["timeout"]),
+        architecture=ARCHITECTURES[profile["architecture"]],
+        # cdk deploy -c reserve-concurrency=true; podrazumevano iskljuceno (function_profiles)
+        reserved_concurrent_executions=reserved_concurrency_for(
+            id, str(stack.node.try_get_context("reserve-concurrency")).lower() == "true"
+        ),
         environment=environment,
         role=role
     )
+    register_function(stack, id, handler, include_dir, environment)
+
     fn_url = function.add_function_url(
         auth_type=_lambda.FunctionUrlAuthType.NONE,
         cors=_lambda.FunctionUrlCorsOptions(
@@ -0,0 +1,104 @@
+"""Memory, timeout, architecture and reserved concurrency per function ID.
+
+create_lambda_function looks every function up here; IDs that are not listed
+run with DEFAULT_PROFILE. Functions with a recording in scripts/tuning_events
+are sized from scripts/power_tuning.py, which replays the recording at the CPU
+share each memory size gets and recommends the cheapest size that meets a
+latency target. The other sizes are estimates until they are recorded.
+
+reserved_concurrency is only applied with `cdk deploy -c reserve-concurrency=true`
+(reserved_concurrency_for). A reservation fails the deploy on accounts whose
+unreserved concurrency would drop below 100, which includes new and sandbox
+accounts at the default limit of 10. Without it the same functions are held
+back by their event sources (catalog_snapshot_setup, the SendEmail queue).
+"""
+import math
+
+# Lambda daje jedan ceo vCPU na 1769 MB, ispod toga srazmerno memoriji
+FULL_VCPU_MB = 1769
+
+# eu-central-1, USD
+PRICE_PER_GB_SECOND = {"x86_64": 0.0000166667, "arm64": 0.0000133334}
+PRICE_PER_REQUEST = 0.0000002
+
+DEFAULT_PROFILE = {
+    "memory": 128,
+    "timeout": 10,
+    "architecture": "x86_64",
+    "reserved_concurrency": None
+}
+
+PROFILES = {
+    # Audio ide presigned URL-ovima direktno u S3, UploadFileLambda samo potpisuje delove:
+    # 40 MB fajl (5 delova) p95 101 ms na 128 MB, pa ona i UpdateSongLambda ostaju na podrazumevanom.
+    # GetSongsLambda i GetSongRatingLambda cekaju DynamoDB, ne CPU: 128 MB je najjeftinije ispod 200 ms
+
+    # Brisanje umetnika samo oznaci umetnika i posalje kaskadu u SQS (CascadeArtistDeletion)
+    "DeleteAlbumLambda": {"timeout": 29},
+    # Stream/SQS potrosaci, bez API Gateway limita od 29s
+    "SyncSongView": {"memory": 256, "timeout": 60, "architecture": "arm64"},
+    "BuildCatalogSnapshot": {
+        "memory": 512, "timeout": 120, "architecture": "arm64",
+        # Uz reserve-concurrency jedan builder u isto vreme, da se snapshot-i ne prepisuju medjusobno
+        "reserved_concurrency": 1
+    },
+    # SES sandbox salje najvise jedan mejl u sekundi
+    "SendEmail": {"timeout": 30, "reserved_concurrency": 2},
+    "SaveTranscript": {"timeout": 30},
+    # ffmpeg enkodira jedan rendition u jednoj niti: ceo vCPU; staticki ffmpeg layer je x86_64
+    "TranscodeRendition": {"memory": 1769, "timeout": 300},
+    # Hook trazi dekodiranjem cele pesme (8 kHz mono): 5 min MP3 1.1 s + 0.65 s isecanje na celom vCPU
+    "CutPreview": {"memory": 1024, "timeout": 120},
+    # Dekodiranje na 11 kHz mono je ceo posao (5 min MP3: 1.1 s na celom vCPU), NumPy peaks ~2 ms
+    "ComputeWaveform": {"memory": 512, "timeout": 120},
+    # Dekodiran 3000x3000 cover je ~27 MB RGB; 6 derivata (3 velicine x WebP/JPEG) u par sekundi
+    "ProcessCover": {"memory": 1024, "timeout": 30},
+    # SHA-256 celog upload-a (do 1 GB, common.uploads.MAX_FILE_SIZE) i CopyObject pod content kljuc;
+    # mreza i CPU rastu sa memorijom, procena ~15 s za 1 GB na 1024 MB
+    "FinalizeUploadLambda": {"memory": 1024, "timeout": 120},
+    # Album do 100 pesama: CreateMultipartUpload po pesmi (paralelno) i potpisivanje prvih delova;
+    # procena, dok se ne snimi u scripts/tuning_events
+    "IngestAlbumLambda": {"memory": 256, "timeout": 29},
+    # Jedna stranica (100 mapiranja): BatchGetItem, do 100 update-a kroz throttled_map, 4 BatchWriteItem;
+    # throttling usporava radnike, pa timeout ima rezervu
+    "CascadeArtistDeletion": {"timeout": 120},
+    # Brisanje sadrzaja bez referenci lista i brise i HLS segmente (stotine objekata po pesmi)
+    "ReleaseContent": {"timeout": 60}
+}
+
+
+def profile_for(function_id):
+    return {**DEFAULT_PROFILE, **PROFILES.get(function_id, {})}
+
+
+def reserved_concurrency_for(function_id, enabled):
+    """The profile's reservation when reserve-concurrency is on, otherwise None (unreserved)."""
+    return profile_for(function_id)["reserved_concurrency"] if enabled else None
+
+
+def cpu_share(memory):
+    """Fraction of one vCPU a function with this much memory runs on."""
+    return min(memory / FULL_VCPU_MB, 1.0)
+
+
+def invocation_cost(memory, duration_ms, architecture="x86_64"):
+    """USD for one invocation; Lambda bills duration in 1 ms steps."""
+    billed_seconds = math.ceil(duration_ms) / 1000
+    return memory / 1024 * billed_seconds * PRICE_PER_GB_SECOND[architecture] + PRICE_PER_REQUEST
+
+
+def recommend(results, target_ms, architecture="x86_64"):
+    """Cheapest measured memory size whose p95 meets target_ms.
+
+    results maps memory (MB) to {"p95_ms": ..., "mean_ms": ...}. Returns
+    (memory, cost per invocation), or (None, None) when no size is fast enough.
+    """
+    best = (None, None)
+    for memory in sorted(results):
+        stats = results[memory]
+        if stats["p95_ms"] > target_ms:
+            continue
+        cost = invocation_cost(memory, stats["mean_ms"], architecture)
+        if best[1] is None or cost < best[1]:
+            best = (memory, cost)
+    return best
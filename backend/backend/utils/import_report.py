@@ -0,0 +1,134 @@
+"""Per-function import-time report, produced at synth.
+
+    cdk synth -c import-report=true
+
+imports the handler of every function created through create_lambda_function
+in a fresh interpreter under `python -X importtime`. Each function is
+measured twice on a copy laid out like its bundle (function dir plus the
+common layer): once from source, as Lambda did before bundling compiled the
+code, and once after compileall, as it runs now. The result goes to
+cdk.out/import-times.json and a summary table is printed.
+
+The numbers come from the local interpreter, not the python3.9 runtime, so
+compare them with each other and across commits, not with Lambda's Init
+Duration. boto3 must be installed locally; handler environment variables
+get their unresolved token strings, which is enough because the shared
+clients are only built on first use.
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from aws_cdk import Stack
+
+from backend.utils.bundling import COMPILE_ARGS
+from backend.utils.common_layer import COMMON_LAYER_DIR
+
+REPORT_FILE = "import-times.json"
+TOP_MODULES = 5
+
+# "import time:  self [us] | cumulative | <indent>package"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+_functions = {}
+
+
+def register_function(scope, function_id, handler, include_dir, environment):
+    _functions.setdefault(Stack.of(scope).node.path, []).append({
+        "id": function_id,
+        "handler": handler,
+        "include_dir": include_dir,
+        "environment": {k: str(v) for k, v in (environment or {}).items()},
+    })
+
+
+def _parse(stderr, module):
+    """Cumulative import time of the handler module and its heaviest direct imports, in ms.
+
+    importtime prints a package after everything it imported, so the direct
+    imports of the handler are the level-1 lines just before its own line.
+    """
+    children = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        level = len(match.group(3)) // 2
+        ms = int(match.group(2)) / 1000
+        if level == 0:
+            if match.group(4) == module:
+                heaviest = sorted(children, key=lambda item: item[1], reverse=True)[:TOP_MODULES]
+                return round(ms, 1), [{"module": name, "ms": round(t, 1)} for name, t in heaviest]
+            # Import pri pokretanju interpretera (site, encodings...)
+            children = []
+        elif level == 1:
+            children.append((match.group(4), ms))
+    raise RuntimeError(f"{module} not found in importtime output")
+
+
+def _import_once(bundle_dir, module, environment):
+    env = dict(os.environ)
+    env.update(environment)
+    env.setdefault("AWS_REGION", env.get("AWS_DEFAULT_REGION", "eu-central-1"))
+    env.setdefault("AWS_DEFAULT_REGION", env["AWS_REGION"])
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    env["PYTHONPATH"] = os.pathsep.join([bundle_dir, os.path.join(bundle_dir, "python")])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=bundle_dir, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return _parse(result.stderr, module)
+
+
+def measure_function(function):
+    module = function["handler"].rsplit(".", 1)[0]
+    with tempfile.TemporaryDirectory() as bundle_dir:
+        shutil.copytree(function["include_dir"], bundle_dir, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        shutil.copytree(COMMON_LAYER_DIR, os.path.join(bundle_dir, "python"), dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+
+        source_ms, _ = _import_once(bundle_dir, module, function["environment"])
+        subprocess.run([sys.executable, *COMPILE_ARGS, bundle_dir], check=True)
+        bytecode_ms, heaviest = _import_once(bundle_dir, module, function["environment"])
+
+    return {
+        "id": function["id"],
+        "handler": function["handler"],
+        "source_ms": source_ms,
+        "bytecode_ms": bytecode_ms,
+        "heaviest": heaviest,
+    }
+
+
+def write_import_report(stack, outdir):
+    rows = []
+    for function in _functions.get(stack.node.path, []):
+        try:
+            rows.append(measure_function(function))
+        except Exception as e:
+            rows.append({"id": function["id"], "handler": function["handler"], "error": str(e)})
+
+    os.makedirs(outdir, exist_ok=True)
+    path = os.path.join(outdir, REPORT_FILE)
+    with open(path, "w") as f:
+        json.dump({"stack": stack.node.path, "python": sys.version.split()[0], "functions": rows}, f, indent=2)
+
+    # stderr, stdout aplikacije cita cdk CLI
+    out = sys.stderr
+    print(f"{'function':<36}{'source ms':>11}{'bytecode ms':>13}  heaviest import", file=out)
+    for row in sorted(rows, key=lambda r: r.get("bytecode_ms", -1), reverse=True):
+        if "error" in row:
+            print(f"{row['id']:<36}{'error':>11}  {row['error']}", file=out)
+            continue
+        heaviest = row["heaviest"][0] if row["heaviest"] else {"module": "-", "ms": 0}
+        print(f"{row['id']:<36}{row['source_ms']:>11.1f}{row['bytecode_ms']:>13.1f}"
+              f"  {heaviest['module']} ({heaviest['ms']:.1f})", file=out)
+    print(f"Import-time report: {path}", file=out)
+    return rows
@@ -0,0 +1,227 @@
+import aws_cdk.aws_lambda as _lambda
+import aws_cdk.aws_stepfunctions as sfn
+import aws_cdk.aws_stepfunctions_tasks as tasks
+from aws_cdk import BundlingOptions, Duration
+
+from backend.utils.content_setup import get_content_objects_table
+from backend.utils.create_lambda import create_lambda_function
+
+# Staticki build je zakucan na verziju; "release" alias na sajtu se menja bez najave
+FFMPEG_VERSION = "7.0.2"
+FFMPEG_ARCHIVE = f"ffmpeg-{FFMPEG_VERSION}-amd64-static.tar.xz"
+FFMPEG_URL = f"https://johnvansickle.com/ffmpeg/old-releases/{FFMPEG_ARCHIVE}"
+# SHA-256 arhive iznad; menja se zajedno sa FFMPEG_VERSION (context "ffmpeg:sha256" ga pregazi)
+FFMPEG_SHA256 = None
+# Koliko renditions se enkodira u isto vreme za jednu pesmu
+MAX_PARALLEL_RENDITIONS = 4
+
+LAMBDA_ERRORS = ["Lambda.ServiceException", "Lambda.AWSLambdaException",
+                 "Lambda.SdkClientException", "Lambda.TooManyRequestsException"]
+
+
+def _retry(task):
+    task.add_retry(
+        errors=LAMBDA_ERRORS,
+        interval=Duration.seconds(2),
+        max_attempts=3,
+        backoff_rate=2.0
+    )
+    return task
+
+
+def _ffmpeg_bundling_command(url, sha256):
+    """Shell steps that fetch the archive, refuse it unless its SHA-256 matches, and keep the binary."""
+    archive = f"/tmp/{FFMPEG_ARCHIVE}"
+    return " && ".join([
+        f"test -n '{sha256 or ''}' || (echo 'No SHA-256 pinned for {FFMPEG_ARCHIVE}' >&2 && exit 1)",
+        "mkdir -p /tmp/ffmpeg /asset-output/bin",
+        # Arhiva u lambda/layers/ffmpeg (vendored) ima prednost, bez mreze pri build-u
+        f"(cp /asset-input/{FFMPEG_ARCHIVE} {archive} 2>/dev/null || curl -fsSL -o {archive} {url})",
+        f"echo '{sha256}  {archive}' | sha256sum -c -",
+        f"tar -xJf {archive} --strip-components=1 -C /tmp/ffmpeg",
+        "cp /tmp/ffmpeg/ffmpeg /asset-output/bin/ffmpeg"
+    ])
+
+
+def _ffmpeg_layer(stack):
+    # Staticki x86_64 build, zato su ffmpeg workeri x86_64 (function_profiles).
+    # ffmpeg:url pokazuje na interno hostovanu kopiju iste arhive
+    url = stack.node.try_get_context("ffmpeg:url") or FFMPEG_URL
+    sha256 = stack.node.try_get_context("ffmpeg:sha256") or FFMPEG_SHA256
+    return _lambda.LayerVersion(
+        stack, "FfmpegLayer",
+        code=_lambda.Code.from_asset("lambda/layers/ffmpeg", bundling=BundlingOptions(
+            image=_lambda.Runtime.PYTHON_3_9.bundling_image,
+            command=["bash", "-c", _ffmpeg_bundling_command(url, sha256)]
+        )),
+        compatible_runtimes=[_lambda.Runtime.PYTHON_3_9],
+        compatible_architectures=[_lambda.Architecture.X86_64],
+        description=f"Static ffmpeg {FFMPEG_VERSION} for the ingest workers"
+    )
+
+
+def setup_ingest_sf(stack, music_bucket, songs_table):
+    """One execution per upload: HLS renditions, a preview clip and waveform peaks, in parallel."""
+    ffmpeg_layer = _ffmpeg_layer(stack)
+    # Radnici upisuju izvedene kljuceve i na sadrzaj, da ih duplikat istog fajla preuzme
+    objects_table = get_content_objects_table(stack)
+
+    transcode_rendition_lambda = create_lambda_function(
+        stack,
+        "TranscodeRendition",
+        "handler.lambda_handler",
+        "lambda/transcodeRendition",
+        [ffmpeg_layer],
+        {
+            'BUCKET_NAME': music_bucket.bucket_name
+        }
+    )
+    music_bucket.grant_read(transcode_rendition_lambda, "audio/*")
+    music_bucket.grant_put(transcode_rendition_lambda, "hls/*")
+
+    write_master_lambda = create_lambda_function(
+        stack,
+        "WriteHlsMaster",
+        "handler.lambda_handler",
+        "lambda/writeHlsMaster",
+        [],
+        {
+            'BUCKET_NAME': music_bucket.bucket_name,
+            'SONGS_TABLE': songs_table.table_name,
+            'CONTENT_OBJECTS_TABLE': objects_table.table_name
+        }
+    )
+    music_bucket.grant_put(write_master_lambda, "hls/*")
+    songs_table.grant_read_write_data(write_master_lambda)
+    objects_table.grant_write_data(write_master_lambda)
+
+    cut_preview_lambda = create_lambda_function(
+        stack,
+        "CutPreview",
+        "handler.lambda_handler",
+        "lambda/cutPreview",
+        [ffmpeg_layer],
+        {
+            'BUCKET_NAME': music_bucket.bucket_name,
+            'SONGS_TABLE': songs_table.table_name,
+            'CONTENT_OBJECTS_TABLE': objects_table.table_name,
+            'PREVIEW_START': "hook"
+        }
+    )
+    music_bucket.grant_read(cut_preview_lambda, "audio/*")
+    music_bucket.grant_put(cut_preview_lambda, "audio/*.preview.m4a")
+    songs_table.grant_read_write_data(cut_preview_lambda)
+    objects_table.grant_write_data(cut_preview_lambda)
+
+    compute_waveform_lambda = create_lambda_function(
+        stack,
+        "ComputeWaveform",
+        "handler.lambda_handler",
+        "lambda/computeWaveform",
+        [ffmpeg_layer],
+        {
+            'BUCKET_NAME': music_bucket.bucket_name,
+            'SONGS_TABLE': songs_table.table_name,
+            'CONTENT_OBJECTS_TABLE': objects_table.table_name,
+            'WAVEFORM_BITS': "8"
+        }
+    )
+    music_bucket.grant_read(compute_waveform_lambda, "audio/*")
+    music_bucket.grant_put(compute_waveform_lambda, "audio/*.peaks")
+    songs_table.grant_read_write_data(compute_waveform_lambda)
+    objects_table.grant_write_data(compute_waveform_lambda)
+
+    job_failed = sfn.Fail(
+        stack,
+        "IngestJobFailed",
+        error="IngestJobFailed",
+        cause="A rendition, the master playlist, the preview clip or the waveform could not be written"
+    )
+
+    # Jedan rendition po iteraciji; ulaz: songId, album, sourceKey, prefix, renditions (imena iz common.hls)
+    transcode_task = tasks.LambdaInvoke(
+        stack,
+        "TranscodeRenditionTask",
+        lambda_function=transcode_rendition_lambda,
+        payload=sfn.TaskInput.from_object({
+            "songId": sfn.JsonPath.string_at("$.songId"),
+            "sourceKey": sfn.JsonPath.string_at("$.sourceKey"),
+            "prefix": sfn.JsonPath.string_at("$.prefix"),
+            "rendition": sfn.JsonPath.string_at("$.rendition")
+        }),
+        payload_response_only=True
+    )
+    _retry(transcode_task)
+
+    transcode_renditions = sfn.Map(
+        stack,
+        "TranscodeRenditions",
+        items_path="$.renditions",
+        item_selector={
+            "songId": sfn.JsonPath.string_at("$.songId"),
+            "sourceKey": sfn.JsonPath.string_at("$.sourceKey"),
+            "prefix": sfn.JsonPath.string_at("$.prefix"),
+            "rendition": sfn.JsonPath.string_at("$$.Map.Item.Value")
+        },
+        max_concurrency=MAX_PARALLEL_RENDITIONS,
+        result_path="$.results"
+    )
+    transcode_renditions.item_processor(transcode_task)
+
+    write_master_task = tasks.LambdaInvoke(
+        stack,
+        "WriteHlsMasterTask",
+        lambda_function=write_master_lambda,
+        payload=sfn.TaskInput.from_object({
+            "songId": sfn.JsonPath.string_at("$.songId"),
+            "album": sfn.JsonPath.string_at("$.album"),
+            "sourceKey": sfn.JsonPath.string_at("$.sourceKey"),
+            "prefix": sfn.JsonPath.string_at("$.prefix"),
+            "renditions": sfn.JsonPath.list_at("$.results")
+        }),
+        result_selector={
+            "hlsPlaylist": sfn.JsonPath.string_at("$.Payload.hlsPlaylist")
+        },
+        result_path="$.masterResult"
+    )
+    _retry(write_master_task)
+
+    cut_preview_task = _retry(tasks.LambdaInvoke(
+        stack,
+        "CutPreviewTask",
+        lambda_function=cut_preview_lambda,
+        payload=sfn.TaskInput.from_object({
+            "songId": sfn.JsonPath.string_at("$.songId"),
+            "album": sfn.JsonPath.string_at("$.album"),
+            "sourceKey": sfn.JsonPath.string_at("$.sourceKey")
+        }),
+        payload_response_only=True
+    ))
+
+    compute_waveform_task = _retry(tasks.LambdaInvoke(
+        stack,
+        "ComputeWaveformTask",
+        lambda_function=compute_waveform_lambda,
+        payload=sfn.TaskInput.from_object({
+            "songId": sfn.JsonPath.string_at("$.songId"),
+            "album": sfn.JsonPath.string_at("$.album"),
+            "sourceKey": sfn.JsonPath.string_at("$.sourceKey")
+        }),
+        payload_response_only=True
+    ))
+
+    # Grane upisuju svoje kljuceve u Songs same (common.ingest.attach), izlaz se ne koristi
+    derive = sfn.Parallel(stack, "DeriveFromUpload", result_path=sfn.JsonPath.DISCARD)
+    derive.branch(transcode_renditions.next(write_master_task))
+    derive.branch(cut_preview_task)
+    derive.branch(compute_waveform_task)
+    derive.add_catch(job_failed, errors=["States.ALL"], result_path="$.error")
+
+    definition = derive.next(sfn.Succeed(stack, "IngestJobSucceeded"))
+
+    return sfn.StateMachine(
+        stack,
+        "IngestStateMachine",
+        definition_body=sfn.DefinitionBody.from_chainable(definition),
+        timeout=Duration.minutes(30),
+    )
@@ -0,0 +1,19 @@
+import aws_cdk.aws_secretsmanager as secretsmanager
+from aws_cdk import RemovalPolicy, Stack
+
+
+def get_pagination_secret(scope):
+    # HMAC kljuc za potpisivanje nextToken vrednosti, jedan po stack-u
+    stack = Stack.of(scope)
+    secret = stack.node.try_find_child("PaginationTokenSecret")
+    if secret is None:
+        secret = secretsmanager.Secret(
+            stack, "PaginationTokenSecret",
+            description="Signing key for list endpoint nextToken values",
+            generate_secret_string=secretsmanager.SecretStringGenerator(
+                password_length=64,
+                exclude_punctuation=True
+            ),
+            removal_policy=RemovalPolicy.DESTROY
+        )
+    return secret
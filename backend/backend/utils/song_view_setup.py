@@ -0,0 +1,60 @@
+import aws_cdk.aws_dynamodb as dynamodb
+import aws_cdk.aws_lambda as _lambda
+import aws_cdk.aws_lambda_event_sources as lambda_event_sources
+from aws_cdk import RemovalPolicy
+
+from backend.utils.common_layer import get_common_layer
+from backend.utils.create_lambda import create_lambda_function
+
+
+def setup_song_view(stack, songs_table, albums_table, artists_table, artist_song_table):
+    # Denormalizovan prikaz pesme (album i umetnici ugradjeni), kljuc je Id pesme
+    song_view_table = dynamodb.Table(
+        stack, "SongView",
+        partition_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
+        # Stream samo okida buildCatalogSnapshot, slike nisu potrebne
+        stream=dynamodb.StreamViewType.KEYS_ONLY,
+        removal_policy=RemovalPolicy.DESTROY
+    )
+
+    # Isti sparse, write-sharded indeks kao na Songs tabeli, ActiveShard se prepisuje iz pesme
+    song_view_table.add_global_secondary_index(
+        index_name="active-index",
+        partition_key=dynamodb.Attribute(name="ActiveShard", type=dynamodb.AttributeType.STRING),
+        sort_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
+        projection_type=dynamodb.ProjectionType.ALL
+    )
+
+    sync_song_view_lambda = create_lambda_function(
+        stack,
+        "SyncSongView",
+        "handler.lambda_handler",
+        "lambda/syncSongView",
+        [get_common_layer(stack)],
+        {
+            "SONGS_TABLE": songs_table.table_name,
+            "ALBUMS_TABLE": albums_table.table_name,
+            "ARTISTS_TABLE": artists_table.table_name,
+            "ARTIST_SONG_TABLE": artist_song_table.table_name,
+            "SONG_VIEW_TABLE": song_view_table.table_name
+        }
+    )
+
+    song_view_table.grant_read_write_data(sync_song_view_lambda)
+    songs_table.grant_read_data(sync_song_view_lambda)
+    albums_table.grant_read_data(sync_song_view_lambda)
+    artists_table.grant_read_data(sync_song_view_lambda)
+    artist_song_table.grant_read_data(sync_song_view_lambda)
+
+    for table in (songs_table, albums_table, artists_table):
+        sync_song_view_lambda.add_event_source(
+            lambda_event_sources.DynamoEventSource(
+                table,
+                starting_position=_lambda.StartingPosition.TRIM_HORIZON,
+                batch_size=100,
+                bisect_batch_on_error=True,
+                retry_attempts=10
+            )
+        )
+
+    return song_view_table
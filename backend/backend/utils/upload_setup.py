@@ -0,0 +1,88 @@
+import aws_cdk.aws_dynamodb as dynamodb
+import aws_cdk.aws_s3 as s3
+import aws_cdk.aws_s3_notifications as s3n
+from aws_cdk import Duration, RemovalPolicy, Stack
+
+from backend.utils.common_layer import get_common_layer
+from backend.utils.content_setup import get_content_objects_table
+from backend.utils.create_lambda import create_lambda_function
+
+# Browser salje u uploads/<id>, finalizeUpload premesta fajl u audio/ pod njegov SHA-256 (common.content)
+UPLOAD_PREFIX = "uploads/"
+AUDIO_PREFIX = "audio/"
+# Dan posle TTL-a sesije (common.uploads.SESSION_TTL_SECONDS), da nastavljen upload ne bude prekinut
+INCOMPLETE_UPLOAD_DAYS = 2
+
+
+def get_upload_sessions_table(scope):
+    # Otvoreni multipart upload-i (common.uploads), istekli se brisu preko TTL-a
+    stack = Stack.of(scope)
+    table = stack.node.try_find_child("UploadSessions")
+    if table is None:
+        table = dynamodb.Table(
+            stack, "UploadSessions",
+            partition_key=dynamodb.Attribute(name="Id", type=dynamodb.AttributeType.STRING),
+            time_to_live_attribute="ExpiresAt",
+            removal_policy=RemovalPolicy.DESTROY
+        )
+    return table
+
+
+def setup_upload_finalizer(scope, bucket, songs_table, albums_table, artists_table, artist_song_table,
+                           new_content_topic, new_transcription_topic, ingest_state_machine):
+    sessions_table = get_upload_sessions_table(scope)
+    objects_table = get_content_objects_table(scope)
+
+    finalize_upload_lambda = create_lambda_function(
+        scope,
+        "FinalizeUploadLambda",
+        "handler.lambda_handler",
+        "lambda/finalizeUpload",
+        [get_common_layer(scope)],
+        {
+            "BUCKET_NAME": bucket.bucket_name,
+            "SONGS_TABLE": songs_table.table_name,
+            "ALBUMS_TABLE": albums_table.table_name,
+            "ARTISTS_TABLE": artists_table.table_name,
+            "ARTIST_SONG_TABLE": artist_song_table.table_name,
+            "UPLOAD_SESSIONS_TABLE": sessions_table.table_name,
+            "SNS_NEW_CONTENT_ARN": new_content_topic.topic_arn,
+            "SNS_NEW_TRANSCRIPTION_ARN": new_transcription_topic.topic_arn,
+            "INGEST_STATE_MACHINE_ARN": ingest_state_machine.state_machine_arn,
+            "CONTENT_OBJECTS_TABLE": objects_table.table_name,
+        }
+    )
+    objects_table.grant_read_write_data(finalize_upload_lambda)
+    sessions_table.grant_read_write_data(finalize_upload_lambda)
+    songs_table.grant_read_write_data(finalize_upload_lambda)
+    artist_song_table.grant_write_data(finalize_upload_lambda)
+    albums_table.grant_read_data(finalize_upload_lambda)
+    artists_table.grant_read_data(finalize_upload_lambda)
+    new_content_topic.grant_publish(finalize_upload_lambda)
+    new_transcription_topic.grant_publish(finalize_upload_lambda)
+    ingest_state_machine.grant_start_execution(finalize_upload_lambda)
+    # Zaglavlja i SHA-256 staging fajla, kopija pod content kljuc, brisanje staging fajla
+    bucket.grant_read(finalize_upload_lambda, UPLOAD_PREFIX + "*")
+    bucket.grant_delete(finalize_upload_lambda, UPLOAD_PREFIX + "*")
+    bucket.grant_read_write(finalize_upload_lambda, AUDIO_PREFIX + "*")
+    # Pesma obrisana pre nego sto je fajl vezan: sadrzaj bez referenci se brise odmah
+    bucket.grant_delete(finalize_upload_lambda, AUDIO_PREFIX + "*")
+    bucket.grant_read(finalize_upload_lambda, "hls/*")
+    bucket.grant_delete(finalize_upload_lambda, "hls/*")
+
+    # Napusteni multipart upload-i inace zauvek placaju prostor za vec poslate delove,
+    # a staging fajl koji finalizeUpload nije premestio ne treba niko
+    bucket.add_lifecycle_rule(
+        id="AbortIncompleteAudioUploads",
+        prefix=UPLOAD_PREFIX,
+        abort_incomplete_multipart_upload_after=Duration.days(INCOMPLETE_UPLOAD_DAYS),
+        expiration=Duration.days(INCOMPLETE_UPLOAD_DAYS)
+    )
+
+    # Samo zavrsen multipart upload audio fajla pravi/azurira pesmu
+    bucket.add_event_notification(
+        s3.EventType.OBJECT_CREATED_COMPLETE_MULTIPART_UPLOAD,
+        s3n.LambdaDestination(finalize_upload_lambda),
+        s3.NotificationKeyFilter(prefix=UPLOAD_PREFIX)
+    )
+    return finalize_upload_lambda
@@ -0,0 +1,31 @@
+import os
+
+from common import clients
+from common.auth import require_role
+from common.responses import response
+from common.uploads import SessionNotFound, abort_upload, get_session
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+UPLOAD_SESSIONS_TABLE = os.environ["UPLOAD_SESSIONS_TABLE"]
+
+s3 = clients.client("s3")
+sessions_table = clients.table(UPLOAD_SESSIONS_TABLE)
+
+
+def lambda_handler(event, context):
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
+
+    try:
+        upload_id = event["pathParameters"]["id"]
+        session = get_session(sessions_table, upload_id)
+        abort_upload(s3, BUCKET_NAME, sessions_table, session)
+        return response(200, {"uploadId": upload_id, "status": "aborted"})
+
+    except SessionNotFound as e:
+        return response(404, {"error": str(e)})
+
+    except Exception as e:
+        print("ERROR:", str(e))
+        return response(500, {"error": str(e)})
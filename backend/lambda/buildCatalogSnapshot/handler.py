@@ -0,0 +1,47 @@
+import os
+
+from common import clients
+from common.covers import list_entry
+from common.sharding import query_active_all
+from common.snapshots import write_snapshot
+from common.song_view import list_item
+from common.streams import source_table
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+SONG_VIEW_TABLE_NAME = os.environ["SONG_VIEW_TABLE"]
+ALBUMS_TABLE_NAME = os.environ["ALBUMS_TABLE"]
+ARTISTS_TABLE_NAME = os.environ["ARTISTS_TABLE"]
+
+s3 = clients.client("s3")
+song_view_table = clients.table(SONG_VIEW_TABLE_NAME)
+albums_table = clients.table(ALBUMS_TABLE_NAME)
+artists_table = clients.table(ARTISTS_TABLE_NAME)
+
+# Koji snapshot zavisi od stream-a koje tabele
+SNAPSHOT_BY_TABLE = {
+    SONG_VIEW_TABLE_NAME: "songs",
+    ALBUMS_TABLE_NAME: "albums",
+    ARTISTS_TABLE_NAME: "artists",
+}
+
+
+def build(name):
+    if name == "songs":
+        items = [list_item(view) for view in query_active_all(song_view_table)]
+    elif name == "albums":
+        items = [list_entry(album) for album in query_active_all(albums_table)]
+    else:
+        items = query_active_all(artists_table)
+    written = write_snapshot(s3, BUCKET_NAME, name, items)
+    print(f"{name}: {len(items)} items, {'written' if written else 'unchanged'}")
+    return written
+
+
+def lambda_handler(event, context):
+    # Stream batch-evi se skupljaju u batching prozoru (debounce), rucni poziv bez Records gradi sve
+    records = event.get("Records") or []
+    if records:
+        names = {SNAPSHOT_BY_TABLE[source_table(r)] for r in records if source_table(r) in SNAPSHOT_BY_TABLE}
+    else:
+        names = set(SNAPSHOT_BY_TABLE.values())
+    return {name: build(name) for name in sorted(names)}
@@ -0,0 +1,164 @@
+"""Detach a deleted artist from its albums and songs, one page per SQS message.
+
+deleteArtist marks the artist deleted and queues {"artistId", "genre",
+"phase": "albums"}. Every message handles one PAGE_SIZE page of the
+artist's ArtistAlbum (then ArtistSong) rows:
+
+- the page's albums or songs are read with BatchGetItem,
+- each is updated through throttled_map, whose concurrency shrinks while
+  the table throttles: the artist is removed from artists, or the item is
+  marked deleted if the artist was its only one,
+- the page's mapping rows are deleted with BatchWriteItem,
+- Cascade.<phase> on the artist item counts the processed rows,
+
+and queues the next page, the next phase, or finishes: Cascade.status
+becomes "done" and the catalog version is bumped. A processed page is
+deleted, so the next page is always the first one that remains. Updates
+and deletes are idempotent, and a redelivered message just continues from
+what is left.
+"""
+import json
+import os
+from datetime import datetime
+
+from boto3.dynamodb.conditions import Key
+
+from common import clients
+from common.catalog_cache import bump_version
+from common.concurrency import throttled_map
+from common.hydration import batch_get, hydrate_by_id
+from common.writes import batch_delete
+
+SONGS_TABLE = os.environ["SONGS_TABLE"]
+ALBUMS_TABLE = os.environ["ALBUMS_TABLE"]
+ARTISTS_TABLE = os.environ["ARTISTS_TABLE"]
+ARTIST_SONG_TABLE = os.environ["ARTIST_SONG_TABLE"]
+ARTIST_ALBUM_TABLE = os.environ["ARTIST_ALBUM_TABLE"]
+CATALOG_VERSION_TABLE = os.environ["CATALOG_VERSION_TABLE"]
+ARTIST_DELETION_QUEUE_URL = os.environ["ARTIST_DELETION_QUEUE_URL"]
+
+PAGE_SIZE = int(os.environ.get("CASCADE_PAGE_SIZE", "100"))
+
+dynamodb = clients.resource("dynamodb")
+sqs = clients.client("sqs")
+songs_table = clients.table(SONGS_TABLE)
+albums_table = clients.table(ALBUMS_TABLE)
+artists_table = clients.table(ARTISTS_TABLE)
+artist_song_table = clients.table(ARTIST_SONG_TABLE)
+artist_album_table = clients.table(ARTIST_ALBUM_TABLE)
+catalog_version_table = clients.table(CATALOG_VERSION_TABLE)
+
+
+def _update(table, key, expression, values):
+    # Klijent (ne Table) je thread safe za throttled_map radnike
+    table.meta.client.update_item(
+        TableName=table.name, Key=key, UpdateExpression=expression, ExpressionAttributeValues=values
+    )
+
+
+def detach(table, key, item, artist_id):
+    """Remove the artist from an album or song, or mark it deleted if it was the only one."""
+    artists = item.get('artists', [])
+    others = [a for a in artists if a != artist_id]
+    if others:
+        if len(others) != len(artists):
+            _update(table, key, 'SET artists = :a', {':a': others})
+    elif item.get('deleted') != "true":
+        _update(table, key, 'SET deleted = :val REMOVE ActiveShard', {':val': "true"})
+
+
+def albums_page(artist_id, links):
+    # AlbumGenre na mapiranju je hint za BatchGetItem, redovi bez njega idu preko Id-index
+    hints = {link['AlbumId']: link['AlbumGenre'] for link in links if link.get('AlbumGenre')}
+    albums = hydrate_by_id(dynamodb, albums_table, [link['AlbumId'] for link in links], hints)
+    throttled_map(
+        lambda album: detach(albums_table, {'Genre': album['Genre'], 'Id': album['Id']}, album, artist_id),
+        list(albums.values())
+    )
+    batch_delete(artist_album_table.meta.client, [
+        (artist_album_table.name, {'ArtistId': artist_id, 'AlbumId': link['AlbumId']}) for link in links
+    ])
+
+
+def songs_page(artist_id, links):
+    keys = [{'Album': link['AlbumId'], 'Id': link['SongId']} for link in links]
+    songs = batch_get(dynamodb, songs_table.name, keys) if keys else []
+    throttled_map(
+        lambda song: detach(songs_table, {'Album': song['Album'], 'Id': song['Id']}, song, artist_id),
+        songs
+    )
+    batch_delete(artist_song_table.meta.client, [
+        (artist_song_table.name, {'ArtistId': artist_id, 'SongId': link['SongId']}) for link in links
+    ])
+
+
+PHASES = {
+    "albums": (artist_album_table, albums_page),
+    "songs": (artist_song_table, songs_page),
+}
+NEXT_PHASE = {"albums": "songs", "songs": None}
+
+
+def _artist_key(message):
+    return {'Genre': message['genre'], 'Id': message['artistId']}
+
+
+def count(message, phase, processed):
+    """Progress on the artist item: Cascade.<phase> is the number of rows processed so far."""
+    artists_table.meta.client.update_item(
+        TableName=artists_table.name,
+        Key=_artist_key(message),
+        UpdateExpression="SET Cascade.#phase = Cascade.#phase + :n",
+        ExpressionAttributeNames={"#phase": phase},
+        ExpressionAttributeValues={":n": processed}
+    )
+
+
+def finish(message):
+    artists_table.meta.client.update_item(
+        TableName=artists_table.name,
+        Key=_artist_key(message),
+        UpdateExpression="SET Cascade.#status = :done, Cascade.finishedAt = :now",
+        ExpressionAttributeNames={"#status": "status"},
+        ExpressionAttributeValues={":done": "done", ":now": datetime.now().isoformat()}
+    )
+    # Albumi i pesme umetnika su promenjeni, kesevi u toplim kontejnerima se odbacuju
+    bump_version(catalog_version_table)
+    print(f"Artist {message['artistId']} deletion cascade finished")
+
+
+def step(message):
+    """Process one page of a phase; return the message that continues the cascade, or None."""
+    artist_id = message['artistId']
+    phase = message['phase']
+    table, process = PHASES[phase]
+
+    # Obradjena mapiranja se brisu, pa stranica uvek pocinje od prvog preostalog reda
+    response = table.meta.client.query(
+        TableName=table.name,
+        KeyConditionExpression=Key('ArtistId').eq(artist_id),
+        Limit=PAGE_SIZE
+    )
+    links = response.get("Items", [])
+
+    if links:
+        process(artist_id, links)
+        count(message, phase, len(links))
+    print(f"Artist {artist_id}: {len(links)} {phase} detached")
+
+    if response.get("LastEvaluatedKey"):
+        return message
+    if NEXT_PHASE[phase]:
+        return {**message, "phase": NEXT_PHASE[phase]}
+    return None
+
+
+def lambda_handler(event, context):
+    # batch_size=1: poruka koja ne uspe se ponavlja sama, posle maxReceiveCount ide u DLQ
+    for record in event.get("Records", []):
+        message = json.loads(record["body"])
+        following = step(message)
+        if following:
+            sqs.send_message(QueueUrl=ARTIST_DELETION_QUEUE_URL, MessageBody=json.dumps(following))
+        else:
+            finish(message)
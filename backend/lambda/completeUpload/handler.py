@@ -0,0 +1,47 @@
+import os
+
+from common import clients
+from common.auth import require_role
+from common.responses import response
+from common.uploads import (
+    IncompleteUpload, InvalidUpload, SessionNotFound, complete_upload, get_session, missing_parts,
+    recorded_parts, sync_parts
+)
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+UPLOAD_SESSIONS_TABLE = os.environ["UPLOAD_SESSIONS_TABLE"]
+
+s3 = clients.client("s3")
+sessions_table = clients.table(UPLOAD_SESSIONS_TABLE)
+
+
+def lambda_handler(event, context):
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
+
+    try:
+        upload_id = event["pathParameters"]["id"]
+        session = get_session(sessions_table, upload_id)
+
+        # ListParts samo ako neki ETag nije stigao do tabele
+        parts = recorded_parts(session)
+        if missing_parts(session, parts):
+            parts = sync_parts(s3, BUCKET_NAME, sessions_table, session)
+
+        complete_upload(s3, BUCKET_NAME, session, parts)
+        print(f"Upload {upload_id} completed, {len(parts)} parts")
+        return response(202, {"uploadId": upload_id, "songId": session["SongId"]})
+
+    except IncompleteUpload as e:
+        return response(409, {"error": str(e), "missing": e.missing})
+
+    except InvalidUpload as e:
+        return response(400, {"error": str(e)})
+
+    except SessionNotFound as e:
+        return response(404, {"error": str(e)})
+
+    except Exception as e:
+        print("ERROR:", str(e))
+        return response(500, {"error": str(e)})
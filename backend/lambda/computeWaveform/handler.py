@@ -0,0 +1,95 @@
+"""Min/max waveform peaks for the player's scrub bar.
+
+The song is decoded once to ANALYSIS_RATE mono PCM. Every level in LEVELS
+splits it into that many equal blocks and keeps each block's (min, max).
+The file sits next to the audio as <sourceKey>.peaks, little-endian:
+
+    magic "WFPK", version u8, bits u8 (8 or 16), level count u16,
+    sample rate u32, duration ms u32, pair count u32 per level,
+    then each level's pairs as interleaved min, max (int8 or int16)
+
+The player draws the level closest to its width: with int8, 512 + 4096
+pairs are about 9 KB.
+"""
+import os
+import struct
+
+import numpy as np
+
+from common import clients
+from common.ingest import attach, decode_pcm, source_url
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+SONGS_TABLE = os.environ["SONGS_TABLE"]
+CONTENT_OBJECTS_TABLE = os.environ["CONTENT_OBJECTS_TABLE"]
+WAVEFORM_BITS = int(os.environ.get("WAVEFORM_BITS", "8"))
+WAVEFORM_SUFFIX = ".peaks"
+ANALYSIS_RATE = 11025
+LEVELS = (512, 4096)
+
+MAGIC = b"WFPK"
+VERSION = 1
+_HEADER = struct.Struct("<4sBBHII")
+
+s3 = clients.client("s3")
+songs_table = clients.table(SONGS_TABLE)
+objects_table = clients.table(CONTENT_OBJECTS_TABLE)
+
+
+def peaks(samples, pairs):
+    """(min, max) of pairs equal blocks of samples, as one interleaved array."""
+    pairs = max(1, min(pairs, len(samples)))
+    starts = np.linspace(0, len(samples), pairs, endpoint=False).astype(np.int64)
+    out = np.empty(pairs * 2, dtype=samples.dtype)
+    out[0::2] = np.minimum.reduceat(samples, starts)
+    out[1::2] = np.maximum.reduceat(samples, starts)
+    return out
+
+
+def encode(samples, sample_rate, levels=LEVELS, bits=WAVEFORM_BITS):
+    if bits not in (8, 16):
+        raise ValueError("bits must be 8 or 16")
+    if len(samples) == 0:
+        samples = np.zeros(1, dtype="<i2")
+    blocks = [peaks(samples, pairs) for pairs in levels]
+    if bits == 8:
+        # Gornji bajt int16 uzorka, aritmeticki pomeraj cuva znak
+        blocks = [(block >> 8).astype("i1") for block in blocks]
+    else:
+        blocks = [block.astype("<i2") for block in blocks]
+
+    duration_ms = int(len(samples) * 1000 / sample_rate)
+    header = _HEADER.pack(MAGIC, VERSION, bits, len(blocks), sample_rate, duration_ms)
+    counts = struct.pack(f"<{len(blocks)}I", *(len(block) // 2 for block in blocks))
+    return header + counts + b"".join(block.tobytes() for block in blocks)
+
+
+def decode(data):
+    """{bits, sampleRate, durationMs, levels: [array of min, max pairs]}; the player's parser in Python."""
+    magic, version, bits, count, sample_rate, duration_ms = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a waveform file")
+    pairs = struct.unpack_from(f"<{count}I", data, _HEADER.size)
+    dtype = np.dtype("i1" if bits == 8 else "<i2")
+    offset = _HEADER.size + 4 * count
+    levels = []
+    for n in pairs:
+        levels.append(np.frombuffer(data, dtype=dtype, count=n * 2, offset=offset).reshape(n, 2))
+        offset += n * 2 * dtype.itemsize
+    return {"bits": bits, "sampleRate": sample_rate, "durationMs": duration_ms, "levels": levels}
+
+
+def lambda_handler(event, context):
+    source = source_url(s3, BUCKET_NAME, event["sourceKey"])
+    samples = np.frombuffer(decode_pcm(source, ANALYSIS_RATE), dtype="<i2")
+    key = event["sourceKey"] + WAVEFORM_SUFFIX
+    body = encode(samples, ANALYSIS_RATE)
+    s3.put_object(
+        Bucket=BUCKET_NAME, Key=key, Body=body, ContentType="application/octet-stream",
+        CacheControl="public, max-age=31536000, immutable"
+    )
+
+    if not attach(songs_table, event, {"waveformFile": key}, objects_table):
+        return {"waveformFile": None}
+    print(f"Song {event['songId']}: waveform {key}, {len(body)} bytes")
+    return {"waveformFile": key}
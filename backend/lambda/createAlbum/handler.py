@@ -2,33 +2,35 @@ import json
 import base64
 import uuid
 from datetime import datetime
-import boto3
-import traceback
 import os
 
+from common import clients
+from common.auth import require_role
+from common.covers import claim_cover, entity_metadata, original_key, store_cover
+from common.hydration import resolve_genres
+from common.responses import response
+from common.sharding import active_shard
+from common.writes import put_with_links
+
 BUCKET_NAME = os.environ["BUCKET_NAME"]
 TABLE_NAME = os.environ["ALBUMS_TABLE"]
 SNS_TOPIC_ARN = os.environ["SNS_TOPIC_ARN"]
 ARTIST_ALBUM_TABLE = os.environ["ARTIST_ALBUM_TABLE"]
+ARTISTS_TABLE = os.environ["ARTISTS_TABLE"]
+CONTENT_OBJECTS_TABLE = os.environ["CONTENT_OBJECTS_TABLE"]
 
-s3 = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(TABLE_NAME)
-sns = boto3.client("sns")
-artist_album_table = dynamodb.Table(ARTIST_ALBUM_TABLE)
+s3 = clients.client("s3")
+table = clients.table(TABLE_NAME)
+sns = clients.client("sns")
+artist_album_table = clients.table(ARTIST_ALBUM_TABLE)
+artists_table = clients.table(ARTISTS_TABLE)
+content_objects_table = clients.table(CONTENT_OBJECTS_TABLE)
 
-CORS_HEADERS = {"Access-Control-Allow-Origin": "*"}
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-
-    if role != "admin":
-        return {
-            "statusCode": 403,
-            'headers': CORS_HEADERS,
-            "body": json.dumps({"message":"Forbidden: Insufficient permissions"})
-        }
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
 
     try:
         body = json.loads(event.get('body', '{}'))
@@ -39,21 +41,13 @@ def lambda_handler(event, context):
         single = body.get('single')
 
         if not genres or len(genres) == 0:
-            return {
-                "statusCode": 400,
-                "headers": CORS_HEADERS,
-                "body": json.dumps({"message": "Album must have at least one genre"})
-            }
-
-        if cover_file_base64 and cover_filename:
-            cover_content = base64.b64decode(cover_file_base64)
-            s3.put_object(
-                Bucket=BUCKET_NAME,
-                Key=cover_filename,
-                Body=cover_content
-            )
+            return response(400, {"message": "Album must have at least one genre"})
 
         album_id = str(uuid.uuid4())
+        cover_data = base64.b64decode(cover_file_base64) if cover_file_base64 and cover_filename else None
+        cover_key = original_key(cover_data) if cover_data else None
+        # Vec sacuvan cover (isti SHA-256) se samo referencira, derivati mu vec postoje
+        images = claim_cover(content_objects_table, cover_key, f"album#{album_id}") if cover_key else None
         primary_genre = genres[0]
 
         item = {
@@ -65,23 +59,32 @@ def lambda_handler(event, context):
             "genres": genres,
             "releaseDate": body.get('releaseDate', str(datetime.now())),
             "description": body.get('description', ''),
-            "coverImage": cover_filename,
+            "coverImage": cover_key,
             "createdDate": str(datetime.now()),
             "modifiedDate": str(datetime.now()),
-            "deleted":"false"
+            "deleted":"false",
+            "ActiveShard": active_shard(album_id),
+            "ArtistGenres": resolve_genres(artists_table, body.get('artists', []))
         }
 
-        table.put_item(Item=item)
+        if images:
+            item["coverImages"] = images
+
+        # Album i ArtistAlbum redovi u jednoj transakciji (common.writes)
+        put_with_links(table, item, artist_album_table, [
+            {
+                "ArtistId": artist_id,
+                "AlbumId": album_id,
+                "AlbumGenre": primary_genre,
+                "createdDate": str(datetime.now())
+            }
+            for artist_id in dict.fromkeys(body.get('artists', []))
+        ])
 
-        artists = body.get('artists', [])
-        for artist_id in artists:
-            artist_album_table.put_item(
-                Item={
-                    "ArtistId": artist_id,
-                    "AlbumId": album_id,
-                    "createdDate": str(datetime.now())
-                }
-            )
+        # Posle upisa albuma, da processCover nadje red kome dodaje derivate (common.covers)
+        if cover_key and not images:
+            store_cover(s3, BUCKET_NAME, content_objects_table, cover_key, cover_data,
+                        f"album#{album_id}", entity_metadata("album", album_id))
 
         # Publish SNS event SAMO ako NIJE single
         if not single:
@@ -99,23 +102,17 @@ def lambda_handler(event, context):
                 )
             except Exception as sns_err:
                 print("SNS Publish ERROR:", str(sns_err))
+                import traceback
                 print(traceback.format_exc())
 
-        return {
-            "statusCode": 201,
-            "headers": CORS_HEADERS,
-            "body": json.dumps({
-                "message": f"Album '{album_title}' uploaded and saved successfully.",
-                "albumId": album_id,
-                "item": item
-            }, default=str)
-        }
+        return response(201, {
+            "message": f"Album '{album_title}' uploaded and saved successfully.",
+            "albumId": album_id,
+            "item": item
+        })
 
     except Exception as e:
         print("ERROR:", str(e))
+        import traceback
         print(traceback.format_exc())
-        return {
-            "statusCode": 500,
-            "headers": CORS_HEADERS,
-            "body": json.dumps({"error": str(e)})
-        }
\ No newline at end of file
+        return response(500, {"error": str(e)})
\ No newline at end of file
@@ -1,31 +1,24 @@
 import json
-import boto3
 import uuid
 import os
 
+from common import clients
+from common.auth import require_role
+from common.responses import response
+from common.sharding import active_shard
+
 table_name = os.environ.get('TABLE_NAME')
-dynamodb = boto3.resource("dynamodb")
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    print("Claims:", claims)
-    role = claims.get("custom:role")
-    if role != "admin":
-        return {
-            "statusCode": 403,
-            'headers': {'Access-Control-Allow-Origin': '*'},
-            "body": json.dumps({"message":"Forbidden: Insufficient permissions"})
-        }
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
 
     try:
         body = json.loads(event.get('body', '{}'))
     except Exception as e:
         print("JSON parse error:", e)
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Invalid JSON"})
-        }
+        return response(400, {"message": "Invalid JSON"})
 
     name = body.get("name")
     biography = body.get("biography")
@@ -33,11 +26,7 @@ def lambda_handler(event, context):
     print("Parsed body:", name, biography, genres)
 
     if not name or not biography or not genres or len(genres) == 0:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Missing required fields"})
-        }
+        return response(400, {"message": "Missing required fields"})
 
     artist_id = str(uuid.uuid4())
     primary_genre = genres[0]
@@ -49,22 +38,15 @@ def lambda_handler(event, context):
         "name": name,
         "biography": biography,
         "genres": genres,
-        "deleted":"false"
+        "deleted":"false",
+        "ActiveShard": active_shard(artist_id)
     }
 
     try:
-        table = dynamodb.Table(table_name)
+        table = clients.table(table_name)
         table.put_item(Item=item)
     except Exception as e:
         print("DynamoDB error:", e)
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Internal server error"})
-        }
+        return response(500, {"message": "Internal server error"})
 
-    return {
-        "statusCode": 201,
-        "headers": {"Access-Control-Allow-Origin": "*"},
-        "body": json.dumps({"message": "Successfully created artist profile", "artist": item})
-    }
+    return response(201, {"message": "Successfully created artist profile", "artist": item})
@@ -1,35 +1,27 @@
 import json
 import os
-import boto3
 import uuid
 import time
 
+from common import clients
+from common.auth import require_role
+from common.responses import response
+
 table_name = os.environ["SUBSCRIPTIONS_TABLE"]
 score_table_name = os.environ["SCORE_TABLE"]
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(table_name)
-score_table = dynamodb.Table(score_table_name)
+table = clients.table(table_name)
+score_table = clients.table(score_table_name)
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-
-    if role != "user":
-        return {
-            "statusCode": 403,
-            'headers': {'Access-Control-Allow-Origin': '*'},
-            "body": json.dumps({"message": "Forbidden: Insufficient permissions"})
-        }
+    forbidden = require_role(event, "user")
+    if forbidden:
+        return forbidden
 
     try:
         body = json.loads(event.get('body', '{}'))
     except Exception as e:
         print("JSON parse error:", e)
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Invalid JSON"})
-        }
+        return response(400, {"message": "Invalid JSON"})
 
     userId = body.get("userId")
     targetId = body.get("targetId")
@@ -39,11 +31,7 @@ def lambda_handler(event, context):
 
     if not userId or not targetId or not targetType:
         print("Missing required fields")
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Missing required fields"})
-        }
+        return response(400, {"message": "Missing required fields"})
 
     subscription_id = str(uuid.uuid4())
     createdAt = int(time.time())
@@ -63,11 +51,7 @@ def lambda_handler(event, context):
         table.put_item(Item=item)
     except Exception as e:
         print("DynamoDB error:", e)
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Internal server error"})
-        }
+        return response(500, {"message": "Internal server error"})
 
     score_item = {
         "User": userId,
@@ -92,12 +76,8 @@ def lambda_handler(event, context):
         except Exception as e:
             print("Score table error:", e)
 
-    return {
-        "statusCode": 201,
-        "headers": {"Access-Control-Allow-Origin": "*"},
-        "body": json.dumps({
-            "message": "Successfully created subscription",
-            "subscription": item,
-            "scoreItem": score_item
-        })
-    }
+    return response(201, {
+        "message": "Successfully created subscription",
+        "subscription": item,
+        "scoreItem": score_item
+    })
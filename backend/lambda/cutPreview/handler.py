@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+import numpy as np
+
+from common import clients
+from common.ingest import attach, decode_pcm, run_ffmpeg, source_url
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+SONGS_TABLE = os.environ["SONGS_TABLE"]
+CONTENT_OBJECTS_TABLE = os.environ["CONTENT_OBJECTS_TABLE"]
+# "hook" ili broj sekundi od pocetka pesme
+PREVIEW_START = os.environ.get("PREVIEW_START", "hook")
+PREVIEW_SECONDS = 30
+PREVIEW_BITRATE = 64000
+PREVIEW_SUFFIX = ".preview.m4a"
+# Za trazenje hook-a dovoljan je mono na 8 kHz
+ANALYSIS_RATE = 8000
+
+s3 = clients.client("s3")
+songs_table = clients.table(SONGS_TABLE)
+objects_table = clients.table(CONTENT_OBJECTS_TABLE)
+
+
+def find_hook(samples, sample_rate, clip_seconds=PREVIEW_SECONDS):
+    """Start, in whole seconds, of the clip_seconds window with the most energy."""
+    seconds = len(samples) // sample_rate
+    if seconds <= clip_seconds:
+        return 0
+    blocks = samples[:seconds * sample_rate].astype(np.float32).reshape(seconds, sample_rate)
+    energy = np.square(blocks).mean(axis=1)
+    totals = np.concatenate(([0.0], np.cumsum(energy)))
+    window = totals[clip_seconds:] - totals[:-clip_seconds]
+    return int(np.argmax(window))
+
+
+def preview_start(source, start=PREVIEW_START):
+    if start != "hook":
+        return max(0, int(float(start)))
+    samples = np.frombuffer(decode_pcm(source, ANALYSIS_RATE), dtype="<i2")
+    return find_hook(samples, ANALYSIS_RATE)
+
+
+def cut_preview(source, start, output):
+    """A PREVIEW_SECONDS AAC clip of source from start, with short fades."""
+    run_ffmpeg([
+        "-ss", str(start), "-t", str(PREVIEW_SECONDS), "-i", source,
+        "-map", "0:a:0", "-vn", "-ac", "2",
+        "-af", f"afade=t=in:d=1,afade=t=out:st={PREVIEW_SECONDS - 2}:d=2",
+        "-c:a", "aac", "-b:a", str(PREVIEW_BITRATE),
+        "-movflags", "+faststart", output
+    ], "preview")
+
+
+def lambda_handler(event, context):
+    source = source_url(s3, BUCKET_NAME, event["sourceKey"])
+    start = preview_start(source)
+    key = event["sourceKey"] + PREVIEW_SUFFIX
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        output = os.path.join(out_dir, "preview.m4a")
+        cut_preview(source, start, output)
+        with open(output, "rb") as f:
+            s3.put_object(
+                Bucket=BUCKET_NAME, Key=key, Body=f, ContentType="audio/mp4",
+                CacheControl="public, max-age=31536000, immutable"
+            )
+
+    if not attach(songs_table, event, {"previewFile": key, "previewStart": start}, objects_table):
+        return {"previewFile": None}
+    print(f"Song {event['songId']}: preview {key} from {start}s")
+    return {"previewFile": key}
@@ -1,35 +1,30 @@
-import json
 import os
 
-import boto3
 from boto3.dynamodb.conditions import Key, Attr
 
+from common import clients
+from common.auth import require_role
+from common.catalog_cache import bump_version
+from common.responses import response
+
 songs_table_name = os.environ["SONGS_TABLE"]
 albums_table_name = os.environ["ALBUMS_TABLE"]
+catalog_version_table_name = os.environ["CATALOG_VERSION_TABLE"]
 
-dynamodb = boto3.resource("dynamodb")
-songs_table = dynamodb.Table(songs_table_name)
-albums_table = dynamodb.Table(albums_table_name)
+songs_table = clients.table(songs_table_name)
+albums_table = clients.table(albums_table_name)
+catalog_version_table = clients.table(catalog_version_table_name)
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-    if role != "admin":
-        return {
-            "statusCode": 403,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Forbidden"})
-        }
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
 
     path_params = event.get("pathParameters") or {}
     album_id = path_params.get("id")
 
     if not album_id:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": "Missing 'albumid' in path"})
-        }
+        return response(400, {"error": "Missing 'albumid' in path"})
 
     try:
         album_response = albums_table.query(
@@ -38,19 +33,16 @@ def lambda_handler(event, context):
         )
 
         if not album_response.get("Items"):
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"error": "Album not found"})
-            }
+            return response(404, {"error": "Album not found"})
 
         album_item = album_response["Items"][0]
 
         albums_table.update_item(
             Key={"Genre": album_item["Genre"], "Id": album_item["Id"]},
-            UpdateExpression="SET deleted = :val",
+            UpdateExpression="SET deleted = :val REMOVE ActiveShard",
             ExpressionAttributeValues={":val": "true"}
         )
+        bump_version(catalog_version_table)
 
         songs_response = songs_table.query(
             IndexName="Album-index",
@@ -61,19 +53,11 @@ def lambda_handler(event, context):
         for song in songs_response.get("Items", []):
             songs_table.update_item(
                 Key={"Album": album_id, "Id": song["Id"]},
-                UpdateExpression="SET deleted = :val",
+                UpdateExpression="SET deleted = :val REMOVE ActiveShard",
                 ExpressionAttributeValues={":val": "true"}
             )
 
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": f"Album {album_id} and its songs marked deleted."})
-        }
+        return response(200, {"message": f"Album {album_id} and its songs marked deleted."})
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": str(e)})
-        }
+        return response(500, {"error": str(e)})
@@ -1,41 +1,41 @@
 import json
 import os
+from datetime import datetime
 
-import boto3
 from boto3.dynamodb.conditions import Key
 
-songs_table_name = os.environ["SONGS_TABLE"]
-albums_table_name = os.environ["ALBUMS_TABLE"]
+from common import clients
+from common.auth import require_role
+from common.catalog_cache import bump_version
+from common.responses import response
+
 artists_table_name = os.environ["ARTISTS_TABLE"]
-artist_song_table_name = os.environ["ARTIST_SONG_TABLE"]
-artist_album_table_name = os.environ["ARTIST_ALBUM_TABLE"]
+catalog_version_table_name = os.environ["CATALOG_VERSION_TABLE"]
+ARTIST_DELETION_QUEUE_URL = os.environ["ARTIST_DELETION_QUEUE_URL"]
+
+artists_table = clients.table(artists_table_name)
+catalog_version_table = clients.table(catalog_version_table_name)
+sqs = clients.client("sqs")
+
+
+def queue_cascade(artist_id, genre):
+    # Albume i pesme umetnika odvaja cascadeArtistDeletion, stranicu po stranicu
+    sqs.send_message(
+        QueueUrl=ARTIST_DELETION_QUEUE_URL,
+        MessageBody=json.dumps({"artistId": artist_id, "genre": genre, "phase": "albums"})
+    )
 
-dynamodb = boto3.resource("dynamodb")
-songs_table = dynamodb.Table(songs_table_name)
-albums_table = dynamodb.Table(albums_table_name)
-artists_table = dynamodb.Table(artists_table_name)
-artist_song_table = dynamodb.Table(artist_song_table_name)
-artist_album_table = dynamodb.Table(artist_album_table_name)
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-    if role != "admin":
-        return {
-            "statusCode": 403,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Forbidden"})
-        }
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
 
     path_params = event.get("pathParameters") or {}
     artist_id = path_params.get("id")
 
     if not artist_id:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": "Missing 'id' in path"})
-        }
+        return response(400, {"error": "Missing 'id' in path"})
 
     try:
         artist_resp = artists_table.query(
@@ -43,96 +43,41 @@ def lambda_handler(event, context):
             KeyConditionExpression=Key("Id").eq(artist_id)
         )
         if not artist_resp["Items"]:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"error": "Artist not found"})
-            }
+            return response(404, {"error": "Artist not found"})
         artist = artist_resp["Items"][0]
         genre = artist["Genre"]
 
+        # Ponovljen DELETE ne pokrece novu kaskadu, samo vraca napredak postojece
+        if artist.get("deleted") == "true" and artist.get("Cascade"):
+            cascade = artist["Cascade"]
+            # Kaskada bez ikakvog napretka: poruka mozda nije ni poslata (send_message je pao posle
+            # oznacavanja), pa se salje ponovo; obrada je idempotentna i duplikat samo nastavlja
+            if cascade.get("status") == "running" and not cascade.get("albums") and not cascade.get("songs"):
+                queue_cascade(artist_id, genre)
+            return response(200 if cascade.get("status") == "done" else 202, {
+                "message": f"Artist {artist_id} is already deleted.",
+                "cascade": cascade
+            })
+
+        cascade = {"status": "running", "albums": 0, "songs": 0, "startedAt": datetime.now().isoformat()}
         artists_table.update_item(
             Key={"Genre": genre, "Id": artist_id},
-            UpdateExpression="SET deleted = :val",
-            ExpressionAttributeValues={":val": "true"},
+            UpdateExpression="SET deleted = :val, Cascade = :cascade REMOVE ActiveShard",
+            ExpressionAttributeValues={":val": "true", ":cascade": cascade},
             ConditionExpression="attribute_exists(Id)"
         )
         print(f"Artist {artist_id} marked deleted")
 
-        albums = artist_album_table.query(
-            KeyConditionExpression=Key('ArtistId').eq(artist_id)
-        )['Items']
-
-        for artist_album in albums:
-            album_id = artist_album['AlbumId']
-            album = albums_table.get_item(
-                Key={'Genre': artist_album["AlbumGenre"], 'Id': album_id}
-            ).get('Item')
-            if not album:
-                continue
-
-            if len(album.get('artists', [])) > 1:
-                album['artists'].remove(artist_id)
-                albums_table.update_item(
-                    Key={'Genre': album['Genre'], 'Id': album_id},
-                    UpdateExpression='SET artists = :a',
-                    ExpressionAttributeValues={':a': album['artists']}
-                )
-            else:
-                albums_table.update_item(
-                    Key={'Genre': album['Genre'], 'Id': album_id},
-                    UpdateExpression='SET deleted = :val',
-                    ExpressionAttributeValues={':val': "true"}
-                )
-
-            songs = artist_song_table.query(
-                KeyConditionExpression=Key('ArtistId').eq(artist_id)
-            )['Items']
-
-            for s in songs:
-                if s['AlbumId'] != album_id:
-                    continue
-
-                song_item = songs_table.get_item(
-                    Key={'Album': album_id, 'Id': s['SongId']}
-                ).get('Item')
-                if not song_item:
-                    continue
-
-                if len(song_item.get('artists', [])) > 1:
-                    song_item['artists'].remove(artist_id)
-                    songs_table.update_item(
-                        Key={'Album': album_id, 'Id': s['SongId']},
-                        UpdateExpression='SET artists = :a',
-                        ExpressionAttributeValues={':a': song_item['artists']}
-                    )
-                else:
-                    songs_table.update_item(
-                        Key={'Album': album_id, 'Id': s['SongId']},
-                        UpdateExpression='SET deleted = :val',
-                        ExpressionAttributeValues={':val': "true"}
-                    )
-
-                artist_song_table.delete_item(
-                    Key={'ArtistId': artist_id, 'SongId': s['SongId']}
-                )
-
-            artist_album_table.delete_item(
-                Key={'ArtistId': artist_id, 'AlbumId': album_id}
-            )
-
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({
-                "message": f"Artist {artist_id} marked deleted. Albums and songs cleaned up."
-            })
-        }
+        queue_cascade(artist_id, genre)
+
+        # Umetnik je promenjen, kesevi u toplim kontejnerima se odbacuju
+        bump_version(catalog_version_table)
+
+        return response(202, {
+            "message": f"Artist {artist_id} marked deleted. Albums and songs are being cleaned up.",
+            "cascade": cascade
+        })
 
     except Exception as e:
         print("Error:", str(e))
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": str(e)})
-        }
+        return response(500, {"error": str(e)})
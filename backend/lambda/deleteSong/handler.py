@@ -1,56 +1,47 @@
-import json
 import os
 
-import boto3
 from boto3.dynamodb.conditions import Key, Attr
 
+from common import clients
+from common.auth import require_role
+from common.catalog_cache import bump_version
+from common.responses import response
+
 songs_table_name = os.environ["SONGS_TABLE"]
 albums_table_name = os.environ["ALBUMS_TABLE"]
+catalog_version_table_name = os.environ["CATALOG_VERSION_TABLE"]
 
-dynamodb = boto3.resource("dynamodb")
-songs_table = dynamodb.Table(songs_table_name)
-albums_table = dynamodb.Table(albums_table_name)
+songs_table = clients.table(songs_table_name)
+albums_table = clients.table(albums_table_name)
+catalog_version_table = clients.table(catalog_version_table_name)
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-    if role != "admin":
-        return {
-            "statusCode": 403,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Forbidden"})
-        }
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
 
     path_params = event.get("pathParameters") or {}
     song_id = path_params.get("id")
 
     if not song_id:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": "Missing 'id' in path"})
-        }
+        return response(400, {"error": "Missing 'id' in path"})
 
     try:
-        response = songs_table.query(
+        result = songs_table.query(
             IndexName="Id-index",
             KeyConditionExpression=Key("Id").eq(song_id)
         )
 
-        items = response.get("Items", [])
+        items = result.get("Items", [])
         if not items:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"error": "Song not found"})
-            }
+            return response(404, {"error": "Song not found"})
 
         song_item = items[0]
         album_id = song_item["Album"]
 
         songs_table.update_item(
             Key={"Album": song_item["Album"], "Id": song_item["Id"]},
-            UpdateExpression="SET deleted = :val",
+            UpdateExpression="SET deleted = :val REMOVE ActiveShard",
             ExpressionAttributeValues={":val": "true"},
             ConditionExpression="attribute_exists(Id)"
         )
@@ -69,19 +60,14 @@ def lambda_handler(event, context):
             for album_item in album_response.get("Items", []):
                 albums_table.update_item(
                     Key={"Genre": album_item["Genre"], "Id": album_item["Id"]},
-                    UpdateExpression="SET deleted = :val",
+                    UpdateExpression="SET deleted = :val REMOVE ActiveShard",
                     ExpressionAttributeValues={":val": "true"}
                 )
+            if album_response.get("Items"):
+                # Album je obrisan, kesevi u toplim kontejnerima se odbacuju
+                bump_version(catalog_version_table)
 
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": f"Song {song_id} marked deleted. Album cleanup checked."})
-        }
+        return response(200, {"message": f"Song {song_id} marked deleted. Album cleanup checked."})
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": str(e)})
-        }
+        return response(500, {"error": str(e)})
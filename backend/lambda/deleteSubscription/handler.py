@@ -1,37 +1,30 @@
-import json
 import os
-import boto3
+
 from boto3.dynamodb.conditions import Key, Attr
 
+from common import clients
+from common.responses import response
+
 table_name = os.environ["SUBSCRIPTIONS_TABLE"]
 score_table_name = os.environ["SCORE_TABLE"]
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(table_name)
-score_table = dynamodb.Table(score_table_name)
+table = clients.table(table_name)
+score_table = clients.table(score_table_name)
 
 def lambda_handler(event, context):
     subscription_id = event.get("pathParameters", {}).get("id")
     if not subscription_id:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Missing subscription id in path"})
-        }
+        return response(400, {"message": "Missing subscription id in path"})
 
     try:
-        response = table.query(
+        result = table.query(
             IndexName="id-index",
             KeyConditionExpression=Key("id").eq(subscription_id),
             FilterExpression=Attr("deleted").eq("false")
         )
-        items = response.get("Items", [])
+        items = result.get("Items", [])
 
         if not items:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"message": "Subscription not found or already deleted"})
-            }
+            return response(404, {"message": "Subscription not found or already deleted"})
 
         item = items[0]
         pk = item["Target"]
@@ -65,20 +58,12 @@ def lambda_handler(event, context):
             except Exception as e:
                 print("Score table update error:", e)
 
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({
-                "success": True,
-                "message": f"Subscription {subscription_id} marked as deleted",
-                "updatedAttributes": update_response.get("Attributes")
-            })
-        }
+        return response(200, {
+            "success": True,
+            "message": f"Subscription {subscription_id} marked as deleted",
+            "updatedAttributes": update_response.get("Attributes")
+        })
 
     except Exception as e:
         print("DynamoDB error:", e)
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Internal server error"})
-        }
+        return response(500, {"message": "Internal server error"})
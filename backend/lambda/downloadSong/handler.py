@@ -1,14 +1,22 @@
 import os
-import json
-import boto3
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
+from common import clients, priming
+from common.responses import response
+from common.song_view import get_view
+
 S3_BUCKET_NAME = os.environ.get('SONG_BUCKET_NAME')
 SONGS_TABLE_NAME = os.environ.get('SONGS_TABLE')
+SONG_VIEW_TABLE_NAME = os.environ.get('SONG_VIEW_TABLE')
 CORS_ORIGIN = os.environ.get('CORS_ORIGIN', '*')
 
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
+s3_client = clients.client('s3')
+song_view_table = clients.table(SONG_VIEW_TABLE_NAME) if SONG_VIEW_TABLE_NAME else None
+
+# Presigned URL se potpisuje lokalno: S3 klijent se samo pravi, konekcija ka S3 ne treba
+if song_view_table:
+    priming.on_init(priming.open_dynamodb(song_view_table), priming.build(s3_client))
 
 
 def lambda_handler(event, context):
@@ -16,7 +24,7 @@ def lambda_handler(event, context):
     if event.get("httpMethod") == "OPTIONS":
         return _response(200, {})
 
-    if not S3_BUCKET_NAME or not SONGS_TABLE_NAME:
+    if not S3_BUCKET_NAME or not SONGS_TABLE_NAME or not SONG_VIEW_TABLE_NAME:
         return _response(500, {'message': 'Server configuration error: Environment variables not set.'})
 
     # Čitanje song_id iz path ili query parametara
@@ -34,18 +42,18 @@ def lambda_handler(event, context):
         return _response(400, {'message': 'Song ID is required in path or query parameter.'})
 
     try:
-        table = dynamodb.Table(SONGS_TABLE_NAME)
-
-        # Dohvatanje pesme po GSI 'Id-index'
-        response = table.query(
-            IndexName='Id-index',
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('Id').eq(song_id)
-        )
-        items = response.get('Items', [])
-        if not items:
-            return _response(404, {'message': f'Song with ID {song_id} not found.'})
+        song_item = get_view(song_view_table, song_id)
+        if not song_item:
+            # Fallback dok SongView ne sustigne Songs tabelu
+            result = clients.table(SONGS_TABLE_NAME).query(
+                IndexName='Id-index',
+                KeyConditionExpression=Key('Id').eq(song_id)
+            )
+            items = result.get('Items', [])
+            if not items:
+                return _response(404, {'message': f'Song with ID {song_id} not found.'})
+            song_item = items[0]
 
-        song_item = items[0]
         s3_key = song_item.get('fileName')
         song_title = song_item.get('title', 'UnknownSong')
 
@@ -76,13 +84,8 @@ def lambda_handler(event, context):
 
 def _response(status_code, body_dict):
     """Helper function za response sa CORS header-ima"""
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': CORS_ORIGIN,
-            'Access-Control-Allow-Methods': 'GET,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-        },
-        'body': json.dumps(body_dict)
-    }
+    return response(status_code, body_dict, {
+        'Access-Control-Allow-Origin': CORS_ORIGIN,
+        'Access-Control-Allow-Methods': 'GET,OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+    })
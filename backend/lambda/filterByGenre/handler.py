@@ -1,40 +1,27 @@
-import json
-import boto3
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
 import os
 
+from boto3.dynamodb.conditions import Key
+
+from common import clients
+from common.responses import response
+
 # Dohvat imena tabela iz environment var
 ARTISTS_TABLE_NAME = os.environ["ARTISTS_TABLE"]
 ALBUMS_TABLE_NAME = os.environ["ALBUMS_TABLE"]
 
-dynamodb = boto3.resource("dynamodb")
-artists_table = dynamodb.Table(ARTISTS_TABLE_NAME)
-albums_table = dynamodb.Table(ALBUMS_TABLE_NAME)
+artists_table = clients.table(ARTISTS_TABLE_NAME)
+albums_table = clients.table(ALBUMS_TABLE_NAME)
 
-CORS_HEADERS = {
-    "Access-Control-Allow-Origin": "*",
+PREFLIGHT_HEADERS = {
     "Access-Control-Allow-Methods": "GET,OPTIONS",
-    "Access-Control-Allow-Headers": "Content-Type",
-    "Content-Type": "application/json"
+    "Access-Control-Allow-Headers": "Content-Type"
 }
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            if obj % 1 == 0:
-                return int(obj)
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
 
 def lambda_handler(event, context):
     # Preflight request (OPTIONS)
     if event.get("httpMethod") == "OPTIONS":
-        return {
-            "statusCode": 200,
-            "headers": CORS_HEADERS,
-            "body": json.dumps({"message": "CORS preflight"})
-        }
+        return response(200, {"message": "CORS preflight"}, PREFLIGHT_HEADERS)
 
     try:
         # Uzmemo query parametre i normalizujemo ključeve na lowercase
@@ -44,11 +31,7 @@ def lambda_handler(event, context):
         genre = query_params.get("genre")
 
         if not genre:
-            return {
-                "statusCode": 400,
-                "headers": CORS_HEADERS,
-                "body": json.dumps({"message": "Missing 'genre' query parameter"})
-            }
+            return response(400, {"message": "Missing 'genre' query parameter"})
 
         # Query za umetnike po žanru
         artists_response = artists_table.query(
@@ -65,18 +48,10 @@ def lambda_handler(event, context):
             "albums": albums_response.get("Items", [])
         }
 
-        return {
-            "statusCode": 200,
-            "headers": CORS_HEADERS,
-            "body": json.dumps(result, cls=DecimalEncoder)
-        }
+        return response(200, result)
 
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
         print(f"Error: {error_trace}")
-        return {
-            "statusCode": 500,
-            "headers": CORS_HEADERS,
-            "body": json.dumps({"error": str(e), "trace": error_trace})
-        }
+        return response(500, {"error": str(e), "trace": error_trace})
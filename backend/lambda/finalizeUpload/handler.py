@@ -0,0 +1,346 @@
+import json
+import os
+from datetime import datetime
+from urllib.parse import unquote_plus
+
+from botocore.exceptions import ClientError
+
+from common import clients, content
+from common.audio_metadata import UnsupportedAudio, extract, s3_reader
+from common.hls import RENDITIONS, content_prefix
+from common.hydration import find_by_id, get_by_id, resolve_genres
+from common.sharding import active_shard
+from common.uploads import (
+    claim_album_event, complete_ingest, finish_ingest_track, release_album_event, upload_id_from_key
+)
+from common.writes import put_with_links
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+SONGS_TABLE = os.environ["SONGS_TABLE"]
+ARTIST_SONG_TABLE = os.environ["ARTIST_SONG_TABLE"]
+ALBUMS_TABLE = os.environ["ALBUMS_TABLE"]
+ARTISTS_TABLE = os.environ["ARTISTS_TABLE"]
+UPLOAD_SESSIONS_TABLE = os.environ["UPLOAD_SESSIONS_TABLE"]
+SNS_NEW_SINGLE_TOPIC_ARN = os.environ["SNS_NEW_CONTENT_ARN"]
+SNS_NEW_TRANSCRIPTION_TOPIC_ARN = os.environ["SNS_NEW_TRANSCRIPTION_ARN"]
+INGEST_STATE_MACHINE_ARN = os.environ["INGEST_STATE_MACHINE_ARN"]
+CONTENT_OBJECTS_TABLE = os.environ["CONTENT_OBJECTS_TABLE"]
+
+# Kljucevi koje ingest radnici izvode iz audio objekta; ako ih duplikat vec ima, ingest se preskace
+DERIVED_FIELDS = ("hlsPlaylist", "previewFile", "waveformFile")
+
+song_table = clients.table(SONGS_TABLE)
+artist_song_table = clients.table(ARTIST_SONG_TABLE)
+albums_table = clients.table(ALBUMS_TABLE)
+artists_table = clients.table(ARTISTS_TABLE)
+sessions_table = clients.table(UPLOAD_SESSIONS_TABLE)
+objects_table = clients.table(CONTENT_OBJECTS_TABLE)
+sns = clients.client("sns")
+s3 = clients.client("s3")
+sfn_client = clients.client("stepfunctions")
+
+
+def probe(key, size):
+    """Audio fields read from the object's headers; {} keeps the client's values."""
+    try:
+        info = extract(s3_reader(s3, BUCKET_NAME, key, size), size)
+    except UnsupportedAudio as e:
+        print(f"Could not read audio metadata of {key}: {e}")
+        return {}
+    return {
+        "fileSize": info["fileSize"],
+        "fileType": info["fileType"],
+        "duration": int(round(info["duration"])),
+        "bitrate": info["bitrate"],
+        "sampleRate": info["sampleRate"],
+        "channels": info["channels"]
+    }
+
+
+def store_audio(session, key, size, metadata):
+    """Move the staged upload to its content key and reference it; return its ContentObjects item."""
+    content_key = content.audio_key(content.s3_sha256(s3, BUCKET_NAME, key))
+    ref = f"song#{session['SongId']}"
+    stored = content.acquire(objects_table, content_key, ref)
+    if stored is None:
+        content_type = metadata.get("fileType") or session["ContentType"]
+        s3.copy_object(
+            Bucket=BUCKET_NAME,
+            Key=content_key,
+            CopySource={"Bucket": BUCKET_NAME, "Key": key},
+            ContentType=content_type,
+            MetadataDirective="REPLACE"
+        )
+        content.register(objects_table, content_key, size, content_type, metadata)
+        stored = content.acquire(objects_table, content_key, ref)
+    else:
+        print(f"{key} has the same content as {content_key}")
+    return stored
+
+
+def create_song(session, key, size, metadata):
+    draft = session["Song"]
+    song_id = session["SongId"]
+    album_id = session["Album"]
+    artists = draft.get("artists", [])
+
+    # Genre hints let readers fetch the album/artists with BatchGetItem
+    album = find_by_id(albums_table, album_id)
+    artist_genres = resolve_genres(
+        artists_table, artists, known=album.get("ArtistGenres") if album else None
+    )
+
+    item = {
+        **draft,
+        "Album": album_id,
+        "Id": song_id,
+        "type": draft.get("type", "single"),
+        "artists": artists,
+        "artist": artists[0] if artists else None, #primary
+        "genres": draft.get("genres", []),
+        "description": draft.get("description", ""),
+        "fileName": key,
+        "fileSize": size if size is not None else draft.get("fileSize"),
+        "createdDate": str(datetime.now()),
+        "modifiedDate": str(datetime.now()),
+        "deleted": "false",
+        "ActiveShard": active_shard(song_id),
+        "transcribe": draft.get("transcribe", False),
+        "ArtistGenres": artist_genres,
+        # Vrednosti iz zaglavlja fajla imaju prednost nad onima koje je poslao klijent
+        **metadata
+    }
+    item.pop("single", None)
+    if album:
+        item["AlbumGenre"] = album["Genre"]
+
+    # Ponovljen S3 event upisuje iste redove, put je idempotentan
+    put_with_links(song_table, item, artist_song_table, [
+        {
+            "ArtistId": artist_id,
+            "SongId": song_id,
+            "AlbumId": album_id,
+            "createdDate": str(datetime.now())
+        }
+        for artist_id in dict.fromkeys(artists)
+    ])
+    return item
+
+
+def replace_audio(session, key, size, metadata):
+    """Point an existing song at its new audio object."""
+    changes = session.get("Changes", {})
+    fields = {
+        "fileName": key,
+        "fileSize": size if size is not None else changes.get("fileSize"),
+        "fileType": changes.get("fileType"),
+        "duration": changes.get("duration"),
+        **metadata,
+        "modifiedDate": datetime.now().isoformat(),
+        "transcriptFileName": ""
+    }
+    try:
+        result = song_table.update_item(
+            Key={"Album": session["Album"], "Id": session["SongId"]},
+            UpdateExpression="SET " + ", ".join(f"#{name} = :{name}" for name in fields),
+            ConditionExpression="attribute_exists(Id)",
+            ExpressionAttributeNames={f"#{name}": name for name in fields},
+            ExpressionAttributeValues={f":{name}": value for name, value in fields.items()},
+            ReturnValues="ALL_NEW"
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            print(f"Song {session['SongId']} no longer exists")
+            return None
+        raise
+    return result["Attributes"]
+
+
+def claim(upload_id):
+    """Mark the session completed; False if another delivery of the event already did."""
+    try:
+        sessions_table.update_item(
+            Key={"Id": upload_id},
+            UpdateExpression="SET #status = :completed",
+            ConditionExpression="#status = :pending",
+            ExpressionAttributeNames={"#status": "Status"},
+            ExpressionAttributeValues={":completed": "completed", ":pending": "pending"}
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def publish(session, item):
+    if session["Mode"] == "create" and session["Song"].get("single"):
+        sns.publish(
+            TopicArn=SNS_NEW_SINGLE_TOPIC_ARN,
+            Message=json.dumps(item, default=str),
+            MessageAttributes={
+                "contentType": {
+                    "DataType": "String",
+                    "StringValue": "song"
+                }
+            },
+            Subject="New Single"
+        )
+        print(f"Published single '{item.get('title')}' to SNS topic {SNS_NEW_SINGLE_TOPIC_ARN}")
+
+    if item.get("transcribe"):
+        sns.publish(
+            TopicArn=SNS_NEW_TRANSCRIPTION_TOPIC_ARN,
+            Message=json.dumps(item, default=str),
+            MessageAttributes={
+                "songId": {
+                    "DataType": "String",
+                    "StringValue": item["Id"]
+                },
+                "songFileName": {
+                    "DataType": "String",
+                    "StringValue": item["fileName"]
+                }
+            },
+            Subject="New Transcription Request"
+        )
+
+
+def publish_album(session):
+    """The one new-content event of an album ingest, sent once its last track is finalized."""
+    album = get_by_id(albums_table, session["Album"], session.get("AlbumGenre"))
+    if not album:
+        print(f"Album {session['Album']} no longer exists")
+        return
+    sns.publish(
+        TopicArn=SNS_NEW_SINGLE_TOPIC_ARN,
+        Message=json.dumps(album, default=str),
+        MessageAttributes={
+            "contentType": {
+                "DataType": "String",
+                "StringValue": "album"
+            }
+        },
+        Subject="New Album"
+    )
+    print(f"Published album '{album.get('title')}' to SNS topic {SNS_NEW_SINGLE_TOPIC_ARN}")
+
+
+def finish_ingest(session):
+    # Album iz POST /albums/ingest salje jedan dogadjaj, kada je upisana i poslednja pesma.
+    # Objavljuje samo isporuka koja preuzme tracker; ako SNS padne, tracker se oslobadja za ponovljenu
+    if not finish_ingest_track(sessions_table, session) or not claim_album_event(sessions_table, session):
+        return
+    try:
+        publish_album(session)
+    except Exception:
+        release_album_event(sessions_table, session)
+        raise
+    complete_ingest(sessions_table, session)
+
+
+def start_ingest(upload_id, item):
+    """HLS renditions and the other derived files of the new audio (utils/ingest_sf_setup.py)."""
+    try:
+        sfn_client.start_execution(
+            stateMachineArn=INGEST_STATE_MACHINE_ARN,
+            # Ime izvrsenja = upload id, ponovljen start istog upload-a se odbija
+            name=upload_id,
+            input=json.dumps({
+                "songId": item["Id"],
+                "album": item["Album"],
+                "sourceKey": item["fileName"],
+                "prefix": content_prefix(content.digest_of(item["fileName"])),
+                "renditions": [rendition["name"] for rendition in RENDITIONS]
+            })
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ExecutionAlreadyExists":
+            raise
+
+
+def link(upload_id, session, stored):
+    """Point the song at stored audio; None if the song is gone or another delivery did it."""
+    key = stored["ObjectKey"]
+    size = stored.get("Size")
+    derived = stored.get("Derived") or {}
+    fields = {**(stored.get("Metadata") or {}), **derived}
+
+    if session["Mode"] == "create":
+        item = create_song(session, key, size, fields)
+    else:
+        item = replace_audio(session, key, size, fields)
+    if item is None:
+        ref = f"song#{session['SongId']}"
+        if content.release(objects_table, key, ref):
+            content.collect(s3, BUCKET_NAME, objects_table, key)
+        return None
+
+    if not claim(upload_id):
+        return None
+    publish(session, item)
+    finish_ingest(session)
+    # Isti sadrzaj je vec obradjen: HLS, preview i peaks se dele preko content kljuca
+    if not all(derived.get(name) for name in DERIVED_FIELDS):
+        start_ingest(upload_id, item)
+    return item
+
+
+def pending_session(upload_id):
+    session = sessions_table.get_item(Key={"Id": upload_id}).get("Item") if upload_id else None
+    if session and session.get("Status") == "completed":
+        # Pesma je vec upisana, ali je objava albuma mozda pala: ponovljena isporuka je ponavlja
+        finish_ingest(session)
+    if not session or session.get("Status") != "pending":
+        return None
+    return session
+
+
+def finalize(key, size):
+    upload_id = upload_id_from_key(key)
+    session = pending_session(upload_id)
+    if not session:
+        print(f"No pending upload session for {key}")
+        return None
+
+    stored = store_audio(session, key, size, probe(key, size))
+    item = link(upload_id, session, stored)
+    # Staging kopija vise ne treba, fajl je pod svojim content kljucem
+    s3.delete_object(Bucket=BUCKET_NAME, Key=key)
+    if item is None:
+        return None
+    print(f"Upload {upload_id} finalized for song {item['Id']}")
+    return item["Id"]
+
+
+def finalize_deduplicated(upload_id):
+    """A session opened for audio that was already stored (common.uploads.start_deduplicated)."""
+    session = pending_session(upload_id)
+    if not session:
+        print(f"No pending upload session {upload_id}")
+        return None
+
+    stored = content.acquire(objects_table, session["ContentKey"], f"song#{session['SongId']}")
+    if stored is None:
+        print(f"{session['ContentKey']} was deleted before upload {upload_id} could use it")
+        return None
+    item = link(upload_id, session, stored)
+    if item is None:
+        return None
+    print(f"Upload {upload_id} linked song {item['Id']} to {stored['ObjectKey']}")
+    return item["Id"]
+
+
+def lambda_handler(event, context):
+    # Deduplikovan upload nema S3 event, uploadMusicFile/updateSong pozivaju lambda direktno
+    if event.get("uploadId"):
+        song_id = finalize_deduplicated(event["uploadId"])
+        return {"finalized": [song_id] if song_id else []}
+
+    finalized = []
+    for record in event.get("Records", []):
+        s3_object = record["s3"]["object"]
+        song_id = finalize(unquote_plus(s3_object["key"]), s3_object.get("size"))
+        if song_id:
+            finalized.append(song_id)
+    return {"finalized": finalized}
@@ -1,125 +1,76 @@
-import json
 import os
-import boto3
-from decimal import Decimal
 from boto3.dynamodb.conditions import Key
 
+from common.auth import role as user_role
+from common.concurrency import gather
+from common import catalog_cache, clients
+from common.hydration import query_all
+from common.responses import response
+
 ALBUMS_TABLE_NAME = os.environ["ALBUMS_TABLE"]
 SONGS_TABLE_NAME = os.environ["SONGS_TABLE"]
-ARTIST_ALBUM_TABLE_NAME = os.environ["ARTIST_ALBUM_TABLE"]
 ARTISTS_TABLE_NAME = os.environ["ARTISTS_TABLE"]
-ARTIST_SONG_TABLE_NAME = os.environ["ARTIST_SONG_TABLE"]
-
-dynamodb = boto3.resource("dynamodb")
-albums_table = dynamodb.Table(ALBUMS_TABLE_NAME)
-songs_table = dynamodb.Table(SONGS_TABLE_NAME)
-artist_album_table = dynamodb.Table(ARTIST_ALBUM_TABLE_NAME)
-artists_table = dynamodb.Table(ARTISTS_TABLE_NAME)
-artist_song_table = dynamodb.Table(ARTIST_SONG_TABLE_NAME)
+CATALOG_VERSION_TABLE_NAME = os.environ["CATALOG_VERSION_TABLE"]
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            if obj % 1 == 0:
-                return int(obj)
-            return float(obj)
-        return super().default(obj)
+dynamodb = clients.resource("dynamodb")
+albums_table = clients.table(ALBUMS_TABLE_NAME)
+songs_table = clients.table(SONGS_TABLE_NAME)
+artists_table = clients.table(ARTISTS_TABLE_NAME)
+catalog_version_table = clients.table(CATALOG_VERSION_TABLE_NAME)
 
 def lambda_handler(event, context):
+    catalog_cache.begin_request(catalog_version_table)
     try:
-        claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-        role = claims.get("custom:role") if claims else None
+        # Bez claims (poziv preko function URL-a) se ne proverava uloga
+        role = user_role(event)
         if role is not None and role not in ("admin", "user"):
-            return {
-                "statusCode": 403,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"message": "Forbidden"})
-            }
+            return response(403, {"message": "Forbidden"})
 
         album_id = event.get("pathParameters", {}).get("id")
         if not album_id:
-            return {
-                "statusCode": 400,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"message": "Missing album id"})
-            }
+            return response(400, {"message": "Missing album id"})
 
-        response = albums_table.query(
-            IndexName="Id-index",
-            KeyConditionExpression=Key("Id").eq(album_id)
+        # Album je particioni kljuc Songs tabele, pa se pesme citaju jednim query-jem paralelno sa albumom
+        album, album_songs = gather(
+            lambda: catalog_cache.find_by_id(albums_table, album_id),
+            lambda: query_all(songs_table, KeyConditionExpression=Key("Album").eq(album_id))
         )
-        items = response.get("Items", [])
-        if not items:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"message": "Album not found"})
-            }
+        if not album:
+            return response(404, {"message": "Album not found"})
+        songs = [s for s in album_songs if s.get("deleted") != "true"]
 
-        album = items[0]
+        artist_ids = list(album.get("artists", []))
+        artist_hints = dict(album.get("ArtistGenres") or {})
+        for song in songs:
+            artist_ids.extend(song.get("artists", []))
+            artist_hints.update(song.get("ArtistGenres") or {})
+        artists = catalog_cache.hydrate_by_id(dynamodb, artists_table, artist_ids, artist_hints)
 
-        artist_album_resp = artist_album_table.query(
-            IndexName="AlbumId-index", 
-            KeyConditionExpression=Key("AlbumId").eq(album_id)
-        )
-        artist_ids = [item["ArtistId"] for item in artist_album_resp.get("Items", [])]
+        def artist_name(artist_id):
+            return artists.get(artist_id, {}).get("name")
 
         artist_data = []
-        for artist_id in artist_ids:
-            r = artists_table.query(
-                IndexName="Id-index",
-                KeyConditionExpression=Key("Id").eq(artist_id)
-            )
-            artist_item = r.get("Items", [{}])[0]
-            artist_name = artist_item.get("name")
-
-            artist_songs_resp = artist_song_table.query(
-                IndexName="AlbumId-index",  
-                KeyConditionExpression=Key("AlbumId").eq(album_id) & Key("ArtistId").eq(artist_id)
-            )
-
-            song_ids = [s["SongId"] for s in artist_songs_resp.get("Items", [])]
-
-            songs = []
-            for song_id in song_ids:
-                song_resp = songs_table.get_item(Key={"Album": album_id, "Id": song_id})
-                if "Item" in song_resp:
-                    songs.append({
-                        "Id": song_id,
-                        "title": song_resp["Item"].get("title"),
-                        "duration": song_resp["Item"].get("duration"),
-                        "genres": song_resp["Item"].get("genres"),
-                        "type": song_resp["Item"].get("type"),
-                        "artists": [{
-                            "Id": artist_id,
-                            "name": artist_name,
-                        }]
-                    })
-
+        for artist_id in album.get("artists", []):
             artist_data.append({
                 "Id": artist_id,
-                "Name": artist_name,
-                "Songs": songs
+                "Name": artist_name(artist_id),
+                "Songs": [
+                    {
+                        "Id": song["Id"],
+                        "title": song.get("title"),
+                        "duration": song.get("duration"),
+                        "genres": song.get("genres"),
+                        "type": song.get("type"),
+                        "artists": [{"Id": a, "name": artist_name(a)} for a in song.get("artists", [])]
+                    }
+                    for song in songs if artist_id in song.get("artists", [])
+                ]
             })
 
         album["Artists"] = artist_data
 
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Content-Type": "application/json"
-            },
-            "body": json.dumps(album, cls=DecimalEncoder)
-        }
+        return response(200, album)
 
     except Exception as e:
         import traceback
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({
-                "error": str(e),
-                "trace": traceback.format_exc()
-            })
-        }
+        return response(500, {"error": str(e), "trace": traceback.format_exc()})
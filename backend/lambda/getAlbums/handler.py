@@ -1,49 +1,33 @@
-import json
 import os
 
-import boto3
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+from common import clients
+from common.auth import require_role
+from common.covers import list_entry
+from common.pagination import InvalidPageRequest
+from common.responses import response
+from common.sharding import query_active_page
+from common.snapshots import serve_snapshot, wants_snapshot
 
 TABLE_NAME = os.environ["ALBUMS_TABLE"]
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(TABLE_NAME)
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            if obj % 1 == 0:
-                return int(obj)
-            else:
-                return float(obj)
-        return super(DecimalEncoder, self).default(obj)
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+s3 = clients.client('s3')
+table = clients.table(TABLE_NAME)
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-    print(role)
-    if role != "admin" and role != "user":
-        return {
-            "statusCode": 403,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Forbidden"})
-        }
+    forbidden = require_role(event, "admin", "user")
+    if forbidden:
+        return forbidden
     try:
-        response = table.query(
-            IndexName="deleted-index",
-            KeyConditionExpression=Key("deleted").eq("false")
-        )
-        items = response.get("Items", [])
+        if wants_snapshot(event):
+            snapshot = serve_snapshot(s3, BUCKET_NAME, "albums", event)
+            if snapshot:
+                return snapshot
+
+        items, next_token = query_active_page(table, "albums", event)
+        return response(200, {"items": [list_entry(item) for item in items], "nextToken": next_token})
 
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps(items, cls=DecimalEncoder)
-        }
+    except InvalidPageRequest as e:
+        return response(400, {"message": str(e)})
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": str(e)})
-        }
+        return response(500, {"error": str(e)})
@@ -1,84 +1,48 @@
-import json
-import boto3
 from boto3.dynamodb.conditions import Key
-from decimal import Decimal
 import os
 
+from common.concurrency import gather
+from common import catalog_cache, clients
+from common.hydration import query_all
+from common.responses import response
+
 ARTISTS_TABLE_NAME = os.environ["ARTISTS_TABLE"]
 ARTIST_ALBUM_TABLE_NAME = os.environ["ARTIST_ALBUM_TABLE"]
 ALBUMS_TABLE_NAME = os.environ["ALBUMS_TABLE"]
+CATALOG_VERSION_TABLE_NAME = os.environ["CATALOG_VERSION_TABLE"]
 
-dynamodb = boto3.resource("dynamodb")
-
-artists_table = dynamodb.Table(ARTISTS_TABLE_NAME)
-artist_album_table = dynamodb.Table(ARTIST_ALBUM_TABLE_NAME)
-albums_table = dynamodb.Table(ALBUMS_TABLE_NAME)
+dynamodb = clients.resource("dynamodb")
 
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+artists_table = clients.table(ARTISTS_TABLE_NAME)
+artist_album_table = clients.table(ARTIST_ALBUM_TABLE_NAME)
+albums_table = clients.table(ALBUMS_TABLE_NAME)
+catalog_version_table = clients.table(CATALOG_VERSION_TABLE_NAME)
 
 
 def lambda_handler(event, context):
+    catalog_cache.begin_request(catalog_version_table)
     try:
         path_params = event.get('pathParameters', {})
         artist_id = path_params.get('id')
 
         if not artist_id:
-            return {
-                "statusCode": 400,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"error": "'id' path parameter is required"})
-            }
+            return response(400, {"error": "'id' path parameter is required"})
 
-        response = artists_table.scan(
-            FilterExpression=Key("Id").eq(artist_id)
+        # Artist i njegove ArtistAlbum veze se citaju paralelno
+        artist_details, artist_album_items = gather(
+            lambda: catalog_cache.find_by_id(artists_table, artist_id),
+            lambda: query_all(artist_album_table, KeyConditionExpression=Key("ArtistId").eq(artist_id))
         )
-        items = response.get("Items", [])
-        if not items:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"error": "Artist not found"})
-            }
-
-        artist_details = items[0]
-
-        artist_album_response = artist_album_table.query(
-            KeyConditionExpression=Key("ArtistId").eq(artist_id)
-        )
-        artist_album_items = artist_album_response.get("Items", [])
-
-        albums = []
-        for item in artist_album_items:
-            album_id = item.get("AlbumId")
-            if not album_id:
-                continue
+        if not artist_details:
+            return response(404, {"error": "Artist not found"})
 
-            album_response = albums_table.query(
-                IndexName="Id-index",  
-                KeyConditionExpression=Key("Id").eq(album_id)
-            )
-            album_items = album_response.get("Items", [])
-            if album_items:
-                albums.append(album_items[0])
+        album_ids = [item["AlbumId"] for item in artist_album_items if item.get("AlbumId")]
+        album_hints = {item["AlbumId"]: item["AlbumGenre"] for item in artist_album_items if item.get("AlbumGenre")}
+        found = catalog_cache.hydrate_by_id(dynamodb, albums_table, album_ids, album_hints)
+        albums = [found[album_id] for album_id in album_ids if album_id in found]
 
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({
-                "artist": artist_details,
-                "albums": albums  
-            }, cls=DecimalEncoder)
-        }
+        return response(200, {"artist": artist_details, "albums": albums})
 
     except Exception as e:
         print(f"Error: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": "Internal Server Error", "details": str(e)})
-        }
+        return response(500, {"error": "Internal Server Error", "details": str(e)})
@@ -1,39 +1,28 @@
-import json
-import boto3
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
 import os
 
-table_name = os.environ["TABLE_NAME"]
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(table_name)
+from common import clients
+from common.pagination import InvalidPageRequest
+from common.responses import response
+from common.sharding import query_active_page
+from common.snapshots import serve_snapshot, wants_snapshot
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            if obj % 1 == 0:
-                return int(obj)
-            else:
-                return float(obj)
-        return super(DecimalEncoder, self).default(obj)
+table_name = os.environ["TABLE_NAME"]
+bucket_name = os.environ["BUCKET_NAME"]
+s3 = clients.client("s3")
+table = clients.table(table_name)
 
 def lambda_handler(event, context):
     try:
-        response = table.query(
-            IndexName="deleted-index",
-            KeyConditionExpression=Key("deleted").eq("false")
-        )
-        items = response.get("Items", [])
-        print(items)
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps(items, cls=DecimalEncoder)
-        }
+        if wants_snapshot(event):
+            snapshot = serve_snapshot(s3, bucket_name, "artists", event)
+            if snapshot:
+                return snapshot
+
+        items, next_token = query_active_page(table, "artists", event)
+        return response(200, {"items": items, "nextToken": next_token})
+
+    except InvalidPageRequest as e:
+        return response(400, {"message": str(e)})
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": str(e)})
-        }
+        return response(500, {"error": str(e)})
@@ -1,18 +1,11 @@
 import os
-import boto3
 from boto3.dynamodb.conditions import Key
 from collections import defaultdict
 import json
-import traceback
 import decimal
 
-dynamodb = boto3.resource('dynamodb')
-
-HEADERS = {
-    "Access-Control-Allow-Origin": "*",
-    "Access-Control-Allow-Headers": "*",
-    "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE"
-}
+from common import clients
+from common.responses import response
 
 # Funkcija koja konvertuje Decimal u float prilikom JSON serijalizacije
 def default_serializer(obj):
@@ -25,9 +18,9 @@ def handler(event, context):
     print("Event:", json.dumps(event, default=default_serializer))  # Loguj ceo event
 
     try:
-        score_table = dynamodb.Table(os.environ['SCORE_TABLE'])
-        songs_table = dynamodb.Table(os.environ['SONGS_TABLE'])
-        albums_table = dynamodb.Table(os.environ['ALBUMS_TABLE'])
+        score_table = clients.table(os.environ['SCORE_TABLE'])
+        songs_table = clients.table(os.environ['SONGS_TABLE'])
+        albums_table = clients.table(os.environ['ALBUMS_TABLE'])
         print("Tables loaded:", os.environ['SCORE_TABLE'], os.environ['SONGS_TABLE'], os.environ['ALBUMS_TABLE'])
 
         try:
@@ -40,26 +33,22 @@ def handler(event, context):
 
         # 1️⃣ Dobavi top artist i top genre
         print("Querying Score table for user...")
-        response = score_table.query(
+        result = score_table.query(
             IndexName='User-index',
             KeyConditionExpression=Key('User').eq(user_id)
         )
-        items = response.get('Items', [])
+        items = result.get('Items', [])
         print(f"Found {len(items)} score records")
 
         if not items:
             print("No score records found")
-            return {
-                'statusCode': 200,
-                'headers': HEADERS,
-                'body': json.dumps({
-                    'topArtist': None,
-                    'topGenre': None,
-                    'songs': [],
-                    'albums': [],
-                    'message': 'No listening history yet'
-                }, default=default_serializer)
-            }
+            return response(200, {
+                'topArtist': None,
+                'topGenre': None,
+                'songs': [],
+                'albums': [],
+                'message': 'No listening history yet'
+            })
 
         aggregated = defaultdict(lambda: {"total_sum": 0, "total_number": 0})
         for r in items:
@@ -131,22 +120,15 @@ def handler(event, context):
                     albums_set.add(a['Id'])
                     albums.append(a)
 
-        return {
-            'statusCode': 200,
-            'headers': HEADERS,
-            'body': json.dumps({
-                'topArtist': top_artist,
-                'topGenre': top_genre,
-                'songs': songs,
-                'albums': albums
-            }, default=default_serializer)
-        }
+        return response(200, {
+            'topArtist': top_artist,
+            'topGenre': top_genre,
+            'songs': songs,
+            'albums': albums
+        })
 
     except Exception as e:
         print(f"ERROR: {str(e)}")
+        import traceback
         print(traceback.format_exc())
-        return {
-            'statusCode': 500,
-            'headers': HEADERS,
-            'body': json.dumps({'error': str(e), 'type': type(e).__name__}, default=default_serializer)
-        }
+        return response(500, {'error': str(e), 'type': type(e).__name__})
@@ -1,12 +1,13 @@
 import os
 import json
-import boto3
 import datetime
 
-dynamodb = boto3.resource('dynamodb')
-listening_history_table = dynamodb.Table(os.environ['LISTENING_HISTORY_TABLE'])
+from common import clients
+from common.responses import response
+
+listening_history_table = clients.table(os.environ['LISTENING_HISTORY_TABLE'])
 # Potrebna nam je i Songs tabela da bismo znali žanr/izvođača pesme
-songs_table = dynamodb.Table(os.environ['SONGS_TABLE']) 
+songs_table = clients.table(os.environ['SONGS_TABLE'])
 
 def handler(event, context):
     """
@@ -19,11 +20,11 @@ def handler(event, context):
 
         # 1. Dobavi info o pesmi da scoreUpdater zna o kom žanru/izvođaču se radi
         # NAPOMENA: Proveri da li je 'Id' ispravan Partition Key za tvoju Songs tabelu
-        response = songs_table.get_item(Key={'Id': song_id})
-        song_item = response.get('Item')
+        result = songs_table.get_item(Key={'Id': song_id})
+        song_item = result.get('Item')
         
         if not song_item:
-            return {'statusCode': 404, 'body': json.dumps({'error': 'Song not found'})}
+            return response(404, {'error': 'Song not found'})
 
         # 2. Kreiraj novi zapis za istoriju slušanja
         # Timestamp je naš Sort Key, mora biti jedinstven za svaki događaj
@@ -40,10 +41,7 @@ def handler(event, context):
 
         listening_history_table.put_item(Item=history_item)
 
-        return {
-            'statusCode': 201, # 201 Created
-            'body': json.dumps({'message': 'Listen event recorded'})
-        }
+        return response(201, {'message': 'Listen event recorded'})
     except Exception as e:
         print(e)
-        return {'statusCode': 500, 'body': json.dumps({'error': str(e)})}
\ No newline at end of file
+        return response(500, {'error': str(e)})
\ No newline at end of file
@@ -1,122 +1,59 @@
-import json
 import os
-import boto3
-from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+
+from common import catalog_cache, clients, priming
+from common.responses import response
+from common.song_view import build_views, get_view, song_response
 
 songs_table_name = os.environ["SONGS_TABLE"]
 albums_table_name = os.environ["ALBUMS_TABLE"]
 artists_table_name = os.environ["ARTISTS_TABLE"]
+song_view_table_name = os.environ["SONG_VIEW_TABLE"]
+catalog_version_table_name = os.environ["CATALOG_VERSION_TABLE"]
 
-dynamodb = boto3.resource("dynamodb")
-songs_table = dynamodb.Table(songs_table_name)
-albums_table = dynamodb.Table(albums_table_name)
-artist_table = dynamodb.Table(artists_table_name)
-
+dynamodb = clients.resource("dynamodb")
+songs_table = clients.table(songs_table_name)
+albums_table = clients.table(albums_table_name)
+artist_table = clients.table(artists_table_name)
+song_view_table = clients.table(song_view_table_name)
+catalog_version_table = clients.table(catalog_version_table_name)
 
-def decimal_default(obj):
-    if isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        return float(obj)
-    raise TypeError
+priming.on_init(
+    priming.open_dynamodb(dynamodb),
+    lambda: catalog_cache.preload_version(catalog_version_table)
+)
 
 
 def lambda_handler(event, context):
+    catalog_cache.begin_request(catalog_version_table)
     try:
         path_params = event.get("pathParameters", {})
         song_id = path_params.get("id")
         if not song_id:
-            return {"statusCode": 400, "body": json.dumps({"error": "songId is required"})}
-
-        # Učitaj pesmu
-        response = songs_table.query(
-            IndexName="Id-index",
-            KeyConditionExpression=boto3.dynamodb.conditions.Key("Id").eq(song_id)
-        )
-        items = response.get("Items", [])
-        if not items:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"error": "Song not found"})
-            }
-
-        item = items[0]
-
-        # Učitaj album
-        album_id = item.get("Album")
-        album_obj = None
-        print(album_id)
-        if album_id:
-            album_resp = albums_table.query(
-                IndexName="Id-index",
-                KeyConditionExpression=boto3.dynamodb.conditions.Key("Id").eq(album_id)
-            )
-            print(album_resp)
-            album_items = album_resp.get("Items", [])
-            if album_items:
-                album_item = album_items[0]
-                album_obj = {
-                    "Id": album_item.get("Id"),
-                    "title": album_item.get("title"),
-                    "description": album_item.get("description", ""),
-                    "coverImage": album_item.get("coverImage", ""),
-                    "releaseDate": album_item.get("releaseDate"),
-                    "artists": album_item.get("artists", []),
-                    "genres": album_item.get("genres", []),
-                    "Genre": album_item.get("Genre", ""),
-                    "deleted": album_item.get("deleted", False)
-                }
+            return response(400, {"error": "songId is required"})
 
-        # Učitaj umetnike
-        artist_ids = item.get("artists", [])
-        artists_full = []
-        for aid in artist_ids:
-            artist_resp = artist_table.query(
+        view = get_view(song_view_table, song_id)
+        if not view:
+            # Pesma jos nije stigla u SongView (stream kasni za upisom), sastavlja se iz izvornih tabela
+            query_response = songs_table.query(
                 IndexName="Id-index",
-                KeyConditionExpression=boto3.dynamodb.conditions.Key("Id").eq(aid)
+                KeyConditionExpression=Key("Id").eq(song_id)
             )
-            artist_items = artist_resp.get("Items", [])
-            if artist_items:
-                a = artist_items[0]
-                artists_full.append({
-                    "Id": a.get("Id"),
-                    "name": a.get("name", "Unknown"),
-                    "biography": a.get("biography", ""),
-                    "genres": a.get("genres", []),
-                    "Genre": a.get("Genre", "")
-                })
+            items = query_response.get("Items", [])
+            if not items:
+                return response(404, {"error": "Song not found"})
+            view = build_views(
+                dynamodb, albums_table, artist_table, items[:1], hydrate=catalog_cache.hydrate_by_id
+            )[0]
 
-        # Sastavi song objekat
-        song = {
-            "id": item.get("Id"),
-            "title": item.get("title"),
-            "artists": artists_full,
-            "genres": item.get("genres", []),
-            "description": item.get("description", ""),
-            "coverImage": item.get("coverImage"),
-            "album": album_obj,  # vraća ceo album objekat
-            "duration": item.get("duration"),
-            "releaseDate": item.get("releaseDate"),
-            "type": item.get("type", "single"),
-            "fileName": item.get("fileName", ""),
-            "transcriptFileName": item.get("transcriptFileName", "")
-        }
+        song = song_response(view)
 
         print(song)
 
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*", "Content-Type": "application/json"},
-            "body": json.dumps(song, default=decimal_default)
-        }
+        return response(200, song)
 
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
         print(f"Error occurred: {error_trace}")
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*", "Content-Type": "application/json"},
-            "body": json.dumps({"error": str(e), "trace": error_trace})
-        }
+        return response(500, {"error": str(e), "trace": error_trace})
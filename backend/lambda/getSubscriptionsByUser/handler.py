@@ -1,42 +1,33 @@
-import json
 import os
 
-import boto3
 from boto3.dynamodb.conditions import Key, Attr
 
+from common import clients
+from common.auth import require_role
+from common.responses import response
+
 table_name = os.environ["SUBSCRIPTIONS_TABLE"]
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(table_name)
+table = clients.table(table_name)
 
 def lambda_handler(event, context):
     print("event:", event)
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-
-    if role != "user":
-        return {
-            "statusCode": 403,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message":"Forbidden: Insufficient permissions"})
-        }
+    forbidden = require_role(event, "user")
+    if forbidden:
+        return forbidden
 
     userId = event.get("queryStringParameters", {}).get("userId")
     if not userId:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Missing userId query parameter"})
-        }
+        return response(400, {"message": "Missing userId query parameter"})
 
     try:
-        table = dynamodb.Table(table_name)
-        response = table.query(
+        table = clients.table(table_name)
+        result = table.query(
             IndexName="User-index",
             KeyConditionExpression=Key("User").eq(userId),
             FilterExpression=Attr("deleted").eq("false")
         )
 
-        items = response.get("Items", [])
+        items = result.get("Items", [])
         subscriptions = []
 
         for item in items:
@@ -54,16 +45,8 @@ def lambda_handler(event, context):
 
         print("subs:", subscriptions)
 
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps(subscriptions)
-        }
+        return response(200, subscriptions)
 
     except Exception as e:
         print("DynamoDB error:", e)
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Internal server error"})
-        }
+        return response(500, {"message": "Internal server error"})
@@ -1,11 +1,12 @@
 import json
 import os
-import boto3
+
+from common import clients
 
 MUSIC_BUCKET_NAME = os.environ["MUSIC_BUCKET_NAME"]
 TRANSCRIPTION_STEP_FUNCTION_ARN = os.environ["TRANSCRIPTION_STEP_FUNCTION_ARN"]
 
-sfn_client = boto3.client("stepfunctions")
+sfn_client = clients.client("stepfunctions")
 
 
 def lambda_handler(event, context):
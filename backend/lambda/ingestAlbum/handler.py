@@ -0,0 +1,187 @@
+import json
+import base64
+import uuid
+from datetime import datetime
+from decimal import Decimal
+import os
+
+from common import clients, content
+from common.auth import require_role
+from common.concurrency import parallel_map, throttled_map
+from common.covers import claim_cover, entity_metadata, original_key, store_cover
+from common.hydration import batch_get, resolve_genres
+from common.responses import response
+from common.sharding import active_shard
+from common.uploads import (
+    InvalidUpload, deduplicated_instructions, deduplicated_session, finalize_deduplicated,
+    ingest_id, ingest_tracker, instructions, open_upload, validate
+)
+from common.writes import batch_put, put_with_links
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+ALBUMS_TABLE = os.environ["ALBUMS_TABLE"]
+ARTIST_ALBUM_TABLE = os.environ["ARTIST_ALBUM_TABLE"]
+ARTISTS_TABLE = os.environ["ARTISTS_TABLE"]
+UPLOAD_SESSIONS_TABLE = os.environ["UPLOAD_SESSIONS_TABLE"]
+CONTENT_OBJECTS_TABLE = os.environ["CONTENT_OBJECTS_TABLE"]
+FINALIZE_UPLOAD_FUNCTION = os.environ["FINALIZE_UPLOAD_FUNCTION"]
+
+s3 = clients.client("s3")
+lambda_client = clients.client("lambda")
+dynamodb = clients.resource("dynamodb")
+albums_table = clients.table(ALBUMS_TABLE)
+artist_album_table = clients.table(ARTIST_ALBUM_TABLE)
+artists_table = clients.table(ARTISTS_TABLE)
+sessions_table = clients.table(UPLOAD_SESSIONS_TABLE)
+content_objects_table = clients.table(CONTENT_OBJECTS_TABLE)
+
+MAX_TRACKS = 100
+# Potpisani delovi po pesmi u odgovoru; svi delovi svih pesama bi presli 6 MB limit odgovora
+SIGNED_PARTS_PER_TRACK = 4
+# Polja pesme iz manifesta koja finalizeUpload upisuje u Songs (kao DRAFT_FIELDS u uploadMusicFile)
+TRACK_FIELDS = (
+    "title", "artists", "genres", "releaseDate", "description",
+    "fileSize", "fileType", "duration", "transcribe"
+)
+
+
+def album_item(body, album_id, cover_key, images):
+    genres = body['genres']
+    artists = body.get('artists', [])
+    item = {
+        "Genre": genres[0],
+        "Id": album_id,
+        "artist": artists[0] if artists else None,  # primary artist
+        "title": body['title'],
+        "artists": artists,
+        "genres": genres,
+        "releaseDate": body.get('releaseDate', str(datetime.now())),
+        "description": body.get('description', ''),
+        "coverImage": cover_key,
+        "createdDate": str(datetime.now()),
+        "modifiedDate": str(datetime.now()),
+        "deleted": "false",
+        "ActiveShard": active_shard(album_id),
+        "ArtistGenres": resolve_genres(artists_table, artists)
+    }
+    if images:
+        item["coverImages"] = images
+    return item
+
+
+def validate_track(track):
+    """(size, content type) of one manifest track, or raise InvalidUpload."""
+    if not track.get('title'):
+        raise InvalidUpload("Every track needs a title")
+    if track.get('sha256') and not content.valid_digest(str(track['sha256']).lower()):
+        raise InvalidUpload("sha256 must be 64 hexadecimal characters")
+    return validate(track.get('fileSize'), track.get('fileType'))
+
+
+def stored_audio(tracks):
+    """{sha256: ContentObjects item} of the manifest's audio that is already stored, in one BatchGetItem."""
+    digests = {str(track['sha256']).lower() for track in tracks if track.get('sha256')}
+    keys = [{"ObjectKey": content.audio_key(digest)} for digest in digests]
+    found = batch_get(dynamodb, CONTENT_OBJECTS_TABLE, keys) if keys else []
+    return {item["Digest"]: item for item in found}
+
+
+def open_track(track, checked, album, stored):
+    """Session item and browser instructions of one track; nothing is stored yet."""
+    file_size, content_type = checked
+    draft = {field: track[field] for field in TRACK_FIELDS if track.get(field) is not None}
+    draft.setdefault('artists', album['artists'])
+    draft.setdefault('genres', album['genres'])
+    draft.setdefault('releaseDate', album['releaseDate'])
+    draft.update(fileSize=file_size, fileType=content_type, coverImage=album['coverImage'], single=False)
+
+    session = {
+        "Mode": "create",
+        "SongId": str(uuid.uuid4()),
+        "Album": album['Id'],
+        "AlbumGenre": album['Genre'],
+        "Ingest": ingest_id(album['Id']),
+        "Song": draft
+    }
+    # Isti SHA-256 je vec sacuvan: pesma se samo vezuje za postojeci objekat, bez prenosa
+    existing = stored.get(str(track.get('sha256') or '').lower())
+    if existing:
+        item = deduplicated_session(session, existing)
+        return item, deduplicated_instructions(item)
+    item = open_upload(s3, BUCKET_NAME, session, file_size, content_type)
+    return item, instructions(s3, BUCKET_NAME, item, {}, SIGNED_PARTS_PER_TRACK)
+
+
+def lambda_handler(event, context):
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
+
+    try:
+        body = json.loads(event.get('body') or '{}', parse_float=Decimal)
+        tracks = body.get('tracks') or []
+        if not body.get('title'):
+            return response(400, {"error": "title is required"})
+        if not body.get('genres'):
+            return response(400, {"message": "Album must have at least one genre"})
+        if not 1 <= len(tracks) <= MAX_TRACKS:
+            return response(400, {"error": f"An album needs between 1 and {MAX_TRACKS} tracks"})
+        # Manifest se proverava ceo pre nego sto se otvori ijedan upload
+        checked = [validate_track(track) for track in tracks]
+
+        album_id = str(uuid.uuid4())
+        cover_file_base64 = body.get('coverFileBase64')
+        cover_data = base64.b64decode(cover_file_base64) if cover_file_base64 else None
+        cover_key = original_key(cover_data) if cover_data else None
+        images = claim_cover(content_objects_table, cover_key, f"album#{album_id}") if cover_key else None
+        album = album_item(body, album_id, cover_key, images)
+
+        stored = stored_audio(tracks)
+
+        # Multipart upload-i se otvaraju paralelno, koliko S3 dozvoljava
+        opened = throttled_map(lambda pair: open_track(*pair, album, stored), list(zip(tracks, checked)))
+        sessions = [session for session, _ in opened]
+
+        # Album i ArtistAlbum u jednoj transakciji, sesije svih pesama i tracker u BatchWriteItem pozivima
+        put_with_links(albums_table, album, artist_album_table, [
+            {
+                "ArtistId": artist_id,
+                "AlbumId": album_id,
+                "AlbumGenre": album['Genre'],
+                "createdDate": str(datetime.now())
+            }
+            for artist_id in dict.fromkeys(album['artists'])
+        ])
+        tracker = ingest_tracker(album_id, [session['Id'] for session in sessions])
+        batch_put(sessions_table.meta.client, [(sessions_table.name, item) for item in [*sessions, tracker]])
+
+        # Posle upisa albuma, da processCover nadje red kome dodaje derivate (common.covers)
+        if cover_key and not images:
+            store_cover(s3, BUCKET_NAME, content_objects_table, cover_key, cover_data,
+                        f"album#{album_id}", entity_metadata("album", album_id))
+
+        # Vec sacuvan audio nema S3 event, finalizeUpload se poziva direktno
+        parallel_map(
+            lambda session: finalize_deduplicated(lambda_client, FINALIZE_UPLOAD_FUNCTION, session['Id']),
+            [session for session in sessions if session.get('ContentKey')]
+        )
+        print(f"Album {album_id} ingest opened {len(sessions)} track uploads")
+
+        return response(202, {
+            "message": f"Upload the tracks to finish publishing '{album['title']}'.",
+            "albumId": album_id,
+            "item": album,
+            "tracks": [
+                {"songId": session['SongId'], "title": session['Song']['title'], "upload": upload}
+                for session, upload in opened
+            ]
+        })
+
+    except InvalidUpload as e:
+        return response(400, {"error": str(e)})
+
+    except Exception as e:
+        print("ERROR:", str(e))
+        import traceback
+        print(traceback.format_exc())
+        return response(500, {"error": str(e)})
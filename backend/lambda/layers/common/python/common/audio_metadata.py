@@ -0,0 +1,225 @@
+"""Duration, bitrate, sample rate and channels of MP3, WAV and FLAC objects.
+
+Only headers are read, through ranged GETs of HEAD_BYTES at a time:
+
+- MP3: skips the ID3v2 tag, then reads the first frame header. A Xing/Info
+  or VBRI header (the encoder's frame index) gives the exact frame count.
+  Without one the file is CBR, and the audio size divided by the bitrate
+  gives the duration.
+- WAV: the fmt chunk and the size of the data chunk. Chunks after the
+  first block are reached by their 8-byte headers.
+- FLAC: the STREAMINFO block, which holds the total sample count.
+
+The parsers take a read(offset, length) callable, so they are tested on
+bytes in memory and run on S3 through s3_reader. Every fixed-size field is
+length-checked before it is unpacked: a truncated or malformed header raises
+UnsupportedAudio, never struct.error.
+"""
+import struct
+
+HEAD_BYTES = 64 * 1024
+
+MIME_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav", "flac": "audio/flac"}
+
+_MP3_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {1: (44100, 48000, 32000), 2: (22050, 24000, 16000), 2.5: (11025, 12000, 8000)}
+_MP3_VERSIONS = {0: 2.5, 2: 2, 3: 1}
+_MP3_LAYERS = {1: 3, 2: 2, 3: 1}
+
+
+class UnsupportedAudio(ValueError):
+    pass
+
+
+class RangedReader:
+    """Serve reads from one cached block, fetching HEAD_BYTES (or more) on a miss."""
+
+    def __init__(self, fetch, size, block=HEAD_BYTES):
+        self.fetch = fetch
+        self.size = size
+        self.block = block
+        self.fetches = 0
+        self._start = 0
+        self._data = b""
+
+    def __call__(self, offset, length):
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b""
+        if not (self._start <= offset and end <= self._start + len(self._data)):
+            self._start = offset
+            self._data = self.fetch(offset, min(offset + max(length, self.block), self.size) - 1)
+            self.fetches += 1
+        return self._data[offset - self._start:end - self._start]
+
+
+def s3_reader(s3, bucket, key, size):
+    def fetch(start, end):
+        return s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")["Body"].read()
+    return RangedReader(fetch, size)
+
+
+def _unpack(fmt, data):
+    if len(data) != struct.calcsize(fmt):
+        raise UnsupportedAudio("Truncated header")
+    return struct.unpack(fmt, data)
+
+
+def extract(read, size):
+    """Return {format, fileType, fileSize, duration, bitrate, sampleRate, channels}."""
+    try:
+        return _extract(read, size)
+    except UnsupportedAudio:
+        raise
+    # Zaglavlje koje provere iznad ne pokrivaju i dalje ne sme da obori pozivaoca
+    except (struct.error, ValueError, IndexError, KeyError, ZeroDivisionError) as e:
+        raise UnsupportedAudio(f"Malformed header: {e}") from e
+
+
+def _extract(read, size):
+    start = _id3v2_size(read(0, 10))
+    magic = read(start, 12)
+    if magic[:4] == b"fLaC":
+        info = _flac(read, start)
+    elif magic[:4] == b"RIFF" and magic[8:12] == b"WAVE":
+        info = _wav(read, size)
+    else:
+        info = _mp3(read, size, start)
+
+    if not info["duration"] or not info["sampleRate"]:
+        raise UnsupportedAudio(f"No audio in {info['format']} headers")
+    if not info.get("bitrate"):
+        info["bitrate"] = int(size * 8 / info["duration"])
+    info["fileType"] = MIME_TYPES[info["format"]]
+    info["fileSize"] = size
+    return info
+
+
+def _id3v2_size(header):
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    # Syncsafe: 7 bitova po bajtu; +10 za zaglavlje, +10 ako postoji footer
+    length = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+    return 10 + length + (10 if header[5] & 0x10 else 0)
+
+
+def _wav(read, size):
+    fmt = None
+    data_size = None
+    pos = 12
+    while pos + 8 <= size and data_size is None:
+        chunk_id, chunk_size = _unpack("<4sI", read(pos, 8))
+        if chunk_id == b"fmt ":
+            fmt = _unpack("<HHIIHH", read(pos + 8, 16))
+        elif chunk_id == b"data":
+            # Snimci u toku mogu imati 0 ili 0xFFFFFFFF kao velicinu
+            data_size = min(chunk_size, size - pos - 8) if chunk_size else size - pos - 8
+        pos += 8 + chunk_size + (chunk_size & 1)
+
+    if fmt is None or data_size is None:
+        raise UnsupportedAudio("WAV without fmt or data chunk")
+    _, channels, sample_rate, byte_rate, _, _ = fmt
+    return {
+        "format": "wav",
+        "duration": data_size / byte_rate if byte_rate else 0,
+        "bitrate": byte_rate * 8,
+        "sampleRate": sample_rate,
+        "channels": channels,
+    }
+
+
+def _flac(read, start):
+    block_header = read(start + 4, 4)
+    if len(block_header) < 4 or block_header[0] & 0x7F != 0:
+        raise UnsupportedAudio("FLAC without STREAMINFO")
+    info = read(start + 8, 34)
+    if len(info) < 34:
+        raise UnsupportedAudio("Truncated FLAC STREAMINFO")
+    packed = int.from_bytes(info[10:18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x07) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    return {
+        "format": "flac",
+        "duration": total_samples / sample_rate if sample_rate else 0,
+        "sampleRate": sample_rate,
+        "channels": channels,
+    }
+
+
+def _mp3_header(header):
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = _MP3_VERSIONS.get((header[1] >> 3) & 0x03)
+    layer = _MP3_LAYERS.get((header[1] >> 1) & 0x03)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    bitrate = _MP3_BITRATES[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x01
+    if layer == 1:
+        samples, length = 384, (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 576 if layer == 3 and version != 1 else 1152
+        length = samples // 8 * bitrate // sample_rate + padding
+    return {
+        "version": version,
+        "bitrate": bitrate,
+        "sampleRate": sample_rate,
+        "channels": 1 if header[3] >> 6 == 3 else 2,
+        "samples": samples,
+        "length": length,
+    }
+
+
+def _mp3(read, size, start):
+    head = read(start, HEAD_BYTES)
+    frame = None
+    for i in range(len(head) - 3):
+        if head[i] != 0xFF:
+            continue
+        frame = _mp3_header(head[i:i + 4])
+        # Sledeci frame mora takodje poceti sync-om, da slucajni 0xFF u podacima ne prodje
+        if frame and (start + i + frame["length"] >= size or
+                      _mp3_header(read(start + i + frame["length"], 4))):
+            start += i
+            break
+        frame = None
+    if frame is None:
+        raise UnsupportedAudio("No MPEG audio frame found")
+
+    data = read(start, frame["length"])
+    side_info = (32 if frame["channels"] == 2 else 17) if frame["version"] == 1 else \
+        (17 if frame["channels"] == 2 else 9)
+    frames = None
+    xing = 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = _unpack(">I", data[xing + 4:xing + 8])[0]
+        if flags & 0x01:
+            frames = _unpack(">I", data[xing + 8:xing + 12])[0]
+    elif data[36:40] == b"VBRI":
+        frames = _unpack(">I", data[50:54])[0]
+
+    if frames:
+        duration = frames * frame["samples"] / frame["sampleRate"]
+        bitrate = int((size - start) * 8 / duration) if duration else 0
+    else:
+        bitrate = frame["bitrate"]
+        duration = (size - start) * 8 / bitrate
+    return {
+        "format": "mp3",
+        "duration": duration,
+        "bitrate": bitrate,
+        "sampleRate": frame["sampleRate"],
+        "channels": frame["channels"],
+    }
@@ -0,0 +1,17 @@
+"""Cognito claims carried by API Gateway in requestContext.authorizer."""
+from common.responses import response
+
+
+def claims(event):
+    return ((event.get("requestContext") or {}).get("authorizer") or {}).get("claims") or {}
+
+
+def role(event):
+    return claims(event).get("custom:role")
+
+
+def require_role(event, *roles):
+    """None when the caller has one of the roles, otherwise the 403 response to return."""
+    if role(event) in roles:
+        return None
+    return response(403, {"message": "Forbidden"})
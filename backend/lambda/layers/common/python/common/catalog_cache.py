@@ -0,0 +1,175 @@
+"""Warm-container cache of Album and Artist items.
+
+Albums and artists change only when an admin edits them, so a warm container
+keeps the ones it has read in an in-process LRU cache. Freshness comes from a
+single CatalogVersion item: updateArtist, updateAlbum, deleteArtist,
+cascadeArtistDeletion, deleteAlbum, deleteSong (when the album goes with
+its last song) and processCover (album coverImages) bump it after every
+write. A handler
+calls begin_request() at the start of each invocation; the first cached
+lookup of that invocation reads the version (one small GetItem) and drops
+the whole cache if it moved. Invocations that never touch the cache pay
+nothing, and neither does one that finds the cache empty with the version
+already known (preload_version).
+Entries also expire after CATALOG_CACHE_TTL seconds, so a missed bump cannot
+pin a stale item.
+
+Lookups return shallow copies; handlers may attach fields to what they get.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from common import hydration
+
+TTL_SECONDS = float(os.environ.get("CATALOG_CACHE_TTL", "300"))
+MAX_ENTRIES = int(os.environ.get("CATALOG_CACHE_MAX_ENTRIES", "2000"))
+VERSION_KEY = {"Id": "catalog"}
+
+
+class LruTtlCache:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = LruTtlCache(MAX_ENTRIES, TTL_SECONDS)
+_version = None
+_pending_check = None
+_state_lock = threading.Lock()
+
+
+def begin_request(version_table):
+    """Mark the cache for a version check before its next lookup."""
+    global _pending_check
+    with _state_lock:
+        _pending_check = version_table
+
+
+def _read_version(version_table):
+    item = version_table.meta.client.get_item(
+        TableName=version_table.name, Key=VERSION_KEY, ConsistentRead=True
+    ).get("Item")
+    return item["Version"] if item else 0
+
+
+def _ensure_fresh():
+    global _pending_check, _version
+    with _state_lock:
+        version_table = _pending_check
+        if version_table is None:
+            return
+        _pending_check = None
+        # Prazan kes nema sta da ponisti; poznata verzija je dovoljna za sledecu proveru
+        if _version is not None and len(_cache) == 0:
+            return
+        version = _read_version(version_table)
+        if version != _version:
+            _cache.clear()
+            _version = version
+
+
+def preload_version(version_table):
+    """Read the CatalogVersion item ahead of the first request (common.priming).
+
+    With the version known and the cache still empty, the first request's
+    check has nothing to invalidate and skips its GetItem.
+    """
+    global _version
+    version = _read_version(version_table)
+    with _state_lock:
+        if _version is None:
+            _version = version
+
+
+def bump_version(version_table):
+    version_table.meta.client.update_item(
+        TableName=version_table.name,
+        Key=VERSION_KEY,
+        UpdateExpression="ADD Version :one",
+        ExpressionAttributeValues={":one": 1}
+    )
+
+
+def clear():
+    global _version, _pending_check
+    with _state_lock:
+        _cache.clear()
+        _version = None
+        _pending_check = None
+
+
+def _get(table, entity_id):
+    item = _cache.get((table.name, entity_id))
+    return dict(item) if item is not None else None
+
+
+def _put(table, item):
+    _cache.put((table.name, item["Id"]), dict(item))
+
+
+def find_by_id(table, entity_id):
+    _ensure_fresh()
+    item = _get(table, entity_id)
+    if item is None:
+        item = hydration.find_by_id(table, entity_id)
+        if item:
+            _put(table, item)
+    return item
+
+
+def get_by_id(table, entity_id, genre=None):
+    _ensure_fresh()
+    item = _get(table, entity_id)
+    if item is None:
+        item = hydration.get_by_id(table, entity_id, genre)
+        if item:
+            _put(table, item)
+    return item
+
+
+def hydrate_by_id(dynamodb, table, ids, genre_hints=None):
+    """hydration.hydrate_by_id, reading only the ids that are not cached."""
+    _ensure_fresh()
+    found = {}
+    missing = []
+    for entity_id in dict.fromkeys(i for i in ids if i):
+        item = _get(table, entity_id)
+        if item is None:
+            missing.append(entity_id)
+        else:
+            found[entity_id] = item
+    if missing:
+        for entity_id, item in hydration.hydrate_by_id(dynamodb, table, missing, genre_hints).items():
+            _put(table, item)
+            found[entity_id] = item
+    return found
@@ -0,0 +1,80 @@
+"""Process-wide boto3 clients, resources and tables, created on first use.
+
+Handlers keep module-level names (s3 = client("s3"), table = table(NAME)),
+but nothing is built until the first attribute access. A container that
+never touches S3 never pays for the S3 client, and every handler module in
+the container shares one session's clients. Creation is serialized, so the
+objects are safe to use from common.concurrency fan-out threads.
+
+Every client is built with CONFIG instead of botocore's defaults:
+- The connection pool is sized to the fan-out pool, so parallel_map and
+  throttled_map workers never queue for a connection.
+- Adaptive retry mode rate-limits a client after throttling responses.
+- Connect and read timeouts are short. A stalled call is retried on a fresh
+  connection well inside the function timeout, instead of hanging until
+  botocore's 60 s default.
+- TCP keep-alive stays on for pooled connections across frozen invocations.
+A config= passed to client() is merged over CONFIG.
+"""
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+from common.concurrency import MAX_WORKERS
+
+CONFIG = Config(
+    # Pored fan-out radnika, po jedna za handler i za priming
+    max_pool_connections=MAX_WORKERS + 2,
+    retries={"mode": "adaptive", "max_attempts": int(os.environ.get("AWS_MAX_ATTEMPTS", "5"))},
+    connect_timeout=float(os.environ.get("CLIENT_CONNECT_TIMEOUT", "2")),
+    read_timeout=float(os.environ.get("CLIENT_READ_TIMEOUT", "5")),
+    tcp_keepalive=True
+)
+
+_lock = threading.RLock()
+_shared = {}
+
+
+class _Lazy:
+    """Stands in for a boto3 object and builds it on first attribute access."""
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_target", None)
+
+    def _resolve(self):
+        target = self._target
+        if target is None:
+            with _lock:
+                if self._target is None:
+                    object.__setattr__(self, "_target", self._factory())
+                target = self._target
+        return target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+
+def _get(key, factory):
+    with _lock:
+        lazy = _shared.get(key)
+        if lazy is None:
+            lazy = _shared[key] = _Lazy(factory)
+        return lazy
+
+
+def client(service, **kwargs):
+    """boto3.client(service, **kwargs) with CONFIG, one per distinct set of arguments."""
+    key = ("client", service, tuple(sorted(kwargs.items(), key=lambda kv: kv[0])))
+    config = CONFIG.merge(kwargs.pop("config")) if "config" in kwargs else CONFIG
+    return _get(key, lambda: boto3.client(service, config=config, **kwargs))
+
+
+def resource(service):
+    return _get(("resource", service), lambda: boto3.resource(service, config=CONFIG))
+
+
+def table(name):
+    return _get(("table", name), lambda: resource("dynamodb").Table(name))
@@ -0,0 +1,150 @@
+"""Bounded fan-out for independent reads inside one invocation.
+
+The thread pool lives at module level, so warm invocations reuse its threads
+instead of paying for new ones. Tasks should call the handlers' module-level
+boto3 clients (table.meta.client for DynamoDB): clients are thread safe,
+resource and Table objects are not.
+
+throttled_map is for fan-out writes that can hit a service's rate limit. Its
+concurrency shrinks when calls are throttled and grows back while they
+succeed.
+"""
+import functools
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
+MAX_WORKERS = int(os.environ.get("FANOUT_MAX_WORKERS", "8"))
+
+THROTTLING_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "ThrottlingException",
+    "Throttling",
+    "TooManyRequestsException",
+    "SlowDown",
+}
+THROTTLE_RETRIES = 5
+BACKOFF_BASE = 0.05
+BACKOFF_CAP = 2.0
+
+_executor = None
+_executor_size = 0
+_lock = threading.Lock()
+
+
+def _pool():
+    global _executor, _executor_size
+    if _executor is None or _executor_size != MAX_WORKERS:
+        with _lock:
+            if _executor is None or _executor_size != MAX_WORKERS:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fanout")
+                _executor_size = MAX_WORKERS
+    return _executor
+
+
+def gather(*calls):
+    """Run zero-argument callables concurrently and return their results in order.
+
+    The first exception raised by a call is re-raised. While waiting, the
+    caller runs every call no worker has picked up yet itself, so nested
+    fan-out on a busy pool still makes progress instead of deadlocking.
+    """
+    if len(calls) <= 1 or MAX_WORKERS <= 1:
+        return [call() for call in calls]
+    futures = [_pool().submit(call) for call in calls]
+    return [call() if future.cancel() else future.result() for call, future in zip(calls, futures)]
+
+
+def parallel_map(fn, items):
+    return gather(*(functools.partial(fn, item) for item in items))
+
+
+def is_throttling(error):
+    return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in THROTTLING_ERRORS
+
+
+class AdaptiveLimit:
+    """Concurrency limit with additive increase, multiplicative decrease.
+
+    A throttled call halves the limit. Every `limit` calls in a row that
+    succeed raise it by one, up to the maximum it started at.
+    """
+
+    def __init__(self, maximum):
+        self.maximum = maximum
+        self.limit = maximum
+        self._active = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+    def release(self, throttled):
+        with self._condition:
+            self._active -= 1
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+    def call(self, fn, item):
+        """fn(item) within the limit; throttling errors are retried with jittered backoff."""
+        for attempt in itertools.count():
+            self.acquire()
+            try:
+                result = fn(item)
+            except Exception as e:
+                throttled = is_throttling(e)
+                self.release(throttled)
+                if not throttled or attempt >= THROTTLE_RETRIES:
+                    raise
+                time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+                continue
+            self.release(False)
+            return result
+
+
+def throttled_map(fn, items, max_workers=None):
+    """parallel_map whose concurrency adapts to throttling; results in item order.
+
+    Up to max_workers (default MAX_WORKERS) calls run at once. Any other
+    error stops the workers and is re-raised, as in gather.
+    """
+    items = list(items)
+    workers = min(max_workers or MAX_WORKERS, MAX_WORKERS, len(items))
+    if workers <= 1:
+        limit = AdaptiveLimit(1)
+        return [limit.call(fn, item) for item in items]
+
+    limit = AdaptiveLimit(workers)
+    results = [None] * len(items)
+    positions = itertools.count()
+    failed = threading.Event()
+
+    def worker():
+        for i in positions:
+            if i >= len(items) or failed.is_set():
+                return
+            try:
+                results[i] = limit.call(fn, items[i])
+            except Exception:
+                failed.set()
+                raise
+
+    gather(*(worker for _ in range(workers)))
+    return results
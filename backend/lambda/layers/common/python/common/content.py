@@ -0,0 +1,173 @@
+"""Content-addressed storage of audio files and cover images.
+
+Every object is stored once, under the SHA-256 of its bytes:
+audio/<d[0:2]>/<d[2:4]>/<d> for audio and covers/original/<d[0:2]>/<d[2:4]>/<d>
+for cover originals. The hash prefix spreads the keys over S3's partitions
+instead of one flat prefix. Files derived from an object are keyed by its
+digest too: preview and peaks next to the audio, HLS under hls/<d>/ and cover
+sizes under covers/<d>/.
+
+ContentObjects has one item per stored object (ObjectKey). It holds Digest,
+Size and ContentType, the audio's header Metadata, the Derived keys the
+ingest workers attached, and Refs: the set of "song#<id>" / "album#<id>"
+items that use the object. Set ADD and DELETE are idempotent, so a retried
+stream batch cannot miscount, and the reference count is len(Refs).
+
+finalizeUpload and the cover writers add their ref as they link an item to
+an object, without waiting for the stream. releaseContent follows the Songs
+and Albums streams: it adds the refs of new links (again, harmlessly) and
+drops a ref when the item is deleted or points at another object. The last
+release deletes the ContentObjects item, the object and everything derived
+from it.
+"""
+import hashlib
+import re
+
+from botocore.exceptions import ClientError
+
+AUDIO_PREFIX = "audio/"
+COVER_PREFIX = "covers/original/"
+HLS_PREFIX = "hls/"
+COVER_SIZES_PREFIX = "covers/"
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+READ_CHUNK_BYTES = 8 * 1024 * 1024
+DELETE_BATCH = 1000
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def s3_sha256(s3, bucket, key):
+    """SHA-256 of an S3 object, streamed in READ_CHUNK_BYTES pieces."""
+    digest = hashlib.sha256()
+    body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+    for chunk in body.iter_chunks(READ_CHUNK_BYTES):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def valid_digest(digest):
+    return isinstance(digest, str) and bool(DIGEST_PATTERN.match(digest))
+
+
+def _layout(prefix, digest):
+    return f"{prefix}{digest[0:2]}/{digest[2:4]}/{digest}"
+
+
+def audio_key(digest):
+    return _layout(AUDIO_PREFIX, digest)
+
+
+def cover_key(digest):
+    return _layout(COVER_PREFIX, digest)
+
+
+def digest_of(key):
+    """Digest in a content key, or None for keys from before this layout."""
+    if not key or not (key.startswith(AUDIO_PREFIX) or key.startswith(COVER_PREFIX)):
+        return None
+    digest = key.rsplit("/", 1)[-1]
+    return digest if valid_digest(digest) and key in (audio_key(digest), cover_key(digest)) else None
+
+
+def derived_prefixes(key):
+    """Prefixes of the object itself and every file derived from it."""
+    digest = digest_of(key)
+    if key.startswith(COVER_PREFIX):
+        return [key, f"{COVER_SIZES_PREFIX}{digest}/"]
+    # Preview i peaks su <key>.preview.m4a i <key>.peaks, HLS je pod hls/<digest>/
+    return [key, f"{HLS_PREFIX}{digest}/"]
+
+
+def register(table, key, size, content_type, metadata=None):
+    """Record a newly stored object; False if it is already recorded."""
+    try:
+        table.put_item(
+            Item={
+                "ObjectKey": key,
+                "Digest": digest_of(key),
+                "Size": size,
+                "ContentType": content_type,
+                "Metadata": metadata or {},
+                "Derived": {}
+            },
+            ConditionExpression="attribute_not_exists(ObjectKey)"
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def acquire(table, key, ref):
+    """Add ref to a stored object and return its item; None if the object is not stored."""
+    try:
+        result = table.update_item(
+            Key={"ObjectKey": key},
+            UpdateExpression="ADD Refs :ref",
+            ConditionExpression="attribute_exists(ObjectKey)",
+            ExpressionAttributeValues={":ref": {ref}},
+            ReturnValues="ALL_NEW"
+        )
+        return result["Attributes"]
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return None
+        raise
+
+
+def release(table, key, ref):
+    """Drop ref from a stored object; True if nothing uses it anymore."""
+    try:
+        result = table.update_item(
+            Key={"ObjectKey": key},
+            UpdateExpression="DELETE Refs :ref",
+            ConditionExpression="attribute_exists(ObjectKey)",
+            ExpressionAttributeValues={":ref": {ref}},
+            ReturnValues="ALL_NEW"
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+    # DynamoDB brise prazan set, pa atribut nestaje sa poslednjom referencom
+    return not result["Attributes"].get("Refs")
+
+
+def record_derived(table, key, fields):
+    """Remember files derived from a stored object, so a duplicate upload can reuse them."""
+    try:
+        table.update_item(
+            Key={"ObjectKey": key},
+            UpdateExpression="SET " + ", ".join(f"Derived.#{name} = :{name}" for name in fields),
+            ConditionExpression="attribute_exists(ObjectKey)",
+            ExpressionAttributeNames={f"#{name}": name for name in fields},
+            ExpressionAttributeValues={f":{name}": value for name, value in fields.items()}
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+
+
+def collect(s3, bucket, table, key):
+    """Delete an unreferenced object and its derived files; False if a ref came back first."""
+    try:
+        table.delete_item(Key={"ObjectKey": key}, ConditionExpression="attribute_not_exists(Refs)")
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+
+    keys = []
+    for prefix in derived_prefixes(key):
+        for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+    for i in range(0, len(keys), DELETE_BATCH):
+        s3.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": k} for k in keys[i:i + DELETE_BATCH]], "Quiet": True}
+        )
+    print(f"Collected {key}: {len(keys)} objects")
+    return True
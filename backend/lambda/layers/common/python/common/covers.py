@@ -0,0 +1,92 @@
+"""Fixed-size derivatives of album and song cover images.
+
+createAlbum, updateAlbum and updateSong store the uploaded original once,
+under its content key (common.content), through store_cover. A new
+original is tagged with the item it belongs to (entity_metadata), and its
+ObjectCreated event runs processCover. That renders every SIZES square in
+every FORMATS encoding to covers/<sha256 of the original>/<size>.<ext> and
+records them on the item as coverImages:
+
+    {"source": <original key>, "sizes": {"64": {"webp": key, "jpeg": key}, ...}}
+
+An original that is already stored is only referenced. Its derivatives
+exist too, so claim_cover returns the coverImages to write with the item.
+The keys change with the content, so the objects are served with
+CACHE_CONTROL and never need invalidating. List responses carry only
+thumbnail(), the smallest variant that fills a card.
+"""
+from common import content
+
+COVER_PREFIX = content.COVER_SIZES_PREFIX
+ORIGINAL_PREFIX = content.COVER_PREFIX
+SIZES = (64, 256, 640)
+FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Kartice pesama su 240 px, albuma 100 px (200 px na retina ekranu)
+LIST_COVER_PX = 200
+
+
+def original_key(data):
+    return content.cover_key(content.sha256(data))
+
+
+def derivative_key(digest, size, fmt):
+    return f"{COVER_PREFIX}{digest}/{size}.{'jpg' if fmt == 'jpeg' else fmt}"
+
+
+def derivative_keys(digest):
+    return {str(size): {fmt: derivative_key(digest, size, fmt) for fmt in FORMATS} for size in SIZES}
+
+
+def entity_metadata(entity, entity_id, album=None):
+    """S3 user metadata telling processCover which item the original belongs to."""
+    metadata = {"entity": entity, "id": entity_id}
+    if album:
+        metadata["album"] = album
+    return metadata
+
+
+def cover_images(key):
+    return {"source": key, "sizes": derivative_keys(content.digest_of(key))}
+
+
+def claim_cover(objects_table, key, ref):
+    """Reference an already stored original; its coverImages, or None if it has to be uploaded."""
+    if content.acquire(objects_table, key, ref) is None:
+        return None
+    return cover_images(key)
+
+
+def store_cover(s3, bucket, objects_table, key, data, ref, metadata, content_type=None):
+    """Upload a new original and reference it; processCover renders its derivatives."""
+    extra = {"ContentType": content_type} if content_type else {}
+    s3.put_object(Bucket=bucket, Key=key, Body=data, Metadata=metadata, **extra)
+    content.register(objects_table, key, len(data), content_type or "image/jpeg")
+    content.acquire(objects_table, key, ref)
+
+
+def thumbnail(cover_images, min_px=LIST_COVER_PX):
+    """{"size", "webp", "jpeg"} of the smallest variant at least min_px wide, or None."""
+    sizes = (cover_images or {}).get("sizes") or {}
+    if not sizes:
+        return None
+    available = sorted(int(size) for size in sizes)
+    size = next((s for s in available if s >= min_px), available[-1])
+    return {"size": size, **sizes[str(size)]}
+
+
+def item_thumbnail(item, album=None, min_px=LIST_COVER_PX):
+    """Thumbnail of an album, or of a song that may share its album's cover."""
+    cover = item.get("coverImage")
+    for owner in (item, album or {}):
+        images = owner.get("coverImages") or {}
+        if cover and images.get("source") == cover:
+            return thumbnail(images, min_px)
+    return None
+
+
+def list_entry(item, album=None):
+    """item for a list response: coverImages replaced by its coverThumbnail."""
+    entry = {k: v for k, v in item.items() if k != "coverImages"}
+    entry["coverThumbnail"] = item_thumbnail(item, album)
+    return entry
@@ -0,0 +1,38 @@
+"""HLS renditions of a song's audio.
+
+Every stored audio file is transcoded by the ingest Step Function
+(utils/ingest_sf_setup.py) into RENDITIONS, each an fMP4-segmented media
+playlist under hls/<sha256 of the audio>/<name>/. master.m3u8 in the same
+prefix lists them, and its key is stored on the Songs item as hlsPlaylist.
+The prefix follows the content (common.content), so songs sharing a file
+share its renditions and a replaced file never shares a prefix with the old one.
+"""
+HLS_PREFIX = "hls/"
+SEGMENT_SECONDS = 6
+MEDIA_PLAYLIST = "playlist.m3u8"
+MASTER_PLAYLIST = "master.m3u8"
+
+# Od najmanjeg ka najvecem; AAC ide svuda, Opus gde ga player podrzava (CODECS filtrira)
+RENDITIONS = (
+    {"name": "aac_64k", "encoder": "aac", "bitrate": 64000, "codecs": "mp4a.40.2"},
+    {"name": "aac_128k", "encoder": "aac", "bitrate": 128000, "codecs": "mp4a.40.2"},
+    {"name": "aac_256k", "encoder": "aac", "bitrate": 256000, "codecs": "mp4a.40.2"},
+    {"name": "opus_96k", "encoder": "libopus", "bitrate": 96000, "codecs": "Opus"},
+)
+RENDITIONS_BY_NAME = {r["name"]: r for r in RENDITIONS}
+
+
+def content_prefix(digest):
+    return f"{HLS_PREFIX}{digest}/"
+
+
+def master_playlist(results):
+    """master.m3u8 for the transcode results: [{name, bandwidth, averageBandwidth, codecs}]."""
+    lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for result in sorted(results, key=lambda r: (r["codecs"] != "mp4a.40.2", r["bandwidth"])):
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={result['bandwidth']},"
+            f"AVERAGE-BANDWIDTH={result['averageBandwidth']},CODECS=\"{result['codecs']}\""
+        )
+        lines.append(f"{result['name']}/{MEDIA_PLAYLIST}")
+    return "\n".join(lines) + "\n"
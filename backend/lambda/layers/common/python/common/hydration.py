@@ -0,0 +1,102 @@
+"""Batched hydration of albums and artists referenced by id.
+
+Albums and Artists are keyed by (Genre, Id), so BatchGetItem needs the Genre
+of every referenced item. Writers store it next to the reference (AlbumGenre
+and ArtistGenres on songs, ArtistGenres on albums, AlbumGenre on ArtistAlbum
+rows). References without a hint, or with a stale one, fall back to a single
+Id-index query per unique id, issued in parallel.
+
+Reads go through table.meta.client so they can run on the fan-out pool.
+"""
+import time
+
+from boto3.dynamodb.conditions import Key
+
+from common.concurrency import parallel_map
+
+BATCH_GET_LIMIT = 100
+MAX_UNPROCESSED_RETRIES = 8
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def batch_get(dynamodb, table_name, keys):
+    """Fetch items by full primary key, 100 keys per BatchGetItem call.
+
+    Duplicate keys are dropped and UnprocessedKeys are retried with
+    exponential backoff.
+    """
+    unique = list({tuple(sorted(k.items())): k for k in keys}.values())
+    items = []
+    for chunk in _chunks(unique, BATCH_GET_LIMIT):
+        request = {table_name: {"Keys": chunk}}
+        attempt = 0
+        while request:
+            response = dynamodb.meta.client.batch_get_item(RequestItems=request)
+            items.extend(response.get("Responses", {}).get(table_name, []))
+            request = response.get("UnprocessedKeys") or {}
+            if request:
+                attempt += 1
+                if attempt > MAX_UNPROCESSED_RETRIES:
+                    raise RuntimeError(f"BatchGetItem on {table_name} kept returning unprocessed keys")
+                time.sleep(min(0.05 * 2 ** attempt, 2))
+    return items
+
+
+def query_all(table, **kwargs):
+    """Query every page of a key condition and return all items."""
+    items = []
+    while True:
+        response = table.meta.client.query(TableName=table.name, **kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def find_by_id(table, entity_id):
+    response = table.meta.client.query(
+        TableName=table.name,
+        IndexName="Id-index",
+        KeyConditionExpression=Key("Id").eq(entity_id)
+    )
+    items = response.get("Items", [])
+    return items[0] if items else None
+
+
+def get_by_id(table, entity_id, genre=None):
+    """Read one album/artist: GetItem when its Genre is known, Id-index otherwise."""
+    if genre:
+        item = table.meta.client.get_item(TableName=table.name, Key={"Genre": genre, "Id": entity_id}).get("Item")
+        if item:
+            return item
+    return find_by_id(table, entity_id)
+
+
+def hydrate_by_id(dynamodb, table, ids, genre_hints=None):
+    """Return {Id: item} for every id that exists in table."""
+    ids = list(dict.fromkeys(i for i in ids if i))
+    hints = genre_hints or {}
+
+    keys = [{"Genre": hints[i], "Id": i} for i in ids if hints.get(i)]
+    found = {item["Id"]: item for item in batch_get(dynamodb, table.name, keys)} if keys else {}
+
+    missing = [i for i in ids if i not in found]
+    for item in parallel_map(lambda entity_id: find_by_id(table, entity_id), missing):
+        if item:
+            found[item["Id"]] = item
+    return found
+
+
+def resolve_genres(table, ids, known=None):
+    """Return {Id: Genre} for ids, used by writers to store genre hints."""
+    known = known or {}
+    genres = {i: known[i] for i in ids if i in known}
+    missing = [i for i in dict.fromkeys(ids) if i not in genres]
+    for item in parallel_map(lambda entity_id: find_by_id(table, entity_id), missing):
+        if item:
+            genres[item["Id"]] = item["Genre"]
+    return genres
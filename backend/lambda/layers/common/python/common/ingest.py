@@ -0,0 +1,64 @@
+"""Helpers for the ingest Step Function workers (utils/ingest_sf_setup.py).
+
+Each execution handles one upload: {songId, album, sourceKey, ...}. A worker
+writes its output next to the audio and then attaches the key to the Songs
+item, only while the song still points at sourceKey. A replaced file's late
+execution therefore cannot overwrite the new file's keys. The keys are also
+recorded on sourceKey's ContentObjects item, so a later upload of the same
+file reuses them instead of running the workers again.
+"""
+import os
+import subprocess
+
+from botocore.exceptions import ClientError
+
+from common import content
+
+# Lambda stavlja /opt/bin (ffmpeg layer) u PATH; lokalno se koristi sistemski ffmpeg
+FFMPEG = os.environ.get("FFMPEG_PATH", "ffmpeg")
+SOURCE_URL_EXPIRES_SECONDS = 3600
+
+
+def source_url(s3, bucket, key):
+    """ffmpeg reads the source through this URL, with range requests, instead of a copy in /tmp."""
+    return s3.generate_presigned_url(
+        "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=SOURCE_URL_EXPIRES_SECONDS
+    )
+
+
+def run_ffmpeg(args, what):
+    result = subprocess.run([FFMPEG, "-nostdin", "-y", "-loglevel", "error", *args], capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed for {what}: {result.stderr.decode(errors='replace').strip()[-2000:]}")
+    return result.stdout
+
+
+def decode_pcm(source, sample_rate, channels=1):
+    """The whole source as signed 16-bit little-endian PCM bytes."""
+    return run_ffmpeg(
+        ["-i", source, "-map", "0:a:0", "-vn", "-ac", str(channels), "-ar", str(sample_rate), "-f", "s16le", "-"],
+        "PCM decode"
+    )
+
+
+def attach(songs_table, event, fields, objects_table=None):
+    """SET fields on the song if it still uses event's sourceKey; False when it moved on."""
+    if objects_table is not None:
+        content.record_derived(objects_table, event["sourceKey"], fields)
+    try:
+        songs_table.update_item(
+            Key={"Album": event["album"], "Id": event["songId"]},
+            UpdateExpression="SET " + ", ".join(f"#{name} = :{name}" for name in fields),
+            ConditionExpression="attribute_exists(Id) AND fileName = :source",
+            ExpressionAttributeNames={f"#{name}": name for name in fields},
+            ExpressionAttributeValues={
+                **{f":{name}": value for name, value in fields.items()},
+                ":source": event["sourceKey"]
+            }
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            print(f"Song {event['songId']} no longer uses {event['sourceKey']}, {', '.join(fields)} not attached")
+            return False
+        raise
@@ -0,0 +1,97 @@
+"""Opaque, signed nextToken / limit pagination for the list endpoints.
+
+A token is the DynamoDB LastEvaluatedKey serialized as JSON, bound to the
+endpoint it was issued for and signed with HMAC-SHA256, so clients can
+neither forge a start key nor replay a token against another table.
+The signing key comes from Secrets Manager (PAGINATION_SECRET_ARN) and is
+read once per container; PAGINATION_SECRET can be set directly for local runs.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+from decimal import Decimal
+
+import boto3
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+_secret = None
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+def _signing_key():
+    global _secret
+    if _secret is None:
+        secret = os.environ.get("PAGINATION_SECRET")
+        if not secret:
+            client = boto3.client("secretsmanager")
+            secret = client.get_secret_value(SecretId=os.environ["PAGINATION_SECRET_ARN"])["SecretString"]
+        _secret = secret.encode()
+    return _secret
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    raise TypeError(f"Cannot serialize {type(obj).__name__} in a page token")
+
+
+def encode_token(scope, last_evaluated_key):
+    if not last_evaluated_key:
+        return None
+    payload = json.dumps({"s": scope, "k": last_evaluated_key}, default=_default, separators=(",", ":")).encode()
+    signature = hmac.new(_signing_key(), payload, hashlib.sha256).digest()
+    return f"{_b64encode(payload)}.{_b64encode(signature)}"
+
+
+def decode_token(scope, token):
+    try:
+        payload_part, signature_part = token.split(".", 1)
+        payload = _b64decode(payload_part)
+        signature = _b64decode(signature_part)
+    except (ValueError, TypeError):
+        raise InvalidPageRequest("Malformed nextToken")
+
+    expected = hmac.new(_signing_key(), payload, hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise InvalidPageRequest("Invalid nextToken")
+
+    data = json.loads(payload, parse_float=Decimal)
+    if data.get("s") != scope:
+        raise InvalidPageRequest("nextToken was issued for a different resource")
+    return data["k"]
+
+
+def page_request(event, scope):
+    """Return (limit, exclusive_start_key) from the query string."""
+    params = event.get("queryStringParameters") or {}
+
+    limit = params.get("limit")
+    if limit is None:
+        limit = DEFAULT_LIMIT
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidPageRequest("limit must be an integer")
+        if limit < 1 or limit > MAX_LIMIT:
+            raise InvalidPageRequest(f"limit must be between 1 and {MAX_LIMIT}")
+
+    token = params.get("nextToken")
+    start_key = decode_token(scope, token) if token else None
+    return limit, start_key
+
@@ -0,0 +1,82 @@
+"""Opt-in init-phase priming for latency-sensitive handlers.
+
+common.clients builds nothing until first use, so the first request of a
+container pays for the client (service model, credentials, endpoint
+resolution), then DNS and the TLS handshake, before its first real call. A
+handler can move that work into the Lambda init phase instead:
+
+    priming.on_init(
+        priming.open_dynamodb(dynamodb),
+        lambda: catalog_cache.preload_version(catalog_version_table)
+    )
+
+on_init does nothing unless the function sets PRIME_ON_INIT=true. The tasks
+run concurrently while the module is imported. Init runs before the first
+request is accepted, and small functions get a CPU boost during it. The
+connections stay in botocore's keep-alive pool and the first request reuses
+them. A task that fails is logged and skipped; the request then does the
+work itself, as it would without priming.
+"""
+import os
+import time
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from common.concurrency import gather
+
+
+def enabled():
+    return os.environ.get("PRIME_ON_INIT", "").lower() in ("1", "true", "yes")
+
+
+def _client(obj):
+    # Resource i Table imaju klijenta u meta.client, klijent je vec klijent
+    return getattr(obj.meta, "client", obj)
+
+
+def _round_trip(call):
+    # I odbijen poziv (403, AccessDenied) ostavlja otvorenu konekciju u pool-u
+    try:
+        call()
+    except ClientError:
+        pass
+
+
+def build(obj):
+    """Task that only builds a client, for clients that never open a connection (presigning)."""
+    return lambda: _client(obj)
+
+
+def open_dynamodb(obj):
+    """Task that opens a pooled connection to the DynamoDB endpoint.
+
+    Every table shares the resource's client, so one connection covers all of
+    them. DescribeEndpoints needs no table name.
+    """
+    return lambda: _round_trip(_client(obj).describe_endpoints)
+
+
+def open_s3(client, bucket):
+    """Task that opens a pooled connection to the bucket's virtual-hosted endpoint."""
+    return lambda: _round_trip(lambda: client.head_bucket(Bucket=bucket))
+
+
+def _run(task):
+    try:
+        task()
+        return None
+    except (BotoCoreError, ClientError) as e:
+        return e
+
+
+def on_init(*tasks):
+    """Run the priming tasks now if PRIME_ON_INIT is set; returns the elapsed ms or None."""
+    if not tasks or not enabled():
+        return None
+    started = time.perf_counter()
+    errors = [e for e in gather(*(lambda task=task: _run(task) for task in tasks)) if e]
+    elapsed = (time.perf_counter() - started) * 1000
+    for e in errors:
+        print(f"Priming skipped: {e}")
+    print(f"Primed {len(tasks) - len(errors)}/{len(tasks)} in {elapsed:.1f} ms")
+    return elapsed
@@ -0,0 +1,39 @@
+"""API Gateway proxy responses.
+
+Every endpoint answers through response(): one JSON encoder instance with
+compact separators, Decimal turned back into int/float, and the CORS header
+the browser needs on every status code.
+"""
+import json
+from decimal import Decimal
+
+CORS_HEADERS = {"Access-Control-Allow-Origin": "*"}
+JSON_HEADERS = {**CORS_HEADERS, "Content-Type": "application/json"}
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # datetime i ostalo, kao ranije json.dumps(default=str)
+    return str(obj)
+
+
+# json.dumps sa argumentima pravi novi encoder pri svakom pozivu, ovaj se pravi jednom
+_encoder = json.JSONEncoder(default=_default, separators=(",", ":"))
+
+
+def to_json(obj):
+    return _encoder.encode(obj)
+
+
+def response(status_code, body, headers=None):
+    all_headers = dict(JSON_HEADERS)
+    if headers:
+        all_headers.update(headers)
+    return {
+        "statusCode": status_code,
+        "headers": all_headers,
+        "body": body if isinstance(body, str) else to_json(body)
+    }
@@ -0,0 +1,86 @@
+"""Write-sharded "active" index for the catalog tables.
+
+Every live Song, Album and Artist carries ActiveShard = "active#<n>", where n
+is a stable hash of its Id. The sparse active-index GSI (ActiveShard, Id)
+therefore spreads the live catalog over ACTIVE_SHARD_COUNT partitions
+instead of putting it all under deleted = "false". Deleting an item removes
+ActiveShard, which drops it from the index.
+
+List endpoints read the index with a scatter-gather query over all shards;
+the page token carries one LastEvaluatedKey per shard that still has items.
+"""
+import math
+import zlib
+
+from common.concurrency import parallel_map
+from common.pagination import encode_token, page_request
+
+ACTIVE_INDEX = "active-index"
+ACTIVE_SHARD_COUNT = 8
+
+
+def active_shard(entity_id):
+    return f"active#{zlib.crc32(entity_id.encode()) % ACTIVE_SHARD_COUNT}"
+
+
+def _query_shard(client, table_name, shard, limit, start_key):
+    kwargs = {
+        "TableName": table_name,
+        "IndexName": ACTIVE_INDEX,
+        "KeyConditionExpression": "ActiveShard = :shard",
+        "ExpressionAttributeValues": {":shard": shard},
+    }
+    if limit:
+        kwargs["Limit"] = limit
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    response = client.query(**kwargs)
+    return shard, response.get("Items", []), response.get("LastEvaluatedKey")
+
+
+def query_active_page(table, scope, event):
+    """Scatter-gather one page of live items; returns (items, nextToken)."""
+    limit, cursor = page_request(event, scope)
+    if cursor is None:
+        cursor = {f"active#{n}": None for n in range(ACTIVE_SHARD_COUNT)}
+    if not cursor:
+        return [], None
+
+    per_shard_limit = max(1, math.ceil(limit / len(cursor)))
+    # The resource's client (unlike the Table) is thread safe and still (de)serializes attribute values
+    client = table.meta.client
+    results = parallel_map(
+        lambda shard: _query_shard(client, table.name, shard, per_shard_limit, cursor[shard]),
+        sorted(cursor)
+    )
+
+    items = []
+    remaining = {}
+    for shard, shard_items, last_key in results:
+        items.extend(shard_items)
+        if last_key:
+            remaining[shard] = last_key
+
+    items.sort(key=lambda item: item["Id"])
+    return items, encode_token(scope, remaining)
+
+
+def _query_shard_all(client, table_name, shard):
+    items = []
+    start_key = None
+    while True:
+        _, shard_items, start_key = _query_shard(client, table_name, shard, None, start_key)
+        items.extend(shard_items)
+        if not start_key:
+            return items
+
+
+def query_active_all(table):
+    """Every live item of the table, sorted by Id like the pages are."""
+    client = table.meta.client
+    shards = [f"active#{n}" for n in range(ACTIVE_SHARD_COUNT)]
+    items = [item for shard_items in parallel_map(
+        lambda shard: _query_shard_all(client, table.name, shard), shards
+    ) for item in shard_items]
+    items.sort(key=lambda item: item["Id"])
+    return items
@@ -0,0 +1,98 @@
+"""Precompiled catalog snapshots for the list endpoints.
+
+buildCatalogSnapshot writes every live song, album and artist to the music
+bucket as one gzip-compressed JSON document per list
+(catalog/<name>.json.gz). The document has the same {"items", "nextToken"}
+shape as a page, with nextToken null. Its ETag is the SHA-256 of the
+uncompressed body. The ETag is kept in the object metadata, so it does not
+depend on the gzip bytes.
+
+A list request with neither limit nor nextToken asks for the whole catalog
+and is answered from the snapshot with one HEAD: 304 when If-None-Match
+still matches, otherwise a 302 to a presigned GET of the object. The body
+never passes through Lambda, so the snapshot can outgrow the 6 MB response
+limit, and the browser decompresses it from its Content-Encoding. When no
+snapshot exists yet the handler falls back to a DynamoDB page.
+"""
+import gzip
+import hashlib
+
+from botocore.exceptions import ClientError
+
+from common.responses import response, to_json
+
+SNAPSHOT_PREFIX = "catalog/"
+ETAG_METADATA_KEY = "etag"
+SNAPSHOT_URL_EXPIRES_SECONDS = 300
+
+
+def snapshot_key(name):
+    return f"{SNAPSHOT_PREFIX}{name}.json.gz"
+
+
+def encode_snapshot(items):
+    """Return (gzip body, strong ETag) for a full list."""
+    body = to_json({"items": items, "nextToken": None}).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest() + '"'
+    # mtime=0 keeps the compressed bytes stable for the same body
+    return gzip.compress(body, mtime=0), etag
+
+
+def _head(s3, bucket, name):
+    try:
+        return s3.head_object(Bucket=bucket, Key=snapshot_key(name))
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+def write_snapshot(s3, bucket, name, items):
+    """Upload the snapshot unless an identical one is already there; True if written."""
+    body, etag = encode_snapshot(items)
+    current = _head(s3, bucket, name)
+    if current and current.get("Metadata", {}).get(ETAG_METADATA_KEY) == etag:
+        return False
+    s3.put_object(
+        Bucket=bucket,
+        Key=snapshot_key(name),
+        Body=body,
+        ContentType="application/json",
+        ContentEncoding="gzip",
+        CacheControl="no-cache",
+        Metadata={ETAG_METADATA_KEY: etag}
+    )
+    return True
+
+
+def wants_snapshot(event):
+    params = event.get("queryStringParameters") or {}
+    return "limit" not in params and "nextToken" not in params
+
+
+def _if_none_match(event):
+    headers = event.get("headers") or {}
+    for key, value in headers.items():
+        if key.lower() == "if-none-match" and value:
+            return {tag.strip().replace("W/", "", 1) for tag in value.split(",")}
+    return set()
+
+
+def _headers(etag):
+    return {"Access-Control-Expose-Headers": "ETag", "Cache-Control": "no-cache", "ETag": etag}
+
+
+def serve_snapshot(s3, bucket, name, event):
+    """Response for a full-list request, or None when there is no snapshot yet."""
+    current = _head(s3, bucket, name)
+    if current is None:
+        return None
+    etag = current.get("Metadata", {}).get(ETAG_METADATA_KEY)
+    candidates = _if_none_match(event)
+    if etag and (etag in candidates or "*" in candidates):
+        return response(304, "", _headers(etag))
+
+    url = s3.generate_presigned_url(
+        "get_object", Params={"Bucket": bucket, "Key": snapshot_key(name)}, ExpiresIn=SNAPSHOT_URL_EXPIRES_SECONDS
+    )
+    return response(302, "", {**_headers(etag), "Location": url})
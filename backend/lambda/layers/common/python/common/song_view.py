@@ -0,0 +1,114 @@
+"""Denormalized SongView read model.
+
+SongView holds one item per song, keyed by Id: the song's own attributes plus
+AlbumSummary and ArtistSummaries, so a song read is a single GetItem and the
+song list is a query on SongView's active-index with no joins. syncSongView
+keeps it current from the Songs, Albums and Artists streams;
+scripts/song_view.py backfills it and checks it against the source tables.
+"""
+from common.concurrency import gather
+from common.covers import list_entry
+from common.hydration import hydrate_by_id
+
+# Write-time hints for BatchGetItem, meaningless to readers of the view
+HINT_ATTRIBUTES = ("AlbumGenre", "ArtistGenres")
+VIEW_ATTRIBUTES = ("AlbumSummary", "ArtistSummaries")
+
+
+def album_summary(album):
+    if not album:
+        return None
+    return {
+        "Id": album.get("Id"),
+        "title": album.get("title"),
+        "description": album.get("description", ""),
+        "coverImage": album.get("coverImage", ""),
+        "coverImages": album.get("coverImages"),
+        "releaseDate": album.get("releaseDate"),
+        "artists": album.get("artists", []),
+        "genres": album.get("genres", []),
+        "Genre": album.get("Genre", ""),
+        "deleted": album.get("deleted", False)
+    }
+
+
+def artist_summary(artist):
+    return {
+        "Id": artist.get("Id"),
+        "name": artist.get("name", "Unknown"),
+        "biography": artist.get("biography", ""),
+        "genres": artist.get("genres", []),
+        "Genre": artist.get("Genre", "")
+    }
+
+
+def build_view(song, album, artists_by_id):
+    view = {k: v for k, v in song.items() if k not in HINT_ATTRIBUTES}
+    view["AlbumSummary"] = album_summary(album)
+    view["ArtistSummaries"] = [
+        artist_summary(artists_by_id[artist_id])
+        for artist_id in song.get("artists", []) if artist_id in artists_by_id
+    ]
+    return view
+
+
+def build_views(dynamodb, albums_table, artists_table, songs, hydrate=hydrate_by_id):
+    """Build the views of many songs with one album and one artist batch.
+
+    Readers pass catalog_cache.hydrate_by_id; the stream consumer and the
+    scripts read the tables directly.
+    """
+    album_hints = {}
+    artist_hints = {}
+    for song in songs:
+        if song.get("Album") and song.get("AlbumGenre"):
+            album_hints[song["Album"]] = song["AlbumGenre"]
+        artist_hints.update(song.get("ArtistGenres") or {})
+
+    albums, artists = gather(
+        lambda: hydrate(dynamodb, albums_table, [song.get("Album") for song in songs], album_hints),
+        lambda: hydrate(
+            dynamodb, artists_table,
+            [artist_id for song in songs for artist_id in song.get("artists", [])],
+            artist_hints
+        )
+    )
+    return [build_view(song, albums.get(song.get("Album")), artists) for song in songs]
+
+
+def get_view(table, song_id):
+    response = table.meta.client.get_item(TableName=table.name, Key={"Id": song_id}, ConsistentRead=True)
+    return response.get("Item")
+
+
+def song_response(view):
+    """GET /songs/{id} body."""
+    return {
+        "id": view.get("Id"),
+        "title": view.get("title"),
+        "artists": view.get("ArtistSummaries", []),
+        "genres": view.get("genres", []),
+        "description": view.get("description", ""),
+        "coverImage": view.get("coverImage"),
+        "coverImages": view.get("coverImages"),
+        "album": view.get("AlbumSummary"),
+        "duration": view.get("duration"),
+        "releaseDate": view.get("releaseDate"),
+        "type": view.get("type", "single"),
+        "fileName": view.get("fileName", ""),
+        # Master HLS playlist, prazan dok se renditions ne naprave (common.hls)
+        "hlsPlaylist": view.get("hlsPlaylist", ""),
+        "previewFile": view.get("previewFile", ""),
+        "waveformFile": view.get("waveformFile", ""),
+        "transcriptFileName": view.get("transcriptFileName", "")
+    }
+
+
+def list_item(view):
+    """GET /songs list entry: the song with its Album and Artists attached."""
+    album = view.get("AlbumSummary")
+    # Lista nosi samo najmanji derivat cover-a koji popunjava karticu (common.covers)
+    item = list_entry({k: v for k, v in view.items() if k not in VIEW_ATTRIBUTES}, album)
+    item["Album"] = list_entry(album) if album else None
+    item["Artists"] = view.get("ArtistSummaries", [])
+    return item
@@ -0,0 +1,17 @@
+"""Helpers for DynamoDB Streams records."""
+from boto3.dynamodb.types import TypeDeserializer
+
+deserializer = TypeDeserializer()
+
+
+def source_table(record):
+    # arn:aws:dynamodb:<region>:<account>:table/<name>/stream/<label>
+    return record["eventSourceARN"].split(":table/", 1)[1].split("/", 1)[0]
+
+
+def image(record, name):
+    """The record's NewImage/OldImage/Keys as plain Python values, or None."""
+    raw = record["dynamodb"].get(name)
+    if not raw:
+        return None
+    return {k: deserializer.deserialize(v) for k, v in raw.items()}
@@ -0,0 +1,368 @@
+"""Direct-to-S3 multipart uploads of audio files.
+
+The API never touches the audio. POST /songs, and PUT /songs/{id} with an
+audioUpload, store an upload session and return presigned URLs. The browser
+PUTs each PART_SIZE chunk to its UploadPart URL, several at a time, and
+reports every part's ETag with PUT /uploads/{id}/parts/{n}. POST
+/uploads/{id}/complete completes the upload, which raises
+s3:ObjectCreated:CompleteMultipartUpload under UPLOAD_PREFIX.
+finalizeUpload moves the file to its content key (common.content) and
+turns the session into the Songs row.
+
+The browser also sends the file's SHA-256. When that content is already
+stored, no bytes are transferred: start_deduplicated opens a session
+pointing at the stored object (ContentKey) and finalizeUpload is invoked
+for it directly.
+
+POST /albums/ingest opens the sessions of a whole album at once
+(open_upload, deduplicated_session) and batch-writes them with an ingest
+tracker (ingest_tracker): an "album#<id>" item whose Pending set holds the
+upload ids of the album's tracks. Each track session points at it through
+Ingest. finalizeUpload drops a track from the set as its song is written
+(finish_ingest_track). Once the set is empty, the one delivery that
+claims the tracker (claim_album_event, a conditional SET Published)
+publishes the album's single new-content event and then completes it
+(complete_ingest). Concurrent or redelivered finalizations lose the claim
+and publish nothing; a failed publish releases it (release_album_event),
+so the retried delivery publishes again.
+
+After a dropped connection GET /uploads/{id} lists the finished parts and
+signs fresh URLs for the rest, so the upload resumes from the last part.
+DELETE /uploads/{id} aborts it.
+
+A session is keyed by the id in the staging key (uploads/<id>). Besides the S3
+UploadId it holds Mode ("create" or "replace"), SongId, Album, FileSize,
+ContentType, PartCount, the finished Parts ({"<n>": etag}) and, for
+"create", the Song draft. Sessions expire through the table's TTL, and the
+bucket's lifecycle rule aborts their multipart uploads a day later.
+"""
+import json
+import math
+import time
+import uuid
+
+from botocore.exceptions import ClientError
+
+from common import content
+
+UPLOAD_PREFIX = "uploads/"
+PART_SIZE = 8 * 1024 * 1024
+MAX_FILE_SIZE = 1024 * 1024 * 1024
+URL_EXPIRES_SECONDS = 3600
+SESSION_TTL_SECONDS = 24 * 3600
+
+AUDIO_TYPES = ("audio/mpeg", "audio/mp3", "audio/wav", "audio/x-wav", "audio/wave", "audio/flac", "audio/x-flac")
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+class SessionNotFound(LookupError):
+    pass
+
+
+class IncompleteUpload(InvalidUpload):
+    def __init__(self, missing):
+        super().__init__(f"{len(missing)} parts are not uploaded yet")
+        self.missing = missing
+
+
+def staging_key(upload_id):
+    return f"{UPLOAD_PREFIX}{upload_id}"
+
+
+def upload_id_from_key(key):
+    if not key.startswith(UPLOAD_PREFIX):
+        return None
+    return key[len(UPLOAD_PREFIX):]
+
+
+def part_count(file_size):
+    return max(1, math.ceil(file_size / PART_SIZE))
+
+
+def validate(file_size, content_type):
+    """Return (size, content type) of a requested upload, or raise InvalidUpload."""
+    try:
+        file_size = int(file_size)
+    except (TypeError, ValueError):
+        raise InvalidUpload("fileSize is required")
+    if file_size <= 0 or file_size > MAX_FILE_SIZE:
+        raise InvalidUpload(f"fileSize must be between 1 and {MAX_FILE_SIZE} bytes")
+    content_type = content_type or "audio/mpeg"
+    if content_type not in AUDIO_TYPES:
+        raise InvalidUpload(f"Unsupported audio type {content_type}")
+    return file_size, content_type
+
+
+def open_upload(s3, bucket, session, file_size, content_type):
+    """Open the multipart upload and return its session item, not yet stored."""
+    upload_id = str(uuid.uuid4())
+    key = staging_key(upload_id)
+    multipart = s3.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)
+
+    return {
+        **session,
+        "Id": upload_id,
+        "Key": key,
+        "UploadId": multipart["UploadId"],
+        "FileSize": file_size,
+        "ContentType": content_type,
+        "PartCount": part_count(file_size),
+        "Parts": {},
+        "Status": "pending",
+        "ExpiresAt": int(time.time()) + SESSION_TTL_SECONDS
+    }
+
+
+def start_upload(s3, bucket, sessions_table, session, file_size, content_type):
+    """Open the multipart upload, store its session and return the browser's instructions."""
+    item = open_upload(s3, bucket, session, file_size, content_type)
+    sessions_table.put_item(Item=item)
+    return instructions(s3, bucket, item, {})
+
+
+def find_stored_audio(objects_table, digest):
+    """ContentObjects item of already stored audio with this SHA-256, or None."""
+    if not digest:
+        return None
+    digest = str(digest).lower()
+    if not content.valid_digest(digest):
+        raise InvalidUpload("sha256 must be 64 hexadecimal characters")
+    return objects_table.get_item(Key={"ObjectKey": content.audio_key(digest)}).get("Item")
+
+
+def deduplicated_session(session, stored):
+    """Session item for audio that is already stored, not yet stored itself."""
+    return {
+        **session,
+        "Id": str(uuid.uuid4()),
+        "ContentKey": stored["ObjectKey"],
+        "FileSize": stored["Size"],
+        "ContentType": stored["ContentType"],
+        "Status": "pending",
+        "ExpiresAt": int(time.time()) + SESSION_TTL_SECONDS
+    }
+
+
+def deduplicated_instructions(session):
+    return {"uploadId": session["Id"], "deduplicated": True, "key": session["ContentKey"]}
+
+
+def start_deduplicated(sessions_table, session, stored):
+    """Session for audio that is already stored; the browser uploads nothing."""
+    item = deduplicated_session(session, stored)
+    sessions_table.put_item(Item=item)
+    return deduplicated_instructions(item)
+
+
+def finalize_deduplicated(lambda_client, function_name, upload_id):
+    """Run finalizeUpload for a deduplicated session, as the S3 event does for an upload."""
+    lambda_client.invoke(
+        FunctionName=function_name,
+        InvocationType="Event",
+        Payload=json.dumps({"uploadId": upload_id}).encode()
+    )
+
+
+def instructions(s3, bucket, session, parts, limit=None):
+    """Finished parts plus a presigned UploadPart URL for every missing one, or for the first limit of them.
+
+    With a limit the browser asks GET /uploads/{id} for the rest.
+    """
+    params = {"Bucket": bucket, "Key": session["Key"], "UploadId": session["UploadId"]}
+    return {
+        "uploadId": session["Id"],
+        "key": session["Key"],
+        "partSize": PART_SIZE,
+        "partCount": int(session["PartCount"]),
+        "completed": [{"partNumber": n, "etag": parts[n]} for n in sorted(parts)],
+        "parts": [
+            {
+                "partNumber": n,
+                "url": s3.generate_presigned_url(
+                    "upload_part", Params={**params, "PartNumber": n}, ExpiresIn=URL_EXPIRES_SECONDS
+                )
+            }
+            for n in missing_parts(session, parts)[:limit]
+        ]
+    }
+
+
+def get_session(sessions_table, upload_id):
+    """The pending session, or raise SessionNotFound (TTL deletes expired items only eventually)."""
+    session = sessions_table.get_item(Key={"Id": upload_id}).get("Item")
+    if not session or session.get("Status") != "pending" or session.get("ExpiresAt", 0) <= time.time():
+        raise SessionNotFound(f"No pending upload {upload_id}")
+    return session
+
+
+def recorded_parts(session):
+    return {int(n): etag for n, etag in (session.get("Parts") or {}).items()}
+
+
+def missing_parts(session, parts):
+    return [n for n in range(1, int(session["PartCount"]) + 1) if n not in parts]
+
+
+def _pending_update(sessions_table, session, expression, names, values):
+    try:
+        sessions_table.update_item(
+            Key={"Id": session["Id"]},
+            UpdateExpression=expression,
+            ConditionExpression="#status = :pending",
+            ExpressionAttributeNames={**names, "#status": "Status"},
+            ExpressionAttributeValues={**values, ":pending": "pending"}
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            raise SessionNotFound(f"No pending upload {session['Id']}")
+        raise
+
+
+def record_part(sessions_table, session, part_number, etag):
+    """Store one finished part's ETag in the session."""
+    try:
+        part_number = int(part_number)
+    except (TypeError, ValueError):
+        raise InvalidUpload("partNumber must be a number")
+    if not 1 <= part_number <= int(session["PartCount"]) or not etag:
+        raise InvalidUpload(f"partNumber must be between 1 and {session['PartCount']}, with an etag")
+    _pending_update(sessions_table, session, "SET Parts.#part = :etag", {"#part": str(part_number)}, {":etag": etag})
+
+
+def sync_parts(s3, bucket, sessions_table, session):
+    """Merge the parts S3 holds into the session; S3 wins, it is what CompleteMultipartUpload checks.
+
+    A part can reach S3 while its ETag report is lost with the connection.
+    """
+    parts = recorded_parts(session)
+    found = {}
+    try:
+        pages = s3.get_paginator("list_parts").paginate(
+            Bucket=bucket, Key=session["Key"], UploadId=session["UploadId"]
+        )
+        for page in pages:
+            for part in page.get("Parts", []):
+                found[part["PartNumber"]] = part["ETag"]
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchUpload":
+            raise SessionNotFound(f"Upload {session['Id']} was aborted")
+        raise
+
+    if found != parts:
+        _pending_update(sessions_table, session, "SET Parts = :parts", {},
+                        {":parts": {str(n): etag for n, etag in found.items()}})
+    return found
+
+
+def complete_upload(s3, bucket, session, parts):
+    """Complete the multipart upload; finalizeUpload picks it up from the S3 event."""
+    missing = missing_parts(session, parts)
+    if missing:
+        raise IncompleteUpload(missing)
+    try:
+        s3.complete_multipart_upload(
+            Bucket=bucket, Key=session["Key"], UploadId=session["UploadId"],
+            MultipartUpload={"Parts": [{"PartNumber": n, "ETag": parts[n]} for n in sorted(parts)]}
+        )
+    except ClientError as e:
+        code = e.response["Error"]["Code"]
+        if code == "NoSuchUpload":
+            raise SessionNotFound(f"Upload {session['Id']} was aborted")
+        if code in ("InvalidPart", "InvalidPartOrder", "EntityTooSmall"):
+            raise InvalidUpload(e.response["Error"].get("Message", code))
+        raise
+
+
+def abort_upload(s3, bucket, sessions_table, session):
+    try:
+        s3.abort_multipart_upload(Bucket=bucket, Key=session["Key"], UploadId=session["UploadId"])
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "NoSuchUpload":
+            raise
+    _pending_update(sessions_table, session, "SET #status = :aborted", {}, {":aborted": "aborted"})
+
+
+def ingest_id(album_id):
+    return f"album#{album_id}"
+
+
+def ingest_tracker(album_id, upload_ids):
+    """Item tracking the track uploads of an album ingest; its id goes on every track session."""
+    return {
+        "Id": ingest_id(album_id),
+        "Mode": "ingest",
+        "Album": album_id,
+        "Pending": set(upload_ids),
+        "Status": "pending",
+        "ExpiresAt": int(time.time()) + SESSION_TTL_SECONDS
+    }
+
+
+def finish_ingest_track(sessions_table, session):
+    """Drop a finalized track from its ingest; True once every track is done and the album is not yet published.
+
+    Set DELETE is idempotent, so a redelivered track cannot count twice.
+    """
+    tracker_id = session.get("Ingest")
+    if not tracker_id:
+        return False
+    try:
+        result = sessions_table.update_item(
+            Key={"Id": tracker_id},
+            UpdateExpression="DELETE Pending :upload",
+            ConditionExpression="#status = :pending",
+            ExpressionAttributeNames={"#status": "Status"},
+            ExpressionAttributeValues={":upload": {session["Id"]}, ":pending": "pending"},
+            ReturnValues="ALL_NEW"
+        )
+        return not result["Attributes"].get("Pending")
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def claim_album_event(sessions_table, session):
+    """Take the right to publish the ingest's album event; False if another delivery holds or used it."""
+    try:
+        sessions_table.update_item(
+            Key={"Id": session["Ingest"]},
+            UpdateExpression="SET Published = :now",
+            ConditionExpression="#status = :pending AND attribute_not_exists(Published)",
+            ExpressionAttributeNames={"#status": "Status"},
+            ExpressionAttributeValues={":now": int(time.time()), ":pending": "pending"}
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def release_album_event(sessions_table, session):
+    """Give the claim back after a failed publish, so a retried delivery can take it."""
+    sessions_table.update_item(
+        Key={"Id": session["Ingest"]},
+        UpdateExpression="REMOVE Published",
+        ConditionExpression="#status = :pending",
+        ExpressionAttributeNames={"#status": "Status"},
+        ExpressionAttributeValues={":pending": "pending"}
+    )
+
+
+def complete_ingest(sessions_table, session):
+    """Close the ingest after its album event is published; later deliveries stop publishing."""
+    try:
+        sessions_table.update_item(
+            Key={"Id": session["Ingest"]},
+            UpdateExpression="SET #status = :completed",
+            ConditionExpression="#status = :pending",
+            ExpressionAttributeNames={"#status": "Status"},
+            ExpressionAttributeValues={":completed": "completed", ":pending": "pending"}
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
@@ -0,0 +1,64 @@
+"""Creation of a song or album together with its artist mapping rows.
+
+The item and its ArtistSong / ArtistAlbum rows go out in one
+TransactWriteItems call when they fit (TRANSACT_LIMIT), so a crash never
+leaves an item without its mappings or mappings without their item.
+
+Longer artist lists go through BatchWriteItem, BATCH_WRITE_LIMIT puts per
+call, with UnprocessedItems retried with exponential backoff. The item is
+in the last batch, so it only becomes visible once every mapping is
+written. The puts are idempotent, so a retried invocation completes a
+partial write. batch_put and batch_delete are the same batching on their
+own, for rows that do not need to land together.
+
+Writes go through table.meta.client, which takes plain Python values.
+"""
+import time
+
+TRANSACT_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+MAX_UNPROCESSED_RETRIES = 8
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def batch_write(client, requests):
+    """Send [(table_name, PutRequest or DeleteRequest)] with BatchWriteItem, retrying unprocessed items."""
+    for chunk in _chunks(requests, BATCH_WRITE_LIMIT):
+        request = {}
+        for table_name, write in chunk:
+            request.setdefault(table_name, []).append(write)
+        attempt = 0
+        while request:
+            response = client.batch_write_item(RequestItems=request)
+            request = response.get("UnprocessedItems") or {}
+            if request:
+                attempt += 1
+                if attempt > MAX_UNPROCESSED_RETRIES:
+                    raise RuntimeError("BatchWriteItem kept returning unprocessed items")
+                time.sleep(min(0.05 * 2 ** attempt, 2))
+
+
+def batch_put(client, puts):
+    """Write [(table_name, item)] with BatchWriteItem."""
+    batch_write(client, [(table_name, {"PutRequest": {"Item": item}}) for table_name, item in puts])
+
+
+def batch_delete(client, keys):
+    """Delete [(table_name, key)] with BatchWriteItem."""
+    batch_write(client, [(table_name, {"DeleteRequest": {"Key": key}}) for table_name, key in keys])
+
+
+def put_with_links(table, item, link_table, links):
+    """Write item to table and every row of links to link_table, atomically when they fit."""
+    puts = [(link_table.name, link) for link in links] + [(table.name, item)]
+    client = table.meta.client
+    if len(puts) <= TRANSACT_LIMIT:
+        client.transact_write_items(TransactItems=[
+            {"Put": {"TableName": table_name, "Item": row}} for table_name, row in puts
+        ])
+    else:
+        batch_put(client, puts)
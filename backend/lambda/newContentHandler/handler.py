@@ -1,15 +1,43 @@
 import os
 import json
-import boto3
 from decimal import Decimal
+from boto3.dynamodb.conditions import Key
 
-dynamodb = boto3.resource('dynamodb')
-subscriptions_table = dynamodb.Table(os.environ['SUBSCRIPTIONS_TABLE'])
-score_table = dynamodb.Table(os.environ['SCORE_TABLE'])
+from common import clients
+from common.concurrency import is_throttling, throttled_map
+
+subscriptions_table = clients.table(os.environ['SUBSCRIPTIONS_TABLE'])
+score_table = clients.table(os.environ['SCORE_TABLE'])
 
 # Pretpostavka za težine, trebalo bi da budu iste kao u scoreUpdater
 W_SUBSCRIPTION = 0.4 
 
+def push_content(user_id, content_id):
+    try:
+        # Dajemo visok početni skor da bi se pojavilo na vrhu feed-a
+        initial_sub_score = 1
+        initial_recency_score = 1 # Smatramo ga "najsvežijim"
+        total_score = (Decimal(initial_sub_score) * Decimal(W_SUBSCRIPTION)) # + ... ostali skorovi
+
+        # Klijent (ne Table) je thread safe za throttled_map radnike
+        score_table.meta.client.put_item(
+            TableName=score_table.name,
+            Item={
+                'User': user_id,
+                'Content': content_id,
+                'sub_score': initial_sub_score,
+                'recency_score': initial_recency_score,
+                'total_score': total_score
+            }
+        )
+        print(f"Pushed new content {content_id} to user {user_id}")
+    except Exception as e:
+        # Throttling ide nazad u throttled_map, ostale greske se samo loguju kao i ranije
+        if is_throttling(e):
+            raise
+        print(f"Error pushing content to user {user_id}: {e}")
+
+
 def handler(event, context):
     # 1. Parsiraj poruku sa SNS-a
     message = json.loads(event['Records'][0]['Sns']['Message'])
@@ -27,37 +55,19 @@ def handler(event, context):
     # Koristimo PK Subscriptions tabele (Target)
     if genre:
         response_genre = subscriptions_table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('Target').eq(f"genre#{genre}")
+            KeyConditionExpression=Key('Target').eq(f"genre#{genre}")
         )
         for item in response_genre.get('Items', []):
             users_to_notify.add(item['User'])
 
     if artist:
         response_artist = subscriptions_table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('Target').eq(f"artist#{artist}")
+            KeyConditionExpression=Key('Target').eq(f"artist#{artist}")
         )
         for item in response_artist.get('Items', []):
             users_to_notify.add(item['User'])
 
     # 3. Za svakog korisnika, upiši visok početni skor za novi sadržaj
-    for user_id in users_to_notify:
-        try:
-            # Dajemo visok početni skor da bi se pojavilo na vrhu feed-a
-            initial_sub_score = 1
-            initial_recency_score = 1 # Smatramo ga "najsvežijim"
-            total_score = (Decimal(initial_sub_score) * Decimal(W_SUBSCRIPTION)) # + ... ostali skorovi
-
-            score_table.put_item(
-                Item={
-                    'User': user_id,
-                    'Content': content_id,
-                    'sub_score': initial_sub_score,
-                    'recency_score': initial_recency_score,
-                    'total_score': total_score
-                }
-            )
-            print(f"Pushed new content {content_id} to user {user_id}")
-        except Exception as e:
-            print(f"Error pushing content to user {user_id}: {e}")
+    throttled_map(lambda user_id: push_content(user_id, content_id), sorted(users_to_notify))
 
     return {'statusCode': 200, 'body': 'OK'}
\ No newline at end of file
@@ -0,0 +1,118 @@
+import hashlib
+import io
+import os
+from urllib.parse import unquote_plus
+
+from botocore.exceptions import ClientError
+from PIL import Image, ImageOps
+
+from common import clients
+from common.catalog_cache import bump_version
+from common.covers import CACHE_CONTROL, FORMATS, SIZES, derivative_key, derivative_keys
+from common.hydration import find_by_id
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+SONGS_TABLE = os.environ["SONGS_TABLE"]
+ALBUMS_TABLE = os.environ["ALBUMS_TABLE"]
+CATALOG_VERSION_TABLE = os.environ["CATALOG_VERSION_TABLE"]
+
+s3 = clients.client("s3")
+songs_table = clients.table(SONGS_TABLE)
+albums_table = clients.table(ALBUMS_TABLE)
+catalog_version_table = clients.table(CATALOG_VERSION_TABLE)
+
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+
+def render(data):
+    """{(size, fmt): bytes} of every derivative, center-cropped to a square."""
+    with Image.open(io.BytesIO(data)) as image:
+        # Telefoni cuvaju rotaciju u EXIF-u; RGB jer JPEG nema alfa kanal
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        rendered = {}
+        for size in SIZES:
+            square = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            for fmt in FORMATS:
+                out = io.BytesIO()
+                square.save(out, **SAVE_OPTIONS[fmt])
+                rendered[(size, fmt)] = out.getvalue()
+        return rendered
+
+
+def exists(key):
+    try:
+        s3.head_object(Bucket=BUCKET_NAME, Key=key)
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+def store_derivatives(data):
+    """Upload the derivatives of data unless an identical image already has them; return the digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    # Najveci JPEG se pise poslednji, pa njegovo postojanje znaci da su tu svi
+    if exists(derivative_key(digest, SIZES[-1], "jpeg")):
+        return digest
+    rendered = render(data)
+    for (size, fmt) in sorted(rendered, key=lambda k: (k[0], k[1] == "jpeg")):
+        s3.put_object(
+            Bucket=BUCKET_NAME,
+            Key=derivative_key(digest, size, fmt),
+            Body=rendered[(size, fmt)],
+            ContentType=FORMATS[fmt],
+            CacheControl=CACHE_CONTROL
+        )
+    return digest
+
+
+def item_key(metadata):
+    if metadata.get("entity") == "song" and metadata.get("album"):
+        return songs_table, {"Album": metadata["album"], "Id": metadata["id"]}
+    if metadata.get("entity") == "album":
+        album = find_by_id(albums_table, metadata["id"])
+        if album:
+            return albums_table, {"Genre": album["Genre"], "Id": album["Id"]}
+    return None, None
+
+
+def record(metadata, source, digest):
+    """SET coverImages if the item still uses this original; False when it moved on."""
+    table, key = item_key(metadata)
+    if table is None:
+        print(f"No item for cover {source}: {metadata}")
+        return False
+    try:
+        table.update_item(
+            Key=key,
+            UpdateExpression="SET coverImages = :images",
+            ConditionExpression="coverImage = :source",
+            ExpressionAttributeValues={
+                ":images": {"source": source, "sizes": derivative_keys(digest)},
+                ":source": source
+            }
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            print(f"{metadata['entity']} {metadata['id']} no longer uses {source}")
+            return False
+        raise
+    # Albumi su u kesu toplih kontejnera (common.catalog_cache), novi derivati se vide tek posle podizanja verzije
+    if table is albums_table:
+        bump_version(catalog_version_table)
+    return True
+
+
+def lambda_handler(event, context):
+    processed = []
+    for s3_record in event.get("Records", []):
+        key = unquote_plus(s3_record["s3"]["object"]["key"])
+        obj = s3.get_object(Bucket=BUCKET_NAME, Key=key)
+        digest = store_derivatives(obj["Body"].read())
+        if record(obj.get("Metadata", {}), key, digest):
+            processed.append(key)
+    return {"processed": processed}
@@ -1,22 +1,25 @@
 import json
 import os
-import boto3
 from decimal import Decimal
+
 from boto3.dynamodb.conditions import Key
 
+from common import clients
+from common.auth import require_role
+from common.responses import response
+
 table_name = os.environ["RATING_TABLE"]
 song_table_name = os.environ["SONGS_TABLE"]
 score_table_name = os.environ["SCORE_TABLE"]
 
-dynamodb = boto3.resource("dynamodb")
-rating_table = dynamodb.Table(table_name)
-song_table = dynamodb.Table(song_table_name)
-score_table = dynamodb.Table(score_table_name)
+rating_table = clients.table(table_name)
+song_table = clients.table(song_table_name)
+score_table = clients.table(score_table_name)
 
 def update_score(user, content, rating_value):
     try:
-        response = score_table.get_item(Key={"User": user, "Content": content})
-        item = response.get("Item")
+        result = score_table.get_item(Key={"User": user, "Content": content})
+        item = result.get("Item")
 
         if item:
             new_sum = Decimal(item.get("sum", 0)) + Decimal(rating_value)
@@ -42,16 +45,9 @@ def update_score(user, content, rating_value):
         print(f"Error updating score for {content}: {str(e)}")
 
 def lambda_handler(event, context):
-    headers = {"Access-Control-Allow-Origin": "*"}
-
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-    if role != "user":
-        return {
-            "statusCode": 403,
-            "headers": headers,
-            "body": json.dumps({"message":"Forbidden: Insufficient permissions"})
-        }
+    forbidden = require_role(event, "user")
+    if forbidden:
+        return forbidden
 
     try:
         body = json.loads(event.get('body', '{}'))
@@ -60,11 +56,7 @@ def lambda_handler(event, context):
         rating_value = body.get('rating')
 
         if not user_id or rating_value is None:
-            return {
-                "statusCode": 400,
-                "headers": headers,
-                "body": json.dumps({"message": "userId and rating are required"})
-            }
+            return response(400, {"message": "userId and rating are required"})
 
         rating_table.put_item(
             Item={
@@ -90,16 +82,8 @@ def lambda_handler(event, context):
             for genre in genres:
                 update_score(user_id, f"GENRE#{genre}", rating_value)
 
-        return {
-            "statusCode": 200,
-            "headers": headers,
-            "body": json.dumps({"message": "Rating saved successfully"})
-        }
+        return response(200, {"message": "Rating saved successfully"})
 
     except Exception as e:
         print("Error saving rating:", str(e))
-        return {
-            "statusCode": 500,
-            "headers": headers,
-            "body": json.dumps({"error": str(e)})
-        }
+        return response(500, {"error": str(e)})
@@ -1,19 +1,16 @@
 import os
 import json
-import boto3
 import datetime
 
-dynamodb = boto3.resource('dynamodb')
-listening_history_table = dynamodb.Table(os.environ['LISTENING_HISTORY_TABLE'])
-songs_table = dynamodb.Table(os.environ['SONGS_TABLE'])
+from common import clients, priming
+from common.responses import response
 
-def handler(event, context):
-    headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "*",
-        "Access-Control-Allow-Methods": "OPTIONS,POST,GET"
-    }
+listening_history_table = clients.table(os.environ['LISTENING_HISTORY_TABLE'])
+songs_table = clients.table(os.environ['SONGS_TABLE'])
+
+priming.on_init(priming.open_dynamodb(songs_table))
 
+def handler(event, context):
     try:
         try:
             user_id = event['requestContext']['authorizer']['claims']['sub']
@@ -27,23 +24,15 @@ def handler(event, context):
         album_id = album['Id']
 
         if not song_id or not album:
-            return {
-                'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({'error': 'songId or album missing'})
-            }
+            return response(400, {'error': 'songId or album missing'})
 
-        response = songs_table.get_item(
+        result = songs_table.get_item(
             Key={'Album': album_id, 'Id': song_id}
         )
-        song_item = response.get('Item')
+        song_item = result.get('Item')
         print("Song item:", song_item)
         if not song_item:
-            return {
-                'statusCode': 404,
-                'headers': headers,
-                'body': json.dumps({'error': 'Song not found'})
-            }
+            return response(404, {'error': 'Song not found'})
 
         timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
@@ -62,16 +51,8 @@ def handler(event, context):
 
         listening_history_table.put_item(Item=history_item)
 
-        return {
-            'statusCode': 201,
-            'headers': headers,
-            'body': json.dumps({'message': 'Listen event recorded'})
-        }
+        return response(201, {'message': 'Listen event recorded'})
 
     except Exception as e:
         print("Error:", str(e))
-        return {
-            'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({'error': str(e)})
-        }
+        return response(500, {'error': str(e)})
@@ -0,0 +1,36 @@
+import json
+import os
+
+from common import clients
+from common.auth import require_role
+from common.responses import response
+from common.uploads import InvalidUpload, SessionNotFound, get_session, record_part
+
+UPLOAD_SESSIONS_TABLE = os.environ["UPLOAD_SESSIONS_TABLE"]
+
+sessions_table = clients.table(UPLOAD_SESSIONS_TABLE)
+
+
+def lambda_handler(event, context):
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
+
+    try:
+        upload_id = event["pathParameters"]["id"]
+        part_number = event["pathParameters"]["partNumber"]
+        body = json.loads(event.get("body") or "{}")
+
+        session = get_session(sessions_table, upload_id)
+        record_part(sessions_table, session, part_number, body.get("etag"))
+        return response(200, {"uploadId": upload_id, "partNumber": int(part_number)})
+
+    except InvalidUpload as e:
+        return response(400, {"error": str(e)})
+
+    except SessionNotFound as e:
+        return response(404, {"error": str(e)})
+
+    except Exception as e:
+        print("ERROR:", str(e))
+        return response(500, {"error": str(e)})
@@ -0,0 +1,46 @@
+import os
+
+from common import clients, content
+from common.streams import image, source_table
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+SONGS_TABLE_NAME = os.environ["SONGS_TABLE"]
+CONTENT_OBJECTS_TABLE = os.environ["CONTENT_OBJECTS_TABLE"]
+
+s3 = clients.client("s3")
+objects_table = clients.table(CONTENT_OBJECTS_TABLE)
+
+
+def references(item, kind):
+    """Content keys a live song or album uses."""
+    # Kljucevi iz starog rasporeda (pre content adresa) nemaju ContentObjects red i ne broje se
+    if not item or item.get("deleted") == "true":
+        return set()
+    keys = {item.get("coverImage")}
+    if kind == "song":
+        keys.add(item.get("fileName"))
+    return {key for key in keys if content.digest_of(key)}
+
+
+def apply(record):
+    """Bring the refs in line with one change; return the keys that lost their last ref."""
+    kind = "song" if source_table(record) == SONGS_TABLE_NAME else "album"
+    old = image(record, "OldImage")
+    new = image(record, "NewImage")
+    ref = f"{kind}#{(new or old)['Id']}"
+    before = references(old, kind)
+    after = references(new, kind)
+
+    # Ponovljen batch ponovo dodaje/brise isti element seta, sto ne menja broj
+    for key in after - before:
+        content.acquire(objects_table, key, ref)
+    return [key for key in before - after if content.release(objects_table, key, ref)]
+
+
+def lambda_handler(event, context):
+    unreferenced = []
+    for record in event.get("Records", []):
+        unreferenced.extend(apply(record))
+
+    collected = [key for key in dict.fromkeys(unreferenced) if content.collect(s3, BUCKET_NAME, objects_table, key)]
+    return {"collected": collected}
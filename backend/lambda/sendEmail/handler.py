@@ -1,14 +1,17 @@
 import json
 import os
-import boto3
 from boto3.dynamodb.conditions import Key
 
+from common import clients
+from common.concurrency import parallel_map, throttled_map
+from common.hydration import query_all
+
 # SES setup iz env
 region = os.environ.get("SES_REGION", os.environ["AWS_REGION"])
 SES_SOURCE_EMAIL = os.environ["SES_SOURCE_EMAIL"]
 
-ses = boto3.client("ses", region_name=region)
-subs_table = boto3.resource("dynamodb").Table(os.environ["SUBSCRIPTIONS_TABLE"])
+ses = clients.client("ses", region_name=region)
+subs_table = clients.table(os.environ["SUBSCRIPTIONS_TABLE"])
 
 
 def lambda_handler(event, context):
@@ -25,29 +28,20 @@ def lambda_handler(event, context):
         genres = message.get("genres", [])
         artists = message.get("artists", [])
 
-        # Query subscriptions by genre
-        for genre in genres:
-            resp = subs_table.query(
-                KeyConditionExpression=Key("Target").eq("genre#" + genre)
-            )
-            for sub in resp.get("Items", []):
-                if sub.get("deleted", "false") == "true":
-                    continue
-                email = sub.get("email")
-                if email:
-                    send_email(email, message, content_type)
-
-        # Query subscriptions by artist
-        for artist in artists:
-            resp = subs_table.query(
-                KeyConditionExpression=Key("Target").eq("artist#" + artist)
-            )
-            for sub in resp.get("Items", []):
-                if sub.get("deleted", "false") == "true":
-                    continue
-                email = sub.get("email")
-                if email:
-                    send_email(email, message, content_type)
+        # Pretplate po zanru i po umetniku se citaju paralelno
+        targets = ["genre#" + genre for genre in genres] + ["artist#" + artist for artist in artists]
+        subscriptions = parallel_map(
+            lambda target: query_all(subs_table, KeyConditionExpression=Key("Target").eq(target)),
+            targets
+        )
+
+        # Korisnik pretplacen i na zanr i na umetnika dobija jedan mejl
+        emails = list(dict.fromkeys(
+            sub["email"]
+            for subs in subscriptions for sub in subs
+            if sub.get("deleted", "false") != "true" and sub.get("email")
+        ))
+        throttled_map(lambda email: send_email(email, message, content_type), emails)
 
 
 def send_email(user_email, message, content_type):
@@ -0,0 +1,123 @@
+import os
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from common import clients
+from common.concurrency import parallel_map
+from common.hydration import batch_get, query_all
+from common.song_view import album_summary, artist_summary, build_views
+from common.streams import image, source_table
+
+SONGS_TABLE_NAME = os.environ["SONGS_TABLE"]
+ALBUMS_TABLE_NAME = os.environ["ALBUMS_TABLE"]
+ARTISTS_TABLE_NAME = os.environ["ARTISTS_TABLE"]
+ARTIST_SONG_TABLE_NAME = os.environ["ARTIST_SONG_TABLE"]
+SONG_VIEW_TABLE_NAME = os.environ["SONG_VIEW_TABLE"]
+
+dynamodb = clients.resource("dynamodb")
+songs_table = clients.table(SONGS_TABLE_NAME)
+albums_table = clients.table(ALBUMS_TABLE_NAME)
+artists_table = clients.table(ARTISTS_TABLE_NAME)
+artist_song_table = clients.table(ARTIST_SONG_TABLE_NAME)
+song_view_table = clients.table(SONG_VIEW_TABLE_NAME)
+
+
+def _patch(song_id, update_expression, condition_expression, values):
+    """Conditionally update one SongView item; False if the condition no longer holds."""
+    try:
+        song_view_table.meta.client.update_item(
+            TableName=SONG_VIEW_TABLE_NAME,
+            Key={"Id": song_id},
+            UpdateExpression=update_expression,
+            ConditionExpression=condition_expression,
+            ExpressionAttributeValues=values
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def sync_songs(records):
+    # Poslednja slika svake pesme u batch-u, None za obrisane
+    latest = {}
+    for record in records:
+        song_id = image(record, "Keys")["Id"]
+        latest[song_id] = None if record["eventName"] == "REMOVE" else image(record, "NewImage")
+
+    songs = [song for song in latest.values() if song]
+    views = build_views(dynamodb, albums_table, artists_table, songs) if songs else []
+
+    with song_view_table.batch_writer(overwrite_by_pkeys=["Id"]) as batch:
+        for view in views:
+            batch.put_item(Item=view)
+        for song_id, song in latest.items():
+            if song is None:
+                batch.delete_item(Key={"Id": song_id})
+    return len(latest)
+
+
+def sync_album(old, new):
+    summary = album_summary(new)
+    if album_summary(old) == summary:
+        return 0
+
+    songs = query_all(songs_table, KeyConditionExpression=Key("Album").eq(new["Id"]), ProjectionExpression="Id")
+    patched = parallel_map(
+        lambda song_id: _patch(
+            song_id,
+            "SET AlbumSummary = :summary",
+            "AlbumSummary.Id = :id",
+            {":summary": summary, ":id": new["Id"]}
+        ),
+        [song["Id"] for song in songs]
+    )
+    return sum(patched)
+
+
+def sync_artist(old, new):
+    summary = artist_summary(new)
+    if old and artist_summary(old) == summary:
+        return 0
+
+    mappings = query_all(artist_song_table, KeyConditionExpression=Key("ArtistId").eq(new["Id"]))
+    views = batch_get(dynamodb, SONG_VIEW_TABLE_NAME, [{"Id": m["SongId"]} for m in mappings])
+
+    # Umetnik se menja na svom mestu u listi, uslov stiti od istovremenog rebuild-a pesme
+    patches = [
+        (view["Id"], i)
+        for view in views
+        for i, artist in enumerate(view.get("ArtistSummaries") or [])
+        if artist.get("Id") == new["Id"]
+    ]
+    patched = parallel_map(
+        lambda patch: _patch(
+            patch[0],
+            f"SET ArtistSummaries[{patch[1]}] = :summary",
+            f"ArtistSummaries[{patch[1]}].Id = :id",
+            {":summary": summary, ":id": new["Id"]}
+        ),
+        patches
+    )
+    return sum(patched)
+
+
+def lambda_handler(event, context):
+    records = event.get("Records", [])
+    song_records = [r for r in records if source_table(r) == SONGS_TABLE_NAME]
+    synced = sync_songs(song_records) if song_records else 0
+
+    patched = 0
+    for record in records:
+        table_name = source_table(record)
+        if table_name == SONGS_TABLE_NAME or record["eventName"] == "REMOVE":
+            continue
+        old, new = image(record, "OldImage"), image(record, "NewImage")
+        if table_name == ALBUMS_TABLE_NAME:
+            patched += sync_album(old, new)
+        elif table_name == ARTISTS_TABLE_NAME:
+            patched += sync_artist(old, new)
+
+    print(f"SongView: {synced} songs rebuilt, {patched} items patched")
+    return {"songs": synced, "patched": patched}
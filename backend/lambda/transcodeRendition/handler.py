@@ -0,0 +1,84 @@
+import os
+import re
+import tempfile
+
+from common import clients
+from common.concurrency import parallel_map
+from common.hls import MEDIA_PLAYLIST, RENDITIONS_BY_NAME, SEGMENT_SECONDS
+from common.ingest import run_ffmpeg, source_url
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+
+CONTENT_TYPES = {".m3u8": "application/vnd.apple.mpegurl", ".mp4": "audio/mp4", ".m4s": "audio/mp4"}
+# Svaki upload ima svoj prefiks, pa se segmenti nikad ne menjaju
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+s3 = clients.client("s3")
+
+_EXTINF = re.compile(r"#EXTINF:([\d.]+),\s*\n(\S+)")
+
+
+def ffmpeg_args(source, out_dir, rendition):
+    return [
+        "-i", source,
+        "-map", "0:a:0", "-vn", "-ac", "2",
+        "-c:a", rendition["encoder"], "-b:a", str(rendition["bitrate"]),
+        "-f", "hls",
+        "-hls_time", str(SEGMENT_SECONDS),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4",
+        "-hls_fmp4_init_filename", "init.mp4",
+        "-hls_segment_filename", os.path.join(out_dir, "seg_%05d.m4s"),
+        os.path.join(out_dir, MEDIA_PLAYLIST)
+    ]
+
+
+def measure_bandwidth(out_dir):
+    """(peak, average) bits per second of the segments, for the master's BANDWIDTH attributes."""
+    with open(os.path.join(out_dir, MEDIA_PLAYLIST)) as f:
+        segments = _EXTINF.findall(f.read())
+    peak = total_bits = total_seconds = 0
+    for duration, name in segments:
+        seconds = float(duration)
+        bits = os.path.getsize(os.path.join(out_dir, name)) * 8
+        total_bits += bits
+        total_seconds += seconds
+        if seconds > 0:
+            peak = max(peak, bits / seconds)
+    average = total_bits / total_seconds if total_seconds else 0
+    return int(peak), int(average)
+
+
+def transcode(source, out_dir, rendition):
+    """Encode one rendition of source (path or URL) into out_dir."""
+    run_ffmpeg(ffmpeg_args(source, out_dir, rendition), rendition["name"])
+    peak, average = measure_bandwidth(out_dir)
+    return {
+        "name": rendition["name"],
+        "codecs": rendition["codecs"],
+        "bandwidth": peak,
+        "averageBandwidth": average
+    }
+
+
+def upload_dir(out_dir, prefix):
+    def put(name):
+        with open(os.path.join(out_dir, name), "rb") as f:
+            s3.put_object(
+                Bucket=BUCKET_NAME,
+                Key=prefix + name,
+                Body=f,
+                ContentType=CONTENT_TYPES.get(os.path.splitext(name)[1], "application/octet-stream"),
+                CacheControl=CACHE_CONTROL
+            )
+    parallel_map(put, sorted(os.listdir(out_dir)))
+
+
+def lambda_handler(event, context):
+    rendition = RENDITIONS_BY_NAME[event["rendition"]]
+    source = source_url(s3, BUCKET_NAME, event["sourceKey"])
+    with tempfile.TemporaryDirectory() as out_dir:
+        result = transcode(source, out_dir, rendition)
+        upload_dir(out_dir, f"{event['prefix']}{rendition['name']}/")
+    print(f"Song {event['songId']}: {rendition['name']} at {result['averageBandwidth']} bps")
+    return result
@@ -2,27 +2,28 @@ import json
 import base64
 import os
 from datetime import datetime
-import boto3
+
+from common import clients
+from common.auth import require_role
+from common.catalog_cache import bump_version
+from common.covers import claim_cover, entity_metadata, original_key, store_cover
+from common.responses import response
 
 TABLE_NAME = os.environ["ALBUMS_TABLE"]
 S3_BUCKET = os.environ.get("BUCKET_NAME")
+CONTENT_OBJECTS_TABLE = os.environ["CONTENT_OBJECTS_TABLE"]
 
-dynamodb = boto3.resource('dynamodb')
-s3_client = boto3.client('s3')
+s3_client = clients.client("s3")
 
-album_table = dynamodb.Table(TABLE_NAME)
+album_table = clients.table(TABLE_NAME)
+catalog_version_table = clients.table(os.environ["CATALOG_VERSION_TABLE"])
+content_objects_table = clients.table(CONTENT_OBJECTS_TABLE)
 
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-
-    if role != "admin":
-        return {
-            "statusCode": 403,
-            'headers': {'Access-Control-Allow-Origin': '*'},
-            "body": json.dumps({"message": "Forbidden: Insufficient permissions"})
-        }
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
 
     try:
         body = json.loads(event.get('body', '{}'))
@@ -35,68 +36,34 @@ def lambda_handler(event, context):
         cover_base64 = body.get('coverBase64')  # Nova slika u base64
 
         if not album_id:
-            return {
-                "statusCode": 400,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"message": "Album ID is required"})
-            }
+            return response(400, {"message": "Album ID is required"})
 
         if not genres or len(genres) == 0:
-            return {
-                "statusCode": 400,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"message": "Album must have at least one genre"})
-            }
+            return response(400, {"message": "Album must have at least one genre"})
 
-        response = album_table.get_item(
+        result = album_table.get_item(
             Key={
                 'Genre': genre,
                 'Id': album_id
             }
         )
-        print(response)
+        print(result)
 
-        if 'Item' not in response:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"message": "Album not found"})
-            }
+        if 'Item' not in result:
+            return response(404, {"message": "Album not found"})
 
-        existing_album = response['Item']
+        existing_album = result['Item']
         old_cover_image = existing_album.get('coverImage', '')
 
-        # Ako postoji nova slika, uploaduj na S3
-        if cover_base64:
-            try:
-                image_data = base64.b64decode(cover_base64)
-                s3_client.put_object(
-                    Bucket=S3_BUCKET,
-                    Key=cover_image,
-                    Body=image_data,
-                    ContentType='image/jpeg'
-                )
-                print(f"Uploaded new cover image: {cover_image}")
-
-                if old_cover_image and old_cover_image != cover_image:
-                    try:
-                        s3_client.delete_object(
-                            Bucket=S3_BUCKET,
-                            Key=old_cover_image
-                        )
-                        print(f"Deleted old cover image: {old_cover_image}")
-                    except Exception as e:
-                        print(f"Could not delete old image: {e}")
-
-            except Exception as e:
-                print(f"Error uploading to S3: {e}")
-                return {
-                    "statusCode": 500,
-                    "headers": {"Access-Control-Allow-Origin": "*"},
-                    "body": json.dumps({"message": f"Error uploading image: {str(e)}"})
-                }
-
-        final_cover_image = cover_image if cover_image else old_cover_image
+        # Kljuc nove slike je njen SHA-256; vec sacuvana slika se samo referencira
+        cover_data = base64.b64decode(cover_base64) if cover_base64 else None
+        new_cover_image = original_key(cover_data) if cover_data else None
+        new_cover_images = None
+        if new_cover_image and new_cover_image != old_cover_image:
+            new_cover_images = claim_cover(content_objects_table, new_cover_image, f"album#{album_id}")
+        elif new_cover_image:
+            new_cover_image = None
+        final_cover_image = new_cover_image or cover_image or old_cover_image
         if genre not in genres:
             genre = genres[0]
 
@@ -112,27 +79,41 @@ def lambda_handler(event, context):
             "coverImage": final_cover_image,
             "createdDate": existing_album.get('createdDate', str(datetime.now())),
             "modifiedDate": str(datetime.now()),
-            "deleted": "false"
+            "deleted": "false",
+            "ArtistGenres": existing_album.get('ArtistGenres', {})
         }
 
+        if existing_album.get('ActiveShard'):
+            updated_item['ActiveShard'] = existing_album['ActiveShard']
+        if final_cover_image == old_cover_image and existing_album.get('coverImages'):
+            updated_item['coverImages'] = existing_album['coverImages']
+        elif new_cover_images:
+            updated_item['coverImages'] = new_cover_images
+
         album_table.put_item(Item=updated_item)
 
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({
-                "message": f"Album '{album_title}' updated successfully.",
-                "albumId": album_id,
-                "item": updated_item
-            }, default=str)
-        }
+        # Posle upisa albuma, da processCover nadje red sa novim kljucem.
+        # Stari cover se ne brise ovde: releaseContent ga brise kad ga vise nista ne koristi
+        if new_cover_image and not new_cover_images:
+            try:
+                store_cover(s3_client, S3_BUCKET, content_objects_table, new_cover_image, cover_data,
+                            f"album#{album_id}", entity_metadata("album", album_id), 'image/jpeg')
+                print(f"Uploaded new cover image: {new_cover_image}")
+            except Exception as e:
+                print(f"Error uploading to S3: {e}")
+                album_table.put_item(Item=existing_album)
+                return response(500, {"message": f"Error uploading image: {str(e)}"})
+
+        bump_version(catalog_version_table)
+
+        return response(200, {
+            "message": f"Album '{album_title}' updated successfully.",
+            "albumId": album_id,
+            "item": updated_item
+        })
 
     except Exception as e:
         import traceback
         print("ERROR:", str(e))
         print(traceback.format_exc())
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": str(e)})
-        }
+        return response(500, {"error": str(e)})
@@ -1,69 +1,49 @@
 import json
-import boto3
 import os
+
 from boto3.dynamodb.conditions import Key
 
+from common import clients
+from common.auth import require_role
+from common.catalog_cache import bump_version
+from common.responses import response
+
 table_name = os.environ.get('ARTISTS_TABLE')
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(table_name)
+table = clients.table(table_name)
+catalog_version_table = clients.table(os.environ["CATALOG_VERSION_TABLE"])
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-    if role != "admin":
-        return {
-            "statusCode": 403,
-            'headers': {'Access-Control-Allow-Origin': '*'},
-            "body": json.dumps({"message":"Forbidden: Insufficient permissions"})
-        }
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
 
     artist_id = event.get("pathParameters", {}).get("id")
     if not artist_id:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Missing artist id"})
-        }
+        return response(400, {"message": "Missing artist id"})
 
     try:
         body = json.loads(event.get("body", "{}"))
     except Exception:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Invalid JSON"})
-        }
+        return response(400, {"message": "Invalid JSON"})
 
     name = body.get("name")
     biography = body.get("biography")
     genres = body.get("genres")
 
     if not name and not biography and not genres:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "No fields to update"})
-        }
+        return response(400, {"message": "No fields to update"})
 
     try:
-        response = table.query(
+        result = table.query(
             IndexName="Id-index",
             KeyConditionExpression=Key("Id").eq(artist_id)
         )
-        items = response.get("Items", [])
+        items = result.get("Items", [])
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Internal server error"})
-        }
+        return response(500, {"message": "Internal server error"})
 
     if not items:
-        return {
-            "statusCode": 404,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Artist not found"})
-        }
+        return response(404, {"message": "Artist not found"})
 
     artist = items[0]
     genre_pk = artist["Genre"]
@@ -98,18 +78,11 @@ def lambda_handler(event, context):
             ExpressionAttributeNames=expr_attr_names if expr_attr_names else None,
             ReturnValues="ALL_NEW"
         )
+        bump_version(catalog_version_table)
     except Exception:
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Internal server error"})
-        }
-
-    return {
-        "statusCode": 200,
-        "headers": {"Access-Control-Allow-Origin": "*"},
-        "body": json.dumps({
-            "message": "Artist updated",
-            "artist": updated.get("Attributes")
-        })
-    }
+        return response(500, {"message": "Internal server error"})
+
+    return response(200, {
+        "message": "Artist updated",
+        "artist": updated.get("Attributes")
+    })
@@ -1,21 +1,21 @@
 import datetime
 import os
-import boto3
 import logging
 from decimal import Decimal
 from boto3.dynamodb.conditions import Key, Attr
 
+from common import clients
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
 score_table_name = os.environ['SCORE_TABLE']
 rating_table_name = os.environ['RATING_TABLE']
 subscription_table_name = os.environ['SUBSCRIPTION_TABLE']
 
-score_table = dynamodb.Table(score_table_name)
-rating_table = dynamodb.Table(rating_table_name)
-subscription_table = dynamodb.Table(subscription_table_name)
+score_table = clients.table(score_table_name)
+rating_table = clients.table(rating_table_name)
+subscription_table = clients.table(subscription_table_name)
 
 W_RATING = 0.5
 W_SUBSCRIPTION = 0.4
@@ -4,19 +4,27 @@ import os
 from datetime import datetime
 from decimal import Decimal
 
-import boto3
-
-s3 = boto3.client('s3')
-dynamodb = boto3.resource("dynamodb")
+from common import clients
+from common.auth import require_role
+from common.covers import claim_cover, entity_metadata, original_key, store_cover
+from common.responses import response
+from common.uploads import (
+    InvalidUpload, finalize_deduplicated, find_stored_audio, start_deduplicated, start_upload, validate
+)
+
+s3 = clients.client("s3")
 songs_table_name = os.environ["SONGS_TABLE"]
 albums_table_name = os.environ["ALBUMS_TABLE"]
 bucket_name = os.environ["BUCKET_NAME"]
+upload_sessions_table_name = os.environ["UPLOAD_SESSIONS_TABLE"]
+content_objects_table_name = os.environ["CONTENT_OBJECTS_TABLE"]
+finalize_upload_function = os.environ["FINALIZE_UPLOAD_FUNCTION"]
+lambda_client = clients.client("lambda")
 
-SNS_NEW_TRANSCRIPTION_TOPIC_ARN = os.environ["SNS_NEW_TRANSCRIPTION_ARN"]
-sns = boto3.client("sns")
-
-songs_table = dynamodb.Table(songs_table_name)
-albums_table = dynamodb.Table(albums_table_name)
+songs_table = clients.table(songs_table_name)
+albums_table = clients.table(albums_table_name)
+sessions_table = clients.table(upload_sessions_table_name)
+content_objects_table = clients.table(content_objects_table_name)
 
 
 def convert_to_dynamodb_types(obj, path="root"):
@@ -50,120 +58,64 @@ def convert_decimals(obj):
 
 
 def lambda_handler(event, context):
-    claims = event.get("requestContext", {}).get("authorizer", {}).get("claims", {})
-    role = claims.get("custom:role")
-    if role != "admin":
-        return {
-            "statusCode": 403,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Forbidden"})
-        }
+    forbidden = require_role(event, "admin")
+    if forbidden:
+        return forbidden
 
     try:
         body = json.loads(event.get('body', '{}'))
         print("Received body:", json.dumps(body, default=str))
 
         if 'Id' not in body or 'Album' not in body:
-            return {
-                "statusCode": 400,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"error": "Missing required fields: Id and Album"})
-            }
+            return response(400, {"error": "Missing required fields: Id and Album"})
 
         song_id = str(body['Id'])
         album = str(body['Album']['Id'])
 
-        response = songs_table.get_item(Key={'Album': album, 'Id': song_id})
-        item = response.get('Item')
+        result = songs_table.get_item(Key={'Album': album, 'Id': song_id})
+        item = result.get('Item')
         if not item:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"error": "Song not found"})
+            return response(404, {"error": "Song not found"})
+        previous_item = dict(item)
+
+        # Novi audio fajl browser salje direktno u S3, finalizeUpload ga zatim vezuje za pesmu
+        upload = None
+        audio_upload = body.get('audioUpload')
+        if audio_upload:
+            file_size, content_type = validate(audio_upload.get('fileSize'), audio_upload.get('fileType'))
+            changes = {"fileSize": file_size, "fileType": content_type}
+            if audio_upload.get('duration') is not None:
+                changes["duration"] = convert_to_dynamodb_types(audio_upload['duration'])
+            session = {
+                "Mode": "replace",
+                "SongId": song_id,
+                "Album": album,
+                "Changes": changes
             }
-
-        filename = body.get('fileName')
-        fileBase64 = body.get('fileBase64')
-
-        if filename and fileBase64:
-            try:
-                file_content = base64.b64decode(fileBase64)
-                content_type = 'audio/mpeg'
-                if filename.lower().endswith('.wav'):
-                    content_type = 'audio/wav'
-                elif filename.lower().endswith('.flac'):
-                    content_type = 'audio/flac'
-
-                s3.put_object(
-                    Bucket=bucket_name,
-                    Key=filename,
-                    Body=file_content,
-                    ContentType=content_type
-                )
-                print(f"Uploaded audio file: {filename}")
-
-                item['fileName'] = filename
-                item['fileType'] = body.get('fileType', item.get('fileType'))
-                item['fileSize'] = body.get('fileSize', item.get('fileSize'))
-                item['duration'] = body.get('duration', item.get('duration'))
-
-                if item.get('transcribe'):
-                    item['transcriptFileName'] = ''
-                    sns.publish(
-                        TopicArn=SNS_NEW_TRANSCRIPTION_TOPIC_ARN,
-                        Message=json.dumps(item, default=str),
-                        MessageAttributes={
-                            "songId": {
-                                "DataType": "String",
-                                "StringValue": song_id
-                            },
-                            "songFileName": {
-                                "DataType": "String",
-                                "StringValue": filename
-                            }
-                        },
-                        Subject="New Transcription Request"
-                    )
-
-            except Exception as e:
-                print(f"S3 audio upload error: {str(e)}")
-                return {
-                    "statusCode": 500,
-                    "headers": {"Access-Control-Allow-Origin": "*"},
-                    "body": json.dumps({"error": f"Audio upload failed: {str(e)}"})
-                }
+            stored = find_stored_audio(content_objects_table, audio_upload.get('sha256'))
+            if stored:
+                upload = start_deduplicated(sessions_table, session, stored)
+            else:
+                upload = start_upload(s3, bucket_name, sessions_table, session, file_size, content_type)
 
         cover_filename = body.get('coverImage')
         coverBase64 = body.get('coverBase64')
 
+        # Kljuc nove slike je njen SHA-256; vec sacuvana slika se samo referencira,
+        # za novu processCover pravi derivate posle upisa pesme
+        cover_key = None
+        cover_data = None
         if cover_filename and coverBase64:
-            try:
-                cover_content = base64.b64decode(coverBase64)
-                content_type = 'image/jpeg'
-                if cover_filename.lower().endswith('.png'):
-                    content_type = 'image/png'
-                elif cover_filename.lower().endswith('.jpg') or cover_filename.lower().endswith('.jpeg'):
-                    content_type = 'image/jpeg'
-                elif cover_filename.lower().endswith('.gif'):
-                    content_type = 'image/gif'
-
-                s3.put_object(
-                    Bucket=bucket_name,
-                    Key=cover_filename,
-                    Body=cover_content,
-                    ContentType=content_type
-                )
-                print(f"Uploaded cover image: {cover_filename}")
-
-                item['coverImage'] = cover_filename
-
-            except Exception as e:
-                print(f"S3 cover upload error: {str(e)}")
-                return {
-                    "statusCode": 500,
-                    "headers": {"Access-Control-Allow-Origin": "*"},
-                    "body": json.dumps({"error": f"Cover upload failed: {str(e)}"})
-                }
+            cover_data = base64.b64decode(coverBase64)
+            new_key = original_key(cover_data)
+            if new_key != item.get('coverImage'):
+                images = claim_cover(content_objects_table, new_key, f"song#{song_id}")
+                item['coverImage'] = new_key
+                item.pop('coverImages', None)
+                if images:
+                    item['coverImages'] = images
+                else:
+                    cover_key = new_key
 
         if 'title' in body:
             item['title'] = str(body['title'])
@@ -179,28 +131,44 @@ def lambda_handler(event, context):
         songs_table.put_item(Item=item)
         print("Item saved successfully")
 
+        # Posle upisa pesme, da processCover nadje red sa novim kljucem
+        if cover_key:
+            try:
+                content_type = 'image/jpeg'
+                if cover_filename.lower().endswith('.png'):
+                    content_type = 'image/png'
+                elif cover_filename.lower().endswith('.gif'):
+                    content_type = 'image/gif'
+
+                store_cover(s3, bucket_name, content_objects_table, cover_key, cover_data,
+                            f"song#{song_id}", entity_metadata("song", song_id, album), content_type)
+                print(f"Uploaded cover image: {cover_key}")
+
+            except Exception as e:
+                print(f"S3 cover upload error: {str(e)}")
+                songs_table.put_item(Item=previous_item)
+                return response(500, {"error": f"Cover upload failed: {str(e)}"})
+
+        # finalizeUpload menja audio polja pesme; pokrece se tek posle svih upisa ovog handler-a,
+        # inace bi put_item iznad mogao da vrati stari fileName preko novog
+        if upload and upload.get('deduplicated'):
+            finalize_deduplicated(lambda_client, finalize_upload_function, upload['uploadId'])
+
         response_item = convert_decimals(item)
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({
-                "message": "Song updated successfully",
-                "item": response_item
-            })
+        result = {
+            "message": "Song updated successfully",
+            "item": response_item
         }
+        if upload:
+            result["upload"] = upload
+        return response(200, result)
 
     except json.JSONDecodeError:
-        return {
-            "statusCode": 400,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": "Invalid JSON in request body"})
-        }
+        return response(400, {"error": "Invalid JSON in request body"})
+    except InvalidUpload as e:
+        return response(400, {"error": str(e)})
     except Exception as e:
         import traceback
         print("ERROR:", str(e))
         print(traceback.format_exc())
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": f"Internal server error: {str(e)}"})
-        }
+        return response(500, {"error": f"Internal server error: {str(e)}"})
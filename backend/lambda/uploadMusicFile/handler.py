@@ -1,118 +1,79 @@
 import json
-import base64
 import uuid
 from datetime import datetime
-import boto3
-import traceback
+from decimal import Decimal
 import os
 
+from common import clients
+from common.responses import response
+from common.uploads import (
+    InvalidUpload, finalize_deduplicated, find_stored_audio, start_deduplicated, start_upload, validate
+)
+
 BUCKET_NAME = os.environ["BUCKET_NAME"]
-SONG_TABLE = os.environ["SONGS_TABLE"]
-ARTIST_SONG_TABLE = os.environ["ARTIST_SONG_TABLE"]
-SNS_NEW_SINGLE_TOPIC_ARN = os.environ["SNS_NEW_CONTENT_ARN"]
-SNS_NEW_TRANSCRIPTION_TOPIC_ARN = os.environ["SNS_NEW_TRANSCRIPTION_ARN"]
+UPLOAD_SESSIONS_TABLE = os.environ["UPLOAD_SESSIONS_TABLE"]
+CONTENT_OBJECTS_TABLE = os.environ["CONTENT_OBJECTS_TABLE"]
+FINALIZE_UPLOAD_FUNCTION = os.environ["FINALIZE_UPLOAD_FUNCTION"]
+
+s3 = clients.client("s3")
+lambda_client = clients.client("lambda")
+sessions_table = clients.table(UPLOAD_SESSIONS_TABLE)
+content_objects_table = clients.table(CONTENT_OBJECTS_TABLE)
+
+# Polja pesme koja finalizeUpload upisuje u Songs kada se upload zavrsi
+DRAFT_FIELDS = (
+    "title", "type", "artists", "genres", "releaseDate", "description",
+    "fileSize", "fileType", "coverImage", "duration", "single", "transcribe"
+)
 
-s3 = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
-song_table = dynamodb.Table(SONG_TABLE)
-artist_song_table = dynamodb.Table(ARTIST_SONG_TABLE)
-sns = boto3.client("sns")
 
 def lambda_handler(event, context):
     try:
-        body = json.loads(event.get('body', '{}'))
-        filename = body['fileName']
-        fileBase64 = body['fileBase64']
-        artists = body.get('artists', [])
-        genres = body.get('genres', [])
-        single = body.get('single')
-        album_id = body.get('album', 'Unknown')
-        transcribe = body.get('transcribe', False)
-
-        # Upload pesme u S3
-        s3.put_object(Bucket=BUCKET_NAME, Key=filename, Body=base64.b64decode(fileBase64))
-        print(f"Uploaded {filename} to S3 bucket {BUCKET_NAME}")
+        body = json.loads(event.get('body') or '{}', parse_float=Decimal)
+        if not body.get('title'):
+            return response(400, {"error": "title is required"})
+        file_size, content_type = validate(body.get('fileSize'), body.get('fileType'))
 
         song_id = str(uuid.uuid4())
-        item = {
+        album_id = body.get('album', 'Unknown')
+        draft = {field: body[field] for field in DRAFT_FIELDS if body.get(field) is not None}
+        draft.setdefault('releaseDate', str(datetime.now()))
+        draft['fileSize'] = file_size
+        draft['fileType'] = content_type
+
+        session = {
+            "Mode": "create",
+            "SongId": song_id,
             "Album": album_id,
-            "Id": song_id,
-            "title": body['title'],
-            "type": body.get('type', 'single'),
-            "artists": artists,
-            "artist": artists[0], #primary
-            "genres": genres,
-            "releaseDate": body.get('releaseDate', str(datetime.now())),
-            "description": body.get('description', ''),
-            "fileName": filename,
-            "fileSize": body.get('fileSize'),
-            "fileType": body.get('fileType'),
-            "coverImage": body.get('coverImage'),
-            "createdDate": str(datetime.now()),
-            "modifiedDate": str(datetime.now()),
-            "duration": body.get('duration'),
-            "deleted": "false",
-            "transcribe": transcribe
+            "Song": draft
         }
-        song_table.put_item(Item=item)
-        print(song_id)
-        # Artist → Song mapping
-        for artist_id in artists:
-            artist_song_table.put_item(Item={
-                "ArtistId": artist_id,
-                "SongId": song_id,
-                "AlbumId": album_id,
-                "createdDate": str(datetime.now())
+        # Isti SHA-256 je vec sacuvan: pesma se samo vezuje za postojeci objekat, bez prenosa
+        stored = find_stored_audio(content_objects_table, body.get('sha256'))
+        if stored:
+            upload = start_deduplicated(sessions_table, session, stored)
+            finalize_deduplicated(lambda_client, FINALIZE_UPLOAD_FUNCTION, upload['uploadId'])
+            print(f"Upload {upload['uploadId']} for song {song_id} reuses {stored['ObjectKey']}")
+            return response(202, {
+                "message": f"'{body['title']}' uses an already uploaded file.",
+                "songId": song_id,
+                "upload": upload
             })
 
-        # Publish SNS event SAMO ako je single
-        print(f"Single: {single}")
-        if single:
-            sns.publish(
-                TopicArn=SNS_NEW_SINGLE_TOPIC_ARN,
-                Message=json.dumps(item, default=str),
-                MessageAttributes={
-                    "contentType": {
-                        "DataType": "String",
-                        "StringValue": "song"
-                    }
-                },
-                Subject="New Single"
-            )
-            print(f"Published single '{body['title']}' to SNS topic {SNS_NEW_SINGLE_TOPIC_ARN}")
+        # Audio ide direktno u S3, ovde se samo otvara multipart upload i potpisuju URL-ovi
+        upload = start_upload(s3, BUCKET_NAME, sessions_table, session, file_size, content_type)
+        print(f"Upload {upload['uploadId']} started for song {song_id}, {len(upload['parts'])} parts")
 
-        if transcribe:
-            sns.publish(
-                    TopicArn=SNS_NEW_TRANSCRIPTION_TOPIC_ARN,
-                    Message=json.dumps(item, default=str),
-                    MessageAttributes={
-                        "songId": {
-                            "DataType": "String",
-                            "StringValue": song_id
-                        },
-                        "songFileName": {
-                            "DataType": "String",
-                            "StringValue": filename
-                        }
-                    },
-                    Subject="New Transcription Request"
-                )
+        return response(202, {
+            "message": f"Upload the file to finish creating '{body['title']}'.",
+            "songId": song_id,
+            "upload": upload
+        })
 
-        return {
-            "statusCode": 201,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({
-                "message": f"Song '{filename}' uploaded successfully.",
-                "songId": song_id,
-                "item": item
-            }, default=str)
-        }
+    except InvalidUpload as e:
+        return response(400, {"error": str(e)})
 
     except Exception as e:
         print("ERROR:", str(e))
+        import traceback
         print(traceback.format_exc())
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": str(e)})
-        }
\ No newline at end of file
+        return response(500, {"error": str(e)})
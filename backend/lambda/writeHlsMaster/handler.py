@@ -0,0 +1,29 @@
+import os
+
+from common import clients
+from common.hls import MASTER_PLAYLIST, master_playlist
+from common.ingest import attach
+
+BUCKET_NAME = os.environ["BUCKET_NAME"]
+SONGS_TABLE = os.environ["SONGS_TABLE"]
+CONTENT_OBJECTS_TABLE = os.environ["CONTENT_OBJECTS_TABLE"]
+
+s3 = clients.client("s3")
+songs_table = clients.table(SONGS_TABLE)
+objects_table = clients.table(CONTENT_OBJECTS_TABLE)
+
+
+def lambda_handler(event, context):
+    key = event["prefix"] + MASTER_PLAYLIST
+    s3.put_object(
+        Bucket=BUCKET_NAME,
+        Key=key,
+        Body=master_playlist(event["renditions"]).encode(),
+        ContentType="application/vnd.apple.mpegurl",
+        CacheControl="public, max-age=31536000, immutable"
+    )
+
+    if not attach(songs_table, event, {"hlsPlaylist": key}, objects_table):
+        return {"hlsPlaylist": None}
+    print(f"Song {event['songId']}: master playlist {key}")
+    return {"hlsPlaylist": key}
@@ -0,0 +1,75 @@
+"""Backfill ActiveShard on live Songs, Albums and Artists items.
+
+Items created before the active-index existed only carry deleted = "false".
+This scans each table with parallel segments and sets ActiveShard on every
+live item that does not have it yet, so they show up in the list endpoints.
+
+    python scripts/backfill_active_shard.py --table BackendStack-Songs... --table ...
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "layers", "common", "python"))
+from common.sharding import active_shard  # noqa: E402
+
+
+def backfill_segment(table_name, segment, total_segments, dry_run):
+    # boto3 resources are not thread safe, every segment gets its own session
+    table = boto3.session.Session().resource("dynamodb").Table(table_name)
+    keys = [k["AttributeName"] for k in table.key_schema]
+    scan_kwargs = {
+        "Segment": segment,
+        "TotalSegments": total_segments,
+        "FilterExpression": Attr("deleted").eq("false") & Attr("ActiveShard").not_exists(),
+        "ProjectionExpression": ", ".join(f"#k{i}" for i in range(len(keys))),
+        "ExpressionAttributeNames": {f"#k{i}": k for i, k in enumerate(keys)},
+    }
+    updated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get("Items", []):
+            if dry_run:
+                updated += 1
+                continue
+            try:
+                table.update_item(
+                    Key={k: item[k] for k in keys},
+                    UpdateExpression="SET ActiveShard = :shard",
+                    ConditionExpression="deleted = :false AND attribute_not_exists(ActiveShard)",
+                    ExpressionAttributeValues={":shard": active_shard(item["Id"]), ":false": "false"},
+                )
+                updated += 1
+            except ClientError as e:
+                # Item was deleted or written by a new handler in the meantime
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+        if "LastEvaluatedKey" not in response:
+            return updated
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", action="append", required=True, help="table name, may be repeated")
+    parser.add_argument("--segments", type=int, default=4, help="parallel scan segments per table")
+    parser.add_argument("--dry-run", action="store_true", help="only count items that would be updated")
+    args = parser.parse_args()
+
+    for table_name in args.table:
+        with ThreadPoolExecutor(max_workers=args.segments) as executor:
+            counts = executor.map(
+                lambda segment: backfill_segment(table_name, segment, args.segments, args.dry_run),
+                range(args.segments)
+            )
+            total = sum(counts)
+        print(f"{table_name}: {'would update' if args.dry_run else 'updated'} {total} items")
+
+
+if __name__ == "__main__":
+    main()
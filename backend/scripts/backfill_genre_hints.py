@@ -0,0 +1,99 @@
+"""Backfill the genre hints used for BatchGetItem hydration.
+
+Albums and Artists are keyed by (Genre, Id). Readers that only hold an id
+batch-fetch them using hints stored next to the reference:
+
+    Songs.AlbumGenre, Songs.ArtistGenres, Albums.ArtistGenres, ArtistAlbum.AlbumGenre
+
+Items written before the hints existed fall back to one Id-index query per
+id. This script fills the hints in for them.
+
+    python scripts/backfill_genre_hints.py --songs <table> --albums <table> \\
+        --artists <table> --artist-album <table>
+"""
+import argparse
+
+import boto3
+
+
+def scan_all(table, **kwargs):
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get("Items", [])
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def genre_by_id(table):
+    return {
+        item["Id"]: item["Genre"]
+        for item in scan_all(table, ProjectionExpression="Genre, Id")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--songs", required=True)
+    parser.add_argument("--albums", required=True)
+    parser.add_argument("--artists", required=True)
+    parser.add_argument("--artist-album", required=True)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource("dynamodb")
+    songs_table = dynamodb.Table(args.songs)
+    albums_table = dynamodb.Table(args.albums)
+    artists_table = dynamodb.Table(args.artists)
+    artist_album_table = dynamodb.Table(args.artist_album)
+
+    album_genres = genre_by_id(albums_table)
+    artist_genres = genre_by_id(artists_table)
+    counts = {"songs": 0, "albums": 0, "artist_album": 0}
+
+    for song in scan_all(songs_table):
+        if "AlbumGenre" in song and "ArtistGenres" in song:
+            continue
+        hints = {a: artist_genres[a] for a in song.get("artists", []) if a in artist_genres}
+        update = "SET ArtistGenres = :ag"
+        values = {":ag": hints}
+        if song.get("Album") in album_genres:
+            update += ", AlbumGenre = :g"
+            values[":g"] = album_genres[song["Album"]]
+        if not args.dry_run:
+            songs_table.update_item(
+                Key={"Album": song["Album"], "Id": song["Id"]},
+                UpdateExpression=update,
+                ExpressionAttributeValues=values
+            )
+        counts["songs"] += 1
+
+    for album in scan_all(albums_table):
+        if "ArtistGenres" in album:
+            continue
+        hints = {a: artist_genres[a] for a in album.get("artists", []) if a in artist_genres}
+        if not args.dry_run:
+            albums_table.update_item(
+                Key={"Genre": album["Genre"], "Id": album["Id"]},
+                UpdateExpression="SET ArtistGenres = :ag",
+                ExpressionAttributeValues={":ag": hints}
+            )
+        counts["albums"] += 1
+
+    for mapping in scan_all(artist_album_table):
+        if "AlbumGenre" in mapping or mapping["AlbumId"] not in album_genres:
+            continue
+        if not args.dry_run:
+            artist_album_table.update_item(
+                Key={"ArtistId": mapping["ArtistId"], "AlbumId": mapping["AlbumId"]},
+                UpdateExpression="SET AlbumGenre = :g",
+                ExpressionAttributeValues={":g": album_genres[mapping["AlbumId"]]}
+            )
+        counts["artist_album"] += 1
+
+    verb = "would update" if args.dry_run else "updated"
+    print(", ".join(f"{verb} {count} {name} items" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
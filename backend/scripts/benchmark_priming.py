@@ -0,0 +1,117 @@
+"""First-request latency with and without init-phase priming (common.priming).
+
+For each function, every run starts a fresh child process. The child imports
+the handler with PRIME_ON_INIT unset (cold) or set (primed), then sends the
+recorded invocation twice: the first request, then a warm one. AWS calls are
+answered from scripts/tuning_events, as in power_tuning.py. Each call waits
+--rtt-ms, and the first call to each endpoint also waits --connect-ms for DNS
+and the TLS handshake.
+
+Lambda runs init with a full CPU and a function's requests with its memory
+share. The child is therefore held to --memory/1769 of a CPU only after its
+import is done.
+
+    python scripts/benchmark_priming.py --memory 128 --runs 10
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# power_tuning dodaje backend/ u sys.path
+from power_tuning import EVENTS_DIR, _throttle, import_handler, load_events, replay_calls
+from backend.utils.function_profiles import cpu_share  # noqa: E402
+
+FUNCTIONS = ["GetSongLambda", "GenerateDownloadUrlLambda", "RecordListenLambda"]
+
+
+def run_child(args):
+    spec_file = load_events(args.events)
+    invocation = spec_file["invocations"][0]
+    recorded = {}
+    replay_calls(recorded, args.rtt_ms / 1000, args.connect_ms / 1000)
+    if args.primed:
+        os.environ["PRIME_ON_INIT"] = "true"
+
+    timings = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        handler = import_handler(spec_file)
+        timings["init_ms"] = (time.perf_counter() - started) * 1000
+
+    # Roditelj od ove linije ogranicava CPU
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in ("first_ms", "warm_ms"):
+            recorded.clear()
+            recorded.update(copy.deepcopy(invocation.get("responses", {})))
+            started = time.perf_counter()
+            result = handler(copy.deepcopy(invocation["event"]), None)
+            timings[name] = (time.perf_counter() - started) * 1000
+            assert result["statusCode"] < 300, result
+
+    with open(args.output, "w") as f:
+        json.dump(timings, f)
+
+
+def measure(function_id, primed, args):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as out:
+        output = out.name
+    command = [
+        sys.executable, __file__, "--child", os.path.join(EVENTS_DIR, f"{function_id}.json"),
+        "--output", output, "--rtt-ms", str(args.rtt_ms), "--connect-ms", str(args.connect_ms)
+    ]
+    if primed:
+        command.append("--primed")
+    try:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        process.stdout.readline()
+        process.stdin.write("go\n")
+        process.stdin.flush()
+        share = cpu_share(args.memory)
+        if share < 1:
+            _throttle(process, share)
+        if process.wait() != 0:
+            raise RuntimeError(f"{function_id} failed")
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.unlink(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("functions", nargs="*", default=FUNCTIONS)
+    parser.add_argument("--memory", type=int, default=128, help="CPU share after init, as Lambda memory MB")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--rtt-ms", type=float, default=5, help="simulated round trip per AWS call")
+    parser.add_argument("--connect-ms", type=float, default=40, help="simulated DNS + TLS for a new connection")
+    parser.add_argument("--child", metavar="EVENTS", dest="events", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    parser.add_argument("--primed", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.events:
+        run_child(args)
+        return
+
+    print(f"{'function':<28}{'mode':<8}{'init ms':>10}{'first ms':>10}{'warm ms':>10}")
+    for function_id in args.functions:
+        for primed in (False, True):
+            runs = [measure(function_id, primed, args) for _ in range(args.runs)]
+            medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            print(f"{function_id:<28}{'primed' if primed else 'cold':<8}"
+                  f"{medians['init_ms']:>10.1f}{medians['first_ms']:>10.1f}{medians['warm_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Local latency benchmark for GET /songs/{id} with a simulated DynamoDB delay.
+
+Loads lambda/getSong/handler.py with in-memory tables whose every call sleeps
+--delay milliseconds, then times the handler in four modes. The first three
+miss SongView and take the fallback join over the source tables:
+
+    serial    FANOUT_MAX_WORKERS=1 and no genre hints: one Id-index query for
+              the album and one per artist, back to back (the old behaviour)
+    parallel  the same calls issued on the fan-out pool
+    hinted    genre hints present: one BatchGetItem for the album next to one
+              for all artists
+    warm      hinted, on a warm container: albums and artists come from the
+              catalog cache after one CatalogVersion read
+    view      the song is in SongView: a single GetItem
+
+Except in warm mode, the catalog cache is emptied before every invocation.
+
+    python scripts/benchmark_song_fanout.py --artists 5 --delay 15 --runs 30
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(BACKEND_DIR, "lambda", "layers", "common", "python"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+
+from common import catalog_cache, concurrency  # noqa: E402
+from common.song_view import build_view  # noqa: E402
+
+
+class FakeClient:
+    def __init__(self, tables, delay):
+        self.tables = tables
+        self.delay = delay
+        self.calls = 0
+        # Stands in for the DynamoDB resource as well, whose meta.client is what gets called
+        self.meta = SimpleNamespace(client=self)
+
+    def _wait(self):
+        self.calls += 1
+        time.sleep(self.delay)
+
+    def query(self, TableName, IndexName=None, KeyConditionExpression=None, **kwargs):
+        self._wait()
+        entity_id = KeyConditionExpression.get_expression()["values"][1]
+        item = self.tables[TableName].get(entity_id)
+        return {"Items": [item] if item else []}
+
+    def get_item(self, TableName, Key, ConsistentRead=False):
+        self._wait()
+        item = self.tables[TableName].get(Key["Id"])
+        return {"Item": item} if item else {}
+
+    def batch_get_item(self, RequestItems):
+        self._wait()
+        responses = {
+            name: [self.tables[name][k["Id"]] for k in request["Keys"] if k["Id"] in self.tables[name]]
+            for name, request in RequestItems.items()
+        }
+        return {"Responses": responses}
+
+
+class FakeTable:
+    def __init__(self, name, client):
+        self.name = name
+        self.meta = SimpleNamespace(client=client)
+
+    def query(self, **kwargs):
+        return self.meta.client.query(TableName=self.name, **kwargs)
+
+
+def build_catalog(artist_count, hinted, materialized):
+    artist_ids = [f"ar{i}" for i in range(artist_count)]
+    song = {"Album": "al1", "Id": "s1", "title": "Song", "artists": artist_ids}
+    if hinted:
+        song["AlbumGenre"] = "rock"
+        song["ArtistGenres"] = {a: "rock" for a in artist_ids}
+    album = {"Genre": "rock", "Id": "al1", "title": "Album", "artists": artist_ids}
+    artists = {a: {"Genre": "rock", "Id": a, "name": a} for a in artist_ids}
+    return {
+        "Songs": {"s1": song},
+        "Albums": {"al1": album},
+        "Artists": artists,
+        "SongView": {"s1": build_view(song, album, artists)} if materialized else {},
+        "CatalogVersion": {"catalog": {"Id": "catalog", "Version": 1}},
+    }
+
+
+def load_handler():
+    os.environ.update({
+        "SONGS_TABLE": "Songs", "ALBUMS_TABLE": "Albums", "ARTISTS_TABLE": "Artists", "SONG_VIEW_TABLE": "SongView",
+        "CATALOG_VERSION_TABLE": "CatalogVersion"
+    })
+    spec = importlib.util.spec_from_file_location(
+        "getSong_handler", os.path.join(BACKEND_DIR, "lambda", "getSong", "handler.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(handler, mode, args):
+    catalog = build_catalog(args.artists, hinted=mode in ("hinted", "warm"), materialized=mode == "view")
+    client = FakeClient(catalog, args.delay / 1000)
+    handler.dynamodb = client
+    handler.songs_table = FakeTable("Songs", client)
+    handler.albums_table = FakeTable("Albums", client)
+    handler.artist_table = FakeTable("Artists", client)
+    handler.song_view_table = FakeTable("SongView", client)
+    handler.catalog_version_table = FakeTable("CatalogVersion", client)
+    catalog_cache.clear()
+    concurrency.MAX_WORKERS = 1 if mode == "serial" else args.workers
+
+    event = {"pathParameters": {"id": "s1"}}
+    timings = []
+    for _ in range(args.runs):
+        if mode != "warm":
+            catalog_cache.clear()
+        client.calls = 0
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = handler.lambda_handler(event, None)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response["statusCode"] == 200, response
+    timings.sort()
+    return {
+        "mode": mode,
+        "calls": client.calls,
+        "p50": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artists", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=15, help="simulated latency per DynamoDB call, ms")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=concurrency.MAX_WORKERS)
+    args = parser.parse_args()
+
+    handler = load_handler()
+    results = [run(handler, mode, args) for mode in ("serial", "parallel", "hinted", "warm", "view")]
+
+    baseline = results[0]["p50"]
+    print(f"{'mode':<10}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'speedup':>10}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['calls']:>7}{r['p50']:>10.1f}{r['p95']:>10.1f}{baseline / r['p50']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Local power tuning: replay recorded events at the CPU share of each memory size.
+
+Lambda gives a function CPU in proportion to its memory, one full vCPU at
+1769 MB. For every function with an events file and every --memory size, this
+script starts the handler in a fresh child process and holds the child to
+memory/1769 of one CPU with SIGSTOP/SIGCONT in 20 ms periods. It then replays
+the recorded invocations --runs times and prints latency and cost per size.
+The recommendation is the cheapest size whose warm p95 meets --target-ms.
+
+    python scripts/power_tuning.py --target-ms 200
+    python scripts/power_tuning.py UploadFileLambda --memory 256 512 1024 1769 --runs 20
+
+scripts/tuning_events/<FunctionId>.json holds one function's recordings:
+
+    {"code": "lambda/getSongRating",
+     "invocations": [{"event": {...}, "responses": {"GetItem": {"Item": {...}}}}]}
+
+"handler" overrides the entry point, handler.lambda_handler by default.
+
+AWS calls never leave the child. Every botocore call sleeps --io-ms and then
+returns the recorded response for its operation: a list is consumed in order,
+a single response is repeated, and an unrecorded operation gets {}. Responses
+are plain JSON, the way the boto3 resource layer returns items.
+{{base64:N}} anywhere in the file becomes N random bytes in base64, so upload
+events do not have to be checked in at full size.
+
+The first pass over the invocations runs on a cold child: module import plus
+first call, reported as cold. Later passes are the warm samples. The numbers
+come from this machine's CPU, so compare sizes with each other, not with
+Lambda's billed durations. POSIX only (SIGSTOP).
+"""
+import argparse
+import base64
+import contextlib
+import copy
+import importlib.util
+import io
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+EVENTS_DIR = os.path.join(BACKEND_DIR, "scripts", "tuning_events")
+COMMON_LAYER_DIR = os.path.join(BACKEND_DIR, "lambda", "layers", "common", "python")
+sys.path.insert(0, BACKEND_DIR)
+
+from backend.utils.function_profiles import cpu_share, invocation_cost, profile_for, recommend  # noqa: E402
+
+PERIOD = 0.02
+DEFAULT_MEMORY = [128, 256, 512, 1024, 1769]
+
+_PLACEHOLDER = re.compile(r"\{\{base64:(\d+)\}\}")
+# os.environ["X"] i os.environ.get("X") bez podrazumevane vrednosti
+_ENV_NAME = re.compile(r"os\.environ(?:\[[\"'](\w+)[\"']\]|\.get\([\"'](\w+)[\"']\))")
+
+
+def load_events(path):
+    with open(path) as f:
+        raw = f.read()
+    return json.loads(_PLACEHOLDER.sub(lambda m: base64.b64encode(os.urandom(int(m.group(1)))).decode(), raw))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+# Child: import the handler, replay the invocations, write the timings to --output
+
+def replay_calls(recorded, io_seconds, connect_seconds=0):
+    """Answer every botocore call from recorded, after simulated network time.
+
+    The first call to each endpoint (S3: each bucket) also waits
+    connect_seconds, the DNS lookup and TLS handshake of a new connection.
+    """
+    from botocore.client import BaseClient
+    connected = set()
+
+    def _make_api_call(client, operation_name, api_params):
+        host = (client.meta.endpoint_url, api_params.get("Bucket"))
+        if host not in connected:
+            connected.add(host)
+            time.sleep(connect_seconds)
+        time.sleep(io_seconds)
+        response = recorded.get(operation_name, {})
+        if isinstance(response, list):
+            response = response.pop(0) if response else {}
+        return copy.deepcopy(response)
+
+    BaseClient._make_api_call = _make_api_call
+
+
+def import_handler(spec_file):
+    """Import the recorded function's handler module; returns its entry point."""
+    code_dir = os.path.join(BACKEND_DIR, spec_file["code"])
+    module_name, function_name = spec_file.get("handler", "handler.lambda_handler").rsplit(".", 1)
+    handler_file = os.path.join(code_dir, f"{module_name}.py")
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "tuning")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "tuning")
+    with open(handler_file) as f:
+        for names in _ENV_NAME.findall(f.read()):
+            name = "".join(names)
+            os.environ.setdefault(name, name)
+    sys.path[:0] = [code_dir, COMMON_LAYER_DIR]
+
+    spec = importlib.util.spec_from_file_location(module_name, handler_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, function_name)
+
+
+def run_child(args):
+    spec_file = load_events(args.events)
+    recorded = {}
+    replay_calls(recorded, args.io_ms / 1000)
+
+    cold, warm = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        handler = import_handler(spec_file)
+        init_ms = (time.perf_counter() - started) * 1000
+
+        for run in range(args.runs + 1):
+            for invocation in spec_file["invocations"]:
+                recorded.clear()
+                recorded.update(copy.deepcopy(invocation.get("responses", {})))
+                started = time.perf_counter()
+                handler(copy.deepcopy(invocation["event"]), None)
+                elapsed = (time.perf_counter() - started) * 1000
+                (cold if run == 0 else warm).append(elapsed)
+
+    with open(args.output, "w") as f:
+        json.dump({"init_ms": init_ms, "cold": cold, "warm": warm}, f)
+
+
+# Parent: start one child per memory size and throttle it
+
+def _throttle(process, share):
+    running = PERIOD * share
+    try:
+        while process.poll() is None:
+            time.sleep(running)
+            os.kill(process.pid, signal.SIGSTOP)
+            time.sleep(PERIOD - running)
+            os.kill(process.pid, signal.SIGCONT)
+    except ProcessLookupError:
+        pass
+
+
+def measure(events_path, memory, args):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as out:
+        output = out.name
+    try:
+        process = subprocess.Popen([
+            sys.executable, __file__, "--child", events_path, "--output", output,
+            "--runs", str(args.runs), "--io-ms", str(args.io_ms)
+        ])
+        share = cpu_share(memory)
+        if share < 1:
+            _throttle(process, share)
+        if process.wait() != 0:
+            raise RuntimeError(f"handler failed at {memory} MB")
+        with open(output) as f:
+            timings = json.load(f)
+    finally:
+        os.unlink(output)
+
+    return {
+        "cold_ms": timings["init_ms"] + timings["cold"][0],
+        "mean_ms": sum(timings["warm"]) / len(timings["warm"]),
+        "p95_ms": percentile(timings["warm"], 0.95),
+    }
+
+
+def tune(function_id, args):
+    events_path = os.path.join(EVENTS_DIR, f"{function_id}.json")
+    profile = profile_for(function_id)
+    architecture = profile["architecture"]
+    results = {memory: measure(events_path, memory, args) for memory in args.memory}
+
+    print(f"\n{function_id} ({architecture}, now {profile['memory']} MB)")
+    print(f"{'memory':>8}{'cold ms':>10}{'mean ms':>10}{'p95 ms':>10}{'$/1M':>10}")
+    for memory, r in results.items():
+        cost = invocation_cost(memory, r["mean_ms"], architecture) * 1_000_000
+        print(f"{memory:>8}{r['cold_ms']:>10.1f}{r['mean_ms']:>10.1f}{r['p95_ms']:>10.1f}{cost:>10.3f}")
+
+    memory, cost = recommend(results, args.target_ms, architecture)
+    if memory is None:
+        print(f"  no size meets p95 <= {args.target_ms} ms")
+    else:
+        print(f"  recommended: {memory} MB, ${cost * 1_000_000:.3f} per 1M invocations")
+    return memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("functions", nargs="*", help="function IDs, default every file in scripts/tuning_events")
+    parser.add_argument("--memory", type=int, nargs="+", default=DEFAULT_MEMORY)
+    parser.add_argument("--runs", type=int, default=10, help="warm passes over the recorded invocations")
+    parser.add_argument("--io-ms", type=float, default=10, help="simulated latency per AWS call, ms")
+    parser.add_argument("--target-ms", type=float, default=200, help="warm p95 latency target, ms")
+    parser.add_argument("--child", metavar="EVENTS", dest="events", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.events:
+        run_child(args)
+        return
+
+    functions = args.functions or sorted(
+        name[:-len(".json")] for name in os.listdir(EVENTS_DIR) if name.endswith(".json")
+    )
+    for function_id in functions:
+        tune(function_id, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Backfill and check the SongView read model.
+
+SongView is kept current by the syncSongView stream consumer, which only sees
+writes made after it was deployed. `backfill` rebuilds a view item for every
+song, `check` rebuilds them in memory and reports view items that are missing,
+stale or orphaned (no longer backed by a song); with --repair it also fixes them.
+
+    python scripts/song_view.py backfill --songs <table> --albums <table> \\
+        --artists <table> --song-view <table>
+    python scripts/song_view.py check ... [--repair]
+"""
+import argparse
+import os
+import sys
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lambda", "layers", "common", "python"))
+from common.hydration import batch_get  # noqa: E402
+from common.song_view import build_views  # noqa: E402
+
+CHUNK_SIZE = 100
+
+
+def scan_all(table, **kwargs):
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get("Items", [])
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def song_chunks(songs_table):
+    chunk = []
+    for song in scan_all(songs_table):
+        chunk.append(song)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def backfill(dynamodb, tables, dry_run):
+    written = 0
+    with tables["song_view"].batch_writer(overwrite_by_pkeys=["Id"]) as batch:
+        for songs in song_chunks(tables["songs"]):
+            views = build_views(dynamodb, tables["albums"], tables["artists"], songs)
+            if not dry_run:
+                for view in views:
+                    batch.put_item(Item=view)
+            written += len(views)
+    print(f"{'would write' if dry_run else 'wrote'} {written} SongView items")
+
+
+def check(dynamodb, tables, repair):
+    view_table = tables["song_view"]
+    song_ids = set()
+    missing = stale = 0
+
+    with view_table.batch_writer(overwrite_by_pkeys=["Id"]) as batch:
+        for songs in song_chunks(tables["songs"]):
+            expected = build_views(dynamodb, tables["albums"], tables["artists"], songs)
+            stored = {
+                view["Id"]: view
+                for view in batch_get(dynamodb, view_table.name, [{"Id": song["Id"]} for song in songs])
+            }
+            for view in expected:
+                song_ids.add(view["Id"])
+                current = stored.get(view["Id"])
+                if current == view:
+                    continue
+                if current is None:
+                    missing += 1
+                    print(f"missing  {view['Id']}")
+                else:
+                    stale += 1
+                    changed = sorted(k for k in set(view) | set(current) if view.get(k) != current.get(k))
+                    print(f"stale    {view['Id']}: {', '.join(changed)}")
+                if repair:
+                    batch.put_item(Item=view)
+
+        orphaned = 0
+        for view in scan_all(view_table, ProjectionExpression="Id"):
+            if view["Id"] not in song_ids:
+                orphaned += 1
+                print(f"orphaned {view['Id']}")
+                if repair:
+                    batch.delete_item(Key={"Id": view["Id"]})
+
+    print(f"{len(song_ids)} songs: {missing} missing, {stale} stale, {orphaned} orphaned"
+          + (" (repaired)" if repair else ""))
+    return missing + stale + orphaned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["backfill", "check"])
+    parser.add_argument("--songs", required=True)
+    parser.add_argument("--albums", required=True)
+    parser.add_argument("--artists", required=True)
+    parser.add_argument("--song-view", required=True)
+    parser.add_argument("--dry-run", action="store_true", help="backfill: only count the items")
+    parser.add_argument("--repair", action="store_true", help="check: rewrite bad items and delete orphans")
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource("dynamodb")
+    tables = {
+        "songs": dynamodb.Table(args.songs),
+        "albums": dynamodb.Table(args.albums),
+        "artists": dynamodb.Table(args.artists),
+        "song_view": dynamodb.Table(args.song_view),
+    }
+
+    if args.command == "backfill":
+        backfill(dynamodb, tables, args.dry_run)
+    elif check(dynamodb, tables, args.repair) and not args.repair:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Run the HLS transcode worker on a local file, without AWS.
+
+Encodes every rendition in common.hls with the same ffmpeg command and
+bandwidth measurement as lambda/transcodeRendition, one rendition at a
+time, then writes master.m3u8. Needs ffmpeg with libopus on PATH (or
+FFMPEG_PATH). The output plays in Safari, or with ffplay:
+
+    python scripts/transcode_hls.py song.flac /tmp/song-hls
+    ffplay /tmp/song-hls/master.m3u8
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "lambda", "layers", "common", "python"))
+from common.hls import MASTER_PLAYLIST, RENDITIONS_BY_NAME, master_playlist  # noqa: E402
+
+
+def load_worker():
+    os.environ.setdefault("BUCKET_NAME", "local")
+    spec = importlib.util.spec_from_file_location(
+        "transcode_rendition", os.path.join(BACKEND_DIR, "lambda", "transcodeRendition", "handler.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source")
+    parser.add_argument("output")
+    parser.add_argument("--renditions", nargs="+", choices=list(RENDITIONS_BY_NAME), default=list(RENDITIONS_BY_NAME))
+    args = parser.parse_args()
+
+    worker = load_worker()
+    results = []
+    for name in args.renditions:
+        out_dir = os.path.join(args.output, name)
+        os.makedirs(out_dir, exist_ok=True)
+        result = worker.transcode(args.source, out_dir, RENDITIONS_BY_NAME[name])
+        print(f"{name:<10} peak {result['bandwidth']:>8} bps  average {result['averageBandwidth']:>8} bps")
+        results.append(result)
+
+    with open(os.path.join(args.output, MASTER_PLAYLIST), "w") as f:
+        f.write(master_playlist(results))
+    print(os.path.join(args.output, MASTER_PLAYLIST))
+
+
+if __name__ == "__main__":
+    main()
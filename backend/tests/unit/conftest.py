@@ -0,0 +1,41 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LAMBDA_DIR = os.path.join(BACKEND_DIR, "lambda")
+
+sys.path.insert(0, os.path.join(LAMBDA_DIR, "layers", "common", "python"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+@pytest.fixture
+def load_handler(monkeypatch):
+    """Import lambda/<name>/handler.py as a fresh module with the given environment."""
+    def _load(name, environment):
+        for key, value in environment.items():
+            monkeypatch.setenv(key, value)
+        spec = importlib.util.spec_from_file_location(
+            f"{name}_handler", os.path.join(LAMBDA_DIR, name, "handler.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return _load
+
+
+@pytest.fixture(autouse=True)
+def serial_fanout(monkeypatch):
+    """Run common.concurrency fan-out inline so Stubber sees calls in a fixed order."""
+    monkeypatch.setattr("common.concurrency.MAX_WORKERS", 1)
+
+
+@pytest.fixture(autouse=True)
+def empty_catalog_cache():
+    """Every test starts from a cold container."""
+    from common import catalog_cache
+    catalog_cache.clear()
@@ -0,0 +1,113 @@
+import json
+
+from botocore.stub import ANY, Stubber
+
+ENV = {
+    "SONGS_TABLE": "Songs",
+    "ALBUMS_TABLE": "Albums",
+    "ARTISTS_TABLE": "Artists",
+    "ARTIST_SONG_TABLE": "ArtistSong",
+    "ARTIST_ALBUM_TABLE": "ArtistAlbum",
+    "CATALOG_VERSION_TABLE": "CatalogVersion",
+    "ARTIST_DELETION_QUEUE_URL": "https://sqs.eu-central-1.amazonaws.com/123456789012/ArtistDeletionQueue",
+}
+
+
+def _album(album_id, artists):
+    return {"Genre": {"S": "rock"}, "Id": {"S": album_id}, "artists": {"L": [{"S": a} for a in artists]}}
+
+
+def test_delete_marks_the_artist_and_queues_the_cascade(load_handler):
+    handler = load_handler("deleteArtist", ENV)
+    event = {
+        "requestContext": {"authorizer": {"claims": {"custom:role": "admin"}}},
+        "pathParameters": {"id": "ar1"},
+    }
+
+    with Stubber(handler.artists_table.meta.client) as dynamodb, Stubber(handler.sqs) as sqs:
+        dynamodb.add_response("query", {"Items": [{"Genre": {"S": "rock"}, "Id": {"S": "ar1"}}]})
+        dynamodb.add_response("update_item", {})
+        sqs.add_response("send_message", {"MessageId": "m1"}, {
+            "QueueUrl": ENV["ARTIST_DELETION_QUEUE_URL"],
+            "MessageBody": json.dumps({"artistId": "ar1", "genre": "rock", "phase": "albums"})
+        })
+        dynamodb.add_response("update_item", {})
+
+        response = handler.lambda_handler(event, None)
+        dynamodb.assert_no_pending_responses()
+        sqs.assert_no_pending_responses()
+
+    assert response["statusCode"] == 202
+    assert json.loads(response["body"])["cascade"]["status"] == "running"
+
+
+def test_repeated_delete_requeues_a_cascade_without_progress(load_handler):
+    handler = load_handler("deleteArtist", ENV)
+    event = {
+        "requestContext": {"authorizer": {"claims": {"custom:role": "admin"}}},
+        "pathParameters": {"id": "ar1"},
+    }
+
+    def artist(albums):
+        return {"Items": [{"Genre": {"S": "rock"}, "Id": {"S": "ar1"}, "deleted": {"S": "true"}, "Cascade": {"M": {
+            "status": {"S": "running"}, "albums": {"N": str(albums)}, "songs": {"N": "0"}
+        }}}]}
+
+    with Stubber(handler.artists_table.meta.client) as dynamodb, Stubber(handler.sqs) as sqs:
+        # Oznaceno, ali poruka nije stigla do reda: ponovljen DELETE je salje opet
+        dynamodb.add_response("query", artist(0))
+        sqs.add_response("send_message", {"MessageId": "m1"}, {
+            "QueueUrl": ENV["ARTIST_DELETION_QUEUE_URL"],
+            "MessageBody": json.dumps({"artistId": "ar1", "genre": "rock", "phase": "albums"})
+        })
+        assert handler.lambda_handler(event, None)["statusCode"] == 202
+        sqs.assert_no_pending_responses()
+
+        # Kaskada koja napreduje se samo prijavljuje
+        dynamodb.add_response("query", artist(3))
+        assert handler.lambda_handler(event, None)["statusCode"] == 202
+        dynamodb.assert_no_pending_responses()
+
+
+def test_cascade_detaches_one_page_with_batched_reads_and_deletes(load_handler):
+    handler = load_handler("cascadeArtistDeletion", ENV)
+    message = {"artistId": "ar1", "genre": "rock", "phase": "albums"}
+    links = [
+        {"ArtistId": {"S": "ar1"}, "AlbumId": {"S": "al1"}, "AlbumGenre": {"S": "rock"}},
+        {"ArtistId": {"S": "ar1"}, "AlbumId": {"S": "al2"}, "AlbumGenre": {"S": "rock"}},
+    ]
+
+    with Stubber(handler.artists_table.meta.client) as dynamodb, Stubber(handler.sqs) as sqs:
+        dynamodb.add_response("query", {"Items": links})
+        dynamodb.add_response("batch_get_item", {"Responses": {"Albums": [
+            _album("al1", ["ar1", "ar2"]), _album("al2", ["ar1"])
+        ]}})
+        # al1 zadrzava drugog umetnika, al2 je bio samo njegov
+        dynamodb.add_response("update_item", {}, {
+            "TableName": "Albums", "Key": {"Genre": "rock", "Id": "al1"},
+            "UpdateExpression": "SET artists = :a", "ExpressionAttributeValues": {":a": ["ar2"]}
+        })
+        dynamodb.add_response("update_item", {}, {
+            "TableName": "Albums", "Key": {"Genre": "rock", "Id": "al2"},
+            "UpdateExpression": "SET deleted = :val REMOVE ActiveShard", "ExpressionAttributeValues": {":val": "true"}
+        })
+        dynamodb.add_response("batch_write_item", {"UnprocessedItems": {}})
+        dynamodb.add_response("update_item", {}, {
+            "TableName": "Artists", "Key": {"Genre": "rock", "Id": "ar1"},
+            "UpdateExpression": "SET Cascade.#phase = Cascade.#phase + :n",
+            "ExpressionAttributeNames": {"#phase": "albums"}, "ExpressionAttributeValues": {":n": 2}
+        })
+        sqs.add_response("send_message", {"MessageId": "m2"}, {
+            "QueueUrl": ENV["ARTIST_DELETION_QUEUE_URL"], "MessageBody": ANY
+        })
+
+        handler.lambda_handler({"Records": [{"body": json.dumps(message)}]}, None)
+        dynamodb.assert_no_pending_responses()
+        sqs.assert_no_pending_responses()
+
+        # Prazna poslednja faza zavrsava kaskadu
+        dynamodb.add_response("query", {"Items": []})
+        dynamodb.add_response("update_item", {})
+        dynamodb.add_response("update_item", {})
+        handler.lambda_handler({"Records": [{"body": json.dumps({**message, "phase": "songs"})}]}, None)
+        dynamodb.assert_no_pending_responses()
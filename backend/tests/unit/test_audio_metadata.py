@@ -0,0 +1,116 @@
+import io
+import struct
+import wave
+
+import pytest
+
+from common.audio_metadata import RangedReader, UnsupportedAudio, extract
+
+
+def _read(data):
+    reader = RangedReader(lambda start, end: data[start:end + 1], len(data))
+    return reader, len(data)
+
+
+def _wav(seconds, rate=44100, channels=2, width=2):
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(width)
+        w.setframerate(rate)
+        w.writeframes(b"\0" * int(seconds * rate) * channels * width)
+    return out.getvalue()
+
+
+def _flac(total_samples, rate=48000, channels=2, bits=24):
+    packed = (rate << 44) | ((channels - 1) << 41) | ((bits - 1) << 36) | total_samples
+    streaminfo = struct.pack(">HH", 4096, 4096) + b"\0" * 6 + packed.to_bytes(8, "big") + b"\0" * 16
+    return b"fLaC" + bytes([0x80, 0, 0, 34]) + streaminfo + b"\0" * 1000
+
+
+def _id3(length):
+    syncsafe = bytes([(length >> 21) & 0x7F, (length >> 14) & 0x7F, (length >> 7) & 0x7F, length & 0x7F])
+    return b"ID3\x03\x00\x00" + syncsafe + b"\0" * length
+
+
+# MPEG1 Layer III, 128 kbps, 44.1 kHz, stereo: 417 bajtova po frame-u bez padding-a
+MP3_HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+
+
+def _mp3_frames(count, first=None):
+    frame = MP3_HEADER + b"\0" * 413
+    return (first or frame) + frame * (count - 1)
+
+
+def _xing_frame(frames):
+    body = bytearray(413)
+    body[32:44] = b"Xing" + struct.pack(">II", 0x01, frames)
+    return MP3_HEADER + bytes(body)
+
+
+def test_wav_duration_from_fmt_and_data_chunks():
+    reader, size = _read(_wav(2.5, rate=22050, channels=1))
+
+    info = extract(reader, size)
+
+    assert info["format"] == "wav" and info["fileType"] == "audio/wav"
+    assert info["duration"] == pytest.approx(2.5)
+    assert (info["sampleRate"], info["channels"], info["bitrate"]) == (22050, 1, 22050 * 16)
+
+
+def test_flac_duration_from_streaminfo():
+    reader, size = _read(_flac(48000 * 200 + 24000))
+
+    info = extract(reader, size)
+
+    assert info["duration"] == pytest.approx(200.5)
+    assert (info["sampleRate"], info["channels"]) == (48000, 2)
+
+
+def test_cbr_mp3_after_id3_tag():
+    data = _id3(5000) + _mp3_frames(1000)
+    reader, size = _read(data)
+
+    info = extract(reader, size)
+
+    assert info["format"] == "mp3"
+    assert info["duration"] == pytest.approx(1000 * 417 * 8 / 128000)
+    assert (info["bitrate"], info["sampleRate"], info["channels"]) == (128000, 44100, 2)
+
+
+def test_vbr_mp3_uses_xing_frame_count_not_file_size():
+    # Xing kaze 10000 frame-ova, fajl ima samo 50: trajanje se ne racuna iz velicine
+    reader, size = _read(_mp3_frames(50, first=_xing_frame(10000)))
+
+    info = extract(reader, size)
+
+    assert info["duration"] == pytest.approx(10000 * 1152 / 44100)
+
+
+def test_large_file_is_read_with_a_few_ranged_gets():
+    data = _wav(60)  # ~10 MB
+    reader, size = _read(data)
+
+    extract(reader, size)
+
+    assert reader.fetches == 1
+
+
+def test_garbage_is_rejected():
+    reader, size = _read(b"\x00\xff\x13" * 5000)
+
+    with pytest.raises(UnsupportedAudio):
+        extract(reader, size)
+
+
+@pytest.mark.parametrize("data", [
+    _wav(1)[:26],
+    _flac(48000)[:20],
+    MP3_HEADER + b"\0" * 32 + b"Xing",
+    MP3_HEADER + b"\0" * 32 + b"Xing" + struct.pack(">I", 0x01),
+], ids=["wav", "flac", "mp3-xing", "mp3-xing-flags"])
+def test_truncated_headers_are_unsupported_not_struct_errors(data):
+    reader, size = _read(data)
+
+    with pytest.raises(UnsupportedAudio):
+        extract(reader, size)
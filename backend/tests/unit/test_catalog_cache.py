@@ -0,0 +1,136 @@
+from botocore.stub import Stubber
+
+from common import catalog_cache
+
+ENV = {
+    "ARTISTS_TABLE": "Artists",
+    "ARTIST_ALBUM_TABLE": "ArtistAlbum",
+    "ALBUMS_TABLE": "Albums",
+    "CATALOG_VERSION_TABLE": "CatalogVersion",
+}
+
+EVENT = {"pathParameters": {"id": "ar1"}}
+
+
+def _version(n):
+    return {"Item": {"Id": {"S": "catalog"}, "Version": {"N": str(n)}}}
+
+
+def _add_cold_reads(stub):
+    stub.add_response("query", {"Items": [{"Genre": {"S": "rock"}, "Id": {"S": "ar1"}}]})
+    stub.add_response("query", {"Items": [
+        {"ArtistId": {"S": "ar1"}, "AlbumId": {"S": f"al{i}"}, "AlbumGenre": {"S": "rock"}} for i in range(3)
+    ]})
+    stub.add_response("batch_get_item", {"Responses": {"Albums": [
+        {"Genre": {"S": "rock"}, "Id": {"S": f"al{i}"}} for i in range(3)
+    ]}})
+
+
+def _add_warm_reads(stub):
+    # Only the ArtistAlbum mapping is read, the artist and its albums come from the cache
+    stub.add_response("query", {"Items": [
+        {"ArtistId": {"S": "ar1"}, "AlbumId": {"S": f"al{i}"}, "AlbumGenre": {"S": "rock"}} for i in range(3)
+    ]})
+
+
+def test_warm_invocation_skips_entity_reads(load_handler):
+    handler = load_handler("getArtistById", ENV)
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response("get_item", _version(1))
+        _add_cold_reads(stub)
+        stub.add_response("get_item", _version(1))
+        _add_warm_reads(stub)
+
+        first = handler.lambda_handler(EVENT, None)
+        second = handler.lambda_handler(EVENT, None)
+        stub.assert_no_pending_responses()
+
+    assert first["body"] == second["body"]
+
+
+def test_version_bump_drops_the_cache(load_handler):
+    handler = load_handler("getArtistById", ENV)
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response("get_item", _version(1))
+        _add_cold_reads(stub)
+        stub.add_response("get_item", _version(2))
+        _add_cold_reads(stub)
+
+        handler.lambda_handler(EVENT, None)
+        handler.lambda_handler(EVENT, None)
+        stub.assert_no_pending_responses()
+
+
+def test_update_artist_bumps_the_catalog_version(load_handler):
+    handler = load_handler("updateArtist", {"ARTISTS_TABLE": "Artists", "CATALOG_VERSION_TABLE": "CatalogVersion"})
+    event = {
+        "requestContext": {"authorizer": {"claims": {"custom:role": "admin"}}},
+        "pathParameters": {"id": "ar1"},
+        "body": '{"name": "New name"}',
+    }
+
+    with Stubber(handler.table.meta.client) as stub:
+        stub.add_response("query", {"Items": [{"Genre": {"S": "rock"}, "Id": {"S": "ar1"}}]})
+        stub.add_response("update_item", {"Attributes": {"Id": {"S": "ar1"}, "name": {"S": "New name"}}})
+        stub.add_response(
+            "update_item", {},
+            {
+                "TableName": "CatalogVersion",
+                "Key": {"Id": "catalog"},
+                "UpdateExpression": "ADD Version :one",
+                "ExpressionAttributeValues": {":one": 1},
+            }
+        )
+        response = handler.lambda_handler(event, None)
+        stub.assert_no_pending_responses()
+
+    assert response["statusCode"] == 200
+
+
+def test_deleting_the_last_song_of_an_album_bumps_the_catalog_version(load_handler):
+    handler = load_handler("deleteSong", {
+        "SONGS_TABLE": "Songs", "ALBUMS_TABLE": "Albums", "CATALOG_VERSION_TABLE": "CatalogVersion"
+    })
+    event = {
+        "requestContext": {"authorizer": {"claims": {"custom:role": "admin"}}},
+        "pathParameters": {"id": "s1"},
+    }
+
+    with Stubber(handler.songs_table.meta.client) as stub:
+        stub.add_response("query", {"Items": [{"Album": {"S": "al1"}, "Id": {"S": "s1"}}]})
+        stub.add_response("update_item", {})
+        stub.add_response("query", {"Items": [], "Count": 0})
+        stub.add_response("query", {"Items": [{"Genre": {"S": "rock"}, "Id": {"S": "al1"}}]})
+        stub.add_response("update_item", {})
+        stub.add_response(
+            "update_item", {},
+            {
+                "TableName": "CatalogVersion",
+                "Key": {"Id": "catalog"},
+                "UpdateExpression": "ADD Version :one",
+                "ExpressionAttributeValues": {":one": 1},
+            }
+        )
+        response = handler.lambda_handler(event, None)
+        stub.assert_no_pending_responses()
+
+    assert response["statusCode"] == 200
+
+
+def test_lru_ttl_cache_evicts_oldest_and_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(catalog_cache.time, "monotonic", lambda: now[0])
+    cache = catalog_cache.LruTtlCache(max_entries=2, ttl=60)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] += 61
+    assert cache.get("a") is None
+    assert len(cache) == 1
@@ -0,0 +1,75 @@
+from botocore.stub import Stubber
+
+from common.snapshots import encode_snapshot
+
+ENV = {"SONG_VIEW_TABLE": "SongView", "BUCKET_NAME": "music"}
+BUILDER_ENV = {
+    "SONG_VIEW_TABLE": "SongView",
+    "ALBUMS_TABLE": "Albums",
+    "ARTISTS_TABLE": "Artists",
+    "BUCKET_NAME": "music",
+}
+
+
+def _event(headers=None):
+    return {
+        "requestContext": {"authorizer": {"claims": {"custom:role": "user"}}},
+        "queryStringParameters": None,
+        "headers": headers or {},
+    }
+
+
+def _etag(items):
+    return encode_snapshot(items)[1]
+
+
+def test_full_list_is_served_from_the_snapshot(load_handler):
+    handler = load_handler("getSongs", ENV)
+    etag = _etag([{"Id": "s1", "title": "One"}])
+
+    # Telo snapshot-a ne prolazi kroz Lambda, klijent se preusmerava na objekat
+    with Stubber(handler.s3) as s3_stub, Stubber(handler.dynamodb.meta.client) as stub:
+        s3_stub.add_response("head_object", {"Metadata": {"etag": etag}}, {
+            "Bucket": "music", "Key": "catalog/songs.json.gz"
+        })
+
+        response = handler.lambda_handler(_event(), None)
+        s3_stub.assert_no_pending_responses()
+        stub.assert_no_pending_responses()
+
+    assert response["statusCode"] == 302
+    assert response["body"] == ""
+    assert response["headers"]["ETag"] == etag
+    location = response["headers"]["Location"]
+    assert location.startswith("https://music.s3.") and "/catalog/songs.json.gz?" in location
+
+
+def test_matching_etag_costs_one_head_and_returns_304(load_handler):
+    handler = load_handler("getSongs", ENV)
+    etag = _etag([{"Id": "s1"}])
+
+    with Stubber(handler.s3) as s3_stub, Stubber(handler.dynamodb.meta.client):
+        s3_stub.add_response("head_object", {"Metadata": {"etag": etag}})
+
+        response = handler.lambda_handler(_event({"If-None-Match": etag}), None)
+        s3_stub.assert_no_pending_responses()
+
+    assert response["statusCode"] == 304
+    assert response["body"] == ""
+
+
+def test_builder_skips_unchanged_snapshots(load_handler, monkeypatch):
+    handler = load_handler("buildCatalogSnapshot", BUILDER_ENV)
+    albums = [{"Id": "a1", "title": "First"}]
+    monkeypatch.setattr(handler, "query_active_all", lambda table: albums)
+    _, etag = encode_snapshot([{**album, "coverThumbnail": None} for album in albums])
+
+    with Stubber(handler.s3) as s3_stub:
+        s3_stub.add_response("head_object", {"Metadata": {"etag": etag}})
+        assert handler.build("albums") is False
+
+        albums.append({"Id": "a2", "title": "Second"})
+        s3_stub.add_response("head_object", {"Metadata": {"etag": etag}})
+        s3_stub.add_response("put_object", {})
+        assert handler.build("albums") is True
+        s3_stub.assert_no_pending_responses()
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from common import concurrency
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    monkeypatch.setattr(concurrency, "MAX_WORKERS", 4)
+
+
+def test_gather_keeps_call_order(pooled):
+    def slow(value, delay):
+        time.sleep(delay)
+        return value
+
+    assert concurrency.gather(lambda: slow("a", 0.05), lambda: slow("b", 0), lambda: slow("c", 0.02)) == ["a", "b", "c"]
+
+
+def test_gather_overlaps_independent_calls(pooled):
+    started = time.perf_counter()
+    concurrency.parallel_map(time.sleep, [0.1] * 4)
+    assert time.perf_counter() - started < 0.3
+
+
+def test_gather_reraises_first_failure(pooled):
+    def boom():
+        raise KeyError("missing")
+
+    with pytest.raises(KeyError):
+        concurrency.gather(lambda: 1, boom)
+
+
+def test_nested_gather_on_a_saturated_pool_completes(monkeypatch):
+    monkeypatch.setattr(concurrency, "MAX_WORKERS", 2)
+
+    def inner(n):
+        return sum(concurrency.parallel_map(lambda i: time.sleep(0.01) or i, range(n)))
+
+    assert concurrency.parallel_map(inner, [3, 4, 5, 6]) == [3, 6, 10, 15]
+
+
+def _throttled():
+    return ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "PutItem")
+
+
+def test_throttled_map_backs_off_and_retries(pooled, monkeypatch):
+    monkeypatch.setattr(concurrency, "BACKOFF_BASE", 0)
+    limits = []
+    failures = {"b": 2}
+    original_release = concurrency.AdaptiveLimit.release
+
+    def release(self, throttled):
+        original_release(self, throttled)
+        limits.append(self.limit)
+
+    monkeypatch.setattr(concurrency.AdaptiveLimit, "release", release)
+
+    def put(item):
+        if failures.get(item):
+            failures[item] -= 1
+            raise _throttled()
+        return item.upper()
+
+    assert concurrency.throttled_map(put, ["a", "b", "c", "d"]) == ["A", "B", "C", "D"]
+    assert min(limits) < 4
+
+
+def test_throttled_map_gives_up_on_other_errors(pooled):
+    def put(item):
+        raise ValueError(item)
+
+    with pytest.raises(ValueError):
+        concurrency.throttled_map(put, ["a", "b"])
@@ -0,0 +1,58 @@
+from botocore.stub import ANY, Stubber
+
+from common import content
+
+ENV = {"BUCKET_NAME": "music", "SONGS_TABLE": "Songs", "CONTENT_OBJECTS_TABLE": "ContentObjects"}
+SONGS_ARN = "arn:aws:dynamodb:eu-central-1:123456789012:table/Songs/stream/2024-01-01T00:00:00.000"
+
+
+def _song(deleted, file_name):
+    return {"Album": {"S": "al1"}, "Id": {"S": "s1"}, "deleted": {"S": deleted}, "fileName": {"S": file_name}}
+
+
+def test_content_keys_are_hash_prefixed():
+    digest = content.sha256(b"audio")
+    key = content.audio_key(digest)
+
+    assert key == f"audio/{digest[:2]}/{digest[2:4]}/{digest}"
+    assert content.digest_of(key) == digest
+    assert content.digest_of(content.cover_key(digest)) == digest
+    # Kljucevi iz starog rasporeda nisu content kljucevi
+    assert content.digest_of("audio/2f1c7a52-upload") is None
+    assert content.derived_prefixes(key) == [key, f"hls/{digest}/"]
+
+
+def test_last_release_collects_the_object_and_its_derived_files(load_handler):
+    handler = load_handler("releaseContent", ENV)
+    key = content.audio_key(content.sha256(b"audio"))
+    record = {
+        "eventName": "MODIFY",
+        "eventSourceARN": SONGS_ARN,
+        "dynamodb": {"OldImage": _song("false", key), "NewImage": _song("true", key)},
+    }
+
+    with Stubber(handler.objects_table.meta.client) as dynamodb, Stubber(handler.s3) as s3:
+        # Ostale reference nestaju sa setom, pa ALL_NEW nema Refs
+        dynamodb.add_response("update_item", {"Attributes": {"ObjectKey": {"S": key}}}, {
+            "TableName": "ContentObjects", "Key": {"ObjectKey": key}, "UpdateExpression": "DELETE Refs :ref",
+            "ConditionExpression": "attribute_exists(ObjectKey)",
+            "ExpressionAttributeValues": {":ref": {"song#s1"}}, "ReturnValues": "ALL_NEW"
+        })
+        dynamodb.add_response("delete_item", {}, {
+            "TableName": "ContentObjects", "Key": {"ObjectKey": key},
+            "ConditionExpression": "attribute_not_exists(Refs)"
+        })
+        s3.add_response("list_objects_v2", {"Contents": [{"Key": key}, {"Key": key + ".peaks"}]},
+                        {"Bucket": "music", "Prefix": key})
+        s3.add_response("list_objects_v2", {"Contents": [{"Key": "hls/x/master.m3u8"}]}, {"Bucket": "music", "Prefix": ANY})
+        s3.add_response("delete_objects", {}, {"Bucket": "music", "Delete": {
+            "Objects": [{"Key": key}, {"Key": key + ".peaks"}, {"Key": "hls/x/master.m3u8"}], "Quiet": True
+        }})
+
+        assert handler.lambda_handler({"Records": [record]}, None) == {"collected": [key]}
+        dynamodb.assert_no_pending_responses()
+        s3.assert_no_pending_responses()
+
+    # Pesma koja i dalje koristi isti fajl ne menja reference
+    unchanged = {**record, "dynamodb": {"OldImage": _song("false", key), "NewImage": _song("false", key)}}
+    assert handler.lambda_handler({"Records": [unchanged]}, None) == {"collected": []}
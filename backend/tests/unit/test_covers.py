@@ -0,0 +1,74 @@
+import io
+
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import ANY, Stubber
+
+from common import covers
+
+ENV = {"BUCKET_NAME": "music", "SONGS_TABLE": "Songs", "ALBUMS_TABLE": "Albums", "CATALOG_VERSION_TABLE": "CatalogVersion"}
+
+
+def test_list_entry_picks_the_smallest_variant_that_fills_a_card():
+    images = {"source": "covers/original/x/a.png", "sizes": covers.derivative_keys("abc")}
+    album = {"Id": "al1", "coverImage": "covers/original/x/a.png", "coverImages": images}
+
+    entry = covers.list_entry(album)
+    assert "coverImages" not in entry
+    assert entry["coverThumbnail"] == {"size": 256, "webp": "covers/abc/256.webp", "jpeg": "covers/abc/256.jpg"}
+    assert covers.thumbnail(images, min_px=1000)["size"] == 640
+
+    # Pesma deli cover albuma; zastarele derivate (drugi source) lista ne vraca
+    song = {"Id": "s1", "coverImage": "covers/original/x/a.png"}
+    assert covers.list_entry(song, album)["coverThumbnail"]["size"] == 256
+    assert covers.list_entry({**album, "coverImage": "covers/original/y/b.png"})["coverThumbnail"] is None
+
+
+def test_process_cover_renders_hashed_derivatives_and_records_them(load_handler):
+    image = pytest.importorskip("PIL.Image")
+    handler = load_handler("processCover", ENV)
+    original = io.BytesIO()
+    image.new("RGB", (800, 600), (200, 40, 40)).save(original, format="PNG")
+    data = original.getvalue()
+    key = "covers/original/u1/cover.png"
+
+    with Stubber(handler.s3) as s3, Stubber(handler.songs_table.meta.client) as dynamodb:
+        s3.add_response("get_object", {
+            "Body": StreamingBody(io.BytesIO(data), len(data)),
+            "Metadata": {"entity": "song", "id": "s1", "album": "al1"}
+        })
+        s3.add_client_error("head_object", "404", http_status_code=404)
+        for _ in range(len(covers.SIZES) * len(covers.FORMATS)):
+            s3.add_response("put_object", {}, {
+                "Bucket": "music", "Key": ANY, "Body": ANY, "ContentType": ANY,
+                "CacheControl": covers.CACHE_CONTROL
+            })
+        dynamodb.add_response("update_item", {})
+
+        result = handler.lambda_handler({"Records": [{"s3": {"object": {"key": key}}}]}, None)
+        s3.assert_no_pending_responses()
+        dynamodb.assert_no_pending_responses()
+
+    assert result == {"processed": [key]}
+    rendered = handler.render(data)
+    assert set(rendered) == {(size, fmt) for size in covers.SIZES for fmt in covers.FORMATS}
+    with image.open(io.BytesIO(rendered[(64, "webp")])) as thumb:
+        assert thumb.size == (64, 64)
+
+
+def test_recorded_album_cover_bumps_the_catalog_version(load_handler):
+    pytest.importorskip("PIL.Image")
+    handler = load_handler("processCover", ENV)
+    source = "covers/original/u1/cover.png"
+
+    with Stubber(handler.albums_table.meta.client) as dynamodb:
+        dynamodb.add_response("query", {"Items": [{"Genre": {"S": "rock"}, "Id": {"S": "al1"}}]})
+        dynamodb.add_response("update_item", {})
+        # Kesirani album u toplim kontejnerima inace ne bi video coverImages do isteka TTL-a
+        dynamodb.add_response("update_item", {}, {
+            "TableName": "CatalogVersion", "Key": {"Id": "catalog"},
+            "UpdateExpression": "ADD Version :one", "ExpressionAttributeValues": {":one": 1}
+        })
+
+        assert handler.record({"entity": "album", "id": "al1"}, source, "abc") is True
+        dynamodb.assert_no_pending_responses()
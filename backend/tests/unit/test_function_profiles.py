@@ -0,0 +1,30 @@
+from backend.utils.function_profiles import (
+    DEFAULT_PROFILE, invocation_cost, profile_for, recommend, reserved_concurrency_for
+)
+
+
+def test_unlisted_function_gets_default_profile():
+    assert profile_for("NoSuchLambda") == DEFAULT_PROFILE
+    assert profile_for("SyncSongView")["memory"] == 256
+    assert profile_for("SyncSongView")["reserved_concurrency"] is None
+
+
+def test_reserved_concurrency_is_opt_in():
+    assert reserved_concurrency_for("BuildCatalogSnapshot", enabled=False) is None
+    assert reserved_concurrency_for("BuildCatalogSnapshot", enabled=True) == 1
+    assert reserved_concurrency_for("SyncSongView", enabled=True) is None
+
+
+def test_recommend_picks_cheapest_size_meeting_target():
+    results = {
+        128: {"mean_ms": 400, "p95_ms": 480},
+        512: {"mean_ms": 190, "p95_ms": 250},
+        1024: {"mean_ms": 120, "p95_ms": 145},
+        1769: {"mean_ms": 92, "p95_ms": 116},
+    }
+
+    memory, cost = recommend(results, target_ms=200)
+
+    assert memory == 1024
+    assert cost == invocation_cost(1024, 120)
+    assert recommend(results, target_ms=100) == (None, None)
@@ -0,0 +1,65 @@
+import json
+
+from botocore.stub import Stubber
+
+ENV = {
+    "ALBUMS_TABLE": "Albums",
+    "SONGS_TABLE": "Songs",
+    "ARTISTS_TABLE": "Artists",
+    "CATALOG_VERSION_TABLE": "CatalogVersion",
+}
+
+
+def _version():
+    return {"Id": {"S": "catalog"}, "Version": {"N": "1"}}
+
+EVENT = {
+    "requestContext": {"authorizer": {"claims": {"custom:role": "user"}}},
+    "pathParameters": {"id": "al1"},
+}
+
+ARTIST_IDS = ["ar1", "ar2", "ar3"]
+
+
+def _hints(artist_ids):
+    return {"M": {a: {"S": "rock"} for a in artist_ids}}
+
+
+def _song(i):
+    artist_ids = [ARTIST_IDS[i % 3]] + (["ar1"] if i % 3 else [])
+    return {
+        "Album": {"S": "al1"},
+        "Id": {"S": f"s{i:02d}"},
+        "title": {"S": f"Track {i}"},
+        "deleted": {"S": "false"},
+        "artists": {"L": [{"S": a} for a in artist_ids]},
+        "ArtistGenres": _hints(artist_ids),
+    }
+
+
+def test_twenty_track_album_with_three_artists_costs_constant_calls(load_handler):
+    handler = load_handler("getAlbumById", ENV)
+    album = {
+        "Genre": {"S": "rock"},
+        "Id": {"S": "al1"},
+        "title": {"S": "Album"},
+        "artists": {"L": [{"S": a} for a in ARTIST_IDS]},
+        "ArtistGenres": _hints(ARTIST_IDS),
+    }
+    artists = [{"Genre": {"S": "rock"}, "Id": {"S": a}, "name": {"S": a.upper()}} for a in ARTIST_IDS]
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response("get_item", {"Item": _version()})
+        stub.add_response("query", {"Items": [album]})
+        stub.add_response("query", {"Items": [_song(i) for i in range(20)]})
+        stub.add_response("batch_get_item", {"Responses": {"Artists": artists}})
+
+        response = handler.lambda_handler(EVENT, None)
+        stub.assert_no_pending_responses()
+
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    grouped = {a["Id"]: [s["Id"] for s in a["Songs"]] for a in body["Artists"]}
+    assert len(grouped["ar1"]) == 20
+    assert grouped["ar2"] == [f"s{i:02d}" for i in range(20) if i % 3 == 1]
+    assert body["Artists"][1]["Name"] == "AR2"
@@ -0,0 +1,51 @@
+import pytest
+from botocore.stub import Stubber
+
+ENV = {
+    "ARTISTS_TABLE": "Artists",
+    "ARTIST_ALBUM_TABLE": "ArtistAlbum",
+    "ALBUMS_TABLE": "Albums",
+    "CATALOG_VERSION_TABLE": "CatalogVersion",
+}
+
+
+def _version():
+    return {"Id": {"S": "catalog"}, "Version": {"N": "1"}}
+
+
+def _album(album_id):
+    return {"Genre": {"S": "rock"}, "Id": {"S": album_id}, "title": {"S": album_id}}
+
+
+@pytest.mark.parametrize("album_count", [1, 10, 90])
+def test_get_artist_by_id_uses_constant_number_of_calls(load_handler, album_count):
+    handler = load_handler("getArtistById", ENV)
+    mappings = [
+        {"ArtistId": {"S": "ar1"}, "AlbumId": {"S": f"al{i}"}, "AlbumGenre": {"S": "rock"}}
+        for i in range(album_count)
+    ]
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response("get_item", {"Item": _version()})
+        stub.add_response("query", {"Items": [{"Genre": {"S": "rock"}, "Id": {"S": "ar1"}}]})
+        stub.add_response("query", {"Items": mappings})
+        stub.add_response("batch_get_item", {"Responses": {"Albums": [_album(f"al{i}") for i in range(album_count)]}})
+
+        response = handler.lambda_handler({"pathParameters": {"id": "ar1"}}, None)
+        stub.assert_no_pending_responses()
+
+    assert response["statusCode"] == 200
+
+
+def test_get_artist_by_id_returns_404_without_scanning(load_handler):
+    handler = load_handler("getArtistById", ENV)
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response("get_item", {"Item": _version()})
+        stub.add_response("query", {"Items": []})
+        stub.add_response("query", {"Items": []})
+
+        response = handler.lambda_handler({"pathParameters": {"id": "missing"}}, None)
+        stub.assert_no_pending_responses()
+
+    assert response["statusCode"] == 404
@@ -0,0 +1,76 @@
+import json
+
+from botocore.stub import ANY, Stubber
+
+from common.hydration import batch_get
+from common.sharding import ACTIVE_SHARD_COUNT
+
+ENV = {"SONG_VIEW_TABLE": "SongView", "BUCKET_NAME": "music"}
+
+EVENT = {"requestContext": {"authorizer": {"claims": {"custom:role": "user"}}}}
+
+
+def _add_shard_pages(stub, views):
+    # One query per active-index shard; which shard gets the songs does not matter here
+    stub.add_response("query", {"Items": views})
+    for _ in range(ACTIVE_SHARD_COUNT - 1):
+        stub.add_response("query", {"Items": []})
+
+
+def _view(song_id, album_id, artist_ids):
+    return {
+        "Id": {"S": song_id},
+        "Album": {"S": album_id},
+        "title": {"S": song_id},
+        "deleted": {"S": "false"},
+        "artists": {"L": [{"S": a} for a in artist_ids]},
+        "AlbumSummary": {"M": {"Id": {"S": album_id}, "title": {"S": album_id.upper()}}},
+        "ArtistSummaries": {"L": [{"M": {"Id": {"S": a}, "name": {"S": a.upper()}}} for a in artist_ids]},
+    }
+
+
+def _entity(entity_id):
+    return {"Genre": {"S": "rock"}, "Id": {"S": entity_id}, "title": {"S": entity_id}}
+
+
+def test_get_songs_reads_only_the_song_view(load_handler):
+    handler = load_handler("getSongs", ENV)
+    views = [_view(f"s{i:02d}", f"al{i % 3}", ["ar1", f"ar{i % 2 + 2}"]) for i in range(40)]
+
+    # No snapshot built yet, the full list falls back to a SongView page
+    with Stubber(handler.s3) as s3_stub, Stubber(handler.dynamodb.meta.client) as stub:
+        s3_stub.add_client_error("head_object", "404", http_status_code=404)
+        _add_shard_pages(stub, views)
+
+        response = handler.lambda_handler(EVENT, None)
+        s3_stub.assert_no_pending_responses()
+        stub.assert_no_pending_responses()
+
+    assert response["statusCode"] == 200
+    first = json.loads(response["body"])["items"][0]
+    assert first["Album"] == {"Id": "al0", "title": "AL0", "coverThumbnail": None}
+    assert [a["name"] for a in first["Artists"]] == ["AR1", "AR2"]
+    assert "AlbumSummary" not in first
+
+
+def test_batch_get_chunks_and_retries_unprocessed_keys(load_handler, monkeypatch):
+    handler = load_handler("getSongs", ENV)
+    monkeypatch.setattr("common.hydration.time.sleep", lambda _: None)
+    keys = [{"Genre": "rock", "Id": f"al{i}"} for i in range(150)] + [{"Genre": "rock", "Id": "al0"}]
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response(
+            "batch_get_item",
+            {
+                "Responses": {"Albums": [_entity(f"al{i}") for i in range(99)]},
+                "UnprocessedKeys": {"Albums": {"Keys": [{"Genre": {"S": "rock"}, "Id": {"S": "al99"}}]}},
+            },
+            {"RequestItems": {"Albums": {"Keys": ANY}}},
+        )
+        stub.add_response("batch_get_item", {"Responses": {"Albums": [_entity("al99")]}})
+        stub.add_response("batch_get_item", {"Responses": {"Albums": [_entity(f"al{i}") for i in range(100, 150)]}})
+
+        items = batch_get(handler.dynamodb, "Albums", keys)
+        stub.assert_no_pending_responses()
+
+    assert len(items) == 150
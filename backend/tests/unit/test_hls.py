@@ -0,0 +1,40 @@
+import os
+import shutil
+import wave
+
+import pytest
+
+from common.hls import RENDITIONS_BY_NAME, master_playlist
+
+
+def test_master_lists_aac_before_opus_by_bandwidth():
+    playlist = master_playlist([
+        {"name": "opus_96k", "codecs": RENDITIONS_BY_NAME["opus_96k"]["codecs"], "bandwidth": 99000, "averageBandwidth": 96000},
+        {"name": "aac_128k", "codecs": "mp4a.40.2", "bandwidth": 140000, "averageBandwidth": 130000},
+        {"name": "aac_64k", "codecs": "mp4a.40.2", "bandwidth": 70000, "averageBandwidth": 66000},
+    ])
+
+    uris = [line for line in playlist.splitlines() if not line.startswith("#")]
+    assert uris == ["aac_64k/playlist.m3u8", "aac_128k/playlist.m3u8", "opus_96k/playlist.m3u8"]
+    assert 'BANDWIDTH=70000,AVERAGE-BANDWIDTH=66000,CODECS="mp4a.40.2"' in playlist
+    # RFC 6381 ime Opus-a, malim slovima ga Safari/hls.js ne prepoznaju
+    assert 'BANDWIDTH=99000,AVERAGE-BANDWIDTH=96000,CODECS="Opus"' in playlist
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_worker_segments_a_local_file(load_handler, tmp_path):
+    worker = load_handler("transcodeRendition", {"BUCKET_NAME": "music"})
+    source = tmp_path / "song.wav"
+    with wave.open(str(source), "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(44100)
+        w.writeframes(b"\0" * 44100 * 4 * 15)
+    out_dir = tmp_path / "aac_128k"
+    out_dir.mkdir()
+
+    result = worker.transcode(str(source), str(out_dir), RENDITIONS_BY_NAME["aac_128k"])
+
+    assert sorted(os.listdir(out_dir))[:2] == ["init.mp4", "playlist.m3u8"]
+    assert len([name for name in os.listdir(out_dir) if name.endswith(".m4s")]) == 3
+    assert result["averageBandwidth"] > 0
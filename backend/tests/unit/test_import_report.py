@@ -0,0 +1,20 @@
+from backend.utils.import_report import _parse
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       900 |        900 | site
+import time:       300 |        300 |       botocore.session
+import time:       200 |     180000 |     boto3
+import time:        50 |     180050 |   boto3.dynamodb.conditions
+import time:       100 |        100 |   common.responses
+import time:       400 |       4500 |   common.clients
+import time:       250 |     185000 | handler
+"""
+
+
+def test_parse_reports_the_handler_and_its_direct_imports():
+    total, heaviest = _parse(IMPORTTIME, "handler")
+
+    assert total == 185.0
+    assert [h["module"] for h in heaviest] == ["boto3.dynamodb.conditions", "common.clients", "common.responses"]
+    assert heaviest[0]["ms"] == 180.1
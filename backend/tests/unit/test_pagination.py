@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from common import pagination
+
+ENV = {"ALBUMS_TABLE": "Albums", "ARTISTS_TABLE": "Artists", "BUCKET_NAME": "music"}
+
+
+@pytest.fixture(autouse=True)
+def signing_key(monkeypatch):
+    monkeypatch.setenv("PAGINATION_SECRET", "test-secret")
+    monkeypatch.setattr(pagination, "_secret", None)
+
+
+def _event(**params):
+    return {
+        "requestContext": {"authorizer": {"claims": {"custom:role": "user"}}},
+        "queryStringParameters": params or None,
+    }
+
+
+def test_token_round_trip():
+    key = {"deleted": "false", "Genre": "rock", "Id": "a1"}
+    token = pagination.encode_token("albums", key)
+    assert pagination.decode_token("albums", token) == key
+
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    token = pagination.encode_token("albums", {"deleted": "false", "Genre": "rock", "Id": "a1"})
+    forged = pagination.encode_token("albums", {"deleted": "true", "Genre": "rock", "Id": "a1"})
+
+    with pytest.raises(pagination.InvalidPageRequest):
+        pagination.decode_token("albums", token.split(".")[0] + "." + forged.split(".")[1])
+    with pytest.raises(pagination.InvalidPageRequest):
+        pagination.decode_token("songs", token)
+
+
+class FakeShardedTable:
+    """Serves active-index queries from per-shard lists of album ids."""
+
+    def __init__(self, shards):
+        self.name = "Albums"
+        self.shards = shards
+        self.calls = []
+        self.meta = self
+        self.client = self
+
+    def query(self, **kwargs):
+        self.calls.append(kwargs)
+        shard = kwargs["ExpressionAttributeValues"][":shard"]
+        items = self.shards.get(shard, [])
+        start = kwargs.get("ExclusiveStartKey", {}).get("Pos", 0)
+        page = items[start:start + kwargs["Limit"]]
+        response = {"Items": [{"Id": i} for i in page]}
+        if start + kwargs["Limit"] < len(items):
+            response["LastEvaluatedKey"] = {"Pos": start + kwargs["Limit"]}
+        return response
+
+
+def test_get_albums_scatter_gathers_shards_page_by_page(load_handler, monkeypatch):
+    handler = load_handler("getAlbums", ENV)
+    table = FakeShardedTable({
+        "active#0": ["a1", "a2", "a3"],
+        "active#5": ["b1"],
+    })
+    monkeypatch.setattr(handler, "table", table)
+
+    seen = []
+    token = None
+    while True:
+        params = {"limit": "8"}
+        if token:
+            params["nextToken"] = token
+        body = json.loads(handler.lambda_handler(_event(**params), None)["body"])
+        seen.extend(album["Id"] for album in body["items"])
+        token = body["nextToken"]
+        if not token:
+            break
+
+    assert sorted(seen) == ["a1", "a2", "a3", "b1"]
+    # 8 shards on the first page, then only active#0 still has items
+    assert len(table.calls) == 8 + 1
+    assert all(call["IndexName"] == "active-index" for call in table.calls)
+
+
+def test_get_albums_rejects_bad_page_requests(load_handler):
+    handler = load_handler("getAlbums", ENV)
+
+    assert handler.lambda_handler(_event(limit="1000"), None)["statusCode"] == 400
+    assert handler.lambda_handler(_event(nextToken="not-a-token"), None)["statusCode"] == 400
+
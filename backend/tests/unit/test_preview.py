@@ -0,0 +1,12 @@
+import numpy as np
+
+
+def test_hook_is_the_loudest_thirty_seconds(load_handler):
+    handler = load_handler("cutPreview", {"BUCKET_NAME": "music", "SONGS_TABLE": "Songs", "CONTENT_OBJECTS_TABLE": "ContentObjects"})
+    rate = 100
+    samples = np.full(240 * rate, 1000, dtype="<i2")
+    samples[95 * rate:125 * rate] = 8000
+
+    assert handler.find_hook(samples, rate) == 95
+    assert handler.find_hook(samples[:20 * rate], rate) == 0
+    assert handler.preview_start("unused", start="42.5") == 42
@@ -0,0 +1,52 @@
+from botocore.stub import Stubber
+
+from common import catalog_cache, clients, priming
+
+ENV = {
+    "SONGS_TABLE": "Songs",
+    "ALBUMS_TABLE": "Albums",
+    "ARTISTS_TABLE": "Artists",
+    "SONG_VIEW_TABLE": "SongView",
+    "CATALOG_VERSION_TABLE": "CatalogVersion",
+}
+
+
+def test_on_init_is_opt_in(monkeypatch):
+    calls = []
+    monkeypatch.delenv("PRIME_ON_INIT", raising=False)
+
+    assert priming.on_init(lambda: calls.append("task")) is None
+    assert calls == []
+
+    monkeypatch.setenv("PRIME_ON_INIT", "true")
+    assert priming.on_init(lambda: calls.append("task")) is not None
+    assert calls == ["task"]
+
+
+def test_primed_get_song_skips_request_time_reads(load_handler, monkeypatch):
+    monkeypatch.setenv("PRIME_ON_INIT", "true")
+    dynamodb_client = clients.resource("dynamodb").meta.client
+
+    with Stubber(dynamodb_client) as stub:
+        # Init: konekcija i CatalogVersion
+        stub.add_response("describe_endpoints", {"Endpoints": []})
+        stub.add_response("get_item", {"Item": {"Id": {"S": "catalog"}, "Version": {"N": "1"}}})
+        handler = load_handler("getSong", ENV)
+        stub.assert_no_pending_responses()
+
+        # Zahtev: SongView promasaj, pa jedan upit za pesmu i BatchGetItem za album i umetnike,
+        # bez GetItem nad CatalogVersion
+        stub.add_response("get_item", {})
+        stub.add_response("query", {"Items": [{
+            "Album": {"S": "al1"}, "Id": {"S": "s1"}, "title": {"S": "Song"},
+            "artists": {"L": [{"S": "ar1"}]}, "AlbumGenre": {"S": "rock"},
+            "ArtistGenres": {"M": {"ar1": {"S": "rock"}}}
+        }]})
+        stub.add_response("batch_get_item", {"Responses": {"Albums": [{"Genre": {"S": "rock"}, "Id": {"S": "al1"}}]}})
+        stub.add_response("batch_get_item", {"Responses": {"Artists": [{"Genre": {"S": "rock"}, "Id": {"S": "ar1"}}]}})
+
+        result = handler.lambda_handler({"pathParameters": {"id": "s1"}}, None)
+        stub.assert_no_pending_responses()
+
+    assert result["statusCode"] == 200
+    assert catalog_cache._version == 1
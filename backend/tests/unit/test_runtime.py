@@ -0,0 +1,49 @@
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+
+from common import auth, clients
+from common.responses import response
+
+
+def test_response_serializes_dynamodb_values_with_cors():
+    result = response(200, {"count": Decimal("3"), "rating": Decimal("4.5"), "tags": {"a"}})
+
+    assert result["statusCode"] == 200
+    assert result["headers"]["Access-Control-Allow-Origin"] == "*"
+    assert json.loads(result["body"]) == {"count": 3, "rating": 4.5, "tags": ["a"]}
+
+
+def test_require_role():
+    event = {"requestContext": {"authorizer": {"claims": {"custom:role": "user"}}}}
+
+    assert auth.require_role(event, "admin", "user") is None
+    assert auth.require_role(event, "admin")["statusCode"] == 403
+    assert auth.require_role({}, "user")["statusCode"] == 403
+
+
+def test_clients_are_shared_and_built_on_first_use(monkeypatch):
+    built = []
+
+    def fake_client(service, **kwargs):
+        built.append(service)
+        return SimpleNamespace(service=service)
+
+    monkeypatch.setattr(clients, "_shared", {})
+    monkeypatch.setattr(clients.boto3, "client", fake_client)
+
+    s3 = clients.client("s3")
+    assert clients.client("s3") is s3
+    assert built == []
+
+    assert s3.service == "s3"
+    assert s3.service == "s3"
+    assert built == ["s3"]
+
+
+def test_clients_use_tuned_config():
+    config = clients.client("dynamodb").meta.config
+
+    assert config.retries["mode"] == "adaptive"
+    assert config.max_pool_connections == clients.CONFIG.max_pool_connections
+    assert config.connect_timeout == clients.CONFIG.connect_timeout
@@ -0,0 +1,168 @@
+import json
+
+from botocore.stub import ANY, Stubber
+
+GET_SONG_ENV = {
+    "SONGS_TABLE": "Songs",
+    "ALBUMS_TABLE": "Albums",
+    "ARTISTS_TABLE": "Artists",
+    "SONG_VIEW_TABLE": "SongView",
+    "CATALOG_VERSION_TABLE": "CatalogVersion",
+}
+
+SYNC_ENV = dict(GET_SONG_ENV, ARTIST_SONG_TABLE="ArtistSong")
+
+ARN = "arn:aws:dynamodb:eu-central-1:123456789012:table/{}/stream/2025-01-01T00:00:00.000"
+
+
+def _song(hinted=True):
+    item = {
+        "Album": {"S": "al1"},
+        "Id": {"S": "s1"},
+        "title": {"S": "Song"},
+        "deleted": {"S": "false"},
+        "artists": {"L": [{"S": "ar1"}, {"S": "ar2"}]},
+    }
+    if hinted:
+        item["AlbumGenre"] = {"S": "rock"}
+        item["ArtistGenres"] = {"M": {"ar1": {"S": "rock"}, "ar2": {"S": "pop"}}}
+    return item
+
+
+def _album(title="Album"):
+    return {"Genre": {"S": "rock"}, "Id": {"S": "al1"}, "title": {"S": title}, "coverImage": {"S": "al1.jpg"}}
+
+
+def _artist(artist_id, name):
+    return {"Genre": {"S": "rock"}, "Id": {"S": artist_id}, "name": {"S": name}}
+
+
+def _record(table, event_name, keys, old=None, new=None):
+    data = {"Keys": keys}
+    if old:
+        data["OldImage"] = old
+    if new:
+        data["NewImage"] = new
+    return {"eventName": event_name, "eventSourceARN": ARN.format(table), "dynamodb": data}
+
+
+def test_get_song_is_one_consistent_get_item(load_handler):
+    handler = load_handler("getSong", GET_SONG_ENV)
+    view = {
+        "Id": {"S": "s1"},
+        "title": {"S": "Song"},
+        "AlbumSummary": {"M": {"Id": {"S": "al1"}, "title": {"S": "Album"}}},
+        "ArtistSummaries": {"L": [{"M": {"Id": {"S": "ar1"}, "name": {"S": "One"}}}]},
+    }
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response(
+            "get_item", {"Item": view},
+            {"TableName": "SongView", "Key": {"Id": "s1"}, "ConsistentRead": True}
+        )
+        response = handler.lambda_handler({"pathParameters": {"id": "s1"}}, None)
+        stub.assert_no_pending_responses()
+
+    body = json.loads(response["body"])
+    assert body["id"] == "s1"
+    assert body["album"]["title"] == "Album"
+    assert body["artists"] == [{"Id": "ar1", "name": "One"}]
+
+
+def test_get_song_falls_back_to_source_tables_before_the_view_catches_up(load_handler):
+    handler = load_handler("getSong", GET_SONG_ENV)
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response("get_item", {})
+        stub.add_response("query", {"Items": [_song(hinted=False)]})
+        stub.add_response("get_item", {"Item": {"Id": {"S": "catalog"}, "Version": {"N": "1"}}})
+        stub.add_response("query", {"Items": [_album()]})
+        stub.add_response("query", {"Items": [_artist("ar1", "One")]})
+        stub.add_response("query", {"Items": [_artist("ar2", "Two")]})
+        response = handler.lambda_handler({"pathParameters": {"id": "s1"}}, None)
+        stub.assert_no_pending_responses()
+
+    body = json.loads(response["body"])
+    assert body["album"]["coverImage"] == "al1.jpg"
+    assert [a["name"] for a in body["artists"]] == ["One", "Two"]
+
+
+def test_song_insert_writes_the_view_with_one_batch_per_table(load_handler):
+    handler = load_handler("syncSongView", SYNC_ENV)
+    event = {"Records": [_record("Songs", "INSERT", {"Album": {"S": "al1"}, "Id": {"S": "s1"}}, new=_song())]}
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response("batch_get_item", {"Responses": {"Albums": [_album()]}})
+        stub.add_response("batch_get_item", {"Responses": {"Artists": [_artist("ar1", "One"), _artist("ar2", "Two")]}})
+        stub.add_response("batch_write_item", {"UnprocessedItems": {}}, {"RequestItems": {"SongView": ANY}})
+        result = handler.lambda_handler(event, None)
+        stub.assert_no_pending_responses()
+
+    assert result == {"songs": 1, "patched": 0}
+
+
+def test_album_rename_patches_every_song_of_the_album(load_handler):
+    handler = load_handler("syncSongView", SYNC_ENV)
+    keys = {"Genre": {"S": "rock"}, "Id": {"S": "al1"}}
+    event = {"Records": [_record("Albums", "MODIFY", keys, old=_album("Old"), new=_album("New"))]}
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response("query", {"Items": [{"Id": {"S": "s1"}}, {"Id": {"S": "s2"}}]})
+        for song_id in ("s1", "s2"):
+            stub.add_response(
+                "update_item", {},
+                {
+                    "TableName": "SongView",
+                    "Key": {"Id": song_id},
+                    "UpdateExpression": "SET AlbumSummary = :summary",
+                    "ConditionExpression": "AlbumSummary.Id = :id",
+                    "ExpressionAttributeValues": ANY,
+                }
+            )
+        result = handler.lambda_handler(event, None)
+        stub.assert_no_pending_responses()
+
+    assert result == {"songs": 0, "patched": 2}
+
+
+def test_artist_rename_patches_its_position_in_each_view(load_handler):
+    handler = load_handler("syncSongView", SYNC_ENV)
+    keys = {"Genre": {"S": "rock"}, "Id": {"S": "ar2"}}
+    event = {"Records": [_record("Artists", "MODIFY", keys, old=_artist("ar2", "Two"), new=_artist("ar2", "Deux"))]}
+    view = {
+        "Id": {"S": "s1"},
+        "ArtistSummaries": {"L": [
+            {"M": {"Id": {"S": "ar1"}, "name": {"S": "One"}}},
+            {"M": {"Id": {"S": "ar2"}, "name": {"S": "Two"}}},
+        ]},
+    }
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        stub.add_response("query", {"Items": [{"ArtistId": {"S": "ar2"}, "SongId": {"S": "s1"}}]})
+        stub.add_response("batch_get_item", {"Responses": {"SongView": [view]}})
+        stub.add_response(
+            "update_item", {},
+            {
+                "TableName": "SongView",
+                "Key": {"Id": "s1"},
+                "UpdateExpression": "SET ArtistSummaries[1] = :summary",
+                "ConditionExpression": "ArtistSummaries[1].Id = :id",
+                "ExpressionAttributeValues": ANY,
+            }
+        )
+        result = handler.lambda_handler(event, None)
+        stub.assert_no_pending_responses()
+
+    assert result == {"songs": 0, "patched": 1}
+
+
+def test_unchanged_album_fields_skip_the_fan_out(load_handler):
+    handler = load_handler("syncSongView", SYNC_ENV)
+    keys = {"Genre": {"S": "rock"}, "Id": {"S": "al1"}}
+    event = {"Records": [_record("Albums", "MODIFY", keys, old=_album(), new=dict(_album(), ActiveShard={"S": "active#1"}))]}
+
+    with Stubber(handler.dynamodb.meta.client) as stub:
+        result = handler.lambda_handler(event, None)
+        stub.assert_no_pending_responses()
+
+    assert result == {"songs": 0, "patched": 0}
@@ -0,0 +1,318 @@
+import io
+import json
+import time
+import wave
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from botocore.stub import ANY, Stubber
+
+from common import content, uploads
+
+EVENT = {
+    "requestContext": {"authorizer": {"claims": {"custom:role": "admin"}}},
+    "body": json.dumps({
+        "title": "Song", "album": "al1", "artists": ["ar1"], "single": True,
+        "fileSize": 3 * uploads.PART_SIZE - 1, "fileType": "audio/mpeg"
+    }),
+}
+
+FINALIZE_ENV = {
+    "BUCKET_NAME": "music",
+    "SONGS_TABLE": "Songs",
+    "ARTIST_SONG_TABLE": "ArtistSong",
+    "ALBUMS_TABLE": "Albums",
+    "ARTISTS_TABLE": "Artists",
+    "UPLOAD_SESSIONS_TABLE": "UploadSessions",
+    "SNS_NEW_CONTENT_ARN": "arn:aws:sns:eu-central-1:123456789012:new-content",
+    "SNS_NEW_TRANSCRIPTION_ARN": "arn:aws:sns:eu-central-1:123456789012:new-transcription",
+    "INGEST_STATE_MACHINE_ARN": "arn:aws:states:eu-central-1:123456789012:stateMachine:ingest",
+    "CONTENT_OBJECTS_TABLE": "ContentObjects",
+}
+
+CREATE_ENV = {
+    "BUCKET_NAME": "music",
+    "UPLOAD_SESSIONS_TABLE": "UploadSessions",
+    "CONTENT_OBJECTS_TABLE": "ContentObjects",
+    "FINALIZE_UPLOAD_FUNCTION": "finalize-upload",
+}
+
+
+def test_create_song_starts_multipart_upload_with_one_url_per_part(load_handler):
+    handler = load_handler("uploadMusicFile", CREATE_ENV)
+
+    with Stubber(handler.s3) as s3, Stubber(handler.sessions_table.meta.client) as dynamodb:
+        s3.add_response("create_multipart_upload", {"UploadId": "u1"},
+                        {"Bucket": "music", "Key": ANY, "ContentType": "audio/mpeg"})
+        dynamodb.add_response("put_item", {})
+
+        response = handler.lambda_handler(EVENT, None)
+        s3.assert_no_pending_responses()
+        dynamodb.assert_no_pending_responses()
+
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 202
+    assert body["upload"]["key"] == f"uploads/{body['upload']['uploadId']}"
+    assert [part["partNumber"] for part in body["upload"]["parts"]] == [1, 2, 3]
+    assert "uploadId=u1" in body["upload"]["parts"][0]["url"]
+
+    too_big = {**EVENT, "body": json.dumps({"title": "Song", "fileSize": uploads.MAX_FILE_SIZE + 1})}
+    assert handler.lambda_handler(too_big, None)["statusCode"] == 400
+
+
+def test_create_song_with_stored_content_uploads_nothing(load_handler):
+    handler = load_handler("uploadMusicFile", CREATE_ENV)
+    digest = content.sha256(b"same file")
+    event = {**EVENT, "body": json.dumps({**json.loads(EVENT["body"]), "sha256": digest})}
+    stored = {"ObjectKey": {"S": content.audio_key(digest)}, "Size": {"N": "9"}, "ContentType": {"S": "audio/mpeg"}}
+
+    with Stubber(handler.sessions_table.meta.client) as dynamodb, Stubber(handler.lambda_client) as lambda_stub, \
+            Stubber(handler.s3):
+        dynamodb.add_response("get_item", {"Item": stored}, {"TableName": "ContentObjects", "Key": ANY})
+        dynamodb.add_response("put_item", {})
+        lambda_stub.add_response("invoke", {"StatusCode": 202},
+                                 {"FunctionName": "finalize-upload", "InvocationType": "Event", "Payload": ANY})
+
+        body = json.loads(handler.lambda_handler(event, None)["body"])
+        dynamodb.assert_no_pending_responses()
+        lambda_stub.assert_no_pending_responses()
+
+    assert body["upload"]["deduplicated"] is True
+    assert body["upload"]["key"] == f"audio/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def _session(status):
+    return {
+        "Id": {"S": "up1"}, "Status": {"S": status}, "Mode": {"S": "create"},
+        "SongId": {"S": "s1"}, "Album": {"S": "al1"}, "ContentType": {"S": "audio/wav"},
+        "Song": {"M": {"title": {"S": "Song"}, "artists": {"L": [{"S": "ar1"}]}, "single": {"BOOL": True}}},
+    }
+
+
+def test_finalizer_writes_song_once_per_session(load_handler):
+    handler = load_handler("finalizeUpload", FINALIZE_ENV)
+    album = {"Genre": {"S": "rock"}, "Id": {"S": "al1"}, "ArtistGenres": {"M": {"ar1": {"S": "rock"}}}}
+    audio = io.BytesIO()
+    with wave.open(audio, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b"\0" * 8000 * 2 * 3)
+    audio = audio.getvalue()
+    record = {"Records": [{"s3": {"object": {"key": "uploads/up1", "size": len(audio)}}}]}
+    content_key = content.audio_key(content.sha256(audio))
+
+    written = []
+    handler.song_table.meta.client.meta.events.register(
+        "before-parameter-build.dynamodb.TransactWriteItems",
+        lambda params, **kwargs: written.extend(op["Put"]["Item"] for op in params["TransactItems"])
+    )
+
+    with Stubber(handler.song_table.meta.client) as dynamodb, Stubber(handler.sns) as sns, \
+            Stubber(handler.s3) as s3, Stubber(handler.sfn_client) as sfn:
+        dynamodb.add_response("get_item", {"Item": _session("pending")})
+        s3.add_response("get_object", {"Body": StreamingBody(io.BytesIO(audio), len(audio))},
+                        {"Bucket": "music", "Key": "uploads/up1", "Range": f"bytes=0-{len(audio) - 1}"})
+        # SHA-256 staging fajla, pa kopija pod content kljuc jer taj sadrzaj jos ne postoji
+        s3.add_response("get_object", {"Body": StreamingBody(io.BytesIO(audio), len(audio))},
+                        {"Bucket": "music", "Key": "uploads/up1"})
+        dynamodb.add_client_error("update_item", "ConditionalCheckFailedException")
+        s3.add_response("copy_object", {}, {
+            "Bucket": "music", "Key": content_key, "CopySource": {"Bucket": "music", "Key": "uploads/up1"},
+            "ContentType": "audio/wav", "MetadataDirective": "REPLACE"
+        })
+        dynamodb.add_response("put_item", {})
+        dynamodb.add_response("update_item", {"Attributes": {
+            "ObjectKey": {"S": content_key}, "Size": {"N": str(len(audio))}, "Refs": {"SS": ["song#s1"]},
+            "Metadata": {"M": {"duration": {"N": "3"}, "sampleRate": {"N": "8000"}}}, "Derived": {"M": {}}
+        }})
+        dynamodb.add_response("query", {"Items": [album]})
+        # Pesma i ArtistSong red u jednoj transakciji
+        dynamodb.add_response("transact_write_items", {})
+        dynamodb.add_response("update_item", {})
+        sns.add_response("publish", {"MessageId": "m1"})
+        sfn.add_response("start_execution", {"executionArn": "arn:aws:states:::execution:hls:up1",
+                                             "startDate": "2024-01-01T00:00:00Z"})
+        s3.add_response("delete_object", {}, {"Bucket": "music", "Key": "uploads/up1"})
+
+        assert handler.lambda_handler(record, None) == {"finalized": ["s1"]}
+        song = written[-1]
+        assert song["fileName"] == {"S": content_key}
+        # Trajanje iz WAV zaglavlja, ne iz draft-a
+        assert song["duration"] == {"N": "3"} and song["sampleRate"] == {"N": "8000"}
+
+        # Ponovljena isporuka istog S3 eventa
+        dynamodb.add_response("get_item", {"Item": _session("completed")})
+        assert handler.lambda_handler(record, None) == {"finalized": []}
+
+        dynamodb.assert_no_pending_responses()
+        sns.assert_no_pending_responses()
+        sfn.assert_no_pending_responses()
+
+
+def test_album_event_is_claimed_once_and_retried_after_a_failed_publish(load_handler):
+    handler = load_handler("finalizeUpload", FINALIZE_ENV)
+
+    record = {"Records": [{"s3": {"object": {"key": "uploads/up1", "size": 10}}}]}
+
+    # Resource deserijalizuje odgovor na mestu, pa svaki stub dobija svoju kopiju
+    def track():
+        return {**_session("completed"), "Ingest": {"S": uploads.ingest_id("al1")}, "AlbumGenre": {"S": "rock"}}
+
+    def album():
+        return {"Item": {"Genre": {"S": "rock"}, "Id": {"S": "al1"}}}
+
+    claim = {
+        "TableName": "UploadSessions", "Key": {"Id": uploads.ingest_id("al1")},
+        "UpdateExpression": "SET Published = :now",
+        "ConditionExpression": "#status = :pending AND attribute_not_exists(Published)",
+        "ExpressionAttributeNames": {"#status": "Status"},
+        "ExpressionAttributeValues": {":now": ANY, ":pending": "pending"}
+    }
+
+    with Stubber(handler.song_table.meta.client) as dynamodb, Stubber(handler.sns) as sns:
+        # SNS pada: claim se oslobadja, greska ide dalje da bi se isporuka ponovila
+        dynamodb.add_response("get_item", {"Item": track()})
+        dynamodb.add_response("update_item", {"Attributes": {"Status": {"S": "pending"}}})
+        dynamodb.add_response("update_item", {}, claim)
+        dynamodb.add_response("get_item", album())
+        sns.add_client_error("publish", "InternalError", http_status_code=500)
+        dynamodb.add_response("update_item", {})
+        with pytest.raises(ClientError):
+            handler.lambda_handler(record, None)
+
+        # Ponovljena isporuka preuzima claim, objavljuje i zatvara tracker
+        dynamodb.add_response("get_item", {"Item": track()})
+        dynamodb.add_response("update_item", {"Attributes": {"Status": {"S": "pending"}}})
+        dynamodb.add_response("update_item", {}, claim)
+        dynamodb.add_response("get_item", album())
+        sns.add_response("publish", {"MessageId": "m1"})
+        dynamodb.add_response("update_item", {})
+        assert handler.lambda_handler(record, None) == {"finalized": []}
+
+        # Isporuka koja se istovremeno zavrsila ne dobija claim i ne objavljuje drugi put
+        dynamodb.add_response("get_item", {"Item": track()})
+        dynamodb.add_response("update_item", {"Attributes": {"Status": {"S": "pending"}}})
+        dynamodb.add_client_error("update_item", "ConditionalCheckFailedException")
+        assert handler.lambda_handler(record, None) == {"finalized": []}
+
+        dynamodb.assert_no_pending_responses()
+        sns.assert_no_pending_responses()
+
+
+def test_resume_lists_s3_parts_and_signs_only_missing_ones(load_handler):
+    env = {"BUCKET_NAME": "music", "UPLOAD_SESSIONS_TABLE": "UploadSessions"}
+    get_upload = load_handler("getUpload", env)
+    complete = load_handler("completeUpload", env)
+    event = {**EVENT, "pathParameters": {"id": "up1"}}
+
+    def session(parts):
+        return {
+            "Id": {"S": "up1"}, "Key": {"S": "uploads/up1"}, "UploadId": {"S": "u1"}, "SongId": {"S": "s1"},
+            "Status": {"S": "pending"}, "PartCount": {"N": "3"}, "ExpiresAt": {"N": str(int(time.time()) + 60)},
+            "Parts": {"M": {n: {"S": etag} for n, etag in parts.items()}},
+        }
+
+    # Part 2 je stigao u S3, ali je njegov ETag izgubljen sa konekcijom
+    with Stubber(get_upload.s3) as s3, Stubber(get_upload.sessions_table.meta.client) as dynamodb:
+        dynamodb.add_response("get_item", {"Item": session({"1": '"e1"'})})
+        s3.add_response("list_parts", {"Parts": [{"PartNumber": 1, "ETag": '"e1"'}, {"PartNumber": 2, "ETag": '"e2"'}]})
+        dynamodb.add_response("update_item", {})
+
+        body = json.loads(get_upload.lambda_handler(event, None)["body"])
+        s3.assert_no_pending_responses()
+        dynamodb.assert_no_pending_responses()
+
+    assert [part["partNumber"] for part in body["completed"]] == [1, 2]
+    assert [part["partNumber"] for part in body["parts"]] == [3]
+
+    with Stubber(complete.sessions_table.meta.client) as dynamodb:
+        dynamodb.add_response("get_item", {"Item": session({"1": '"e1"', "2": '"e2"'})})
+        with Stubber(complete.s3) as s3:
+            s3.add_response("list_parts", {"Parts": [{"PartNumber": 1, "ETag": '"e1"'}, {"PartNumber": 2, "ETag": '"e2"'}]})
+            response = complete.lambda_handler(event, None)
+
+    assert response["statusCode"] == 409
+    assert json.loads(response["body"])["missing"] == [3]
+
+
+INGEST_ENV = {
+    "BUCKET_NAME": "music",
+    "ALBUMS_TABLE": "Albums",
+    "ARTIST_ALBUM_TABLE": "ArtistAlbum",
+    "ARTISTS_TABLE": "Artists",
+    "UPLOAD_SESSIONS_TABLE": "UploadSessions",
+    "CONTENT_OBJECTS_TABLE": "ContentObjects",
+    "FINALIZE_UPLOAD_FUNCTION": "finalize-upload",
+}
+
+
+def test_album_ingest_batches_its_writes_and_uploads_only_new_audio(load_handler):
+    handler = load_handler("ingestAlbum", INGEST_ENV)
+    digest = content.sha256(b"stored track")
+    track = {"fileSize": 10 * uploads.PART_SIZE, "fileType": "audio/mpeg"}
+    event = {**EVENT, "body": json.dumps({
+        "title": "Album", "genres": ["rock"], "artists": ["ar1"],
+        "tracks": [{**track, "title": "One", "sha256": digest}, {**track, "title": "Two"}]
+    })}
+    stored = {
+        "ObjectKey": {"S": content.audio_key(digest)}, "Digest": {"S": digest},
+        "Size": {"N": "9"}, "ContentType": {"S": "audio/mpeg"}
+    }
+
+    with Stubber(handler.sessions_table.meta.client) as dynamodb, Stubber(handler.s3) as s3, \
+            Stubber(handler.lambda_client) as lambda_stub:
+        dynamodb.add_response("query", {"Items": [{"Genre": {"S": "rock"}, "Id": {"S": "ar1"}}]})
+        dynamodb.add_response("batch_get_item", {"Responses": {"ContentObjects": [stored]}})
+        s3.add_response("create_multipart_upload", {"UploadId": "u2"},
+                        {"Bucket": "music", "Key": ANY, "ContentType": "audio/mpeg"})
+        # Album + ArtistAlbum u jednoj transakciji, dve sesije + tracker u jednom BatchWriteItem
+        dynamodb.add_response("transact_write_items", {})
+        dynamodb.add_response("batch_write_item", {"UnprocessedItems": {}})
+        lambda_stub.add_response("invoke", {"StatusCode": 202},
+                                 {"FunctionName": "finalize-upload", "InvocationType": "Event", "Payload": ANY})
+
+        response = handler.lambda_handler(event, None)
+        dynamodb.assert_no_pending_responses()
+        s3.assert_no_pending_responses()
+        lambda_stub.assert_no_pending_responses()
+
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 202
+    one, two = body["tracks"]
+    assert one["upload"] == {"uploadId": ANY, "deduplicated": True, "key": content.audio_key(digest)}
+    # Samo prvi delovi su potpisani, ostale browser trazi preko GET /uploads/{id}
+    assert two["upload"]["partCount"] == 10
+    assert [part["partNumber"] for part in two["upload"]["parts"]] == [1, 2, 3, 4]
+
+
+def test_only_the_last_finalized_track_publishes_the_album():
+    table = boto3.resource("dynamodb").Table("UploadSessions")
+    session = {"Id": "up1", "Ingest": uploads.ingest_id("al1")}
+
+    with Stubber(table.meta.client) as dynamodb:
+        dynamodb.add_response("update_item", {"Attributes": {"Pending": {"SS": ["up2"]}}})
+        assert uploads.finish_ingest_track(table, session) is False
+
+        dynamodb.add_response("update_item", {"Attributes": {"Status": {"S": "pending"}}})
+        assert uploads.finish_ingest_track(table, {**session, "Id": "up2"}) is True
+
+        # Objava albuma nije uspela, tracker je ostao otvoren: ponovljena isporuka objavljuje opet
+        dynamodb.add_response("update_item", {"Attributes": {"Status": {"S": "pending"}}})
+        assert uploads.finish_ingest_track(table, {**session, "Id": "up2"}) is True
+        dynamodb.add_response("update_item", {}, {
+            "Key": {"Id": session["Ingest"]}, "TableName": "UploadSessions",
+            "UpdateExpression": "SET #status = :completed", "ConditionExpression": "#status = :pending",
+            "ExpressionAttributeNames": {"#status": "Status"},
+            "ExpressionAttributeValues": {":completed": "completed", ":pending": "pending"}
+        })
+        uploads.complete_ingest(table, session)
+
+        # Ponovljena isporuka kada je album vec objavljen
+        dynamodb.add_client_error("update_item", "ConditionalCheckFailedException")
+        assert uploads.finish_ingest_track(table, session) is False
+        dynamodb.assert_no_pending_responses()
+
+    assert uploads.finish_ingest_track(table, {"Id": "up3"}) is False
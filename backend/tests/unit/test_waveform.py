@@ -0,0 +1,21 @@
+import numpy as np
+
+
+def test_peaks_round_trip_at_each_level(load_handler):
+    handler = load_handler("computeWaveform", {"BUCKET_NAME": "music", "SONGS_TABLE": "Songs", "CONTENT_OBJECTS_TABLE": "ContentObjects"})
+    rate = 1000
+    samples = np.zeros(10 * rate, dtype="<i2")
+    samples[2500] = 32000
+    samples[7500] = -32000
+
+    for bits, top in ((8, 125), (16, 32000)):
+        data = handler.encode(samples, rate, levels=(4, 100), bits=bits)
+        waveform = handler.decode(data)
+
+        assert waveform["durationMs"] == 10000
+        coarse, fine = waveform["levels"]
+        assert coarse.tolist() == [[0, 0], [0, top], [0, 0], [-top, 0]]
+        assert fine.shape == (100, 2)
+        assert fine[25].tolist() == [0, top]
+
+    assert len(handler.encode(samples, rate, levels=(512, 4096))) < 10 * 1024
@@ -0,0 +1,53 @@
+import boto3
+from botocore.stub import Stubber
+
+from common import writes
+
+
+def _tables():
+    dynamodb = boto3.resource("dynamodb")
+    return dynamodb.Table("Albums"), dynamodb.Table("ArtistAlbum")
+
+
+def _links(count):
+    return [{"ArtistId": f"ar{i}", "AlbumId": "al1"} for i in range(count)]
+
+
+def test_album_and_mappings_are_one_transaction():
+    albums, artist_album = _tables()
+    item = {"Genre": "rock", "Id": "al1"}
+
+    with Stubber(albums.meta.client) as dynamodb:
+        dynamodb.add_response("transact_write_items", {}, {"TransactItems": [
+            *({"Put": {"TableName": "ArtistAlbum", "Item": link}} for link in _links(3)),
+            {"Put": {"TableName": "Albums", "Item": item}}
+        ]})
+
+        writes.put_with_links(albums, item, artist_album, _links(3))
+        dynamodb.assert_no_pending_responses()
+
+
+def test_long_artist_lists_are_batched_and_unprocessed_items_retried(monkeypatch):
+    monkeypatch.setattr(writes.time, "sleep", lambda seconds: None)
+    albums, artist_album = _tables()
+    item = {"Genre": "rock", "Id": "al1"}
+    links = _links(writes.TRANSACT_LIMIT)
+    calls = []
+    albums.meta.client.meta.events.register(
+        "before-parameter-build.dynamodb.BatchWriteItem", lambda params, **kwargs: calls.append(params)
+    )
+
+    with Stubber(albums.meta.client) as dynamodb:
+        # 101 put -> 5 poziva po 25; prvi poziv vraca jedan red kao neobradjen
+        unprocessed = {"ArtistAlbum": [{"PutRequest": {"Item": {"ArtistId": {"S": "ar0"}, "AlbumId": {"S": "al1"}}}}]}
+        dynamodb.add_response("batch_write_item", {"UnprocessedItems": unprocessed})
+        for _ in range(5):
+            dynamodb.add_response("batch_write_item", {"UnprocessedItems": {}})
+
+        writes.put_with_links(albums, item, artist_album, links)
+        dynamodb.assert_no_pending_responses()
+
+    sizes = [sum(len(requests) for requests in call["RequestItems"].values()) for call in calls]
+    assert sizes == [25, 1, 25, 25, 25, 1]
+    # Album je u poslednjem pozivu, posle svih ArtistAlbum redova
+    assert list(calls[-1]["RequestItems"]) == ["Albums"]
@@ -5,6 +5,7 @@ import {environment} from '../../env/environment';
 import {HttpClient} from '@angular/common/http';
 import {CreateArtistDto} from './create-artist-dto.model';
 import { ArtistWithAlbums } from './artist-albums.model';
+import { getAllPages } from '../content/models/page.model';
 
 @Injectable({
   providedIn: 'root'
@@ -14,7 +15,7 @@ export class ArtistService {
   constructor(private httpClient: HttpClient) { }
 
   getAll(): Observable<Artist[]> {
-    return this.httpClient.get<Artist[]>(`${environment.apiHost}/artists`);
+    return getAllPages<Artist>(this.httpClient, `${environment.apiHost}/artists`);
   }
 
   add(artist: CreateArtistDto): Observable<Artist> {
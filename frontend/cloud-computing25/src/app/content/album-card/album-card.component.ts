@@ -39,11 +39,15 @@ export class AlbumCardComponent {
     return `${mins}:${secs.toString().padStart(2, '0')}`;
   }
 
+  // Lista vraca mali derivat; original samo dok processCover ne napravi derivate
   getAlbumCoverUrl(): string {
-    console.log(this.album.coverImage);
     if (!this.album.coverImage) return '';
-    console.log(environment.s3BucketLink + '/' + this.album.coverImage);
-    return environment.s3BucketLink + '/' + this.album.coverImage;
+    return environment.s3BucketLink + '/' + (this.album.coverThumbnail?.jpeg ?? this.album.coverImage);
+  }
+
+  getAlbumCoverWebpUrl(): string {
+    if (!this.album.coverThumbnail) return '';
+    return environment.s3BucketLink + '/' + this.album.coverThumbnail.webp;
   }
 
   onCoverError() {
@@ -4,11 +4,12 @@ import { Observable, of } from 'rxjs';
 import { Album } from './models/album.model';
 import { environment } from '../../env/environment';
 import { SingleUploadDTO } from './models/single-upload-dto.model';
-import { AlbumUploadDTO } from './models/album-upload-dto.model';
+import { AlbumIngestDTO, AlbumUploadDTO } from './models/album-upload-dto.model';
 import { Rating } from './models/rating.model';
 import { Song } from './models/song.model';
 import { Artist } from '../artists/artist.model';
 import { AlbumResponse } from './album-details/album-details.component';
+import { getAllPages } from './models/page.model';
 
 @Injectable({
   providedIn: 'root'
@@ -25,12 +26,17 @@ export class ContentService {
     return this.httpClient.post<Album>(environment.apiHost + `/albums`,album);
   }
 
+  // Album i upload sesije svih pesama u jednom pozivu; odgovor ima tracks[] u redosledu manifesta
+  ingestAlbum(album: AlbumIngestDTO): Observable<any> {
+    return this.httpClient.post<any>(environment.apiHost + `/albums/ingest`, album);
+  }
+
   getAllSongs(): Observable<Song[]> {
-    return this.httpClient.get<Song[]>(environment.apiHost + `/songs`);
+    return getAllPages<Song>(this.httpClient, environment.apiHost + `/songs`);
   }
 
   getAllAlbums(): Observable<Album[]> {
-    return this.httpClient.get<Album[]>(environment.apiHost + `/albums`);
+    return getAllPages<Album>(this.httpClient, environment.apiHost + `/albums`);
   }
 
   getSong(songId: string): Observable<Song> {
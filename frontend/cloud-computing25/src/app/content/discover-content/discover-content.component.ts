@@ -101,7 +101,7 @@ export class DiscoverContentComponent implements OnInit {
   }
   getAlbumCoverUrl(album: Album): string {
     return album.coverImage 
-      ? `${environment.s3BucketLink}/${album.coverImage}`
+      ? `${environment.s3BucketLink}/${album.coverThumbnail?.jpeg ?? album.coverImage}`
       : 'assets/placeholder.png'; // fallback placeholder
   }
 }
@@ -9,3 +9,20 @@ export interface AlbumUploadDTO {
   coverFileName?: string;
   single: boolean
 }
+
+// Pesma u manifestu POST /albums/ingest
+export interface AlbumTrackDTO {
+  title: string;
+  description?: string;
+  artists: number[];
+  genres: string[];
+  fileSize: number;
+  fileType: string;
+  duration?: number;
+  transcribe: boolean;
+  sha256?: string;
+}
+
+export interface AlbumIngestDTO extends AlbumUploadDTO {
+  tracks: AlbumTrackDTO[];
+}
@@ -1,10 +1,12 @@
 import { Artist } from "../../artists/artist.model";
 import { Song } from '../models/song.model';
+import { CoverThumbnail } from './cover.model';
 
 export interface Album {
   title: string;
   description?: string;
   coverImage: string;
+  coverThumbnail?: CoverThumbnail | null;
   releaseDate: Date;
   songs: Song[];
   artists: Artist[];
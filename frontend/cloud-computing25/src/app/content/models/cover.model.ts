@@ -0,0 +1,6 @@
+// Derivat cover-a koji lista vraca (backend common/covers.py): kvadrat od size px
+export interface CoverThumbnail {
+  size: number;
+  webp: string;
+  jpeg: string;
+}
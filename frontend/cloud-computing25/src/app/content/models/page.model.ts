@@ -0,0 +1,27 @@
+import { HttpClient, HttpParams } from '@angular/common/http';
+import { EMPTY, Observable } from 'rxjs';
+import { expand, map, reduce } from 'rxjs/operators';
+
+export interface Page<T> {
+  items: T[];
+  nextToken: string | null;
+}
+
+export function getAllPages<T>(httpClient: HttpClient, url: string, limit: number = 100): Observable<T[]> {
+  // Prvi zahtev bez limit-a dobija ceo katalog iz snapshot-a (nextToken je tada null): backend
+  // preusmerava (302) na presigned URL objekta u S3, browser sam prati redirect i raspakuje gzip;
+  // ako snapshot jos ne postoji, backend vraca prvu stranu i nastavlja se sa limit-om
+  const fetchPage = (nextToken: string | null) => {
+    let params = new HttpParams();
+    if (nextToken) {
+      params = params.set('limit', limit).set('nextToken', nextToken);
+    }
+    return httpClient.get<Page<T>>(url, { params });
+  };
+
+  return fetchPage(null).pipe(
+    expand(page => page.nextToken ? fetchPage(page.nextToken) : EMPTY),
+    map(page => page.items),
+    reduce((all, items) => all.concat(items), [] as T[])
+  );
+}
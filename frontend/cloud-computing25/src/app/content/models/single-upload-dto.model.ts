@@ -1,13 +1,11 @@
 import { Artist } from "../../artists/artist.model";
 
 export interface SingleUploadDTO {
-  fileName: string;
   fileType: string;
   fileSize: number;
   createdDate: Date;
   modifiedDate: Date;
   duration?: number;
-  fileBase64: string;
   title: string;
   description?: string;
   artists: Artist[];
@@ -17,4 +15,5 @@ export interface SingleUploadDTO {
   single: boolean,
   transcribe: boolean,
   coverFileBase64?: string;
+  sha256?: string;
 }
@@ -1,11 +1,13 @@
 import { Artist } from "../../artists/artist.model";
 import { Album } from "./album.model";
+import { CoverThumbnail } from "./cover.model";
 
 export interface Song {
   Id:string,
   title: string;
   genres?: string[];
   coverImage?: string;
+  coverThumbnail?: CoverThumbnail | null;
   artists: Artist[];
   description?: string;
   Album?: Album;
@@ -15,4 +17,7 @@ export interface Song {
   fileSize:number,
   deleted:boolean,
   transcriptFileName?:string;
+  hlsPlaylist?:string;
+  previewFile?:string;
+  waveformFile?:string;
 }
@@ -1,4 +1,4 @@
-import { Component, Input } from '@angular/core';
+import { Component, ElementRef, Input, ViewChild } from '@angular/core';
 import { Song } from '../models/song.model';
 import { environment } from '../../../env/environment';
 
@@ -10,6 +10,8 @@ import { environment } from '../../../env/environment';
 })
 export class SongCardComponent {
   @Input() song!: Song;
+  @ViewChild('preview') preview?: ElementRef<HTMLAudioElement>;
+  playingPreview = false;
 
   getArtistNames(): string {
     return this.song.artists?.map(a => a.name).join(', ') || '';
@@ -19,10 +21,35 @@ export class SongCardComponent {
     return this.song.genres?.join(', ') || '';
   }
 
+  // Lista vraca mali derivat; original samo dok processCover ne napravi derivate
   getCoverUrl(): string {
     if (!this.song.coverImage) return "";
-    console.log(environment.s3BucketLink + '/' + this.song.coverImage)
-    return environment.s3BucketLink + '/' + this.song.coverImage;
+    return environment.s3BucketLink + '/' + (this.song.coverThumbnail?.jpeg ?? this.song.coverImage);
+  }
+
+  getCoverWebpUrl(): string {
+    if (!this.song.coverThumbnail) return "";
+    return environment.s3BucketLink + '/' + this.song.coverThumbnail.webp;
+  }
+
+  // 30s isecak (~250 KB) umesto celog fajla, browser ga ucitava unapred
+  getPreviewUrl(): string {
+    if (!this.song.previewFile) return '';
+    return environment.s3BucketLink + '/' + this.song.previewFile;
+  }
+
+  togglePreview(event: Event): void {
+    event.stopPropagation();
+    event.preventDefault();
+    const audio = this.preview?.nativeElement;
+    if (!audio) return;
+
+    if (this.playingPreview) {
+      audio.pause();
+    } else {
+      audio.play();
+    }
+    this.playingPreview = !this.playingPreview;
   }
 
   onImageError(event: Event): void {
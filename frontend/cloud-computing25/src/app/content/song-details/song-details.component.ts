@@ -10,6 +10,7 @@ import { Subscription } from 'rxjs';
 import {HttpClient} from '@angular/common/http';
 import { ListeningHistoryService } from '../listening-history.service';
 import { FeedService } from '../../layout/feed.service';
+import { drawWaveform, parseWaveform, Waveform } from '../waveform';
 
 @Component({
   selector: 'app-song-details',
@@ -21,6 +22,8 @@ export class SongDetailsComponent implements OnInit, OnDestroy {
   snackBar: MatSnackBar = inject(MatSnackBar)
   song: Song | null = null;
   @ViewChild('audioPlayer') audioPlayer!: ElementRef<HTMLAudioElement>;
+  @ViewChild('waveformCanvas') waveformCanvas?: ElementRef<HTMLCanvasElement>;
+  waveform: Waveform | null = null;
   isPlaying = false;
   currentTime = 0;
   volume = 70;
@@ -69,6 +72,7 @@ export class SongDetailsComponent implements OnInit, OnDestroy {
         this.isLoadingSong = false;
 
         this.loadSongRating();
+        this.loadWaveform();
 
         console.log(song);
 
@@ -97,6 +101,27 @@ export class SongDetailsComponent implements OnInit, OnDestroy {
     this.subscriptions.add(songSubscription);
   }
 
+  // Nekoliko KB min/max parova umesto dekodiranja celog fajla u browseru
+  private loadWaveform(): void {
+    this.waveform = null;
+    if (!this.song?.waveformFile) return;
+
+    this.http.get(environment.s3BucketLink + '/' + this.song.waveformFile, { responseType: 'arraybuffer' }).subscribe({
+      next: (buffer) => {
+        this.waveform = parseWaveform(buffer);
+        setTimeout(() => this.redrawWaveform());
+      },
+      error: (error) => console.warn('Waveform not available:', error)
+    });
+  }
+
+  private redrawWaveform(): void {
+    const canvas = this.waveformCanvas?.nativeElement;
+    if (!canvas || !this.waveform) return;
+    canvas.width = canvas.clientWidth;
+    drawWaveform(canvas, this.waveform, this.getProgressPercentage() / 100);
+  }
+
   private async loadSongRating(): Promise<void> {
     if (!this.song) return;
 
@@ -130,11 +155,19 @@ export class SongDetailsComponent implements OnInit, OnDestroy {
   }
 
   getAudioUrl(): string {
+    // HLS (manji fajlovi, bitrate po mrezi) gde ga browser svira nativno, inace originalni fajl
+    if (this.song?.hlsPlaylist && this.supportsHls()) {
+      return environment.s3BucketLink + '/' + this.song.hlsPlaylist;
+    }
     if (!this.song?.fileName) return '';
     console.log(environment.s3BucketLink + '/' + this.song.fileName)
     return environment.s3BucketLink + '/' + this.song.fileName;
   }
 
+  private supportsHls(): boolean {
+    return document.createElement('audio').canPlayType('application/vnd.apple.mpegurl') !== '';
+  }
+
   togglePlayPause() {
     if (!this.audioPlayer?.nativeElement) return;
 
@@ -174,6 +207,7 @@ export class SongDetailsComponent implements OnInit, OnDestroy {
   onTimeUpdate() {
     if (this.audioPlayer?.nativeElement) {
       this.currentTime = this.audioPlayer.nativeElement.currentTime;
+      this.redrawWaveform();
     }
   }
 
@@ -6,6 +6,7 @@ import { Artist } from '../../artists/artist.model';
 import { ContentService } from '../content.service';
 import { environment } from '../../../env/environment';
 import { Song } from '../models/song.model';
+import { UploadService } from '../upload.service';
 
 @Component({
   selector: 'app-update-song',
@@ -27,6 +28,7 @@ export class UpdateSongComponent implements OnInit {
     private fb: FormBuilder,
     private artistService: ArtistService,
     private contentService: ContentService,
+    private uploadService: UploadService,
     private dialogRef: MatDialogRef<UpdateSongComponent>,
     @Inject(MAT_DIALOG_DATA) public data: { song: Song }
   ) {
@@ -109,11 +111,6 @@ export class UpdateSongComponent implements OnInit {
   async save(): Promise<void> {
     if (this.form.invalid) return;
 
-    let audioBase64: string | undefined;
-    if (this.selectedAudioFile) {
-      audioBase64 = await this.convertFileToBase64(this.selectedAudioFile);
-    }
-
     let coverBase64: string | undefined;
     if (this.selectedCoverFile) {
       coverBase64 = await this.convertFileToBase64(this.selectedCoverFile);
@@ -126,11 +123,15 @@ export class UpdateSongComponent implements OnInit {
       duration: this.audioInfo?.duration || this.data.song.duration
     };
 
-    if (audioBase64) {
-      updatedSong.fileBase64 = audioBase64;
-      updatedSong.fileName = crypto.randomUUID();
-      updatedSong.fileType = this.audioInfo.fileType;
-      updatedSong.fileSize = this.audioInfo.fileSize;
+    // Novi audio ide direktno u S3, pesma se azurira kada se upload zavrsi
+    const audioFile = this.selectedAudioFile;
+    if (audioFile) {
+      updatedSong.audioUpload = {
+        fileType: this.audioInfo.fileType,
+        fileSize: this.audioInfo.fileSize,
+        duration: this.audioInfo.duration,
+        sha256: await this.uploadService.sha256(audioFile)
+      };
     }
 
     if (coverBase64) {
@@ -141,7 +142,17 @@ export class UpdateSongComponent implements OnInit {
     }
 
     this.contentService.updateSong(updatedSong).subscribe({
-      next: () => this.dialogRef.close(true),
+      next: async (res) => {
+        if (audioFile) {
+          try {
+            await this.uploadService.uploadFile(audioFile, res.upload);
+          } catch (err) {
+            console.error('Audio upload failed', err);
+            return;
+          }
+        }
+        this.dialogRef.close(true);
+      },
       error: (err) => console.error('Update song failed', err)
     });
   }
@@ -4,11 +4,12 @@ import { ArtistService } from '../../artists/artist.service';
 import { Artist } from '../../artists/artist.model';
 import { SingleUploadDTO } from '../models/single-upload-dto.model';
 import { ContentService } from '../content.service';
-import { AlbumUploadDTO } from '../models/album-upload-dto.model';
+import { AlbumIngestDTO, AlbumTrackDTO, AlbumUploadDTO } from '../models/album-upload-dto.model';
 import { MatSnackBar } from '@angular/material/snack-bar';
 import { FeedService } from '../../layout/feed.service';
 import { Router } from '@angular/router';
-import { forkJoin } from 'rxjs';
+import { firstValueFrom } from 'rxjs';
+import { UploadService } from '../upload.service';
 
 @Component({
   standalone: false,
@@ -33,6 +34,7 @@ export class UploadContentComponent implements OnInit {
     private fb: FormBuilder,
     private artistService: ArtistService,
     private musicService: ContentService,
+    private uploadService: UploadService,
     private snackBar: MatSnackBar,
     private router: Router
   ) {
@@ -193,8 +195,6 @@ export class UploadContentComponent implements OnInit {
     const file: File = formValue.singleFile;
     if (!file) return;
 
-    const base64File = await this.convertFileToBase64(file);
-
     let coverBase64: string | null = null;
     if (this.coverFile) {
       coverBase64 = await this.convertFileToBase64(this.coverFile);
@@ -215,13 +215,13 @@ export class UploadContentComponent implements OnInit {
 
     console.log('Album DTO:', albumDto);
     this.musicService.addAlbum(albumDto).subscribe({
-      next: albumRes => {
+      next: async albumRes => {
         const albumId = albumRes.item.Id;
 
+        const sha256 = await this.uploadService.sha256(file);
         const dto: SingleUploadDTO = {
-          fileBase64: base64File,
-          fileName: crypto.randomUUID(),
           fileSize: file.size,
+          sha256,
           fileType: file.type,
           createdDate: new Date(file.lastModified),
           modifiedDate: new Date(file.lastModified),
@@ -230,7 +230,8 @@ export class UploadContentComponent implements OnInit {
           description: formValue.description,
           artists: formValue.artists,
           genres: formValue.genres,
-          coverImage: name,
+          // Kljuc pod kojim je createAlbum sacuvao cover (covers/original/...)
+          coverImage: albumRes.item.coverImage,
           coverFileBase64: coverBase64 ?? undefined,
           album: albumId,
           single: true,
@@ -239,10 +240,15 @@ export class UploadContentComponent implements OnInit {
 
         console.log('Single DTO:', dto);
         this.musicService.addSong(dto).subscribe({
-          next: res => {
-            console.log('Single uploaded successfully', res);
-            this.snackBar.open('Upload successful!', 'OK', { duration: 3000 });
-            this.router.navigate(['/home']); // 👈 redirekcija
+          next: async res => {
+            try {
+              await this.uploadService.uploadFile(file, res.upload);
+              console.log('Single uploaded successfully', res);
+              this.snackBar.open('Upload successful!', 'OK', { duration: 3000 });
+              this.router.navigate(['/home']); // 👈 redirekcija
+            } catch (err) {
+              console.error('Single upload failed', err);
+            }
           },
           error: err => console.error('Single upload failed', err)
         });
@@ -258,8 +264,26 @@ export class UploadContentComponent implements OnInit {
       this.coverBase64 = await this.convertFileToBase64(this.coverFile);
     }
 
-    const name = crypto.randomUUID();
-    const albumDto: AlbumUploadDTO = {
+    const files: File[] = this.songs.controls
+      .map(songCtrl => (songCtrl as FormGroup).value.audioFile)
+      .filter((file: File | null) => !!file);
+    const tracks: AlbumTrackDTO[] = await Promise.all(this.songs.controls
+      .map(songCtrl => (songCtrl as FormGroup).value)
+      .filter(song => !!song.audioFile)
+      .map(async song => ({
+        title: song.title,
+        description: song.description,
+        artists: song.artists,
+        genres: song.genres,
+        fileSize: song.audioFile.size,
+        fileType: song.audioFile.type,
+        duration: song.audioInfo?.duration || 0,
+        transcribe: true,
+        sha256: await this.uploadService.sha256(song.audioFile)
+      })));
+
+    // Jedan poziv otvara album i upload-e svih pesama; backend salje jedno obavestenje za album
+    const albumDto: AlbumIngestDTO = {
       createdDate: new Date(),
       modifiedDate: new Date(),
       title: formValue.title,
@@ -267,55 +291,23 @@ export class UploadContentComponent implements OnInit {
       artists: formValue.artists,
       genres: formValue.genres,
       coverFileBase64: this.coverBase64 ?? undefined,
-      coverFileName: name,
-      single: false
+      coverFileName: crypto.randomUUID(),
+      single: false,
+      tracks
     };
 
-    this.musicService.addAlbum(albumDto).subscribe({
-      next: albumRes => {
-        const albumId = albumRes.item.Id;
-
-        const uploadRequests = this.songs.controls.map(async (songCtrl) => {
-          const songControl = songCtrl as FormGroup;
-          const songFile: File = songControl.value.audioFile;
-          if (!songFile) return null;
-
-          const base64File = await this.convertFileToBase64(songFile);
-
-          const songDto: SingleUploadDTO = {
-            fileBase64: base64File,
-            fileName: crypto.randomUUID(),
-            fileSize: songFile.size,
-            fileType: songFile.type,
-            createdDate: new Date(songFile.lastModified),
-            modifiedDate: new Date(songFile.lastModified),
-            duration: songControl.value.audioInfo?.duration || 0,
-            title: songControl.value.title,
-            description: songControl.value.description,
-            artists: songControl.value.artists,
-            genres: songControl.value.genres,
-            coverImage: name,
-            coverFileBase64: this.coverBase64 ?? undefined,
-            album: albumId,
-            transcribe: true,
-            single: false
-          };
-
-          return this.musicService.addSong(songDto);
-        }).filter(req => req !== null);
-
-        // sačekaj da svi završe
-        forkJoin(uploadRequests).subscribe({
-          next: res => {
-            console.log('Sve pesme uploadovane:', res);
-            this.snackBar.open('Album uploaded successfully!', 'OK', { duration: 3000 });
-            this.router.navigate(['/home']);
-          },
-          error: err => console.error('Neka pesma nije uploadovana', err)
-        });
-      },
-      error: err => console.error('Album upload failed', err)
-    });
+    try {
+      const res = await firstValueFrom(this.musicService.ingestAlbum(albumDto));
+      // tracks[] je u redosledu manifesta, fajlovi idu paralelno
+      await Promise.all(res.tracks.map((track: any, i: number) =>
+        this.uploadService.uploadFile(files[i], track.upload)
+      ));
+      console.log('Sve pesme uploadovane:', res);
+      this.snackBar.open('Album uploaded successfully!', 'OK', { duration: 3000 });
+      this.router.navigate(['/home']);
+    } catch (err) {
+      console.error('Album upload failed', err);
+    }
   }
 
   // ----------- Helpers -----------
@@ -0,0 +1,94 @@
+import { Injectable } from '@angular/core';
+import { HttpClient } from '@angular/common/http';
+import { firstValueFrom } from 'rxjs';
+import { environment } from '../../env/environment';
+
+export interface UploadPart {
+  partNumber: number;
+  url: string;
+}
+
+// Odgovor POST /songs (i PUT /songs/{id} sa audioUpload) i GET /uploads/{id} - vidi common/uploads.py
+// deduplicated: isti sadrzaj je vec sacuvan, pesma se povezuje sa njim bez slanja bajtova
+export interface UploadInstructions {
+  uploadId: string;
+  key: string;
+  deduplicated?: boolean;
+  partSize?: number;
+  partCount?: number;
+  completed?: { partNumber: number; etag: string }[];
+  parts?: UploadPart[];
+}
+
+const PARALLEL_PARTS = 4;
+const RESUME_ATTEMPTS = 3;
+// WebCrypto nema inkrementalni SHA-256, fajl se hesira ceo u memoriji; vece fajlove ne deduplikujemo
+const DEDUP_MAX_BYTES = 128 * 1024 * 1024;
+
+@Injectable({
+  providedIn: 'root'
+})
+export class UploadService {
+  constructor(private http: HttpClient) {}
+
+  // Posle prekida konekcije nastavlja od delova koji fale, bez ponovnog slanja celog fajla
+  async uploadFile(file: File, upload: UploadInstructions): Promise<void> {
+    if (upload.deduplicated) return;
+    for (let attempt = 1; ; attempt++) {
+      try {
+        await this.uploadParts(file, upload);
+        // POST /albums/ingest potpisuje samo prve delove svake pesme, ostali stizu preko GET /uploads/{id}
+        while (!this.allPartsSigned(upload)) {
+          upload = await this.resume(upload.uploadId);
+          await this.uploadParts(file, upload);
+        }
+        break;
+      } catch (err) {
+        if (attempt >= RESUME_ATTEMPTS) throw err;
+        console.warn(`Upload ${upload.uploadId} interrupted, resuming`, err);
+        upload = await this.resume(upload.uploadId);
+      }
+    }
+    await firstValueFrom(this.http.post(`${environment.apiHost}/uploads/${upload.uploadId}/complete`, {}));
+  }
+
+  // Hex SHA-256 fajla; backend po njemu prepoznaje audio koji je vec sacuvan.
+  // Iznad DEDUP_MAX_BYTES vraca undefined (sha256 je opciono) i fajl se salje normalno
+  async sha256(file: File): Promise<string | undefined> {
+    if (file.size > DEDUP_MAX_BYTES) return undefined;
+    const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+  }
+
+  resume(uploadId: string): Promise<UploadInstructions> {
+    return firstValueFrom(this.http.get<UploadInstructions>(`${environment.apiHost}/uploads/${uploadId}`));
+  }
+
+  abort(uploadId: string): Promise<any> {
+    return firstValueFrom(this.http.delete(`${environment.apiHost}/uploads/${uploadId}`));
+  }
+
+  private allPartsSigned(upload: UploadInstructions): boolean {
+    return (upload.completed?.length ?? 0) + (upload.parts?.length ?? 0) >= (upload.partCount ?? 0);
+  }
+
+  // Delovi idu direktno na presigned S3 URL-ove (fetch, bez auth interceptora), ETag svakog dela se belezi u sesiji
+  private async uploadParts(file: File, upload: UploadInstructions): Promise<void> {
+    const pending = [...(upload.parts ?? [])];
+
+    const worker = async () => {
+      let part: UploadPart | undefined;
+      while ((part = pending.shift())) {
+        const partSize = upload.partSize!;
+        const start = (part.partNumber - 1) * partSize;
+        const res = await fetch(part.url, { method: 'PUT', body: file.slice(start, start + partSize) });
+        if (!res.ok) throw new Error(`Part ${part.partNumber} failed: ${res.status}`);
+        await firstValueFrom(this.http.put(
+          `${environment.apiHost}/uploads/${upload.uploadId}/parts/${part.partNumber}`,
+          { etag: res.headers.get('ETag') }
+        ));
+      }
+    };
+    await Promise.all(Array.from({ length: Math.min(PARALLEL_PARTS, pending.length) }, worker));
+  }
+}
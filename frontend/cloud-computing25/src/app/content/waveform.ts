@@ -0,0 +1,55 @@
+// Citac .peaks fajla koji pravi backend/lambda/computeWaveform (format je opisan tamo)
+export interface Waveform {
+  bits: number;
+  sampleRate: number;
+  durationMs: number;
+  levels: (Int8Array | Int16Array)[]; // naizmenicno min, max
+}
+
+export function parseWaveform(buffer: ArrayBuffer): Waveform {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== 'WFPK' || view.getUint8(4) !== 1) throw new Error('Not a waveform file');
+
+  const bits = view.getUint8(5);
+  const count = view.getUint16(6, true);
+  let offset = 16 + 4 * count;
+  const levels: (Int8Array | Int16Array)[] = [];
+  for (let i = 0; i < count; i++) {
+    const values = view.getUint32(16 + 4 * i, true) * 2;
+    // Kopija (slice) jer Int16Array zahteva poravnat offset
+    levels.push(bits === 8
+      ? new Int8Array(buffer.slice(offset, offset + values))
+      : new Int16Array(buffer.slice(offset, offset + values * 2)));
+    offset += values * (bits / 8);
+  }
+  return { bits, sampleRate: view.getUint32(8, true), durationMs: view.getUint32(12, true), levels };
+}
+
+export function drawWaveform(canvas: HTMLCanvasElement, waveform: Waveform, progress: number,
+                             played = '#1db954', rest = '#b3b3b3'): void {
+  const ctx = canvas.getContext('2d');
+  if (!ctx) return;
+  const width = canvas.width;
+  const height = canvas.height;
+  const full = waveform.bits === 8 ? 128 : 32768;
+  // Najgrublji nivo koji ima bar jedan par po pikselu
+  const level = waveform.levels.find(l => l.length / 2 >= width) ?? waveform.levels[waveform.levels.length - 1];
+  const pairs = level.length / 2;
+
+  ctx.clearRect(0, 0, width, height);
+  for (let x = 0; x < width; x++) {
+    const from = Math.floor(x * pairs / width);
+    const to = Math.max(from + 1, Math.floor((x + 1) * pairs / width));
+    let min = 0;
+    let max = 0;
+    for (let i = from; i < to; i++) {
+      min = Math.min(min, level[2 * i]);
+      max = Math.max(max, level[2 * i + 1]);
+    }
+    ctx.fillStyle = x / width < progress ? played : rest;
+    const top = height / 2 - (max / full) * height / 2;
+    const bottom = height / 2 - (min / full) * height / 2;
+    ctx.fillRect(x, top, 1, Math.max(1, bottom - top));
+  }
+}